@@ -0,0 +1,184 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+from MasterProjectManager import MasterProjectManager
+from ProjectRecord import ProjectRecord, as_project_dict
+from utils.text_utils import normalize_project_identity
+
+
+class BufferedProjectWriter:
+    def __init__(self, manager: MasterProjectManager, max_batch: int = 100, flush_interval: float = 5.0):
+        """
+        Write-behind buffer around MasterProjectManager.
+
+        upsert_project() returns immediately. Repeated writes to the same (source, identity)
+        are coalesced into one pending entry, and a background thread flushes the buffer
+        through manager.bulk_upsert_projects once it holds max_batch identities or the
+        oldest entry is flush_interval seconds old. Use it as a context manager (or call
+        close()) so the remaining entries are flushed even when the scraping loop raises.
+
+        Args:
+            manager: MasterProjectManager used for the bulk writes
+            max_batch: Number of pending identities that triggers a flush
+            flush_interval: Max seconds an entry waits before being flushed
+        """
+        self.manager = manager
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+
+        # (source, name_key, ticker_key) -> payloads (dict copies or records) in arrival order
+        self._pending: "OrderedDict[Tuple[str, str, str], List[Union[Dict, ProjectRecord]]]" = OrderedDict()
+        self._pending_items = 0
+        self._oldest: Optional[float] = None
+        self._closed = False
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+
+        self.failed_items: List[Dict[str, Any]] = []
+        self._stats = {
+            "enqueued": 0,
+            "coalesced": 0,
+            "flushed": 0,
+            "failed": 0,
+            "flush_count": 0,
+            "last_flush_latency": 0.0,
+            "max_flush_latency": 0.0,
+            "total_flush_latency": 0.0,
+        }
+
+        self._thread = threading.Thread(target=self._run, name="BufferedProjectWriter", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "BufferedProjectWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def upsert_project(self, project_data: Union[Dict, ProjectRecord], source: str) -> None:
+        """
+        Queue a project for a buffered upsert.
+
+        Records are queued as they are and only converted to dicts when flushed, so the
+        caller must not reuse a record after handing it over.
+
+        Args:
+            project_data: Project data dictionary or ProjectRecord
+            source: Source of the data (e.g., 'coinmarketcap', 'coingecko')
+        """
+        if isinstance(project_data, ProjectRecord):
+            name, ticker, payload = project_data.project_name, project_data.project_ticker, project_data
+        else:
+            name, ticker, payload = project_data.get('project_name'), project_data.get('project_ticker'), dict(project_data)
+        name_key, ticker_key = normalize_project_identity(name, ticker)
+        if not name_key or not ticker_key:
+            raise ValueError("project_name and project_ticker are required")
+
+        key = (source, name_key, ticker_key)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BufferedProjectWriter is closed")
+
+            payloads = self._pending.get(key)
+            if payloads is None:
+                self._pending[key] = [payload]
+            else:
+                payloads.append(payload)
+                self._stats["coalesced"] += 1
+            self._pending_items += 1
+            self._stats["enqueued"] += 1
+
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if len(self._pending) >= self.max_batch:
+                self._wakeup.notify()
+
+    def _flush_due(self) -> bool:
+        """Caller holds self._lock."""
+        if not self._pending:
+            return False
+        if len(self._pending) >= self.max_batch:
+            return True
+        return time.monotonic() - self._oldest >= self.flush_interval
+
+    def _run(self) -> None:
+        """Background flusher loop."""
+        while True:
+            with self._lock:
+                while not self._closed and not self._flush_due():
+                    timeout = None
+                    if self._oldest is not None:
+                        timeout = max(0.0, self.flush_interval - (time.monotonic() - self._oldest))
+                    self._wakeup.wait(timeout)
+                if self._closed:
+                    return
+            self.flush()
+
+    def flush(self) -> Dict[str, int]:
+        """
+        Write every pending entry now, one bulk_upsert_projects call per source.
+
+        Returns:
+            Dict with "written" and "failed" item counts for this flush
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, OrderedDict()
+                batch_items, self._pending_items = self._pending_items, 0
+                self._oldest = None
+            if not batch:
+                return {"written": 0, "failed": 0}
+
+            by_source: Dict[str, List[Dict]] = {}
+            for (source, _, _), payloads in batch.items():
+                by_source.setdefault(source, []).extend(as_project_dict(p) for p in payloads)
+
+            start = time.monotonic()
+            failed: List[Dict[str, Any]] = []
+            for source, payloads in by_source.items():
+                try:
+                    result = self.manager.bulk_upsert_projects(payloads, source)
+                    failed += [{**err, "source": source} for err in result["errors"]]
+                except Exception as e:
+                    failed += [
+                        {"project_name": p.get('project_name', 'Unknown'), "source": source, "error": str(e)}
+                        for p in payloads
+                    ]
+            latency = time.monotonic() - start
+
+            with self._lock:
+                self.failed_items += failed
+                self._stats["flushed"] += batch_items - len(failed)
+                self._stats["failed"] += len(failed)
+                self._stats["flush_count"] += 1
+                self._stats["last_flush_latency"] = latency
+                self._stats["max_flush_latency"] = max(self._stats["max_flush_latency"], latency)
+                self._stats["total_flush_latency"] += latency
+
+            for err in failed:
+                print(f"Failed to upsert project {err['project_name']} from {err['source']}: {err['error']}")
+            return {"written": batch_items - len(failed), "failed": len(failed)}
+
+    def close(self) -> None:
+        """Stop the background flusher and flush whatever is still pending."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join()
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and flush latency counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["queue_depth"] = len(self._pending)
+            stats["queued_items"] = self._pending_items
+        flushes = stats["flush_count"]
+        stats["avg_flush_latency"] = stats["total_flush_latency"] / flushes if flushes else 0.0
+        return stats
@@ -1,27 +1,107 @@
-import re
-
-from pymongo import MongoClient, ASCENDING
-from datetime import datetime
+from pymongo import MongoClient, UpdateOne, ReturnDocument
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+from datetime import datetime, timedelta
+import time
 import uuid
-from typing import Dict, List, Any, Optional, Tuple, Set
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple, Set, Iterator, Union
 import json
-from copy import deepcopy
 
 from config.private import get_mongodb_uri
+from ProjectRecord import ProjectRecord, as_project_dict
+from storage.base import ProjectStore, Projection
+from storage.mongo_store import DUPLICATE_KEY, MongoProjectStore
+from utils.exchange_registry import ExchangeRegistry
+from utils.mongo_client import get_mongo_client
+from utils.text_utils import normalize_project_identity, parse_dollar_amount, project_identity_keys
+
+
+class WriteConflictError(Exception):
+    """A compare-and-swap write lost to concurrent writers on every retry."""
+
+
+# Identity cache key: a (name_key, ticker_key) identity or one of a project's identity_keys
+CacheKey = Union[Tuple[str, str], str]
 
 
 class MasterProjectManager:
-    def __init__(self, connection_string: str, database_name: str = "chainreachai"):
+    # Lower bounds of the market_cap histogram buckets; values >= the last bound share one bucket
+    MARKET_CAP_BUCKETS = [0, 1e5, 1e6, 1e7, 1e8, 1e9, 1e10]
+    # List field (dotted path) -> key that identifies its dict items, compared case-insensitively
+    LIST_IDENTITY_KEYS: Dict[str, str] = {"telegram_admins": "username"}
+    # Payload fields recorded in the market snapshot series on upsert
+    SNAPSHOT_FIELDS = ("market_cap", "fdv", "liquidity")
+    # get_market_series reductions of the samples that fall into one interval
+    SERIES_AGGREGATES = {
+        "last": lambda values: values[-1],
+        "first": lambda values: values[0],
+        "min": min,
+        "max": max,
+        "mean": lambda values: sum(values) / len(values),
+    }
+
+    def __init__(self, connection_string: Optional[str] = None, database_name: str = "chainreachai",
+                 identity_cache_size: int = 50000, maintain_ticker_counts: bool = False,
+                 client: Optional[MongoClient] = None, db: Optional[Database] = None,
+                 write_mode: str = "client", max_write_retries: int = 5,
+                 store: Optional[ProjectStore] = None, split_details: bool = False,
+                 record_market_snapshots: bool = True):
         """
         Initialize the MasterProjectManager with MongoDB connection
 
         Args:
-            connection_string: MongoDB connection string
+            connection_string: MongoDB connection string (defaults to get_mongodb_uri())
             database_name: Name of the database to use
+            identity_cache_size: Max entries in the in-process identity cache (LRU)
+            maintain_ticker_counts: Keep the ticker_counts side collection current on insert
+                (seed it once with rebuild_ticker_counts)
+            client: Injected MongoClient; otherwise the process-wide pooled client for
+                connection_string is used (utils.mongo_client.get_mongo_client)
+            db: Injected Database; takes precedence over client/database_name
+            write_mode: "client" reads, merges in Python and writes a diff; "server" sends the
+                merge as one upsert pipeline update per project (see _build_merge_pipeline)
+            max_write_retries: Re-merge attempts after a _v compare-and-swap conflict before
+                WriteConflictError is raised (client write mode)
+            store: Storage backend (e.g. storage.sqlite_store.SQLiteProjectStore for offline
+                runs); takes precedence over connection_string/client/db, which otherwise
+                build the MongoDB backend
+            split_details: Build the MongoDB backend with about, exchanges and telegram_admins
+                in the project_details collection (see MongoProjectStore); client write mode only
+            record_market_snapshots: Append the market_cap / fdv / liquidity each upsert carries
+                to the backend's market snapshot series (see get_market_series)
         """
-        self.client = MongoClient(connection_string)
-        self.db = self.client[database_name]
-        self.collection = self.db.projects
+        if write_mode not in ("client", "server"):
+            raise ValueError(f"Unknown write_mode: {write_mode}")
+        self.write_mode = write_mode
+        self.max_write_retries = max_write_retries
+        self._write_stats = {"cas_attempts": 0, "conflicts": 0, "retries": 0, "exhausted": 0}
+
+        if store is None:
+            if db is None:
+                db = (client if client is not None else get_mongo_client(connection_string))[database_name]
+            store = MongoProjectStore(db, split_details=split_details)
+        self.store = store
+
+        # Raw MongoDB handles (None for other backends), used by the server write mode
+        is_mongo = isinstance(store, MongoProjectStore)
+        self.db = store.db if is_mongo else None
+        self.client = self.db.client if is_mongo else None
+        self.collection = store.collection if is_mongo else None
+        self.ticker_counts = store.ticker_counts if is_mongo else None
+        if write_mode == "server" and not is_mongo:
+            raise ValueError("write_mode='server' requires the MongoDB store")
+        if write_mode == "server" and store.split_details:
+            raise ValueError("write_mode='server' merges whole documents and cannot use split_details")
+
+        # In-process slug -> id cache over the backend's exchange dimension
+        self.exchange_registry = ExchangeRegistry(store)
+
+        # Keep the backend's ticker -> count table current on insert
+        self.maintain_ticker_counts = maintain_ticker_counts
+
+        # Keep a time series of the market data seen on upsert
+        self.record_market_snapshots = record_market_snapshots
 
         # Source priority list (index 0 = highest priority)
         self.source_priority = [
@@ -32,32 +112,22 @@ class MasterProjectManager:
             "birdeye"
         ]
 
-        # self._setup_indexes()
-
-    def _setup_indexes(self):
-        """Setup MongoDB indexes for optimal performance"""
-        # Compound index for duplicate detection
-        self.collection.create_index([
-            ("project_name", ASCENDING),
-            ("project_ticker", ASCENDING)
-        ], name="duplicate_detection_idx")
-
-        # Unique index on project_uid
-        self.collection.create_index("project_uid", unique=True, name="project_uid_idx")
-
-        # Unique index on project_ticker
-        self.collection.create_index("project_ticker", name="project_ticker_idx")
+        # Identity cache: (name_key, ticker_key) or identity key -> project_uid, LRU ordered.
+        # A hit still reads the document (the merge needs it), but by project_uid; the saving
+        # is on misses of an authoritative cache, which skip the lookup for new projects.
+        self.identity_cache_size = identity_cache_size
+        self._identity_cache: "OrderedDict[CacheKey, str]" = OrderedDict()
+        self._identity_cache_authoritative = False
+        self._identity_cache_stats = {"hits": 0, "misses": 0, "negative_hits": 0, "evictions": 0}
 
-        # Index on categories for filtering
-        self.collection.create_index("category", name="category_idx")
+        # (computed_at monotonic seconds, stats) of the last get_project_stats call
+        self._stats_cache: Optional[Tuple[float, Dict]] = None
 
-        # Sparse index on market_cap for projects with market data
-        self.collection.create_index("market_cap", sparse=True, name="market_cap_idx")
-
-        # Index on sources keys for source-based queries
-        self.collection.create_index("sources", name="sources_idx")
+        # self._setup_indexes()
 
-        print("MongoDB indexes created successfully")
+    def _setup_indexes(self):
+        """Setup backend indexes for optimal performance"""
+        self.store.setup_indexes()
 
     @staticmethod
     def _is_empty(value: Any) -> bool:
@@ -80,18 +150,61 @@ class MasterProjectManager:
         except Exception:
             return f"{type(item).__name__}:{repr(item)}"
 
-    def _merge_lists(self, a: List[Any], b: List[Any], prefer_b: bool) -> List[Any]:
+    @classmethod
+    def _freeze(cls, item: Any) -> Any:
+        """
+        Hashable canonical form of a list item that, for JSON-shaped data, is equal exactly
+        when the _signature JSON is: dicts compare regardless of key order, lists and tuples
+        alike, and the type tag keeps 1, 1.0 and True apart. Anything else falls back to
+        _signature.
+        """
+        kind = type(item)
+        if kind is str:
+            return item
+        if kind is dict:
+            try:
+                return dict, tuple(sorted((k, cls._freeze(v)) for k, v in item.items()))
+            except TypeError:
+                return object, cls._signature(item)
+        if kind is list or kind is tuple:
+            return list, tuple(cls._freeze(v) for v in item)
+        if kind in (int, float, bool) or item is None:
+            return kind, item
+        return object, cls._signature(item)
+
+    def _list_identity(self, field: str, item: Any) -> Any:
+        """
+        De-duplication key of an item of the list at `field` (dotted path). Items of a
+        field listed in LIST_IDENTITY_KEYS that carry a non-empty string under the
+        identity key are the same item when that key matches case-insensitively
+        (a telegram admin is its username); every other item is compared by structure.
+        """
+        id_key = self.LIST_IDENTITY_KEYS.get(field)
+        if id_key is not None and type(item) is dict:
+            value = item.get(id_key)
+            if isinstance(value, str) and value:
+                return id_key, value.lower()
+        return self._freeze(item)
+
+    def _merge_lists(self, a: List[Any], b: List[Any], prefer_b: bool, field: str = "") -> List[Any]:
         """
         Union with order. If prefer_b, take b items first, then fill with a's uniques.
-        Works for primitives and list-of-dicts without a fixed identity.
-        """
-        base = b[:] + a[:] if prefer_b else a[:] + b[:]
-        out, seen = [], set()
-        for itm in base:
-            sig = self._signature(itm)
-            if sig not in seen:
-                seen.add(sig)
-                out.append(itm)
+        Lists of plain strings (exchanges, category, network) are de-duplicated with one
+        dict.fromkeys pass; other items go through _list_identity for `field`.
+        Returns `a` itself when the union is item-for-item identical to it.
+        """
+        base = b + a if prefer_b else a + b
+        if all(type(itm) is str for itm in base):
+            out = list(dict.fromkeys(base))
+        else:
+            out, seen = [], set()
+            for itm in base:
+                key = self._list_identity(field, itm)
+                if key not in seen:
+                    seen.add(key)
+                    out.append(itm)
+        if len(out) == len(a) and all(x is y for x, y in zip(out, a)):
+            return a
         return out
 
     def _deep_merge(
@@ -103,12 +216,14 @@ class MasterProjectManager:
             path: Tuple[str, ...] = (),
     ) -> Any:
         """
-        Non-destructive deep merge.
+        Non-destructive, copy-free deep merge.
         - prefer_b=True: b wins for scalars when both non-empty.
         - Dicts merge recursively.
         - Lists union with de-duplication.
         - Never overwrite non-empty with empty.
         - Protected keys never change unless a is empty.
+        - Unchanged subtrees are shared with a/b and a dict level is only copied when one of
+          its keys changes, so the result must be treated as read-only.
         """
         # Different types: pick b only if meaningful and preferred
         if type(a) is not type(b):
@@ -116,37 +231,40 @@ class MasterProjectManager:
 
         # Dicts
         if isinstance(a, dict):
-            result = deepcopy(a)
+            result = a
             for k, v_b in b.items():
                 if k == "sources":
                     # handled outside
                     continue
-                v_a = result.get(k, None)
+                v_a = a.get(k, None)
 
                 # protect certain top-level keys from mutation
                 if len(path) == 0 and k in protected_keys:
-                    if self._is_empty(v_a) and not self._is_empty(v_b):
-                        result[k] = deepcopy(v_b)
-                    # else keep existing
-                    continue
-
-                if v_a is None:
-                    if not self._is_empty(v_b):
-                        result[k] = deepcopy(v_b)
-                    continue
-
+                    if not (self._is_empty(v_a) and not self._is_empty(v_b)):
+                        continue  # keep existing
+                    merged = v_b
+                elif v_a is None:
+                    if self._is_empty(v_b):
+                        continue
+                    merged = v_b
                 # both sides have a value
-                if isinstance(v_a, dict) and isinstance(v_b, dict):
-                    result[k] = self._deep_merge(v_a, v_b, prefer_b, protected_keys, path + (k,))
+                elif isinstance(v_a, dict) and isinstance(v_b, dict):
+                    merged = self._deep_merge(v_a, v_b, prefer_b, protected_keys, path + (k,))
                 elif isinstance(v_a, list) and isinstance(v_b, list):
-                    result[k] = self._merge_lists(v_a, v_b, prefer_b)
+                    merged = self._merge_lists(v_a, v_b, prefer_b, ".".join(path + (k,)))
+                # scalars or mismatched subtypes
+                elif self._is_empty(v_a) and not self._is_empty(v_b):
+                    merged = v_b
+                elif not self._is_empty(v_b) and prefer_b:
+                    merged = v_b
                 else:
-                    # scalars or mismatched subtypes
-                    if self._is_empty(v_a) and not self._is_empty(v_b):
-                        result[k] = deepcopy(v_b)
-                    elif not self._is_empty(v_b) and prefer_b:
-                        result[k] = deepcopy(v_b)
-                    # else keep v_a
+                    continue  # keep v_a
+
+                if merged is v_a:
+                    continue
+                if result is a:
+                    result = dict(a)
+                result[k] = merged
             return result
 
         # Lists
@@ -182,22 +300,97 @@ class MasterProjectManager:
 
         return highest_priority_source
 
+    @staticmethod
+    def _with_identity_keys(doc: Dict) -> Dict:
+        """Persist the normalized identity (name_key, ticker_key) on a document about to be written."""
+        doc["name_key"], doc["ticker_key"] = normalize_project_identity(
+            doc.get("project_name"), doc.get("project_ticker")
+        )
+        return doc
+
+    @staticmethod
+    def _with_source_identity_keys(doc: Dict, new_data: Dict) -> Dict:
+        """
+        identity_keys of a merged document about to be written: the ones it already has
+        followed by the source slugs and contracts of the incoming payload, in first-seen
+        order. Keys are only ever added, so an old slug keeps resolving to the project.
+        """
+        incoming = project_identity_keys(new_data)
+        if incoming:
+            stored = doc.get("identity_keys")
+            doc["identity_keys"] = list(dict.fromkeys((stored if isinstance(stored, list) else []) + incoming))
+        return doc
+
+    @staticmethod
+    def _with_source_keys(doc: Dict) -> Dict:
+        """
+        Denormalize `sources` into the indexed source_keys (source names) and
+        source_last_updated ([{"source", "last_updated"}]) arrays, in sources order, so
+        source filters and "stale since" queries are index range scans instead of
+        $exists scans over the sources map.
+        """
+        sources = doc.get("sources")
+        if not isinstance(sources, dict):
+            return doc
+        doc["source_keys"] = list(sources)
+        doc["source_last_updated"] = [
+            {"source": src, "last_updated": info["last_updated"]}
+            if isinstance(info, dict) and "last_updated" in info else {"source": src}
+            for src, info in sources.items()
+        ]
+        return doc
+
+    def _with_exchange_ids(self, projects_data: List[Dict], source: str, keep_ids: bool = False) -> List[Dict]:
+        """
+        Payloads with their exchange slugs replaced by ids of this store's exchange dimension,
+        resolved under `source` in one registry call for the whole batch. Payloads carry
+        slugs; an id found in a payload was handed out by some other store and is dropped.
+
+        Args:
+            projects_data: Project payloads
+            source: Source the slugs come from
+            keep_ids: The documents were read from self.store (see scripts.exchange_ids_migration),
+                so the ids they hold are this store's and are kept
+        """
+        slugs = [itm for p in projects_data if isinstance(p.get("exchanges"), list)
+                 for itm in p["exchanges"] if type(itm) is str]
+        ids = self.exchange_registry.resolve(source, slugs) if slugs else {}
+
+        converted, dropped = [], 0
+        for p in projects_data:
+            exchanges = p.get("exchanges")
+            if isinstance(exchanges, list):
+                resolved = []
+                for itm in exchanges:
+                    if type(itm) is str:
+                        if itm in ids:
+                            resolved.append(ids[itm])
+                    elif keep_ids and type(itm) is int:
+                        resolved.append(itm)
+                    else:
+                        dropped += 1
+                p = {**p, "exchanges": list(dict.fromkeys(resolved))}
+            converted.append(p)
+        if dropped:
+            print(f"Dropped {dropped} exchange ids from payloads of {source}: payloads carry exchange slugs")
+        return converted
+
     def _merge_data_by_priority(self, existing_data: Dict, new_data: Dict, new_source: str) -> Dict:
         """
         Deep, non-destructive merge with source priority.
         Higher priority updates missing or conflicting fields but never deletes existing data.
         Lists are unioned with de-duplication. Dicts merge recursively.
+        Neither input is copied or mutated: the result is a new top-level dict that shares
+        unchanged subtrees with existing_data/new_data.
         """
-        merged_data = deepcopy(existing_data) if existing_data else {}
-        merged_data.setdefault("sources", {})
-
         # Update sources: add/refresh new_source and carry over any other provided sources
         now_str = datetime.now().strftime('%Y-%m-%d')
         new_sources_raw = new_data.get("sources", {}) or {}
+        merged_sources = dict(existing_data.get("sources") or {}) if existing_data else {}
 
         # Always record the incoming new_source explicitly
         new_src_url = new_sources_raw.get(new_source, "")
-        merged_data["sources"][new_source] = {
+        merged_sources[new_source] = {
             "url": new_src_url,
             "last_updated": now_str,
         }
@@ -206,156 +399,1165 @@ class MasterProjectManager:
         for src, url in new_sources_raw.items():
             if src == new_source:
                 continue
-            merged_data["sources"][src] = {
+            merged_sources[src] = {
                 "url": url,
                 "last_updated": now_str,
             }
 
+        protected = {"project_uid", "project_name", "project_ticker", "created_at", "identity_keys",
+                     "source_keys", "source_last_updated"}
+
         # Nothing else to merge
         if not existing_data:
             # First write wins, nothing to compare against
-            tmp = deepcopy(new_data)
-            tmp.pop("sources", None)
-            protected = {"project_uid", "project_name", "project_ticker", "created_at"}
-            merged_payload = self._deep_merge({}, tmp, True, protected)
-            merged_data.update(merged_payload)
-            return merged_data
+            merged_data = {"sources": merged_sources}
+            merged_data.update(self._deep_merge({}, new_data, True, protected))
+            self._with_source_identity_keys(merged_data, new_data)
+            self._with_source_keys(merged_data)
+            return self._with_identity_keys(merged_data)
 
         # Determine priority
-        current_highest_source = self._get_highest_priority_source(merged_data.get("sources", {}))
+        current_highest_source = self._get_highest_priority_source(merged_sources)
         current_highest_priority = self._get_source_priority_index(current_highest_source)
         new_source_priority = self._get_source_priority_index(new_source)
         prefer_new = new_source_priority <= current_highest_priority
 
-        # Merge payloads excluding 'sources'
-        existing_payload = deepcopy(existing_data)
-        existing_payload.pop("sources", None)
-        incoming_payload = deepcopy(new_data)
-        incoming_payload.pop("sources", None)
-
-        protected = {"project_uid", "project_name", "project_ticker", "created_at"}
-        merged_payload = self._deep_merge(existing_payload, incoming_payload, prefer_new, protected)
-        # Reattach merged payload
-        for k, v in merged_payload.items():
-            merged_data[k] = v
-
-        return merged_data
-
-    def find_existing_project(self, project_name: str, project_ticker: str) -> Optional[Dict]:
-        """Case-insensitive name + uppercase ticker match."""
-        name = (project_name or "").strip()
-        ticker = (project_ticker or "").upper().strip()
-        if not name or not ticker:
+        # Merge payloads; 'sources' is skipped by _deep_merge and reattached below
+        base = existing_data if "sources" in existing_data else {**existing_data, "sources": {}}
+        merged_data = self._deep_merge(base, new_data, prefer_new, protected)
+        if merged_data is existing_data:
+            merged_data = dict(existing_data)
+        merged_data["sources"] = merged_sources
+        self._with_source_identity_keys(merged_data, new_data)
+        self._with_source_keys(merged_data)
+
+        return self._with_identity_keys(merged_data)
+
+    @staticmethod
+    def _is_dotted_path_safe(key: Any) -> bool:
+        """Whether a key can be addressed inside a dotted update path."""
+        return isinstance(key, str) and key != "" and "." not in key and not key.startswith("$")
+
+    def _collect_diff(self, old: Dict, new: Dict, prefix: str,
+                      set_ops: Dict[str, Any], add_ops: Dict[str, Any]) -> None:
+        """Walk `new` against `old`, recording dotted $set paths and $addToSet appends."""
+        for k, v_new in new.items():
+            if not prefix and k == "_id":
+                continue
+            path = f"{prefix}{k}"
+            if k not in old:
+                set_ops[path] = v_new
+                continue
+
+            v_old = old[k]
+            if v_new is v_old:
+                continue
+
+            if isinstance(v_old, dict) and isinstance(v_new, dict):
+                if all(self._is_dotted_path_safe(sub) for sub in v_new):
+                    self._collect_diff(v_old, v_new, f"{path}.", set_ops, add_ops)
+                elif v_old != v_new:
+                    set_ops[path] = v_new
+            elif isinstance(v_old, list) and isinstance(v_new, list):
+                if v_old == v_new:
+                    continue
+                appended = v_new[len(v_old):]
+                # Mongo compares 1 and 1.0 as equal, so only unions of strings and of integers
+                # (exchange ids) onto lists without floats are left to $addToSet
+                if (v_old and appended and v_new[:len(v_old)] == v_old
+                        and all(type(itm) is str or type(itm) is int for itm in appended)
+                        and not any(type(itm) is float for itm in v_old)):
+                    add_ops[path] = {"$each": appended}
+                else:
+                    set_ops[path] = v_new
+            elif type(v_old) is not type(v_new) or v_old != v_new:
+                set_ops[path] = v_new
+
+    def _diff_update(self, existing: Dict, merged: Dict) -> Dict[str, Dict]:
+        """
+        Minimal update document turning the stored `existing` document into `merged`.
+        - Nested dicts become dotted-path $set entries (sources.coingecko.last_updated, ...).
+        - Lists that only gained string or integer items at the end become $addToSet/$each.
+        - Anything else that changed is $set as a whole; _id is never written.
+        - Any change also bumps the document version _v.
+        Merges never remove keys, so no $unset is produced. Returns {} when nothing changed.
+        """
+        set_ops: Dict[str, Any] = {}
+        add_ops: Dict[str, Any] = {}
+        self._collect_diff(existing, merged, "", set_ops, add_ops)
+        set_ops.pop("_v", None)
+
+        update: Dict[str, Dict] = {}
+        if set_ops:
+            update["$set"] = set_ops
+        if add_ops:
+            update["$addToSet"] = add_ops
+        if update:
+            update["$inc"] = {"_v": 1}
+        return update
+
+    @staticmethod
+    def _empty_expr(value: Any) -> Dict:
+        """Aggregation expression mirroring _is_empty for a stored value (missing counts as empty)."""
+        return {"$or": [
+            {"$in": [{"$type": value}, ["missing", "null"]]},
+            {"$eq": [{"$cond": [{"$eq": [{"$type": value}, "string"]}, {"$trim": {"input": value}}, None]}, ""]},
+            {"$eq": [value, {"$literal": {}}]},
+            {"$eq": [value, {"$literal": []}]},
+        ]}
+
+    def _take_incoming_expr(self, stored: str, incoming: Any, prefer: Union[bool, str]) -> Any:
+        """Incoming value when the stored one is empty or the incoming source is preferred."""
+        if prefer is True:
+            return {"$literal": incoming}
+        take = self._empty_expr(stored) if prefer is False else {"$or": [self._empty_expr(stored), prefer]}
+        return {"$cond": [take, {"$literal": incoming}, stored]}
+
+    @staticmethod
+    def _union_expr(first: Any, second: Any, id_key: Optional[str] = None) -> Dict:
+        """
+        Ordered union of two arrays keeping the first occurrence, like _merge_lists. With
+        an id_key, objects holding a non-empty string there are matched on its lowercased
+        value and all other items by equality, mirroring _list_identity.
+        """
+        if id_key is None:
+            return {"$reduce": {
+                "input": {"$concatArrays": [first, second]},
+                "initialValue": [],
+                "in": {"$cond": [{"$in": ["$$this", "$$value"]},
+                                 "$$value",
+                                 {"$concatArrays": ["$$value", ["$$this"]]}]},
+            }}
+
+        key = {"$cond": [
+            {"$and": [{"$eq": [{"$type": "$$this"}, "object"]},
+                      {"$eq": [{"$type": f"$$this.{id_key}"}, "string"]},
+                      {"$ne": [f"$$this.{id_key}", ""]}]},
+            [0, {"$toLower": f"$$this.{id_key}"}],
+            [1, "$$this"],
+        ]}
+        union = {"$reduce": {
+            "input": {"$concatArrays": [first, second]},
+            "initialValue": {"items": [], "keys": []},
+            "in": {"$let": {"vars": {"key": key}, "in": {"$cond": [
+                {"$in": ["$$key", "$$value.keys"]},
+                "$$value",
+                {"items": {"$concatArrays": ["$$value.items", ["$$this"]]},
+                 "keys": {"$concatArrays": ["$$value.keys", ["$$key"]]}},
+            ]}}},
+        }}
+        return {"$let": {"vars": {"union": union}, "in": "$$union.items"}}
+
+    def _merge_expr(self, stored: str, incoming: Any, prefer: Union[bool, str]) -> Any:
+        """
+        Aggregation expression merging a non-empty incoming value into the stored field path,
+        following the _deep_merge rules for a non-protected key.
+        """
+        if isinstance(incoming, dict):
+            fields = {
+                k: self._merge_expr(f"{stored}.{k}", v, prefer)
+                for k, v in incoming.items()
+                if k != "sources" and not self._is_empty(v)
+            }
+            return {"$cond": [{"$eq": [{"$type": stored}, "object"]},
+                              {"$mergeObjects": [stored, fields]},
+                              self._take_incoming_expr(stored, incoming, prefer)]}
+
+        if isinstance(incoming, list):
+            literal = {"$literal": incoming}
+            id_key = self.LIST_IDENTITY_KEYS.get(stored[1:])
+            if prefer is True:
+                union = self._union_expr(literal, stored, id_key)
+            elif prefer is False:
+                union = self._union_expr(stored, literal, id_key)
+            else:
+                union = {"$cond": [prefer, self._union_expr(literal, stored, id_key),
+                                   self._union_expr(stored, literal, id_key)]}
+            return {"$cond": [{"$isArray": stored}, union, self._take_incoming_expr(stored, incoming, prefer)]}
+
+        return self._take_incoming_expr(stored, incoming, prefer)
+
+    def _check_server_mergeable(self, value: Any, path: str = "") -> None:
+        """Every dict key must be addressable as a field path for the merge pipeline."""
+        if not isinstance(value, dict):
+            return
+        for k, v in value.items():
+            if not self._is_dotted_path_safe(k):
+                raise ValueError(f"Key '{path}{k}' cannot be merged server-side")
+            self._check_server_mergeable(v, f"{path}{k}.")
+
+    def _build_merge_pipeline(self, project_data: Dict, source: str, project_uid: str,
+                              identity: Optional[Tuple[str, str]] = None) -> List[Dict]:
+        """
+        Express _merge_data_by_priority as an update pipeline, so the merge runs on the
+        server against whatever version of the document is current at write time.
+
+        Source priority is resolved client-side when the payload alone decides it, otherwise
+        a __prefer_new flag is computed from the stored sources in the first stage. Empty
+        incoming values are dropped up front since they can never win. Lists are unioned in
+        order with $reduce/$in rather than $setUnion, which does not keep element order;
+        items are compared with BSON equality, so unlike _merge_lists 1 and 1.0 are the same
+        item and embedded documents with reordered keys are different ones.
+
+        Args:
+            project_data: Project data dictionary
+            source: Source of the data
+            project_uid: project_uid to assign if the upsert inserts a new document
+            identity: (name_key, ticker_key) of the stored document when it was matched through
+                its identity_keys; defaults to the payload's identity
+
+        Returns:
+            List of pipeline stages for update_one/find_one_and_update(..., upsert=True)
+        """
+        self._check_server_mergeable(project_data)
+        now = datetime.now()
+        now_str = now.strftime('%Y-%m-%d')
+        name_key, ticker_key = identity or normalize_project_identity(
+            project_data.get('project_name'), project_data.get('project_ticker')
+        )
+
+        new_sources_raw = project_data.get("sources", {}) or {}
+        incoming_sources = {source: {"url": new_sources_raw.get(source, ""), "last_updated": now_str}}
+        for src, url in new_sources_raw.items():
+            if src != source:
+                incoming_sources[src] = {"url": url, "last_updated": now_str}
+
+        # prefer_new = no known source, stored or incoming, outranks `source`
+        new_source_priority = self._get_source_priority_index(source)
+        higher_sources = self.source_priority[:new_source_priority]
+        pipeline: List[Dict] = []
+        if any(src in higher_sources for src in incoming_sources):
+            prefer: Union[bool, str] = False
+        elif not higher_sources:
+            prefer = True
+        else:
+            prefer = "$__prefer_new"
+            stored_sources = {"$map": {
+                "input": {"$objectToArray": {"$cond": [{"$eq": [{"$type": "$sources"}, "object"]},
+                                                       "$sources", {"$literal": {}}]}},
+                "as": "src",
+                "in": "$$src.k",
+            }}
+            pipeline.append({"$set": {"__prefer_new": {
+                "$eq": [{"$size": {"$setIntersection": [stored_sources, {"$literal": higher_sources}]}}, 0]
+            }}})
+
+        protected = {"project_uid", "project_name", "project_ticker", "created_at", "identity_keys",
+                     "source_keys", "source_last_updated"}
+        fields: Dict[str, Any] = {}
+        for k, v in project_data.items():
+            if k in ("sources", "_id") or self._is_empty(v):
+                continue
+            if k == "project_ticker" and isinstance(v, str):
+                v = v.upper()
+            if k in protected:
+                fields[k] = self._take_incoming_expr(f"${k}", v, False)
+            else:
+                fields[k] = self._merge_expr(f"${k}", v, prefer)
+        if fields:
+            pipeline.append({"$set": fields})
+
+        final: Dict[str, Any] = {
+            "sources": {"$mergeObjects": [
+                {"$cond": [{"$eq": [{"$type": "$sources"}, "object"]}, "$sources", {"$literal": {}}]},
+                {"$literal": incoming_sources},
+            ]},
+            "project_uid": {"$ifNull": ["$project_uid", {"$literal": project_uid}]},
+            "created_at": {"$ifNull": ["$created_at", {"$literal": now.strftime('%Y-%m-%d %H:%M:%S')}]},
+            "name_key": {"$literal": name_key},
+            "ticker_key": {"$literal": ticker_key},
+            "_v": {"$add": [{"$ifNull": ["$_v", -1]}, 1]},
+        }
+        identity_keys = project_identity_keys(project_data)
+        if identity_keys:
+            stored_keys = {"$cond": [{"$isArray": "$identity_keys"}, "$identity_keys", {"$literal": []}]}
+            final["identity_keys"] = self._union_expr(stored_keys, {"$literal": identity_keys})
+        pipeline.append({"$set": final})
+        # Derived from the merged sources, so it needs a stage of its own (see _with_source_keys)
+        sources = {"$objectToArray": "$sources"}
+        pipeline.append({"$set": {
+            "source_keys": {"$map": {"input": sources, "in": "$$this.k"}},
+            "source_last_updated": {"$map": {"input": sources,
+                                             "in": {"source": "$$this.k", "last_updated": "$$this.v.last_updated"}}},
+        }})
+        if prefer == "$__prefer_new":
+            pipeline.append({"$unset": "__prefer_new"})
+        return pipeline
+
+    @staticmethod
+    def _doc_identity(doc: Dict) -> Tuple[str, str]:
+        """(name_key, ticker_key) of a stored document, computed when not backfilled yet."""
+        if doc.get("name_key") is not None and doc.get("ticker_key") is not None:
+            return doc["name_key"], doc["ticker_key"]
+        return normalize_project_identity(doc.get("project_name"), doc.get("project_ticker"))
+
+    def _cache_get(self, key: CacheKey) -> Optional[str]:
+        """Look up an identity in the LRU cache, counting hits and misses."""
+        entry = self._identity_cache.get(key)
+        if entry is None:
+            self._identity_cache_stats["misses"] += 1
             return None
+        self._identity_cache.move_to_end(key)
+        self._identity_cache_stats["hits"] += 1
+        return entry
+
+    def _cache_put(self, key: CacheKey, project_uid: str) -> None:
+        """Store an identity, evicting least recently used entries beyond identity_cache_size."""
+        if self.identity_cache_size <= 0:
+            return
+        self._identity_cache[key] = project_uid
+        self._identity_cache.move_to_end(key)
+        while len(self._identity_cache) > self.identity_cache_size:
+            self._identity_cache.popitem(last=False)
+            self._identity_cache_stats["evictions"] += 1
+            # An evicted identity may exist in the collection, so misses are no longer conclusive
+            self._identity_cache_authoritative = False
+
+    def _cache_forget(self, key: CacheKey) -> None:
+        self._identity_cache.pop(key, None)
+
+    def _remember(self, doc: Dict) -> None:
+        """Cache a stored document under its (name_key, ticker_key) identity and each of its identity_keys."""
+        key = self._doc_identity(doc)
+        if key[0] and key[1]:
+            self._cache_put(key, doc["project_uid"])
+        for identity_key in doc.get("identity_keys") or ():
+            self._cache_put(identity_key, doc["project_uid"])
+
+    def warm_identity_cache(self, authoritative: bool = False, batch_size: int = 2000) -> int:
+        """
+        Fill the identity cache from a projection-only scan of the collection.
+
+        Args:
+            authoritative: Treat cache misses as "project does not exist" and skip the lookup.
+                Only safe while this process is the sole writer of the collection; it is
+                dropped automatically once an entry has to be evicted.
+            batch_size: Cursor batch size for the scan
+
+        Returns:
+            Number of documents scanned
+        """
+        evictions_before = self._identity_cache_stats["evictions"]
+        scanned = 0
+        for doc in self.store.iter_identities(batch_size):
+            scanned += 1
+            if doc.get("project_uid"):
+                self._remember(doc)
+
+        complete = self._identity_cache_stats["evictions"] == evictions_before
+        self._identity_cache_authoritative = authoritative and complete
+        print(f"Identity cache warmed with {len(self._identity_cache)} entries from {scanned} documents")
+        return scanned
+
+    def get_identity_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss statistics for sizing identity_cache_size."""
+        stats = dict(self._identity_cache_stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["size"] = len(self._identity_cache)
+        stats["capacity"] = self.identity_cache_size
+        stats["authoritative"] = self._identity_cache_authoritative
+        return stats
+
+    @staticmethod
+    def _pick_by_identity_keys(identity_keys: List[str], docs: List[Dict]) -> Optional[Dict]:
+        """First of `docs` (oldest first) holding the earliest matching key of identity_keys."""
+        for identity_key in identity_keys:
+            for doc in docs:
+                if identity_key in (doc.get("identity_keys") or ()):
+                    return doc
+        return None
+
+    def _find_by_identity_keys(self, identity_keys: List[str]) -> Optional[Dict]:
+        """
+        Project matching the earliest of identity_keys. Keys are answered by the identity
+        cache as long as it can (a hit, or a miss of an authoritative cache); the remaining
+        keys go to the store as one identity_keys_idx query.
+        """
+        for n, identity_key in enumerate(identity_keys):
+            cached = self._cache_get(identity_key)
+            if cached is not None:
+                doc = self.store.find_by_uid(cached)
+                if doc is not None and identity_key in (doc.get("identity_keys") or ()):
+                    self._remember(doc)
+                    return doc
+                self._cache_forget(identity_key)
+            elif self._identity_cache_authoritative:
+                self._identity_cache_stats["negative_hits"] += 1
+                continue
 
-        pattern = f"^{re.escape(name)}$"  # exact match, ignore case
-        return self.collection.find_one({
-            "project_name": {"$regex": pattern, "$options": "i"},
-            "project_ticker": ticker,
-        })
+            remaining = identity_keys[n:]
+            doc = self._pick_by_identity_keys(remaining, self.store.find_by_identity_keys(remaining))
+            if doc is not None:
+                self._remember(doc)
+            return doc
+        return None
 
-    def upsert_project(self, project_data: Dict, source: str) -> str:
+    def find_existing_project(self, project_name: str, project_ticker: str,
+                              identity_keys: Optional[List[str]] = None) -> Optional[Dict]:
+        """
+        Resolve a project through an ordered chain of indexed keys: the identity_keys
+        (CMC slug / CoinGecko id, then chain contracts; see utils.text_utils.project_identity_keys)
+        and then the casefolded, whitespace-collapsed name + uppercase ticker.
+        Every step is an equality seek (identity_keys_idx, identity_key_idx). Keys known to
+        the identity cache are fetched by project_uid; with an authoritative cache, unknown
+        keys return None without a query.
+        """
+        if identity_keys:
+            doc = self._find_by_identity_keys(identity_keys)
+            if doc is not None:
+                return doc
+
+        name_key, ticker_key = normalize_project_identity(project_name, project_ticker)
+        if not name_key or not ticker_key:
+            return None
+
+        key = (name_key, ticker_key)
+        cached = self._cache_get(key)
+        if cached is not None:
+            doc = self.store.find_by_uid(cached)
+            if doc is not None:
+                self._remember(doc)
+                return doc
+            self._cache_forget(key)
+        elif self._identity_cache_authoritative:
+            self._identity_cache_stats["negative_hits"] += 1
+            return None
+
+        doc = self.store.find_by_identity(name_key, ticker_key)
+        if doc is not None:
+            self._remember(doc)
+        return doc
+
+    def _build_new_project(self, project_data: Dict, project_ticker: str) -> Dict:
+        """
+        Prepare a first-write document: new project_uid, uppercase ticker, created_at,
+        version _v = 0 and sources formatted as {source: {"url", "last_updated"}}.
+        """
+        insert_data = project_data.copy()
+        insert_data['project_uid'] = str(uuid.uuid4())
+        insert_data['project_ticker'] = project_ticker  # Ensure uppercase
+        insert_data['created_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        insert_data['_v'] = 0
+
+        # Format sources with timestamp
+        if 'sources' in insert_data:
+            formatted_sources = {}
+            for src, url in insert_data['sources'].items():
+                formatted_sources[src] = {
+                    'url': url,
+                    'last_updated': datetime.now().strftime('%Y-%m-%d')
+                }
+            insert_data['sources'] = formatted_sources
+
+        self._with_source_identity_keys(insert_data, project_data)
+        self._with_source_keys(insert_data)
+        return self._with_identity_keys(insert_data)
+
+    def _prefetch_existing_projects(self, keys: Set[Tuple[str, str]],
+                                    identity_keys: Set[str] = frozenset()) -> Dict[CacheKey, Dict]:
+        """
+        Fetch every candidate existing document for a batch in a single query.
+        Cached identities and identity keys are fetched by project_uid; with an authoritative
+        identity cache, uncached ones are known to be new and are not queried at all.
+
+        Args:
+            keys: Set of normalized (name_key, ticker_key) identities
+            identity_keys: Set of cross-source identity keys of the batch
+
+        Returns:
+            Dict mapping identity or identity key -> existing document (oldest match wins)
+        """
+        cached_uids: Dict[str, List[CacheKey]] = {}
+        unknown: Set[Tuple[str, str]] = set()
+        unknown_identity_keys: Set[str] = set()
+        for key in [*keys, *identity_keys]:
+            cached = self._cache_get(key)
+            if cached is not None:
+                cached_uids.setdefault(cached, []).append(key)
+            elif self._identity_cache_authoritative:
+                self._identity_cache_stats["negative_hits"] += 1
+            elif isinstance(key, str):
+                unknown_identity_keys.add(key)
+            else:
+                unknown.add(key)
+
+        if not cached_uids and not unknown and not unknown_identity_keys:
+            return {}
+
+        found: Dict[CacheKey, Dict] = {}
+        candidates = self.store.find_candidates(list(cached_uids), sorted(unknown), sorted(unknown_identity_keys))
+        for doc in candidates:
+            key = self._doc_identity(doc)
+            if key in keys:
+                found.setdefault(key, doc)
+            for identity_key in doc.get("identity_keys") or ():
+                if identity_key in identity_keys:
+                    found.setdefault(identity_key, doc)
+
+        for cached_keys in cached_uids.values():
+            for key in cached_keys:
+                if key not in found:
+                    self._cache_forget(key)
+        for doc in {id(doc): doc for doc in found.values()}.values():
+            self._remember(doc)
+        return found
+
+    def upsert_project(self, project_data: Union[Dict, ProjectRecord], source: str) -> str:
         """
         Insert or update a crypto project
 
         Args:
-            project_data: Project data dictionary
+            project_data: Project data dictionary or ProjectRecord
             source: Source of the data (e.g., 'coinmarketcap', 'coingecko')
 
         Returns:
             project_uid of the inserted/updated project
+
+        Raises:
+            WriteConflictError: concurrent writers changed the project on every retry
         """
+        project_data = as_project_dict(project_data)
         project_name = project_data.get('project_name')
         project_ticker = project_data.get('project_ticker', '').upper()
 
         if not project_name or not project_ticker:
             raise ValueError("project_name and project_ticker are required")
+        project_data = self._with_exchange_ids([project_data], source)[0]
 
-        # Check for existing project
-        existing_project = self.find_existing_project(project_name, project_ticker)
+        if self.write_mode == "server":
+            project_uid = self._upsert_project_server_side(project_data, source)
+        else:
+            project_uid, outcome = self._upsert_with_retries(project_data, source)
+            print(f"{outcome.capitalize()} project {project_name} ({project_ticker}) from source {source}")
+        self._record_market_snapshots([(project_uid, project_data)], source)
+        return project_uid
 
-        if existing_project:
-            # Project exists - merge data based on priority
-            merged_data = self._merge_data_by_priority(existing_project, project_data, source)
-            project_uid = existing_project['project_uid']
+    def _try_update(self, existing: Dict, project_data: Dict, source: str) -> Optional[Tuple[Dict, Optional[int], bool]]:
+        """
+        Merge into `existing` and write the diff conditioned on its _v. Of the fields a
+        backend stores separately, only those the payload carries are loaded: the merge leaves
+        every other field as it is.
 
-            # Update existing project
-            self.collection.update_one(
-                {"project_uid": project_uid},
-                {"$set": merged_data}
-            )
+        Returns:
+            (merged document, stored _v, changed), or None when the document moved on in between
+        """
+        self.store.load_details([existing], project_data)
+        merged = self._merge_data_by_priority(existing, project_data, source)
+        version = existing.get("_v")
+        update = self._diff_update(existing, merged)
+        if not update:
+            return merged, version, False
+
+        self._write_stats["cas_attempts"] += 1
+        new_version = self.store.update_if_version(existing["project_uid"], version, merged, update)
+        if new_version is None:
+            return None
+        return merged, new_version, True
 
-            print(f"Updated project {project_name} ({project_ticker}) from source {source}")
+    def _try_insert(self, project_data: Dict, project_ticker: str) -> Optional[Dict]:
+        """
+        Insert a new project unless its identity appeared since it was looked up.
 
-        else:
-            # New project - create with new UID
-            project_uid = str(uuid.uuid4())
-
-            # Prepare data for insertion
-            insert_data = project_data.copy()
-            insert_data['project_uid'] = project_uid
-            insert_data['project_ticker'] = project_ticker  # Ensure uppercase
-            insert_data['created_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-            # Format sources with timestamp
-            if 'sources' in insert_data:
-                formatted_sources = {}
-                for src, url in insert_data['sources'].items():
-                    formatted_sources[src] = {
-                        'url': url,
-                        'last_updated': datetime.now().strftime('%Y-%m-%d')
-                    }
-                insert_data['sources'] = formatted_sources
-
-            # Insert new project
-            self.collection.insert_one(insert_data)
-
-            print(f"Inserted new project {project_name} ({project_ticker}) from source {source}")
+        Returns:
+            The inserted document, or None when another writer inserted it first
+        """
+        insert_data = self._build_new_project(project_data, project_ticker)
+        self._write_stats["cas_attempts"] += 1
+        return insert_data if self.store.insert_if_absent(insert_data) else None
 
+    def _upsert_with_retries(self, project_data: Dict, source: str) -> Tuple[str, str]:
+        """
+        Optimistic read-merge-write. Updates are compare-and-swap on _v; when another writer
+        got there first the document is re-read and re-merged, up to max_write_retries times.
+
+        Returns:
+            (project_uid, "inserted" | "updated" | "unchanged")
+
+        Raises:
+            WriteConflictError: the document kept changing for every attempt
+        """
+        project_name = project_data.get('project_name')
+        project_ticker = project_data.get('project_ticker', '').upper()
+        key = normalize_project_identity(project_name, project_ticker)
+        existing = self.find_existing_project(project_name, project_ticker, project_identity_keys(project_data))
+
+        for attempt in range(self.max_write_retries + 1):
+            if attempt:
+                self._write_stats["retries"] += 1
+
+            if existing:
+                written = self._try_update(existing, project_data, source)
+                if written is not None:
+                    merged, _, changed = written
+                    self._remember(merged)
+                    return merged["project_uid"], "updated" if changed else "unchanged"
+                existing = self.store.find_by_uid(existing["project_uid"])
+            else:
+                inserted = self._try_insert(project_data, project_ticker)
+                if inserted is not None:
+                    self._remember(inserted)
+                    self._increment_ticker_counts([inserted["project_ticker"]])
+                    return inserted["project_uid"], "inserted"
+                existing = self.store.find_by_identity(*key)
+
+            self._write_stats["conflicts"] += 1
+
+        self._write_stats["exhausted"] += 1
+        raise WriteConflictError(
+            f"Gave up on {project_name} ({project_ticker}) from {source} after "
+            f"{self.max_write_retries + 1} conflicting attempts"
+        )
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        """Optimistic concurrency counters: CAS writes attempted, conflicts, retries, give-ups."""
+        stats = dict(self._write_stats)
+        stats["conflict_rate"] = stats["conflicts"] / stats["cas_attempts"] if stats["cas_attempts"] else 0.0
+        return stats
+
+    def _upsert_project_server_side(self, project_data: Dict, source: str) -> str:
+        """
+        upsert_project for write_mode="server": one find_one_and_update(upsert=True) carrying
+        the merge pipeline, so there is no read-modify-write window between concurrent writers.
+        A project matched through its identity_keys is updated by project_uid instead; only
+        that lookup happens before the write. When a concurrent upsert inserts the identity
+        first, the unique identity_key_idx rejects this one and the retry updates that project.
+        """
+        project_name = project_data.get('project_name')
+        key = normalize_project_identity(project_name, project_data.get('project_ticker'))
+        new_uid = str(uuid.uuid4())
+        projection = {"_id": 0, "project_uid": 1, "project_ticker": 1, "name_key": 1, "ticker_key": 1,
+                      "identity_keys": 1, "_v": 1}
+
+        doc = None
+        identity_keys = project_identity_keys(project_data)
+        matched = self._find_by_identity_keys(identity_keys) if identity_keys else None
+        if matched is not None:
+            doc = self.collection.find_one_and_update(
+                {"project_uid": matched["project_uid"]},
+                self._build_merge_pipeline(project_data, source, new_uid, self._doc_identity(matched)),
+                projection=projection,
+                return_document=ReturnDocument.AFTER,
+            )
+
+        if doc is None:
+            pipeline = self._build_merge_pipeline(project_data, source, new_uid)
+            for attempt in range(2):
+                try:
+                    doc = self.collection.find_one_and_update(
+                        {"name_key": key[0], "ticker_key": key[1]},
+                        pipeline,
+                        projection=projection,
+                        upsert=True,
+                        return_document=ReturnDocument.AFTER,
+                    )
+                    break
+                except DuplicateKeyError:
+                    # A concurrent upsert inserted the same identity first; the retry matches it
+                    if attempt:
+                        raise
+
+        project_uid = doc["project_uid"]
+        self._remember(doc)
+        if project_uid == new_uid:
+            self._increment_ticker_counts([doc["project_ticker"]])
+            print(f"Inserted new project {project_name} ({key[1]}) from source {source}")
+        else:
+            print(f"Updated project {project_name} ({key[1]}) from source {source}")
         return project_uid
 
-    def bulk_upsert_projects(self, projects_data: List[Dict], source: str) -> List[str]:
+    def bulk_upsert_projects(self, projects_data: List[Union[Dict, ProjectRecord]], source: str) -> Dict[str, Any]:
         """
-        Bulk upsert multiple projects
+        Bulk upsert multiple projects with one prefetch query and one bulk_write.
+
+        Candidate existing documents for the whole batch are fetched in a single query,
+        merged in memory with _merge_data_by_priority and written back as one unordered
+        bulk_write of insert-if-absent upserts and field-level UpdateOne diffs conditioned on
+        the prefetched _v. Items resolve to a project like find_existing_project does
+        (identity_keys first, then name/ticker); items resolving to the same project inside
+        the batch are merged into a single op; unchanged documents are not written. Entries that lose a race with another writer
+        are redone one by one through the compare-and-swap retry loop.
 
         Args:
-            projects_data: List of project data dictionaries
+            projects_data: List of project data dictionaries or ProjectRecords
             source: Source of the data
 
         Returns:
-            List of project_uids
+            Dict with:
+              - "project_uids": project_uid per input item (None where the item failed)
+              - "inserted" / "updated": number of documents written
+              - "unchanged": number of existing documents the batch did not change (no write)
+              - "errors": list of {"index", "project_name", "error"} per failed item
         """
-        project_uids = []
+        projects_data = [as_project_dict(p) for p in projects_data]
+        result: Dict[str, Any] = {
+            "project_uids": [None] * len(projects_data),
+            "inserted": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "errors": [],
+        }
+
+        def _fail(index: int, message: str) -> None:
+            result["errors"].append({
+                "index": index,
+                "project_name": projects_data[index].get('project_name', 'Unknown'),
+                "error": message,
+            })
+
+        # Validate and key every item up front
+        keyed: List[Tuple[int, Tuple[str, str]]] = []
+        for i, project_data in enumerate(projects_data):
+            key = normalize_project_identity(project_data.get('project_name'), project_data.get('project_ticker'))
+            if not key[0] or not key[1]:
+                _fail(i, "project_name and project_ticker are required")
+                continue
+            keyed.append((i, key))
+
+        if not keyed:
+            return result
+
+        try:
+            projects_data = self._with_exchange_ids(projects_data, source)
+        except Exception as e:
+            for i, _ in keyed:
+                _fail(i, f"exchange resolution failed: {e}")
+            return result
+
+        if self.write_mode == "server":
+            self._bulk_upsert_server_side(projects_data, keyed, source, result)
+            self._record_market_snapshots(
+                [(uid, projects_data[i]) for i, uid in enumerate(result["project_uids"]) if uid], source)
+            result["errors"].sort(key=lambda err: err["index"])
+            print(f"Bulk upserted {len(projects_data)} projects from source {source} server-side: "
+                  f"{result['inserted']} inserted, {result['updated']} updated, "
+                  f"{len(result['errors'])} failed")
+            return result
+
+        identity_keys = {i: project_identity_keys(projects_data[i]) for i, _ in keyed}
+        try:
+            existing_by_key = self._prefetch_existing_projects(
+                {key for _, key in keyed}, {k for keys in identity_keys.values() for k in keys}
+            )
+            # Separately stored fields are only needed where a payload of the batch merges into them
+            self.store.load_details(list({id(doc): doc for doc in existing_by_key.values()}.values()),
+                                    {field for i, _ in keyed for field in projects_data[i]})
+        except Exception as e:
+            for i, _ in keyed:
+                _fail(i, f"prefetch failed: {e}")
+            return result
+
+        # Merge in memory, one pending document per project: existing ones by project_uid,
+        # new ones by the identity of their first item. `aliases` lets later items reach a
+        # pending entry through any key an earlier item of that entry carried.
+        pending: Dict[Any, Dict[str, Any]] = {}
+        aliases: Dict[CacheKey, Any] = {}
+        for i, key in keyed:
+            project_data = projects_data[i]
+            try:
+                existing, target = None, None
+                for k in identity_keys[i]:
+                    if k in existing_by_key:
+                        existing = existing_by_key[k]
+                        break
+                    if k in aliases:
+                        target = aliases[k]
+                        break
+                if existing is None and target is None:
+                    existing = existing_by_key.get(key)
+                    target = aliases.get(key, key)
+                if existing is not None:
+                    target = existing["project_uid"]
+
+                entry = pending.get(target)
+                if entry is None:
+                    if existing:
+                        doc = self._merge_data_by_priority(existing, project_data, source)
+                    else:
+                        doc = self._build_new_project(project_data, key[1])
+                    pending[target] = {"doc": doc, "existing": existing, "indexes": [i]}
+                else:
+                    entry["doc"] = self._merge_data_by_priority(entry["doc"], project_data, source)
+                    entry["indexes"].append(i)
+                for k in [*identity_keys[i], key]:
+                    aliases.setdefault(k, target)
+            except Exception as e:
+                _fail(i, str(e))
+
+        # Unchanged documents are resolved without a write. Updates are conditioned on the
+        # prefetched _v and inserts only happen if the identity is still absent.
+        entries, ops = [], []
+        for entry in pending.values():
+            doc, existing = entry["doc"], entry["existing"]
+            if not existing:
+                ops.append({"op": "insert", "doc": doc})
+            else:
+                update = self._diff_update(existing, doc)
+                if not update:
+                    for i in entry["indexes"]:
+                        result["project_uids"][i] = doc["project_uid"]
+                    result["unchanged"] += 1
+                    self._remember(doc)
+                    continue
+                ops.append({"op": "update", "project_uid": doc["project_uid"], "version": existing.get("_v"),
+                            "doc": doc, "update": update})
+            entries.append(entry)
 
-        for project_data in projects_data:
+        outcome: Dict[str, Any] = {"applied": set(), "conflicts": set(), "failed": {}}
+        if ops:
+            self._write_stats["cas_attempts"] += len(ops)
             try:
-                project_uid = self.upsert_project(project_data, source)
-                project_uids.append(project_uid)
+                outcome = self.store.bulk_write(ops)
             except Exception as e:
-                project_name = project_data.get('project_name', 'Unknown')
-                print(f"Failed to upsert project {project_name}: {str(e)}")
+                outcome["failed"] = {op_index: str(e) for op_index in range(len(ops))}
+        self._write_stats["conflicts"] += len(outcome["conflicts"])
+
+        # Entries that lost a race are redone through the CAS path; the merge is idempotent,
+        # so entries a backend reports conservatively as conflicts come back unchanged.
+        inserted_tickers: List[str] = []
+        for op_index, entry in enumerate(entries):
+            if op_index in outcome["failed"]:
+                for i in entry["indexes"]:
+                    _fail(i, outcome["failed"][op_index])
+                continue
+            if op_index in outcome["conflicts"]:
+                self._redo_bulk_entry(projects_data, entry, source, result, _fail)
+                continue
+            doc, existing = entry["doc"], entry["existing"]
+            for i in entry["indexes"]:
+                result["project_uids"][i] = doc["project_uid"]
+            result["updated" if existing else "inserted"] += 1
+            self._remember(doc)
+            if not existing:
+                inserted_tickers.append(doc["project_ticker"])
+        self._increment_ticker_counts(inserted_tickers)
+        self._record_market_snapshots(
+            [(uid, projects_data[i]) for i, uid in enumerate(result["project_uids"]) if uid], source)
+
+        result["errors"].sort(key=lambda err: err["index"])
+        print(f"Bulk upserted {len(projects_data)} projects from source {source}: "
+              f"{result['inserted']} inserted, {result['updated']} updated, {result['unchanged']} unchanged, "
+              f"{len(result['errors'])} failed")
+        return result
+
+    def _redo_bulk_entry(self, projects_data: List[Dict], entry: Dict[str, Any], source: str,
+                         result: Dict[str, Any], fail) -> None:
+        """Re-apply the payloads of a conflicted bulk entry one by one through _upsert_with_retries."""
+        outcomes = []
+        for i in entry["indexes"]:
+            self._write_stats["retries"] += 1
+            try:
+                project_uid, outcome = self._upsert_with_retries(projects_data[i], source)
+            except Exception as e:
+                fail(i, str(e))
+                continue
+            result["project_uids"][i] = project_uid
+            outcomes.append(outcome)
+        if "inserted" in outcomes:
+            result["inserted"] += 1
+        elif "updated" in outcomes:
+            result["updated"] += 1
+        elif outcomes:
+            result["unchanged"] += 1
+
+    def _bulk_upsert_server_side(self, projects_data: List[Dict], keyed: List[Tuple[int, Tuple[str, str]]],
+                                 source: str, result: Dict[str, Any]) -> None:
+        """
+        bulk_upsert_projects for write_mode="server": every item becomes an upsert pipeline
+        UpdateOne, sent as unordered bulk_writes. Items whose identity_keys match a stored
+        project (one identity_keys_idx query for the batch) update it by project_uid instead.
+        Repeated targets go into successive rounds so they apply in input order. Upserts that a
+        concurrent insert of the same identity beat to the unique identity_key_idx are sent
+        once more and update it. project_uids of updated documents are read back with one
+        projection query for the whole batch. The server does not report no-op pipeline
+        updates, so "unchanged" stays 0.
+        """
+        def _fail(index: int, message: str) -> None:
+            result["errors"].append({
+                "index": index,
+                "project_name": projects_data[index].get('project_name', 'Unknown'),
+                "error": message,
+            })
+
+        identity_keys = {i: project_identity_keys(projects_data[i]) for i, _ in keyed}
+        all_identity_keys = sorted({k for keys in identity_keys.values() for k in keys})
+        try:
+            candidates = self.store.find_by_identity_keys(all_identity_keys) if all_identity_keys else []
+        except PyMongoError as e:
+            for i, _ in keyed:
+                _fail(i, f"prefetch failed: {e}")
+            return
+        matched: Dict[int, Dict] = {}
+        for i, _ in keyed:
+            doc = self._pick_by_identity_keys(identity_keys[i], candidates)
+            if doc is not None:
+                matched[i] = doc
+
+        # An item's target is the matched project_uid, or its (name_key, ticker_key) identity
+        rounds: List[List[Tuple[int, Tuple[str, str]]]] = []
+        occurrences: Dict[Any, int] = {}
+        for i, key in keyed:
+            target = matched[i]["project_uid"] if i in matched else key
+            n = occurrences.get(target, 0)
+            occurrences[target] = n + 1
+            if n == len(rounds):
+                rounds.append([])
+            rounds[n].append((i, key))
+
+        written: List[Tuple[int, Tuple[str, str]]] = []
+        inserted_tickers: List[str] = []
+        for round_items in rounds:
+            ops, op_items = [], []
+            for i, key in round_items:
+                try:
+                    new_uid = str(uuid.uuid4())
+                    if i in matched:
+                        pipeline = self._build_merge_pipeline(projects_data[i], source, new_uid,
+                                                              self._doc_identity(matched[i]))
+                        op = UpdateOne({"project_uid": matched[i]["project_uid"]}, pipeline)
+                    else:
+                        pipeline = self._build_merge_pipeline(projects_data[i], source, new_uid)
+                        op = UpdateOne({"name_key": key[0], "ticker_key": key[1]}, pipeline, upsert=True)
+                except Exception as e:
+                    _fail(i, str(e))
+                    continue
+                ops.append(op)
+                op_items.append((i, key))
+            if not ops:
                 continue
 
-        return project_uids
+            failed_ops: Dict[int, str] = {}
+            upserted: Set[int] = set()
+            raced: List[int] = []
+            try:
+                upserted = set(self.collection.bulk_write(ops, ordered=False).upserted_ids)
+            except BulkWriteError as e:
+                for err in e.details.get("writeErrors", []):
+                    if err.get("code") == DUPLICATE_KEY and op_items[err["index"]][0] not in matched:
+                        raced.append(err["index"])
+                    else:
+                        failed_ops[err["index"]] = err.get("errmsg", "write error")
+                upserted = {u["index"] for u in e.details.get("upserted", [])}
+            except PyMongoError as e:
+                failed_ops = {op_index: str(e) for op_index in range(len(ops))}
+
+            if raced:
+                # A concurrent upsert inserted these identities first; sent again, the ops match them
+                try:
+                    self.collection.bulk_write([ops[op_index] for op_index in raced], ordered=False)
+                except BulkWriteError as e:
+                    for err in e.details.get("writeErrors", []):
+                        failed_ops[raced[err["index"]]] = err.get("errmsg", "write error")
+                except PyMongoError as e:
+                    failed_ops.update({op_index: str(e) for op_index in raced})
+
+            for op_index, (i, key) in enumerate(op_items):
+                if op_index in failed_ops:
+                    _fail(i, failed_ops[op_index])
+                    continue
+                written.append((i, key))
+                if op_index in upserted:
+                    result["inserted"] += 1
+                    inserted_tickers.append(key[1])
+                else:
+                    result["updated"] += 1
+        self._increment_ticker_counts(inserted_tickers)
+
+        for i, _ in written:
+            if i in matched:
+                result["project_uids"][i] = matched[i]["project_uid"]
+        keys = {key for i, key in written if i not in matched}
+        if not keys:
+            return
+        found: Dict[Tuple[str, str], Dict] = {}
+        try:
+            for doc in self.collection.find(
+                    {"name_key": {"$in": sorted({name for name, _ in keys})},
+                     "ticker_key": {"$in": sorted({ticker for _, ticker in keys})}},
+                    {"_id": 0, "project_uid": 1, "name_key": 1, "ticker_key": 1, "identity_keys": 1, "_v": 1}):
+                found.setdefault((doc["name_key"], doc["ticker_key"]), doc)
+        except PyMongoError as e:
+            print(f"Error reading back project_uids: {e}")
+        for i, key in written:
+            doc = found.get(key) if i not in matched else None
+            if doc is not None:
+                result["project_uids"][i] = doc["project_uid"]
+                self._remember(doc)
 
     def get_project_by_uid(self, project_uid: str) -> Optional[Dict]:
-        """Get project by its unique ID"""
-        return self.collection.find_one({"project_uid": project_uid})
+        """Get project by its unique ID, with every field"""
+        doc = self.store.find_by_uid(project_uid)
+        return self.store.load_details([doc])[0] if doc is not None else None
 
     def get_project_by_project_name(self, project_name: str) -> Optional[Dict]:
-        """Get project by its unique ID"""
-        pattern = f"^{re.escape(project_name.strip())}$"
-        return self.collection.find_one({"project_name": {"$regex": pattern, "$options": "i"}})
+        """Get project by its normalized name (identity_key_idx prefix seek), with every field"""
+        name_key, _ = normalize_project_identity(project_name, "")
+        doc = self.store.find_by_name_key(name_key)
+        return self.store.load_details([doc])[0] if doc is not None else None
 
     def get_projects_by_source(self, source: str) -> List[Dict]:
         """Get all projects that have data from a specific source"""
-        return list(self.collection.find({f"sources.{source}": {"$exists": True}}))
+        return list(self.store.iter_by_source(source))
+
+    def iter_projects_stale_since(
+            self,
+            source: str,
+            before: Union[str, datetime],
+            projection: Projection = None,
+            batch_size: int = 500,
+            limit: int = 0,
+    ) -> Iterator[Dict]:
+        """
+        Stream projects whose `source` data was last refreshed before a date, through the
+        (source, last_updated) index on source_last_updated.
+
+        Args:
+            source: Source name (e.g., 'coingecko')
+            before: Cutoff date; datetimes and 'YYYY-MM-DD' strings are both accepted
+            projection: Fields to return (dict or list of names); None returns full documents
+            batch_size: Documents fetched per round trip
+            limit: Maximum number of projects (0 = no limit)
+
+        Yields:
+            Project documents, least recently refreshed first
+        """
+        if isinstance(before, datetime):
+            before = before.strftime('%Y-%m-%d')
+        yield from self.store.iter_stale_by_source(source, before, projection, batch_size, limit)
 
     def get_projects_by_category(self, category: str) -> List[Dict]:
         """Get all projects in a specific category"""
-        return list(self.collection.find({"category": category}))
+        return list(self.store.iter_by_category(category))
+
+    def iter_projects_by_source(
+            self,
+            source: str,
+            projection: Projection = None,
+            batch_size: int = 500,
+            sort_field: str = "_id",
+            resume_after: Any = None,
+    ) -> Iterator[Dict]:
+        """
+        Stream projects that have data from a specific source.
+
+        Each page is its own range query (sort_field > last value seen) limited to
+        batch_size documents, so memory stays flat no matter how large the result is.
+
+        Args:
+            source: Source name (e.g., 'coingecko')
+            projection: Fields to return (dict or list of names); None returns full documents
+            batch_size: Documents fetched per page
+            sort_field: Keyset pagination key, '_id' or 'project_uid'
+            resume_after: doc[sort_field] of the last document processed, to resume an export
+
+        Yields:
+            Project documents in ascending sort_field order
+        """
+        yield from self.store.iter_by_source(source, projection, batch_size, sort_field, resume_after)
+
+    def iter_projects_by_category(
+            self,
+            category: str,
+            projection: Projection = None,
+            batch_size: int = 500,
+            sort_field: str = "_id",
+            resume_after: Any = None,
+    ) -> Iterator[Dict]:
+        """
+        Stream projects in a specific category.
+
+        Args:
+            category: Category name (e.g., 'Memes')
+            projection: Fields to return (dict or list of names); None returns full documents
+            batch_size: Documents fetched per page
+            sort_field: Keyset pagination key, '_id' or 'project_uid'
+            resume_after: doc[sort_field] of the last document processed, to resume an export
+
+        Yields:
+            Project documents in ascending sort_field order
+        """
+        yield from self.store.iter_by_category(category, projection, batch_size, sort_field, resume_after)
+
+    def exchange_id(self, source: str, slug: str) -> Optional[int]:
+        """Id of the exchange a source lists under `slug`, or None when it is not known yet."""
+        return self.exchange_registry.id_for(source, slug)
+
+    def exchange_slugs(self, exchange_ids: List[int]) -> List[str]:
+        """Canonical slugs of a project's exchange ids, for display."""
+        return self.exchange_registry.slugs_for(exchange_ids)
+
+    def get_projects_by_exchange(self, exchange_id: int) -> List[Dict]:
+        """Get all projects listed on an exchange (see exchange_id)"""
+        return list(self.iter_projects_by_exchange(exchange_id))
+
+    def iter_projects_by_exchange(
+            self,
+            exchange_id: int,
+            projection: Projection = None,
+            batch_size: int = 500,
+            sort_field: Optional[str] = None,
+            resume_after: Any = None,
+    ) -> Iterator[Dict]:
+        """
+        Stream projects listed on an exchange, through the multikey index on exchanges.
+
+        Args:
+            exchange_id: Exchange id (see exchange_id)
+            projection: Fields to return (dict or list of names); None returns full documents
+            batch_size: Documents fetched per page
+            sort_field: Keyset pagination key, '_id' or 'project_uid' ('project_uid' only
+                when the store uses split_details); defaults to the one the store supports
+            resume_after: doc[sort_field] of the last document processed, to resume an export
+
+        Yields:
+            Project documents in ascending sort_field order
+        """
+        if sort_field is None:
+            sort_field = "project_uid" if getattr(self.store, "split_details", False) else "_id"
+        yield from self.store.iter_by_exchange(exchange_id, projection, batch_size, sort_field, resume_after)
+
+    def list_duplicate_tickers(self, min_count: int = 2, use_counts_collection: Optional[bool] = None
+                               ) -> List[Dict[str, Any]]:
+        """
+        Tickers shared by at least min_count projects, most duplicated first.
+        Example item: {"project_ticker": "GOLD", "count": 3}
 
-    from typing import Any, Dict, List, Optional
+        Args:
+            min_count: Minimum number of projects sharing the ticker
+            use_counts_collection: Read the ticker_counts side collection (an indexed query)
+                instead of aggregating; defaults to self.maintain_ticker_counts
+        """
+        if use_counts_collection is None:
+            use_counts_collection = self.maintain_ticker_counts
+        return self.store.list_duplicate_tickers(min_count, use_counts_collection)
+
+    def iter_projects_by_ticker(
+            self,
+            project_ticker: str,
+            projection: Projection = None,
+            batch_size: int = 100,
+    ) -> Iterator[Dict]:
+        """Stream the projects sharing a ticker through the project_ticker index."""
+        yield from self.store.iter_by_ticker(project_ticker, projection, batch_size)
+
+    def iter_projects_grouped_by_duplicate_ticker(
+            self,
+            exclude_fields: Optional[List[str]] = None,
+            min_count: int = 2,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Two-phase duplicate report: list duplicate tickers first, then stream the member
+        documents of one ticker at a time, so only a single group is ever held in memory.
+        """
+        if exclude_fields is None:
+            exclude_fields = ["about", "exchanges", "category", "telegram_admins"]
+        projection = {f: 0 for f in exclude_fields} or None
+        for group in self.list_duplicate_tickers(min_count):
+            yield {
+                "project_ticker": group["project_ticker"],
+                "count": group["count"],
+                "projects": list(self.iter_projects_by_ticker(group["project_ticker"], projection)),
+            }
 
     def get_projects_grouped_by_duplicate_ticker(
             self, exclude_fields: Optional[List[str]] = None
@@ -364,28 +1566,25 @@ class MasterProjectManager:
         Return full project docs grouped by duplicate ticker, excluding large fields.
         Example: {"project_ticker": "GOLD", "count": 3, "projects": [ {...}, ... ]}
         """
-        exclude_fields = exclude_fields or ["about", "exchanges", "category", "telegram_admins"]
-        pipeline: List[Dict[str, Any]] = [
-            {"$match": {"project_ticker": {"$ne": None, "$ne": ""}}},
-        ]
-
-        # Exclude fields from each document before grouping
-        if exclude_fields:
-            pipeline.append({"$project": {f: 0 for f in exclude_fields}})
+        return list(self.iter_projects_grouped_by_duplicate_ticker(exclude_fields))
+
+    def _increment_ticker_counts(self, tickers: List[str]) -> None:
+        """Add newly inserted projects to the backend's ticker counts."""
+        if not self.maintain_ticker_counts or not tickers:
+            return
+        increments: Dict[str, int] = {}
+        for ticker in tickers:
+            increments[ticker] = increments.get(ticker, 0) + 1
+        self.store.increment_ticker_counts(increments)
+
+    def rebuild_ticker_counts(self) -> int:
+        """
+        Recompute the ticker counts from scratch (one aggregation on MongoDB).
 
-        pipeline += [
-            {
-                "$group": {
-                    "_id": "$project_ticker",
-                    "count": {"$sum": 1},
-                    "projects": {"$push": "$$ROOT"},
-                }
-            },
-            {"$match": {"count": {"$gt": 1}}},
-            {"$sort": {"count": -1, "_id": 1}},
-            {"$project": {"_id": 0, "project_ticker": "$_id", "count": 1, "projects": 1}},
-        ]
-        return list(self.collection.aggregate(pipeline, allowDiskUse=True))
+        Returns:
+            Number of distinct tickers written
+        """
+        return self.store.rebuild_ticker_counts()
 
     # def get_projects_grouped_by_duplicate_ticker(self) -> List[Dict[str, Any]]:
     #     """
@@ -407,20 +1606,174 @@ class MasterProjectManager:
     #     ]
     #     return list(self.collection.aggregate(pipeline, allowDiskUse=True))
 
-    def get_project_stats(self) -> Dict:
-        """Get database statistics"""
-        total_projects = self.collection.count_documents({})
+    @staticmethod
+    def _market_value(value: Any) -> Optional[float]:
+        """Positive number from a payload value; dollar strings ("$1.2M") are parsed."""
+        if isinstance(value, str):
+            value = parse_dollar_amount(value)
+        if type(value) in (int, float) and value > 0:
+            return float(value)
+        return None
 
-        # Count projects per source
-        source_stats = {}
-        for source in self.source_priority:
-            count = self.collection.count_documents({f"sources.{source}": {"$exists": True}})
-            source_stats[source] = count
+    def _record_market_snapshots(self, written: List[Tuple[str, Dict]], source: str) -> None:
+        """
+        Append the market data of the written payloads to the snapshot series, in one store
+        call. A failure here is reported but never fails the upsert that already happened.
+        """
+        if not self.record_market_snapshots:
+            return
+        now = datetime.now()
+        # Millisecond precision, as MongoDB stores datetimes
+        t = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        snapshots = []
+        for project_uid, project_data in written:
+            values = {field: self._market_value(project_data.get(field)) for field in self.SNAPSHOT_FIELDS}
+            values = {field: value for field, value in values.items() if value is not None}
+            if values:
+                snapshots.append({"project_uid": project_uid, "t": t, "source": source, **values})
+        if not snapshots:
+            return
+        try:
+            self.store.append_market_snapshots(snapshots)
+        except Exception as e:
+            print(f"Error recording market snapshots: {e}")
+
+    @staticmethod
+    def _as_datetime(value: Union[str, datetime, None], end_of_day: bool = False) -> Optional[datetime]:
+        """Datetimes pass through; 'YYYY-MM-DD' strings start the day (or end it, for range ends)."""
+        if value is None or isinstance(value, datetime):
+            return value
+        parsed = datetime.fromisoformat(value)
+        if end_of_day and len(value) == 10:
+            parsed += timedelta(days=1, milliseconds=-1)
+        return parsed
+
+    def iter_market_snapshots(
+            self,
+            project_uid: str,
+            start: Union[str, datetime, None] = None,
+            end: Union[str, datetime, None] = None,
+            source: Optional[str] = None,
+    ) -> Iterator[Dict]:
+        """
+        Stream a project's recorded market snapshots, oldest first.
+
+        Args:
+            project_uid: Project to read
+            start: First instant included; datetimes and 'YYYY-MM-DD' strings are accepted
+            end: Last instant included ('YYYY-MM-DD' includes that whole day)
+            source: Only snapshots recorded from this source
+
+        Yields:
+            {"project_uid", "t", "source", "market_cap", "fdv", "liquidity"}, without the
+            values the upsert did not carry
+        """
+        for snap in self.store.iter_market_snapshots(project_uid, self._as_datetime(start),
+                                                     self._as_datetime(end, end_of_day=True)):
+            if source is None or snap.get("source") == source:
+                yield snap
+
+    @staticmethod
+    def _interval_start(t: datetime, interval: str) -> datetime:
+        if interval == "hour":
+            return t.replace(minute=0, second=0, microsecond=0)
+        day = t.replace(hour=0, minute=0, second=0, microsecond=0)
+        if interval == "day":
+            return day
+        if interval == "week":
+            return day - timedelta(days=day.weekday())
+        return day.replace(day=1)
+
+    def get_market_series(
+            self,
+            project_uid: str,
+            start: Union[str, datetime, None] = None,
+            end: Union[str, datetime, None] = None,
+            interval: str = "day",
+            field: str = "market_cap",
+            agg: str = "last",
+            source: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Downsampled series of one market value, e.g. a daily closing market cap.
+        Example item: {"t": datetime(2025, 3, 1), "value": 1.2e9, "samples": 4}
+
+        Args:
+            project_uid: Project to read
+            start: First instant included; datetimes and 'YYYY-MM-DD' strings are accepted
+            end: Last instant included ('YYYY-MM-DD' includes that whole day)
+            interval: 'hour', 'day', 'week' (starting Monday) or 'month'
+            field: 'market_cap', 'fdv' or 'liquidity'
+            agg: Reduction of the samples of an interval: 'last', 'first', 'min', 'max' or 'mean'
+            source: Only samples recorded from this source (sources may disagree on a value)
+
+        Returns:
+            One item per interval holding samples of `field`, in time order
+        """
+        if interval not in ("hour", "day", "week", "month"):
+            raise ValueError(f"Unknown interval: {interval}")
+        if field not in self.SNAPSHOT_FIELDS:
+            raise ValueError(f"Unknown market field: {field}")
+        reduce = self.SERIES_AGGREGATES.get(agg)
+        if reduce is None:
+            raise ValueError(f"Unknown aggregate: {agg}")
+
+        series: List[Dict[str, Any]] = []
+        values: List[float] = []
+        for snap in self.iter_market_snapshots(project_uid, start, end, source):
+            if field not in snap:
+                continue
+            bucket = self._interval_start(snap["t"], interval)
+            if series and series[-1]["t"] == bucket:
+                values.append(snap[field])
+                continue
+            if series:
+                series[-1].update(value=reduce(values), samples=len(values))
+            series.append({"t": bucket})
+            values = [snap[field]]
+        if series:
+            series[-1].update(value=reduce(values), samples=len(values))
+        return series
+
+    def get_project_stats(self, cache_ttl: float = 0.0) -> Dict:
+        """
+        Get database statistics in a single pass ($facet aggregation on MongoDB).
+
+        Covers every source key present in `sources` (not only source_priority), plus
+        per-category and per-network counts and a market_cap histogram.
+
+        Args:
+            cache_ttl: Seconds a previously computed result may be reused (0 = always recompute)
+
+        Returns:
+            Dict with total_projects, projects_per_source, projects_per_category,
+            projects_per_network and market_cap_histogram
+        """
+        now = time.monotonic()
+        if cache_ttl > 0 and self._stats_cache is not None and now - self._stats_cache[0] < cache_ttl:
+            return self._stats_cache[1]
+
+        bounds = self.MARKET_CAP_BUCKETS
+        counts = self.store.project_stats(bounds)
+
+        source_stats = {source: 0 for source in self.source_priority}
+        source_stats.update(counts["sources"])
+
+        histogram = [
+            {"min": lo, "max": bounds[i + 1] if i + 1 < len(bounds) else None,
+             "count": counts["market_cap"].get(lo, 0)}
+            for i, lo in enumerate(bounds)
+        ]
 
-        return {
-            "total_projects": total_projects,
-            "projects_per_source": source_stats
+        stats = {
+            "total_projects": counts["total"],
+            "projects_per_source": source_stats,
+            "projects_per_category": counts["categories"],
+            "projects_per_network": counts["networks"],
+            "market_cap_histogram": histogram,
         }
+        self._stats_cache = (now, stats)
+        return stats
 
 
 # Example usage and testing
@@ -0,0 +1,213 @@
+# ProjectRecord.py
+"""
+Slotted in-flight representation of a scraped project.
+
+Scrapers build one ProjectRecord per project and the enrichers fill it in place; it is
+turned into the plain dict MasterProjectManager stores only at the DB boundary
+(to_dict / as_project_dict). Slots drop the per-instance key dict, and the values that
+repeat across thousands of projects (exchange slugs, categories, networks, source names,
+admin statuses) are interned, so every record shares one copy of each string.
+"""
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+SOCIAL_FIELDS = (
+    "website", "telegram_link", "twitter_link", "discord_link", "reddit_link", "medium_link",
+    "github_link", "linkedin_link", "facebook_link", "instagram_link", "tiktok_link",
+    "youtube_link", "email_link",
+)
+
+
+def _intern_all(values: Optional[Iterable[Any]]) -> Optional[List[Any]]:
+    if values is None:
+        return None
+    return [sys.intern(v) if isinstance(v, str) else v for v in values]
+
+
+class TelegramAdmin:
+    """One entry of a project's telegram_admins list."""
+
+    __slots__ = ("username", "first_name", "last_name", "status", "role_title")
+
+    def __init__(self, username: Optional[str] = None, first_name: Optional[str] = None,
+                 last_name: Optional[str] = None, status: str = "admin", role_title: Optional[str] = None):
+        self.username = username
+        self.first_name = first_name
+        self.last_name = last_name
+        self.status = sys.intern(status) if status else status
+        self.role_title = role_title
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TelegramAdmin":
+        return cls(data.get("username"), data.get("first_name"), data.get("last_name"),
+                   data.get("status", "admin"), data.get("role_title"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same keys the admin extractors produce; unset fields are left out."""
+        out = {}
+        for field in self.__slots__:
+            value = getattr(self, field)
+            if value is not None:
+                out[field] = value
+        return out
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, TelegramAdmin) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"TelegramAdmin({self.to_dict()!r})"
+
+
+class Socials:
+    """Known social links as slots; links the scrapers do not know yet go to `extra`."""
+
+    __slots__ = SOCIAL_FIELDS + ("extra",)
+
+    def __init__(self, **links: Optional[str]):
+        self.extra: Dict[str, Any] = {}
+        for field in SOCIAL_FIELDS:
+            setattr(self, field, None)
+        for field, link in links.items():
+            self.set(field, link)
+
+    def get(self, field: str, default: Any = None) -> Any:
+        if field in SOCIAL_FIELDS:
+            value = getattr(self, field)
+            return default if value is None else value
+        return self.extra.get(field, default)
+
+    def set(self, field: str, link: Any) -> None:
+        if field in SOCIAL_FIELDS:
+            setattr(self, field, link)
+        else:
+            self.extra[sys.intern(field)] = link
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "Socials":
+        return cls(**(data or {}))
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {}
+        for field in SOCIAL_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                out[field] = value
+        out.update(self.extra)
+        return out
+
+    def __bool__(self) -> bool:
+        return bool(self.extra) or any(getattr(self, field) is not None for field in SOCIAL_FIELDS)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Socials) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"Socials({self.to_dict()!r})"
+
+
+class ProjectRecord:
+    """A project as it moves from the extractors through enrichment to the writer."""
+
+    __slots__ = (
+        "project_name", "project_ticker", "sources", "socials", "exchanges", "market_cap",
+        "about", "important_note", "category", "network", "telegram_admins",
+        "email_link", "email_links", "contracts", "extra",
+    )
+
+    # Plain-valued fields, in the order to_dict emits them
+    _SCALARS = ("project_name", "project_ticker", "market_cap", "about", "important_note",
+                "email_link", "email_links")
+
+    def __init__(self, project_name: Optional[str] = None, project_ticker: Optional[str] = None,
+                 sources: Optional[Dict[str, Any]] = None, socials: Optional[Socials] = None,
+                 exchanges: Optional[List[Union[int, str]]] = None, market_cap: Optional[float] = None,
+                 about: Optional[str] = None, important_note: Optional[str] = None,
+                 category: Optional[List[str]] = None, network: Optional[List[str]] = None,
+                 telegram_admins: Optional[List[TelegramAdmin]] = None,
+                 email_link: Optional[str] = None, email_links: Optional[str] = None,
+                 contracts: Optional[Dict[str, str]] = None, extra: Optional[Dict[str, Any]] = None):
+        self.project_name = project_name
+        self.project_ticker = sys.intern(project_ticker) if project_ticker else project_ticker
+        self.sources = {sys.intern(src): url for src, url in (sources or {}).items()}
+        self.socials = socials if socials is not None else Socials()
+        self.exchanges = _intern_all(exchanges)
+        self.market_cap = market_cap
+        self.about = about
+        self.important_note = important_note
+        self.category = _intern_all(category)
+        self.network = _intern_all(network)
+        self.telegram_admins = telegram_admins
+        self.email_link = email_link
+        self.email_links = email_links
+        # chain -> token contract address, used as a cross-source identity key
+        self.contracts = {sys.intern(chain): address for chain, address in contracts.items()} if contracts else None
+        self.extra = extra or {}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProjectRecord":
+        """
+        Build a record from a scraper payload or a stored project document.
+
+        Args:
+            data: Project data dictionary; keys without a slot are kept in `extra`
+
+        Returns:
+            ProjectRecord: New record (data is not modified)
+        """
+        extra = {sys.intern(k): v for k, v in data.items() if k not in cls.__slots__ or k == "extra"}
+        admins = data.get("telegram_admins")
+        return cls(
+            project_name=data.get("project_name"),
+            project_ticker=data.get("project_ticker"),
+            sources=data.get("sources"),
+            socials=Socials.from_dict(data.get("socials")),
+            exchanges=data.get("exchanges"),
+            market_cap=data.get("market_cap"),
+            about=data.get("about"),
+            important_note=data.get("important_note"),
+            category=data.get("category"),
+            network=data.get("network"),
+            telegram_admins=None if admins is None else [
+                TelegramAdmin.from_dict(a) if isinstance(a, dict) else a for a in admins
+            ],
+            email_link=data.get("email_link"),
+            email_links=data.get("email_links"),
+            contracts=data.get("contracts"),
+            extra=extra,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Plain dict for MasterProjectManager, shaped like the scraper payloads: unset
+        fields and empty socials are left out, lists are copied so the merge never
+        aliases record state.
+        """
+        out: Dict[str, Any] = {}
+        for field in self._SCALARS:
+            value = getattr(self, field)
+            if value is not None:
+                out[field] = value
+        if self.sources:
+            out["sources"] = dict(self.sources)
+        if self.socials:
+            out["socials"] = self.socials.to_dict()
+        if self.contracts:
+            out["contracts"] = dict(self.contracts)
+        for field in ("exchanges", "category", "network"):
+            value = getattr(self, field)
+            if value is not None:
+                out[field] = list(value)
+        if self.telegram_admins is not None:
+            out["telegram_admins"] = [
+                a.to_dict() if isinstance(a, TelegramAdmin) else a for a in self.telegram_admins
+            ]
+        out.update(self.extra)
+        return out
+
+    def __repr__(self) -> str:
+        return f"ProjectRecord({self.to_dict()!r})"
+
+
+def as_project_dict(project: Union[Dict[str, Any], ProjectRecord]) -> Dict[str, Any]:
+    """Project data at the DB boundary: records are converted, dicts pass through."""
+    return project.to_dict() if isinstance(project, ProjectRecord) else project
@@ -1,11 +1,16 @@
 # core/scrapers/cmc/data_extractor.py
 """
 CMC data extraction functions.
+
+Coin pages are server-rendered by Next.js: the `__NEXT_DATA__` script tag carries the coin
+detail (name, symbol, urls, tags, statistics, platforms) the page is built from, so one HTTP
+fetch supplies almost every field. Selenium is only needed for the markets table (exchanges),
+which the page loads client-side, and as a fallback when a page comes without that data.
 """
+import json
 import time
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
 from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -16,10 +21,80 @@ from scrapers.pages.cmc_pages import MARKET_CAP_TEXT, TAGS, TAGS_SECTION, TAGS_M
     EXCHANGE_LINK_12, EXCHANGE_ROWS_OPTION, EXCHANGE_ROWS_100, NEXT_PAGE_BUTTON, FDV_TEXT, ABOUT_TEXT, \
     PROJECT_NAME_TEXT, PROJECT_TICKER_TEXT
 
+from utils.http_client import HTML_PARSER, fetch_html
 from utils.text_utils import replace_string_at_index, parse_dollar_amount, _normalize_name, _get_ecosystem_regex, \
     _strip_ecosystem, _add_unique_ci
 
 
+# Social link keyword -> socials field; a link takes the first field it matches
+LINK_FIELD_MAP = {
+    "t.me": "telegram_link",
+    "linkedin": "linkedin_link",
+    "facebook": "facebook_link",
+    "instagram": "instagram_link",
+    "tiktok": "tiktok_link",
+    "youtube": "youtube_link",
+    "discord": "discord_link",
+    "reddit": "reddit_link",
+    "medium": "medium_link",
+    "twitter": "twitter_link",
+    "x.com": "twitter_link",
+    "mailto:": "email_link",
+    'github': 'github_link',
+}
+
+# Fields the Selenium pass fills when the page came without its __NEXT_DATA__ coin detail
+SELENIUM_FALLBACK_FIELDS = ("project_name", "project_ticker", "market_cap", "socials", "category")
+
+
+def _split_tags(names: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Normalize tag names and split them into (categories, networks).
+    - Converts hyphens to spaces, title-cases, de-duplicates case-insensitively.
+    - Any tag containing 'ecosystem' is moved to networks with 'ecosystem' removed.
+    """
+    cats: List[str] = []
+    nets: List[str] = []
+    for n in names:
+        n = _normalize_name(n)
+        if not n:
+            continue
+        if _get_ecosystem_regex().search(n):
+            m = _strip_ecosystem(n)
+            if m:
+                _add_unique_ci(nets, m)
+        else:
+            _add_unique_ci(cats, n)
+    # Final dedupe + sort
+    cats = sorted({v.title() for v in cats})
+    nets = sorted({v.title() for v in nets})
+    return cats, nets
+
+
+def _merge_tags(project: Dict, cats: List[str], nets: List[str]) -> None:
+    """Add categories and networks to the project's lists, title-cased and sorted."""
+    if nets:
+        for v in nets: _add_unique_ci(project.setdefault("network", []), v)
+        project["network"] = sorted({(v or "").title() for v in project.get("network", []) if isinstance(v, str)})
+    if cats:
+        for v in cats: _add_unique_ci(project.setdefault("category", []), v)
+        project["category"] = sorted({(v or "").title() for v in project.get("category", []) if isinstance(v, str)})
+
+
+def _assign_social_links(project: Dict, links: List[str]) -> None:
+    """Categorize links into project["socials"] fields through LINK_FIELD_MAP, one link per field."""
+    assigned_fields = set()
+    for link in links:
+        for keyword, field in LINK_FIELD_MAP.items():
+            if keyword in link and field not in assigned_fields:
+                if link[:8] == 'mailto: ': link = link[8:]
+                if not isinstance(project.get("socials"), dict):
+                    project["socials"] = {}
+                project["socials"].update({field: link})
+                assigned_fields.add(field)
+                break  # Stop checking more keywords for this link
+
+
 def extract_categories(driver) -> Tuple[List[str], List[str]]:
     """
     Extract tags, normalize, and split into (categories, networks).
@@ -28,24 +103,6 @@ def extract_categories(driver) -> Tuple[List[str], List[str]]:
     Returns:
         (categories: list[str], networks: list[str])
     """
-    def _normalize_and_split(names: List[str]) -> Tuple[List[str], List[str]]:
-        cats: List[str] = []
-        nets: List[str] = []
-        for n in names:
-            n = _normalize_name(n)
-            if not n:
-                continue
-            if _get_ecosystem_regex().search(n):
-                m = _strip_ecosystem(n)
-                if m:
-                    _add_unique_ci(nets, m)
-            else:
-                _add_unique_ci(cats, n)
-        # Final dedupe + sort
-        cats = sorted({v.title() for v in cats})
-        nets = sorted({v.title() for v in nets})
-        return cats, nets
-
     time.sleep(0.5)
     tag_elements = driver.find_elements(By.XPATH, TAGS_SECTION)
 
@@ -60,14 +117,14 @@ def extract_categories(driver) -> Tuple[List[str], List[str]]:
             all_modal_tags = modal_tags + modal_tags_2
             time.sleep(0.3)
             names = [e.text.strip() for e in all_modal_tags if e.text.strip()]
-            return _normalize_and_split(names)
+            return _split_tags(names)
 
     # Else collect from visible section
     if tag_elements:
         driver.execute_script("arguments[0].scrollIntoView({block:'center'});", tag_elements[0])
     time.sleep(0.3)
     names = [el.text.strip() for el in tag_elements if el.text.strip()]
-    return _normalize_and_split(names)
+    return _split_tags(names)
 
 
 def extract_project_name(driver):
@@ -123,7 +180,8 @@ def extract_exchanges(driver, timeout=5, pause=1):
         pause (float): Seconds to wait after page interactions.
 
     Returns:
-        list[str]: Unique list of exchange slugs (e.g., 'pancakeswap-v3').
+        list[str]: Unique list of exchange slugs (e.g., 'pancakeswap-v3'); MasterProjectManager
+        stores them as ids of its own store's exchange dimension.
     """
     wait = WebDriverWait(driver, timeout)
     exchanges = set()
@@ -162,7 +220,7 @@ def extract_exchanges(driver, timeout=5, pause=1):
         except Exception:
             break  # No more next button → exit loop
 
-    return list(exchanges)
+    return sorted(exchanges)
 
 
 def extract_website_from_soup(soup):
@@ -214,6 +272,139 @@ def extract_about_from_soup(soup):
     return about_notes
 
 
+def extract_next_data(soup) -> Optional[Dict[str, Any]]:
+    """
+    Parse the Next.js `__NEXT_DATA__` JSON blob of a server-rendered page.
+
+    Args:
+        soup: BeautifulSoup object
+
+    Returns:
+        dict: Page data, or None when the page has no (valid) blob
+    """
+    tag = soup.find("script", id="__NEXT_DATA__")
+    if tag is None or not tag.string:
+        return None
+    try:
+        return json.loads(tag.string)
+    except ValueError as e:
+        print(f"Error parsing __NEXT_DATA__: {e}")
+    return None
+
+
+def find_coin_detail(data: Any, depth: int = 8) -> Optional[Dict[str, Any]]:
+    """
+    Find the coin detail object in page data: the dict carrying the coin's symbol together
+    with its statistics or urls (props.pageProps.detailRes.detail on current pages). Searched
+    breadth-first, so small layout moves on CMC's side do not break the extractor.
+    """
+    level = [data]
+    for _ in range(depth):
+        next_level = []
+        for node in level:
+            if isinstance(node, dict):
+                if isinstance(node.get("symbol"), str) and ("statistics" in node or "urls" in node):
+                    return node
+                next_level.extend(v for v in node.values() if isinstance(v, (dict, list)))
+            elif isinstance(node, list):
+                next_level.extend(v for v in node if isinstance(v, (dict, list)))
+        level = next_level
+    return None
+
+
+def _html_text(value: Any) -> Optional[str]:
+    """Plain text of an HTML/markdown snippet from page data."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return BeautifulSoup(value, HTML_PARSER).get_text(" ", strip=True) or None
+
+
+def _positive_number(value: Any) -> Optional[float]:
+    if type(value) in (int, float) and value > 0:
+        return float(value)
+    if isinstance(value, str):
+        parsed = parse_dollar_amount(value)
+        if parsed:
+            return parsed
+    return None
+
+
+def extract_details_from_html(html: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Extract every field a coin page's server-rendered HTML can supply, without a browser.
+
+    Args:
+        html: Coin page HTML (https://coinmarketcap.com/currencies/<slug>/)
+
+    Returns:
+        (fields, has_page_data): fields shaped like a project payload (project_name,
+        project_ticker, market_cap, fdv, about, important_note, socials, category, network,
+        contracts; only those found), and whether the page carried its coin detail data.
+        Without it, missing fields are worth a Selenium pass.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    detail = find_coin_detail(extract_next_data(soup) or {})
+    fields: Dict[str, Any] = {}
+    socials: Dict[str, str] = {}
+
+    if detail is not None:
+        if isinstance(detail.get("name"), str) and detail["name"].strip():
+            fields["project_name"] = detail["name"].strip()
+        if detail["symbol"].strip():
+            fields["project_ticker"] = detail["symbol"].strip().upper()
+
+        statistics = detail.get("statistics") if isinstance(detail.get("statistics"), dict) else {}
+        market_cap = _positive_number(statistics.get("marketCap")) or _positive_number(
+            statistics.get("selfReportedMarketCap"))
+        if market_cap: fields["market_cap"] = market_cap
+        fdv = _positive_number(statistics.get("fullyDilutedMarketCap"))
+        if fdv: fields["fdv"] = fdv
+
+        urls = detail.get("urls") if isinstance(detail.get("urls"), dict) else {}
+        websites = [u for u in urls.get("website") or [] if isinstance(u, str) and u]
+        if websites: socials["website"] = websites[0]
+        links = [u for key, values in urls.items() if key != "website" and isinstance(values, list)
+                 for u in values if isinstance(u, str) and u]
+        project: Dict[str, Any] = {}
+        _assign_social_links(project, links)
+        socials.update(project.get("socials", {}))
+
+        tags = [t.get("name") for t in detail.get("tags") or [] if isinstance(t, dict) and isinstance(t.get("name"), str)]
+        cats, nets = _split_tags(tags)
+        if cats: fields["category"] = cats
+        if nets: fields["network"] = nets
+
+        contracts = {}
+        for platform in detail.get("platforms") or []:
+            if not isinstance(platform, dict):
+                continue
+            chain, address = platform.get("contractPlatform"), platform.get("contractAddress")
+            if isinstance(chain, str) and isinstance(address, str) and chain and address:
+                contracts.setdefault(chain, address)
+        if contracts: fields["contracts"] = contracts
+
+    # Rendered sections first, the page data where they are missing
+    if "website" not in socials:
+        website = extract_website_from_soup(soup)
+        if website: socials["website"] = website
+    if socials: fields["socials"] = socials
+
+    impt = extract_important_notice_from_soup(soup) or _html_text((detail or {}).get("notice"))
+    if impt: fields["important_note"] = impt
+
+    about = extract_about_from_soup(soup) or _html_text((detail or {}).get("description"))
+    if about: fields["about"] = about[:4500]
+
+    if "project_name" not in fields:
+        el = soup.select_one("span[data-role='coin-name']")
+        if el and el.get_text(strip=True): fields["project_name"] = el.get_text(strip=True)
+    if "project_ticker" not in fields:
+        el = soup.select_one("span[data-role='coin-symbol']")
+        if el and el.get_text(strip=True): fields["project_ticker"] = el.get_text(strip=True).upper()
+
+    return fields, detail is not None
+
+
 def extract_market_cap(driver):
     """
     Extract market cap text from the project page.
@@ -304,141 +495,108 @@ def extract_all_social_links(driver):
     return links
 
 
+def apply_page_fields(project: Dict, fields: Dict[str, Any]) -> Dict:
+    """
+    Merge fields from extract_details_from_html into a project in place. The listing's
+    project_name/project_ticker are kept when present; socials, contracts, categories and
+    networks are added to what the project has.
+    """
+    for key in ("project_name", "project_ticker"):
+        if project.get(key) is None and fields.get(key):
+            project[key] = fields[key]
+    for key in ("market_cap", "fdv", "about", "important_note"):
+        if fields.get(key):
+            project[key] = fields[key]
+    if fields.get("socials"):
+        if not isinstance(project.get("socials"), dict):
+            project["socials"] = {}
+        project["socials"].update(fields["socials"])
+    if fields.get("contracts"):
+        if not isinstance(project.get("contracts"), dict):
+            project["contracts"] = {}
+        for chain, address in fields["contracts"].items():
+            project["contracts"].setdefault(chain, address)
+    _merge_tags(project, fields.get("category") or [], fields.get("network") or [])
+    return project
+
+
 def enrich_project_with_details(driver, project):
     """
     Enrich project data with additional details from project page.
 
+    The page is fetched once over HTTP and parsed (extract_details_from_html). The browser
+    then only loads it for the exchanges, plus the fields the HTTP pass could not supply
+    when the page came without its coin data.
+
     Args:
-        driver: Selenium WebDriver instance
+        driver: Selenium WebDriver instance, or None for an HTTP-only pass (no exchanges)
         project (dict): Project data dictionary
 
     Returns:
         dict: Enriched project data
     """
-    try:
-        response = requests.get(project["sources"]["coinmarketcap"], timeout=10)
-        soup = BeautifulSoup(response.text, "html.parser")
-
+    url = project["sources"]["coinmarketcap"]
+    fields: Dict[str, Any] = {}
+    fallback = set(SELENIUM_FALLBACK_FIELDS)
+    html = fetch_html(url)
+    if html is not None:
         try:
-            website = extract_website_from_soup(soup)
-            if not isinstance(project.get("socials"), dict):
-                project["socials"] = {}
-            project["socials"].update({"website": website})
+            fields, has_page_data = extract_details_from_html(html)
+            apply_page_fields(project, fields)
+            if has_page_data:
+                fallback.clear()
         except Exception as e:
-            print(f"Missing website via BeatifulSoup for {project.get('project_name', 'Unknown')}")
+            print(f"Error parsing page for {project.get('project_name', 'Unknown')}: {e}")
 
-        try:
-            impt = extract_important_notice_from_soup(soup)
-            if impt: project["important_note"] = impt
-        except Exception as e:
-            print(f"Missing impt note via BeatifulSoup for {project.get('project_name', 'Unknown')}")
-
-        try:
-            about = extract_about_from_soup(soup)
-            if about: project["about"] = about
-        except Exception as e:
-            print(f"Missing about text via BeatifulSoup for {project.get('project_name', 'Unknown')}")
-
-    except Exception as e:
-        print(f"Error connecting to BeatifulSoup for {project.get('project_name', 'Unknown')}: {e}")
+    if driver is None:
+        return project
 
     try:
-        driver.get(project["sources"]["coinmarketcap"])
+        driver.get(url)
 
         try:
-            if project.get("project_name") is None:
+            if "project_name" in fallback and project.get("project_name") is None:
                 project_name = extract_project_name(driver)
                 if project_name: project["project_name"] = project_name
         except Exception as e:
-            print(f"Missing project_name via Selenium for {project['sources']['coinmarketcap']}")
+            print(f"Missing project_name via Selenium for {url}")
 
         try:
-            if project.get("project_ticker") is None:
+            if "project_ticker" in fallback and project.get("project_ticker") is None:
                 project_ticker = extract_project_ticker(driver)
                 if project_ticker: project["project_ticker"] = project_ticker
         except Exception as e:
             print(f"Missing project_ticker via Selenium for {project.get('project_name', 'Unknown')}")
 
         try:
+            # The markets table is rendered client-side
             exchanges = extract_exchanges(driver)
             if exchanges: project["exchanges"] = exchanges
         except Exception as e:
             print(f"Missing exchanges via Selenium for {project.get('project_name', 'Unknown')}")
 
         try:
-            # get market cap
-            market_cap = extract_market_cap(driver)
-            if market_cap: project["market_cap"] = market_cap
+            if "market_cap" in fallback and "market_cap" not in fields:
+                market_cap = extract_market_cap(driver)
+                if market_cap: project["market_cap"] = market_cap
         except Exception as e:
             print(f"Missing market cap via Selenium for {project.get('project_name', 'Unknown')}")
 
         try:
-            # extract social links
-            all_links = extract_all_social_links(driver)
-            if all_links:
-                link_field_map = {
-                    "t.me": "telegram_link",
-                    "linkedin": "linkedin_link",
-                    "facebook": "facebook_link",
-                    "instagram": "instagram_link",
-                    "tiktok": "tiktok_link",
-                    "youtube": "youtube_link",
-                    "discord": "discord_link",
-                    "reddit": "reddit_link",
-                    "medium": "medium_link",
-                    "twitter": "twitter_link",
-                    "x.com": "twitter_link",
-                    "mailto:": "email_link",
-                    'github': 'github_link',
-                }
-
-                # Categorize and store the link
-                assigned_fields = set()
-                for link in all_links:
-                    for keyword, field in link_field_map.items():
-                        if keyword in link and field not in assigned_fields:
-                            if link[:8] == 'mailto: ': link = link[8:]
-                            if not isinstance(project.get("socials"), dict):
-                                project["socials"] = {}
-                            project["socials"].update({field: link})
-                            assigned_fields.add(field)
-                            break  # Stop checking more keywords for this link
+            if "socials" in fallback:
+                all_links = extract_all_social_links(driver)
+                if all_links: _assign_social_links(project, all_links)
         except Exception as e:
             print(f"Missing socials via Selenium for {project.get('project_name', 'Unknown')}")
 
         try:
-            cats, nets = extract_categories(driver)
-            if nets:
-                for v in nets: _add_unique_ci(project.setdefault("network", []), v)
-                project["network"] = sorted({(v or "").title() for v in project.get("network", []) if isinstance(v, str)})
-            if cats:
-                for v in cats: _add_unique_ci(project.setdefault("category", []), v)
-                project["category"] = sorted({(v or "").title() for v in project.get("category", []) if isinstance(v, str)})
+            if "category" in fallback:
+                cats, nets = extract_categories(driver)
+                _merge_tags(project, cats, nets)
         except Exception as e:
-            # import logging, traceback, sys, pprint as pp
-            # logging.basicConfig(level=logging.DEBUG, format="%(levelname)s:%(message)s")
-            #
-            # def _exc_dump(msg: str, **ctx):
-            #     et, ev, tb = sys.exc_info()
-            #     logging.error("%s: %s: %s", msg, et.__name__ if et else "Exception", ev)
-            #     for k, v in ctx.items():
-            #         logging.error("  %s=%s", k, v)
-            #     traceback.print_exc()
-            #
-            # _exc_dump(
-            #     "Missing categories via Selenium",
-            #     project_name=project.get("project_name"),
-            #     has_network=isinstance(project.get("network"), list),
-            #     has_category=isinstance(project.get("category"), list),
-            #     nets_len=("n/a" if "nets" not in locals() else len(nets)),
-            #     cats_len=("n/a" if "cats" not in locals() else len(cats)),
-            #     project_keys=sorted(project.keys()),
-            #     sample_network=(project.get("network")[:5] if isinstance(project.get("network"), list) else None),
-            #     sample_category=(project.get("category")[:5] if isinstance(project.get("category"), list) else None),
-            # )
             print(f"Missing categories via Selenium for {project.get('project_name', 'Unknown')}\n{e}")
 
     except Exception as e:
         print(f"Error connecting Selenium driver for {project.get('project_name', 'Unknown')}: {e}")
 
-    return project
\ No newline at end of file
+    return project
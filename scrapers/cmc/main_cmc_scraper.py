@@ -8,6 +8,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 
+from BufferedProjectWriter import BufferedProjectWriter
 from MasterProjectManager import MasterProjectManager
 from config.private import get_mongodb_uri
 from messengers.pages.tele_pages import SEARCH_BOX
@@ -16,8 +17,8 @@ from scrapers.pages.cmc_pages import *
 
 from scrapers.cmc.data_extractor import enrich_project_with_details
 from scrapers.pages.cmc_pages import NEW_BUTTON
-from utils.project_enrichment import enrich_telegram_data, enrich_email_data
-from utils.web_driver import get_dedicated_local_web_driver, get_local_web_driver, get_local_headless_web_driver
+from utils.driver_pool import HEADLESS, dedicated_kind, get_driver_pool, lean_kind
+from utils.enrichment_pool import enrich_projects_concurrently
 
 
 def go_cmc_to_page(driver, qpage, timeout=10):
@@ -100,52 +101,48 @@ def scrape_standard_project_rows_from_table(driver):
 
     return results
 
-def handle_standard_cmc_table(driver, chrome_profile, projects):
+def handle_standard_cmc_table(driver, chrome_profile, projects, workers=None, lean=True):
     if not projects:
         print("No projects found in table")
         return []
 
     print(f"Scraped {len(projects)} projects, enriching data...")
-    driver2 = get_dedicated_local_web_driver(chrome_profile)
+    driver_pool = get_driver_pool()
+    driver2 = driver_pool.checkout(dedicated_kind(chrome_profile))
     _reset_to_telegram_main(driver2)
     manager = MasterProjectManager(get_mongodb_uri())
 
     enriched_projects = []
     try:
-        # for i, project in enumerate(projects[70:]):   # for testing purposes
-        for i, project in enumerate(projects):
-            print(f"Enriching project {i + 1}/{len(projects)}: {project.get('project_name', 'Unknown')}")
-            enriched_project = enrich_project_with_details(driver, project)
-            enriched_project.update(enrich_telegram_data(driver2, enriched_project, chrome_profile))
-            enriched_project.update(enrich_email_data(enriched_project))
-            print(enriched_project)
-
-            if not enriched_project.get("project_name") or not enriched_project.get("project_ticker"):
-                print(f"[ERROR] Project {project['sources']['coinmarketcap']} not enriched...")
-                continue
-            enriched_projects.append(enriched_project)
-            project_uid = manager.upsert_project(enriched_project, "coinmarketcap")
+        # Writes are buffered off the scraping path and flushed in bulk, also when a driver crashes
+        with BufferedProjectWriter(manager) as writer:
+            enriched_projects = enrich_projects_concurrently(
+                projects, "coinmarketcap", enrich_project_with_details, writer, driver2, chrome_profile,
+                workers=workers, driver=driver, driver_kind=lean_kind("coinmarketcap") if lean else HEADLESS,
+            )
+        print(f"Write buffer stats: {writer.stats()}")
+        print(f"Driver pool stats: {driver_pool.metrics()}")
     finally:
-        driver2.quit()
+        driver_pool.checkin(driver2)
         print(f"Successfully scraped {len(enriched_projects)} projects")
         return enriched_projects
 
 
-def scrape_cmc_page(page_num:int, chrome_profile, links=None):
-    driver = get_local_headless_web_driver()
-    driver.get("https://coinmarketcap.com")
+def scrape_cmc_page(page_num:int, chrome_profile, links=None, workers=None, lean=True):
+    # Page drivers come from the pool, so consecutive pages reuse one browser
+    with get_driver_pool().driver(lean_kind("coinmarketcap") if lean else HEADLESS) as driver:
+        driver.get("https://coinmarketcap.com")
 
-    if links:
-        projects = []
-        for link in links:
-            project = {"sources": {"coinmarketcap": link}}
-            projects.append(project)
-    else:
-        if page_num > 1:
-            go_cmc_to_page(driver, page_num)
-        time.sleep(2.5)
-        projects = scrape_standard_project_rows_from_table(driver)
+        if links:
+            projects = []
+            for link in links:
+                project = {"sources": {"coinmarketcap": link}}
+                projects.append(project)
+        else:
+            if page_num > 1:
+                go_cmc_to_page(driver, page_num)
+            time.sleep(2.5)
+            projects = scrape_standard_project_rows_from_table(driver)
 
-    handle_standard_cmc_table(driver, chrome_profile, projects)
-    driver.quit()
+        handle_standard_cmc_table(driver, chrome_profile, projects, workers, lean)
     time.sleep(1)
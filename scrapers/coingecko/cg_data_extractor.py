@@ -1,11 +1,16 @@
 # core/scrapers/cmc/data_extractor.py
 """
-CMC data extraction functions.
+CoinGecko data extraction functions.
+
+Coin pages are server-rendered: name, symbol, market data, notice, about and the info
+section rows (including the links behind the Chains/Categories "more" dropdowns) are all in
+the HTML of one HTTP fetch. Selenium is only needed for the markets table (exchanges) and
+for the fields a fetched page did not yield.
 """
 import time
-from typing import Dict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
 
-import requests
 from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -15,7 +20,8 @@ from selenium.webdriver import ActionChains
 from scrapers.pages.coingecko_pages import COIN_NAME_TEXT, COIN_SYMBOL_TEXT, MARKET_CAP_TEXT, IMPORTANT_TEXT, \
     INFO_TABLE_KEYS, WEBSITE_LINK, SOCIALS_LINKS, INFO_SECTION_LINKS, CHAINS_INFO_LINKS, MORE_INFO_BUTTON, \
     CATEGORY_INFO_LINKS, ABOUT_MORE_BUTTON, ABOUT_TEXT, EXCHANGE_ROWS_OPTION, EXCHANGE_ROWS_100, \
-    NEXT_PAGE_BUTTON, NAVIGATION_NUMBERS, EXCHANGE_LINK__14
+    NEXT_PAGE_BUTTON, NAVIGATION_NUMBERS, EXCHANGE_LINK__14, FDV_TEXT
+from utils.http_client import HTML_PARSER, fetch_html
 from utils.text_utils import replace_string_at_index, parse_dollar_amount, _slug_from_categories_url, _normalize_name, \
     _add_unique_ci, _get_ecosystem_regex, _strip_ecosystem
 
@@ -56,12 +62,89 @@ def extract_market_cap(driver):
     return None
 
 
-def get_project_info_section(driver, project: Dict) -> Dict:
+# Fields a fetched page should yield; the Selenium pass fills those it did not ("info" is
+# the info section: website, socials, chains and categories)
+SELENIUM_FALLBACK_FIELDS = ("project_name", "project_ticker", "market_cap", "info", "about")
+
+# Social link keyword -> socials field; a link takes the first field it matches
+LINK_FIELD_MAP = {
+    "t.me": "telegram_link",
+    "linkedin": "linkedin_link",
+    "facebook": "facebook_link",
+    "instagram": "instagram_link",
+    "tiktok": "tiktok_link",
+    "youtube": "youtube_link",
+    "discord": "discord_link",
+    "reddit": "reddit_link",
+    "medium": "medium_link",
+    "twitter": "twitter_link",
+    "x.com": "twitter_link",
+    "mailto:": "email_link",
+    "github": "github_link",
+}
+
+
+def apply_info_links(project: Dict, website_url: Optional[str], social_hrefs: List[str],
+                     chain_hrefs: List[str], category_hrefs: List[str]) -> Dict:
     """
-    Get project info section and enrich `project` with website, socials, network, category.
-    - Networks come from the "Chains" block and from category items containing 'ecosystem'.
+    Enrich `project` with the links of the info section rows, however they were collected.
+    - Networks come from the "Chains" links and from category links containing 'ecosystem'.
     - Category items are normalized and de-duplicated.
     """
+    if not isinstance(project.get("socials"), dict):
+        project["socials"] = {}
+    if website_url:
+        project["socials"]["website"] = website_url
+
+    assigned_fields = set()
+    for link in social_hrefs:
+        for keyword, field in LINK_FIELD_MAP.items():
+            if keyword in link and field not in assigned_fields:
+                if link.startswith("mailto: "):
+                    link = link[8:]
+                project["socials"][field] = link
+                assigned_fields.add(field)
+                break
+
+    # Ensure arrays
+    if not isinstance(project.get("category"), list):
+        project["category"] = []
+
+    # Chains → network
+    for href in chain_hrefs:
+        slug = _slug_from_categories_url(href)
+        if not slug: continue
+        if not isinstance(project.get("network"), list): project["network"] = []
+        name = _strip_ecosystem(slug)
+        _add_unique_ci(project["network"], name)
+
+    # Categories → category or network (if contains 'ecosystem')
+    for href in category_hrefs:
+        slug = _slug_from_categories_url(href)
+        if not slug:
+            continue
+        raw = _normalize_name(slug)
+        if _get_ecosystem_regex().search(raw):
+            moved = _strip_ecosystem(raw)
+            if moved:
+                if not isinstance(project.get("network"), list): project["network"] = []
+                _add_unique_ci(project["network"], moved)
+        else:
+            _add_unique_ci(project["category"], raw)
+
+    # Final per-doc normalization and uniqueness guarantees
+    if isinstance(project.get("network"), list):
+        project["network"]  = sorted({v.title() for v in project["network"] if isinstance(v, str)})
+    if isinstance(project.get("category"), list):
+        project["category"] = sorted({v.title() for v in project["category"] if isinstance(v, str)})
+    return project
+
+
+def get_project_info_section(driver, project: Dict) -> Dict:
+    """
+    Get project info section and enrich `project` with website, socials, network, category
+    (see apply_info_links). Chains and Categories rows are expanded with their "more" button.
+    """
     website = community = chains = categories = None
     try:
         info_table_keys_elements = driver.find_elements(By.CSS_SELECTOR, INFO_TABLE_KEYS)
@@ -75,58 +158,26 @@ def get_project_info_section(driver, project: Dict) -> Dict:
         print(f"Failed to get info_table_keys\n{e}")
 
     # Website
+    website_url = None
     try:
         if website is not None:
             WEBSITE_LINK_TARGET = replace_string_at_index(INFO_SECTION_LINKS, -12, str(website + 1))
             website_url = driver.find_element(By.CSS_SELECTOR, WEBSITE_LINK_TARGET).get_attribute("href")
-            if not isinstance(project.get("socials"), dict):
-                project["socials"] = {}
-            if website_url:
-                project["socials"]["website"] = website_url
     except Exception as e:
         print(f"Failed to get website\n{e}")
 
     # Community / socials
+    all_socials: List[str] = []
     try:
         if community is not None:
             SOCIAL_LINKS_TARGET = replace_string_at_index(INFO_SECTION_LINKS, -12, str(community + 1))
             all_socials = driver.find_elements(By.CSS_SELECTOR, SOCIAL_LINKS_TARGET)
             all_socials = [el.get_attribute("href") for el in all_socials if el.get_attribute("href")]
-            if all_socials:
-                link_field_map = {
-                    "t.me": "telegram_link",
-                    "linkedin": "linkedin_link",
-                    "facebook": "facebook_link",
-                    "instagram": "instagram_link",
-                    "tiktok": "tiktok_link",
-                    "youtube": "youtube_link",
-                    "discord": "discord_link",
-                    "reddit": "reddit_link",
-                    "medium": "medium_link",
-                    "twitter": "twitter_link",
-                    "x.com": "twitter_link",
-                    "mailto:": "email_link",
-                    "github": "github_link",
-                }
-                assigned_fields = set()
-                if not isinstance(project.get("socials"), dict):
-                    project["socials"] = {}
-                for link in all_socials:
-                    for keyword, field in link_field_map.items():
-                        if keyword in link and field not in assigned_fields:
-                            if link.startswith("mailto: "):
-                                link = link[8:]
-                            project["socials"][field] = link
-                            assigned_fields.add(field)
-                            break
     except Exception as e:
         print(f"Failed to get all_socials\n{e}")
 
-    # Ensure arrays
-    if not isinstance(project.get("category"), list):
-        project["category"] = []
-
-    # Chains → network
+    # Chains
+    chain_hrefs: List[str] = []
     try:
         if chains is not None:
             CHAIN_LINKS_TARGET = replace_string_at_index(INFO_SECTION_LINKS, -12, str(chains + 1))
@@ -145,17 +196,11 @@ def get_project_info_section(driver, project: Dict) -> Dict:
                 more_info_button.click()
             except Exception:
                 print("more chain info button missing")
-
-            for href in chain_hrefs:
-                slug = _slug_from_categories_url(href)
-                if not slug: continue
-                if not isinstance(project.get("network"), list): project["network"] = []
-                name = _strip_ecosystem(slug)
-                _add_unique_ci(project["network"], name)
     except Exception as e:
         print(f"Failed to get more chains\n{e}")
 
-    # Categories → category or network (if contains 'ecosystem')
+    # Categories
+    category_hrefs: List[str] = []
     try:
         if categories is not None:
             CATEGORIES_LINKS_TARGET = replace_string_at_index(INFO_SECTION_LINKS, -12, str(categories + 1))
@@ -174,32 +219,13 @@ def get_project_info_section(driver, project: Dict) -> Dict:
                 more_info_button.click()
             except Exception as e:
                 print(f"more category info button missing")
-
-            for href in category_hrefs:
-                slug = _slug_from_categories_url(href)
-                if not slug:
-                    continue
-                raw = _normalize_name(slug)
-                if _get_ecosystem_regex().search(raw):
-                    moved = _strip_ecosystem(raw)
-                    if moved:
-                        if not isinstance(project.get("network"), list): project["network"] = []
-                        _add_unique_ci(project["network"], moved)
-                else:
-                    if not isinstance(project.get("category"), list): project["category"] = []
-                    _add_unique_ci(project["category"], raw)
     except Exception as e:
         print(f"Failed to get more categories\n{e}")
 
     try:
-        # Final per-doc normalization and uniqueness guarantees
-        if isinstance(project.get("network"), list):
-            project["network"]  = sorted({v.title() for v in project["network"] if isinstance(v, str)})
-        if isinstance(project.get("category"), list):
-            project["category"] = sorted({v.title() for v in project["category"] if isinstance(v, str)})
-
+        apply_info_links(project, website_url, all_socials, chain_hrefs, category_hrefs)
     except Exception as e:
-        print(f"Failed to sort network and categories\n{e}")
+        print(f"Failed to apply info section links\n{e}")
 
     return project
 
@@ -228,7 +254,8 @@ def extract_exchanges(driver, timeout=2, pause=1):
         pause (float): Seconds to wait after page interactions.
 
     Returns:
-        list[str]: Unique list of exchange slugs (e.g., 'pancakeswap-v3').
+        list[str]: Unique list of exchange slugs (e.g., 'pancakeswap-v3'); MasterProjectManager
+        stores them as ids of its own store's exchange dimension.
     """
     wait = WebDriverWait(driver, timeout)
     exchanges = set()
@@ -268,66 +295,173 @@ def extract_exchanges(driver, timeout=2, pause=1):
         except Exception:
             break  # No more next button → exit loop
 
-    return list(exchanges)
+    return sorted(exchanges)
+
+
+def _soup_text(soup, selector: str) -> Optional[str]:
+    el = soup.select_one(selector)
+    text = el.get_text(" ", strip=True) if el else ""
+    return text or None
+
+
+def extract_details_from_html(html: str, url: str = "https://www.coingecko.com") -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Build the project fields of a coin page from its raw HTML, without a browser.
+
+    Args:
+        html: Coin page HTML (https://www.coingecko.com/en/coins/<id>)
+        url: Page URL, to resolve relative links
+
+    Returns:
+        (fields, missing): fields shaped like a project payload (project_name,
+        project_ticker, market_cap, fdv, important_note, about, socials, category,
+        network; only those found), and the names in SELENIUM_FALLBACK_FIELDS that were not
+        found, "info" standing for the info section
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    fields: Dict[str, Any] = {}
+
+    name = _soup_text(soup, COIN_NAME_TEXT)
+    if name: fields["project_name"] = name
+    symbol = _soup_text(soup, COIN_SYMBOL_TEXT)
+    if symbol and symbol[-6:] == ' Price':
+        symbol = symbol[:-6]
+    if symbol: fields["project_ticker"] = symbol
+
+    market_cap = parse_dollar_amount(_soup_text(soup, MARKET_CAP_TEXT))
+    if market_cap: fields["market_cap"] = market_cap
+    fdv = parse_dollar_amount(_soup_text(soup, FDV_TEXT))
+    if fdv: fields["fdv"] = fdv
+
+    impt = _soup_text(soup, IMPORTANT_TEXT)
+    if impt: fields["important_note"] = impt
+    # The full text is in the HTML; "read more" only unclamps it
+    about = _soup_text(soup, ABOUT_TEXT)
+    if about: fields["about"] = about[:4500]
+
+    # Info section rows: key cell + links, dropdown links included
+    rows: Dict[str, List[str]] = {}
+    for key_el in soup.select(INFO_TABLE_KEYS):
+        key = key_el.get_text(" ", strip=True)
+        row = key_el.parent
+        if row is None:
+            continue
+        hrefs = [urljoin(url, a["href"]) for a in row.select("a[href]") if a["href"]]
+        for label in ("Website", "Community", "Chains", "Categories"):
+            if label in key:
+                rows[label] = hrefs
+    if rows:
+        info: Dict[str, Any] = {}
+        website = rows.get("Website") or []
+        apply_info_links(info, website[0] if website else None, rows.get("Community") or [],
+                         rows.get("Chains") or [], rows.get("Categories") or [])
+        for key in ("socials", "category", "network"):
+            if info.get(key):
+                fields[key] = info[key]
+
+    found = set(fields) | ({"info"} if rows else set())
+    return fields, [field for field in SELENIUM_FALLBACK_FIELDS if field not in found]
+
+
+def apply_page_fields(project: Dict, fields: Dict[str, Any]) -> Dict:
+    """Merge fields from extract_details_from_html into a project in place."""
+    for key in ("project_name", "project_ticker", "market_cap", "fdv", "important_note", "about"):
+        if fields.get(key):
+            project[key] = fields[key]
+    if fields.get("socials"):
+        if not isinstance(project.get("socials"), dict):
+            project["socials"] = {}
+        project["socials"].update(fields["socials"])
+    for key in ("category", "network"):
+        if fields.get(key):
+            existing = project.get(key) if isinstance(project.get(key), list) else []
+            for v in fields[key]: _add_unique_ci(existing, v)
+            project[key] = sorted({v.title() for v in existing if isinstance(v, str)})
+    return project
 
 
 def enrich_project_with_details(driver, project):
     """
     Enrich project data with additional details from project page.
 
+    The page is fetched once over HTTP and parsed (extract_details_from_html). The browser
+    then only loads it for the exchanges and for the fields the HTTP pass did not find.
+
     Args:
-        driver: Selenium WebDriver instance
+        driver: Selenium WebDriver instance, or None for an HTTP-only pass (no exchanges)
         project (dict): Project data dictionary
 
     Returns:
         dict: Enriched project data
     """
+    url = project['sources']['coingecko']
+    missing = list(SELENIUM_FALLBACK_FIELDS)
+    html = fetch_html(url)
+    if html is not None:
+        try:
+            fields, missing = extract_details_from_html(html, url)
+            apply_page_fields(project, fields)
+        except Exception as e:
+            print(f"Error parsing page for {project.get('project_name', 'Unknown')}: {e}")
+
+    if driver is None:
+        print(f"{project}")
+        return project
+
     try:
-        driver.get(project['sources']['coingecko'])
+        driver.get(url)
 
         try:
-            project_name = driver.find_element(By.CSS_SELECTOR, COIN_NAME_TEXT).text
-            if project_name: project["project_name"] = project_name
+            if "project_name" in missing:
+                project_name = driver.find_element(By.CSS_SELECTOR, COIN_NAME_TEXT).text
+                if project_name: project["project_name"] = project_name
         except Exception as e:
-            print(f"Missing project_name via Selenium for {project['sources']['coingecko']}")
+            print(f"Missing project_name via Selenium for {url}")
 
         try:
-            symbol = get_coin_symbol(driver)
-            if symbol: project["project_ticker"] = symbol
+            if "project_ticker" in missing:
+                symbol = get_coin_symbol(driver)
+                if symbol: project["project_ticker"] = symbol
         except Exception as e:
             print(f"Missing project_ticker via Selenium for {project.get('project_name', 'Unknown')}")
 
         try:
-            project.update(get_project_info_section(driver, project))
+            if "info" in missing:
+                project.update(get_project_info_section(driver, project))
         except Exception as e:
             print(f"Error getting project info section via Selenium for {project.get('project_name', 'Unknown')}: {e}")
 
         try:
-            market_cap = extract_market_cap(driver)
-            if market_cap: project["market_cap"] = market_cap
+            if "market_cap" in missing:
+                market_cap = extract_market_cap(driver)
+                if market_cap: project["market_cap"] = market_cap
         except Exception as e:
             print(f"Missing mcap via Selenium for {project.get('project_name', 'Unknown')}")
 
         try:
-            impt = driver.find_element(By.CSS_SELECTOR, IMPORTANT_TEXT).text
-            if impt: project["important_note"] = impt
+            # Without a fetched page, the notice and about text come from the browser too
+            if html is None:
+                impt = driver.find_element(By.CSS_SELECTOR, IMPORTANT_TEXT).text
+                if impt: project["important_note"] = impt
         except Exception as e:
             print(f"Missing impt note via Selenium for {project.get('project_name', 'Unknown')}")
 
         try:
-            about = get_about_text(driver)
-            if about: project["about"] = about
+            if "about" in missing:
+                about = get_about_text(driver)
+                if about: project["about"] = about
         except Exception as e:
             print(f"Missing about text via Selenium for {project.get('project_name', 'Unknown')}")
 
         try:
+            # The markets table is paginated client-side
             exchanges = extract_exchanges(driver)
             if exchanges: project["exchanges"] = exchanges
         except Exception as e:
             print(f"Missing exchanges via Selenium for {project.get('project_name', 'Unknown')}")
 
     except Exception as e:
-        print(f"Error connecting Selenium driver for {project['sources']['coingecko']}: {e}")
+        print(f"Error connecting Selenium driver for {url}: {e}")
 
     print(f"{project}")
     return project
@@ -19,6 +19,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 
+from BufferedProjectWriter import BufferedProjectWriter
 from MasterProjectManager import MasterProjectManager
 from config.private import get_mongodb_uri
 from messengers.pages.tele_pages import SEARCH_BOX
@@ -26,9 +27,9 @@ from messengers.telegram.admin_extractor import _reset_to_telegram_main
 from scrapers.coingecko.cg_data_extractor import enrich_project_with_details
 from scrapers.pages.coingecko_pages import *
 
-from utils.project_enrichment import enrich_telegram_data, enrich_email_data
+from utils.driver_pool import HEADLESS, dedicated_kind, get_driver_pool, lean_kind
+from utils.enrichment_pool import enrich_projects_concurrently
 from utils.text_utils import replace_string_at_index
-from utils.web_driver import get_dedicated_local_web_driver, get_local_web_driver, get_local_headless_web_driver
 
 
 # def keyboard_1press(keyboard, key1):
@@ -207,31 +208,28 @@ def get_project_links(driver):
     return projects
 
 
-def handle_standard_cg_table(driver, chrome_profile, projects):
+def handle_standard_cg_table(driver, chrome_profile, projects, workers=None, lean=True):
     if not projects:
         print("No projects found in table")
 
     print(f"Scraped {len(projects)} projects, enriching data...")
-    driver2 = get_dedicated_local_web_driver(chrome_profile)
+    driver_pool = get_driver_pool()
+    driver2 = driver_pool.checkout(dedicated_kind(chrome_profile))
     _reset_to_telegram_main(driver2)
     manager = MasterProjectManager(get_mongodb_uri())
 
+    enriched_projects = []
     try:
-        enriched_projects = []
-        # for i, project in enumerate(projects[70:]):   # for testing purposes
-        for i, project in enumerate(projects):
-            print(f"Enriching project {i + 1}/{len(projects)}: {project.get('sources', 'coingecko')}")
-            enriched_project = enrich_project_with_details(driver, project)
-            enriched_project.update(enrich_telegram_data(driver2, enriched_project, chrome_profile))
-            enriched_project.update(enrich_email_data(enriched_project))
-
-            if not enriched_project.get("project_name") or not enriched_project.get("project_ticker"):
-                print(f"[ERROR] Project {project['sources']['coingecko']} not enriched...")
-                continue
-            enriched_projects.append(enriched_project)
-            project_uid = manager.upsert_project(enriched_project, "coingecko")
+        # Writes are buffered off the scraping path and flushed in bulk, also when a driver crashes
+        with BufferedProjectWriter(manager) as writer:
+            enriched_projects = enrich_projects_concurrently(
+                projects, "coingecko", enrich_project_with_details, writer, driver2, chrome_profile,
+                workers=workers, driver=driver, driver_kind=lean_kind("coingecko") if lean else HEADLESS,
+            )
+        print(f"Write buffer stats: {writer.stats()}")
+        print(f"Driver pool stats: {driver_pool.metrics()}")
     finally:
-        driver2.quit()
+        driver_pool.checkin(driver2)
 
     print(f"Successfully scraped {len(enriched_projects)} projects")
     return enriched_projects
@@ -239,25 +237,25 @@ def handle_standard_cg_table(driver, chrome_profile, projects):
 
 
 
-def scrape_cg_page(page_num: int, chrome_profile: str, links=None):
+def scrape_cg_page(page_num: int, chrome_profile: str, links=None, workers=None, lean=True):
     """Placeholder for CoinGecko scraping."""
-    driver = get_local_headless_web_driver()
-    # driver.get("https://coingecko.com")
+    # Page drivers come from the pool, so consecutive pages reuse one browser
+    with get_driver_pool().driver(lean_kind("coingecko") if lean else HEADLESS) as driver:
+        # driver.get("https://coingecko.com")
 
-    if links:
-        projects = []
-        for link in links:
-            project = {"sources": {"coingecko": link}}
-            projects.append(project)
-    else:
-        if page_num > 1:
-            driver.get("https://coingecko.com/?page=" + str(page_num) + "")
-            # go_cg_to_page(driver, page_num)
+        if links:
+            projects = []
+            for link in links:
+                project = {"sources": {"coingecko": link}}
+                projects.append(project)
         else:
-            driver.get("https://coingecko.com")
-        time.sleep(1)
-        projects = get_project_links(driver)
+            if page_num > 1:
+                driver.get("https://coingecko.com/?page=" + str(page_num) + "")
+                # go_cg_to_page(driver, page_num)
+            else:
+                driver.get("https://coingecko.com")
+            time.sleep(1)
+            projects = get_project_links(driver)
 
-    handle_standard_cg_table(driver, chrome_profile, projects)
-    driver.quit()
+        handle_standard_cg_table(driver, chrome_profile, projects, workers, lean)
     time.sleep(1)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Rewrite stored exchange slugs as exchange ids (see utils.exchange_registry).
+
+Stored exchanges lists are unions over every source, so which source listed a slug is
+lost: slugs are resolved under the document's highest-priority source, and a slug that
+another source spells differently gets an id of its own. An --aliases file maps such
+spellings onto one exchange before the rewrite:
+    {"coingecko:gate": "coinmarketcap:gate-io", ...}
+(alias -> the source:slug whose exchange it names). Documents are rewritten with the same
+_v compare-and-swap as regular writes, so the job can run next to the scrapers. Indexes,
+among them the exchanges_idx multikey index, are ensured first.
+
+Run from the repo root:
+    python -m scripts.exchange_ids_migration [--sqlite projects.sqlite3] [--split-details] [--aliases aliases.json]
+"""
+
+from __future__ import annotations
+import argparse
+import json
+from typing import Any, Dict, Optional
+
+from MasterProjectManager import MasterProjectManager
+
+BATCH_DOCS = 2000
+MAX_RETRIES = 3
+
+
+def add_aliases(manager: MasterProjectManager, path: str) -> None:
+    with open(path, encoding="utf-8") as f:
+        aliases: Dict[str, str] = json.load(f)
+    added = 0
+    for alias, target in aliases.items():
+        source, _, slug = alias.partition(":")
+        target_source, _, target_slug = target.partition(":")
+        exchange_id = manager.exchange_registry.resolve(target_source, [target_slug])[target_slug]
+        if manager.exchange_registry.add_alias(exchange_id, source, slug):
+            added += 1
+        elif manager.exchange_id(source, slug) != exchange_id:
+            print(f"[SKIP] {alias}: already names exchange {manager.exchange_id(source, slug)}")
+    print(f"[ALIASES] added={added} of {len(aliases)}")
+
+
+def converted(manager: MasterProjectManager, doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Document with its exchange slugs replaced by ids, or None when it has none left."""
+    exchanges = doc.get("exchanges")
+    if not isinstance(exchanges, list) or not any(type(itm) is str for itm in exchanges):
+        return None
+    source = manager._get_highest_priority_source(doc.get("sources") or {}) or "unknown"
+    return manager._with_exchange_ids([doc], source, keep_ids=True)[0]
+
+
+def migrate_one(manager: MasterProjectManager, doc: Dict[str, Any]) -> bool:
+    """Rewrite one document, re-reading it when a concurrent write wins."""
+    for _ in range(MAX_RETRIES):
+        updated = converted(manager, doc)
+        if updated is None:
+            return False
+        update = manager._diff_update(doc, updated)
+        if manager.store.update_if_version(doc["project_uid"], doc.get("_v"), updated, update) is not None:
+            return True
+        doc = manager.store.find_by_uid(doc["project_uid"])
+        if doc is None:
+            return False
+        manager.store.load_details([doc], ["exchanges"])
+    print(f"[ERROR] {doc.get('project_uid')}: kept changing, skipped")
+    return False
+
+
+def run(sqlite_path: Optional[str], split_details: bool, aliases_path: Optional[str]) -> None:
+    if sqlite_path:
+        from storage.sqlite_store import SQLiteProjectStore
+        manager = MasterProjectManager(store=SQLiteProjectStore(sqlite_path))
+    else:
+        from config.private import get_mongodb_uri
+        manager = MasterProjectManager(get_mongodb_uri(), split_details=split_details)
+
+    manager.store.setup_indexes()
+    if aliases_path:
+        add_aliases(manager, aliases_path)
+
+    scanned = modified = 0
+    for doc in manager.store.iter_projects(batch_size=BATCH_DOCS):
+        scanned += 1
+        modified += migrate_one(manager, doc)
+        if scanned % 10000 == 0:
+            print(f"[PROGRESS] scanned={scanned} modified={modified}")
+
+    print(f"[TOTAL] scanned={scanned} modified={modified}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sqlite", help="Migrate a SQLite store instead of MongoDB")
+    parser.add_argument("--split-details", action="store_true",
+                        help="The MongoDB store keeps exchanges in project_details")
+    parser.add_argument("--aliases", help='JSON file of {"source:slug": "source:slug"} exchange aliases')
+    args = parser.parse_args()
+    run(args.sqlite, args.split_details, args.aliases)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Backfill the normalized identity used by MasterProjectManager.find_existing_project:
+- name_key:   project_name whitespace-collapsed and casefolded.
+- ticker_key: project_ticker stripped and uppercased.
+Then merge documents that share an identity: each duplicate is merged into the oldest
+document of its identity with the regular source-priority merge and deleted (with its
+project_details). Its market snapshots stay under its own project_uid. Identities with an
+empty name are only reported. Last, the (name_key, ticker_key) compound index is (re)built
+unique, so concurrent inserts of one identity can no longer create duplicates.
+
+Run from the repo root: python -m scripts.identity_key_migration [--split-details]
+"""
+
+from __future__ import annotations
+import argparse
+from pymongo import UpdateOne, ASCENDING
+from pymongo.errors import BulkWriteError, OperationFailure
+from bson import ObjectId
+from typing import List, Dict, Any, Optional, Tuple
+
+from MasterProjectManager import MasterProjectManager
+from utils.text_utils import normalize_project_identity
+
+BATCH_DOCS = 2000
+DB_NAME = "chainreachai"
+COLL_NAME = "projects"
+INDEX_NAME = "identity_key_idx"
+MAX_RETRIES = 3
+
+def fetch_batch(coll, last_id: Optional[ObjectId], limit: int) -> List[Dict[str, Any]]:
+    q: Dict[str, Any] = {}
+    if last_id is not None:
+        q["_id"] = {"$gt": last_id}
+    return list(
+        coll.find(q, {"_id": 1, "project_name": 1, "project_ticker": 1, "name_key": 1, "ticker_key": 1})
+            .sort("_id", 1)
+            .limit(limit)
+    )
+
+def build_updates(docs: List[Dict[str, Any]]) -> Tuple[List[UpdateOne], int]:
+    ops: List[UpdateOne] = []
+    unchanged = 0
+    for d in docs:
+        name_key, ticker_key = normalize_project_identity(d.get("project_name"), d.get("project_ticker"))
+        if d.get("name_key") == name_key and d.get("ticker_key") == ticker_key:
+            unchanged += 1
+            continue
+        ops.append(UpdateOne({"_id": d["_id"]}, {"$set": {"name_key": name_key, "ticker_key": ticker_key}}))
+    return ops, unchanged
+
+def duplicate_identities(coll) -> List[Dict[str, Any]]:
+    """[{"_id": {"name_key", "ticker_key"}, "ids": [_id, ...]}] for identities held by several documents."""
+    return list(coll.aggregate([
+        {"$sort": {"_id": 1}},
+        {"$group": {"_id": {"name_key": "$name_key", "ticker_key": "$ticker_key"},
+                    "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True))
+
+
+def as_payload(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """A stored document as an upsert payload: sources back to {source: url}, no bookkeeping fields."""
+    payload = {k: v for k, v in doc.items() if k not in ("_id", "_v", "project_uid")}
+    payload["sources"] = {src: (info.get("url", "") if isinstance(info, dict) else info)
+                          for src, info in (doc.get("sources") or {}).items()}
+    return payload
+
+
+def merged_into(manager: MasterProjectManager, keeper: Dict[str, Any], duplicate: Dict[str, Any]) -> Dict[str, Any]:
+    """keeper merged with duplicate, each source keeping its most recent last_updated."""
+    source = manager._get_highest_priority_source(duplicate.get("sources") or {}) or "unknown"
+    merged = manager._merge_data_by_priority(keeper, as_payload(duplicate), source)
+    for src in (duplicate.get("sources") or {}):
+        stored = [info for info in ((keeper.get("sources") or {}).get(src), duplicate["sources"][src])
+                  if isinstance(info, dict)]
+        if stored:
+            merged["sources"][src] = max(stored, key=lambda info: info.get("last_updated") or "")
+    return merged
+
+
+def merge_group(manager: MasterProjectManager, ids: List[ObjectId]) -> int:
+    """Merge the documents `ids` (oldest first) into the first one and delete the others."""
+    store = manager.store
+    docs = store.load_details(list(store.collection.find({"_id": {"$in": ids}}).sort("_id", 1)))
+    if len(docs) < 2:
+        return 0
+    keeper_id = docs[0]["_id"]
+    for _ in range(MAX_RETRIES):
+        keeper = docs[0]
+        merged = keeper
+        for duplicate in docs[1:]:
+            merged = merged_into(manager, merged, duplicate)
+        update = manager._diff_update(keeper, merged)
+        if not update or store.update_if_version(keeper["project_uid"], keeper.get("_v"), merged, update) is not None:
+            break
+        docs[0] = store.load_details([store.collection.find_one({"_id": keeper_id})])[0]
+    else:
+        print(f"[ERROR] {docs[0].get('project_uid')}: kept changing, duplicates left in place")
+        return 0
+
+    duplicate_ids = [d["_id"] for d in docs[1:]]
+    store.collection.delete_many({"_id": {"$in": duplicate_ids}})
+    if store.split_details:
+        store.details.delete_many({"_id": {"$in": [d["project_uid"] for d in docs[1:]]}})
+    return len(duplicate_ids)
+
+
+def merge_duplicates(manager: MasterProjectManager) -> int:
+    """Merge every duplicated identity; returns the number of documents removed."""
+    removed = 0
+    for group in duplicate_identities(manager.store.collection):
+        if not group["_id"].get("name_key"):
+            print(f"[SKIP] {len(group['ids'])} documents without a name share ticker_key "
+                  f"{group['_id'].get('ticker_key')!r}, resolve them by hand")
+            continue
+        removed += merge_group(manager, group["ids"])
+    return removed
+
+
+def ensure_unique_index(coll) -> bool:
+    """Replace a non-unique identity_key_idx with the unique one."""
+    existing = coll.index_information().get(INDEX_NAME)
+    if existing is not None and not existing.get("unique"):
+        coll.drop_index(INDEX_NAME)
+    try:
+        coll.create_index([("name_key", ASCENDING), ("ticker_key", ASCENDING)], unique=True, name=INDEX_NAME)
+    except OperationFailure as e:
+        print(f"[ERROR] {INDEX_NAME} not created, identities are still duplicated: {e}")
+        return False
+    return True
+
+
+def run(split_details: bool = False, manager: Optional[MasterProjectManager] = None) -> None:
+    if manager is None:
+        from config.private import get_mongodb_uri
+        manager = MasterProjectManager(get_mongodb_uri(), database_name=DB_NAME, split_details=split_details)
+    coll = manager.store.collection
+
+    total_scanned = total_unchanged = total_modified = 0
+    last_id: Optional[ObjectId] = None
+
+    while True:
+        batch = fetch_batch(coll, last_id, BATCH_DOCS)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+        ops, unchanged = build_updates(batch)
+        total_scanned += len(batch)
+        total_unchanged += unchanged
+
+        if ops:
+            try:
+                res = coll.bulk_write(ops, ordered=False)
+                total_modified += res.modified_count
+            except BulkWriteError as e:
+                print("[ERROR] Bulk write error:", e.details)
+
+    print(f"[TOTAL] scanned={total_scanned} unchanged={total_unchanged} modified={total_modified}")
+
+    removed = merge_duplicates(manager)
+    print(f"[MERGE] duplicate documents merged and removed={removed}")
+    if removed and "ticker_counts" in coll.database.list_collection_names():
+        manager.rebuild_ticker_counts()
+    unique = ensure_unique_index(coll)
+    print(f"[INDEX] {INDEX_NAME} unique={unique}")
+
+    # Post-migration checks
+    missing = coll.count_documents({"name_key": {"$exists": False}})
+    print(f"[CHECK] documents still missing name_key: {missing}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--split-details", action="store_true",
+                        help="The store keeps about, exchanges and telegram_admins in project_details")
+    args = parser.parse_args()
+    run(args.split_details)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Backfill identity_keys, the cross-source ids MasterProjectManager.find_existing_project
+matches before name/ticker:
+- coinmarketcap:<slug> / coingecko:<id> parsed from the stored sources.*.url
+- contract:<chain>:<address> from the stored contracts ({chain: address})
+Keys are added to whatever the document already has, with the same _v compare-and-swap
+as regular writes, so the job can run next to the scrapers. Then the identity_keys_idx
+multikey index is ensured and keys shared by several projects are reported: those are
+duplicates the name/ticker identity missed, to be merged by hand.
+
+Run from the repo root: python -m scripts.identity_keys_backfill [--sqlite projects.sqlite3]
+"""
+
+from __future__ import annotations
+import argparse
+from typing import Any, Dict, List, Optional, Tuple
+
+from MasterProjectManager import MasterProjectManager
+from utils.text_utils import project_identity_keys
+
+BATCH_DOCS = 2000
+MAX_RETRIES = 3
+MAX_REPORTED = 50
+
+
+def backfilled(doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Document with its identity_keys completed, or None when nothing is missing."""
+    stored = doc.get("identity_keys") if isinstance(doc.get("identity_keys"), list) else []
+    keys = list(dict.fromkeys(stored + project_identity_keys(doc)))
+    if keys == doc.get("identity_keys") or not keys:
+        return None
+    return {**doc, "identity_keys": keys}
+
+
+def backfill_one(manager: MasterProjectManager, doc: Dict[str, Any]) -> Tuple[bool, List[str]]:
+    """
+    Write the missing keys of one document, re-reading it when a concurrent write wins.
+
+    Returns:
+        (written, identity_keys of the document afterwards)
+    """
+    for _ in range(MAX_RETRIES):
+        updated = backfilled(doc)
+        if updated is None:
+            return False, doc.get("identity_keys") or []
+        update = manager._diff_update(doc, updated)
+        if manager.store.update_if_version(doc["project_uid"], doc.get("_v"), updated, update) is not None:
+            return True, updated["identity_keys"]
+        doc = manager.store.find_by_uid(doc["project_uid"])
+        if doc is None:
+            return False, []
+    print(f"[ERROR] {doc.get('project_uid')}: kept changing, skipped")
+    return False, doc.get("identity_keys") or []
+
+
+def run(sqlite_path: Optional[str]) -> None:
+    if sqlite_path:
+        from storage.sqlite_store import SQLiteProjectStore
+        manager = MasterProjectManager(store=SQLiteProjectStore(sqlite_path))
+    else:
+        from config.private import get_mongodb_uri
+        manager = MasterProjectManager(get_mongodb_uri())
+
+    scanned = modified = 0
+    owners: Dict[str, List[str]] = {}
+    names: Dict[str, str] = {}
+    for doc in manager.store.iter_projects(batch_size=BATCH_DOCS):
+        scanned += 1
+        written, keys = backfill_one(manager, doc)
+        modified += written
+        uid = doc["project_uid"]
+        names[uid] = f"{doc.get('project_name')} ({doc.get('project_ticker')})"
+        for key in keys:
+            owners.setdefault(key, []).append(uid)
+
+    manager.store.setup_indexes()
+    print(f"[TOTAL] scanned={scanned} modified={modified}")
+
+    shared = sorted(((key, uids) for key, uids in owners.items() if len(uids) > 1),
+                    key=lambda item: (-len(item[1]), item[0]))
+    print(f"[CHECK] identity keys shared by several projects: {len(shared)}")
+    for key, uids in shared[:MAX_REPORTED]:
+        print(f"[DUPLICATE] {key}: " + ", ".join(f"{uid} {names[uid]}" for uid in uids))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sqlite", help="Backfill a SQLite store instead of MongoDB")
+    run(parser.parse_args().sqlite)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Measure what the lean headless driver (utils.web_driver lean mode) saves per source.
+
+Each URL is loaded --runs times by a full and by a lean headless Chrome, with the browser
+cache disabled, and per load the script records:
+  load      wall time of driver.get (returns after the load event)
+  dcl       DOMContentLoaded from the navigation timing
+  bytes     encodedDataLength summed over Network.loadingFinished events (performance log)
+  requests  requests sent / requests blocked by Network.setBlockedURLs
+  fields    fields the page's extract_details_from_html finds in driver.page_source, so a
+            lean mode that breaks the data shows up next to the savings
+
+Run from the repo root:
+    python -m scripts.lean_driver_benchmark [--source coingecko] [--runs 3] [--url URL ...]
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+from selenium import webdriver
+
+from scripts.page_extractor_check import PARSERS
+from utils.web_driver import apply_lean_blocking, headless_options
+
+SAMPLE_URLS: Dict[str, List[str]] = {
+    "coinmarketcap": ["https://coinmarketcap.com/", "https://coinmarketcap.com/currencies/bitcoin/"],
+    "coingecko": ["https://www.coingecko.com/", "https://www.coingecko.com/en/coins/bitcoin"],
+}
+
+
+def start_driver(lean: bool, source: str):
+    options = headless_options(lean)
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(60)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+    if lean:
+        apply_lean_blocking(driver, source)
+    return driver
+
+
+def network_totals(driver) -> Dict[str, int]:
+    """Drain the performance log and sum the network events since the previous call."""
+    totals = {"bytes": 0, "requests": 0, "blocked": 0}
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            totals["requests"] += 1
+        elif method == "Network.loadingFinished":
+            totals["bytes"] += int(params.get("encodedDataLength") or 0)
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            totals["blocked"] += 1
+    return totals
+
+
+def measure(driver, source: str, url: str) -> Dict[str, Any]:
+    driver.get("about:blank")
+    network_totals(driver)
+    start = time.perf_counter()
+    driver.get(url)
+    load = time.perf_counter() - start
+    dcl = driver.execute_script(
+        "const nav = performance.getEntriesByType('navigation')[0];"
+        "return nav ? nav.domContentLoadedEventEnd - nav.startTime : null;"
+    )
+    # Late requests (lazy images, beacons) still count against the page
+    time.sleep(2)
+    try:
+        fields = len(PARSERS[source](driver.page_source)[0])
+    except Exception as e:
+        print(f"[PARSE] {url}: {e}")
+        fields = 0
+    return {"load": load, "dcl": (dcl or 0) / 1000, **network_totals(driver), "fields": fields}
+
+
+def run(sources: List[str], urls: List[str], runs: int) -> None:
+    print(f"{'source':<14} {'mode':<5} {'load s':>7} {'dcl s':>6} {'MB':>7} {'requests':>8} {'blocked':>7} "
+          f"{'fields':>6}  url")
+    for source in sources:
+        totals: Dict[str, Dict[str, float]] = {}
+        for mode in ("full", "lean"):
+            driver = start_driver(mode == "lean", source)
+            try:
+                for url in urls or SAMPLE_URLS[source]:
+                    results = [measure(driver, source, url) for _ in range(runs)]
+                    avg = {k: sum(r[k] for r in results) / runs for k in results[0]}
+                    for k in ("load", "bytes"):
+                        totals.setdefault(mode, {}).setdefault(k, 0.0)
+                        totals[mode][k] += avg[k]
+                    print(f"{source:<14} {mode:<5} {avg['load']:>7.2f} {avg['dcl']:>6.2f} "
+                          f"{avg['bytes'] / 1e6:>7.2f} {avg['requests']:>8.0f} {avg['blocked']:>7.0f} "
+                          f"{avg['fields']:>6.0f}  {url}")
+            finally:
+                driver.quit()
+
+        full, lean = totals["full"], totals["lean"]
+        print(f"[TOTAL] {source}: load {full['load']:.2f}s -> {lean['load']:.2f}s "
+              f"({1 - lean['load'] / full['load'] if full['load'] else 0:.0%} less), "
+              f"transferred {full['bytes'] / 1e6:.2f} MB -> {lean['bytes'] / 1e6:.2f} MB "
+              f"({1 - lean['bytes'] / full['bytes'] if full['bytes'] else 0:.0%} less)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", choices=sorted(SAMPLE_URLS), help="Only this source (default: both)")
+    parser.add_argument("--url", nargs="+", default=[], help="Pages to load instead of the samples")
+    parser.add_argument("--runs", type=int, default=3, help="Loads per URL and mode")
+    args = parser.parse_args()
+    run([args.source] if args.source else sorted(SAMPLE_URLS), args.url, args.runs)
@@ -1,14 +1,15 @@
 from __future__ import annotations
-from pymongo import MongoClient, UpdateOne
+from pymongo import UpdateOne
 from pymongo.errors import BulkWriteError
 from bson import ObjectId
 from typing import Iterable, Optional, List, Dict, Any, Tuple
 
 from config.private import get_mongodb_uri
+from utils.mongo_client import get_mongo_client
 from utils.text_utils import parse_dollar_amount
 
 # connect
-client = MongoClient(get_mongodb_uri())
+client = get_mongo_client(get_mongodb_uri())
 db = client["chainreachai"]
 projects = db["projects"]
 
@@ -39,7 +40,7 @@ def build_updates(docs: Iterable[Dict[str, Any]]) -> Tuple[List[UpdateOne], int,
     return ops, parsed, skipped, unset
 
 def run(batch_size_docs: int = 2000) -> None:
-    client = MongoClient(get_mongodb_uri())
+    client = get_mongo_client(get_mongodb_uri())
     coll = client["chainreachai"]["projects"]
 
     total_scanned = total_modified = total_parsed = total_skipped = total_unset = 0
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for MasterProjectManager._merge_data_by_priority.
+
+Compares the copy-free merge engine against the previous deepcopy-based one on
+realistic documents (4.5 KB about, 100+ exchange slugs, telegram admins) and checks
+that both produce identical output.
+Reports time per merge, tracemalloc peak and memory blocks retained by each result,
+then times _merge_lists alone on 500-element exchange lists and on telegram admin lists
+against the json.dumps-per-item de-duplication.
+
+Run from the repo root: python -m scripts.merge_benchmark
+"""
+
+from __future__ import annotations
+import random
+import time
+import tracemalloc
+from copy import deepcopy
+from datetime import datetime
+from typing import Any, Dict, List, Set, Tuple
+
+from MasterProjectManager import MasterProjectManager
+from storage.sqlite_store import SQLiteProjectStore
+
+N_DOCS = 200
+ROUNDS = 5
+SEED = 7
+LIST_LEN = 500
+LIST_ROUNDS = 200
+
+
+class LegacyMergeManager(MasterProjectManager):
+    """Previous deepcopy-based merge, kept here as the benchmark baseline."""
+
+    def _merge_lists(self, a: List[Any], b: List[Any], prefer_b: bool) -> List[Any]:
+        base = b[:] + a[:] if prefer_b else a[:] + b[:]
+        out, seen = [], set()
+        for itm in base:
+            sig = self._signature(itm)
+            if sig not in seen:
+                seen.add(sig)
+                out.append(itm)
+        return out
+
+    def _deep_merge(self, a: Any, b: Any, prefer_b: bool, protected_keys: Set[str],
+                    path: Tuple[str, ...] = ()) -> Any:
+        if type(a) is not type(b):
+            return b if (prefer_b and not self._is_empty(b)) or self._is_empty(a) else a
+        if isinstance(a, dict):
+            result = deepcopy(a)
+            for k, v_b in b.items():
+                if k == "sources":
+                    continue
+                v_a = result.get(k, None)
+                if len(path) == 0 and k in protected_keys:
+                    if self._is_empty(v_a) and not self._is_empty(v_b):
+                        result[k] = deepcopy(v_b)
+                    continue
+                if v_a is None:
+                    if not self._is_empty(v_b):
+                        result[k] = deepcopy(v_b)
+                    continue
+                if isinstance(v_a, dict) and isinstance(v_b, dict):
+                    result[k] = self._deep_merge(v_a, v_b, prefer_b, protected_keys, path + (k,))
+                elif isinstance(v_a, list) and isinstance(v_b, list):
+                    result[k] = self._merge_lists(v_a, v_b, prefer_b)
+                else:
+                    if self._is_empty(v_a) and not self._is_empty(v_b):
+                        result[k] = deepcopy(v_b)
+                    elif not self._is_empty(v_b) and prefer_b:
+                        result[k] = deepcopy(v_b)
+            return result
+        if isinstance(a, list):
+            return self._merge_lists(a, b, prefer_b)
+        if self._is_empty(a) and not self._is_empty(b):
+            return b
+        return b if (prefer_b and not self._is_empty(b)) else a
+
+    def _merge_data_by_priority(self, existing_data: Dict, new_data: Dict, new_source: str) -> Dict:
+        merged_data = deepcopy(existing_data) if existing_data else {}
+        merged_data.setdefault("sources", {})
+        now_str = datetime.now().strftime('%Y-%m-%d')
+        new_sources_raw = new_data.get("sources", {}) or {}
+        merged_data["sources"][new_source] = {"url": new_sources_raw.get(new_source, ""), "last_updated": now_str}
+        for src, url in new_sources_raw.items():
+            if src == new_source:
+                continue
+            merged_data["sources"][src] = {"url": url, "last_updated": now_str}
+        protected = {"project_uid", "project_name", "project_ticker", "created_at", "identity_keys",
+                     "source_keys", "source_last_updated"}
+        if not existing_data:
+            tmp = deepcopy(new_data)
+            tmp.pop("sources", None)
+            merged_data.update(self._deep_merge({}, tmp, True, protected))
+            self._with_source_identity_keys(merged_data, new_data)
+            self._with_source_keys(merged_data)
+            return self._with_identity_keys(merged_data)
+        current_highest_source = self._get_highest_priority_source(merged_data.get("sources", {}))
+        prefer_new = (self._get_source_priority_index(new_source)
+                      <= self._get_source_priority_index(current_highest_source))
+        existing_payload = deepcopy(existing_data)
+        existing_payload.pop("sources", None)
+        incoming_payload = deepcopy(new_data)
+        incoming_payload.pop("sources", None)
+        for k, v in self._deep_merge(existing_payload, incoming_payload, prefer_new, protected).items():
+            merged_data[k] = v
+        self._with_source_identity_keys(merged_data, new_data)
+        self._with_source_keys(merged_data)
+        return self._with_identity_keys(merged_data)
+
+
+def _slug(rng: random.Random) -> str:
+    return "-".join(rng.choice(["uniswap", "pancakeswap", "raydium", "mexc", "gate", "bitget", "orca", "dodo"])
+                    for _ in range(2)) + f"-v{rng.randint(1, 4)}"
+
+
+def make_pair(rng: random.Random, i: int) -> Tuple[Dict[str, Any], Dict[str, Any], str]:
+    """Build (stored document, incoming payload, incoming source) for one project."""
+    name = f"Project {i}"
+    existing = {
+        "project_name": name,
+        "project_ticker": f"TK{i}",
+        "project_uid": f"uid-{i}",
+        "created_at": "2025-01-01 00:00:00",
+        "sources": {"coinmarketcap": {"url": f"https://coinmarketcap.com/currencies/project-{i}/",
+                                      "last_updated": "2025-01-01"}},
+        "category": sorted({rng.choice(["Memes", "Defi", "Gaming", "Ai", "Rwa", "Layer 1"]) for _ in range(4)}),
+        "network": ["Ethereum", "Bnb Chain"],
+        "exchanges": sorted({_slug(rng) for _ in range(130)}),
+        "socials": {"website": f"https://project{i}.io", "telegram_link": f"https://t.me/project{i}",
+                    "twitter_link": f"https://x.com/project{i}"},
+        "market_cap": rng.uniform(1e5, 1e9),
+        "about": ("lorem ipsum dolor sit amet " * 200)[:4500],
+        "telegram_admins": [{"first_name": f"admin{j}", "status": "admin", "username": f"adm_{i}_{j}"}
+                            for j in range(12)],
+    }
+    incoming = {
+        "project_name": name,
+        "project_ticker": f"TK{i}",
+        "sources": {"coingecko": f"https://www.coingecko.com/en/coins/project-{i}"},
+        "category": sorted({rng.choice(["Memes", "Defi", "Gaming", "Ai", "Rwa", "Layer 1"]) for _ in range(4)}),
+        "exchanges": sorted({_slug(rng) for _ in range(110)}),
+        "socials": {"website": f"https://project{i}.io", "discord_link": f"https://discord.gg/p{i}"},
+        "market_cap": rng.uniform(1e5, 1e9),
+        "about": ("lorem ipsum dolor sit amet " * 200)[:4500],
+        "telegram_admins": [{"first_name": f"admin{j}", "status": "admin", "username": f"adm_{i}_{j}"}
+                            for j in range(8, 16)],
+    }
+    return existing, incoming, rng.choice(["coingecko", "dextools"])
+
+
+def bench(manager: MasterProjectManager, pairs) -> Tuple[float, float, float]:
+    """Return (microseconds per merge, peak KiB per merge, memory blocks retained by the result)."""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for existing, incoming, source in pairs:
+            manager._merge_data_by_priority(existing, incoming, source)
+    per_merge_us = (time.perf_counter() - start) / (ROUNDS * len(pairs)) * 1e6
+
+    peaks, blocks = [], 0
+    tracemalloc.start()
+    for existing, incoming, source in pairs:
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        base_current, _ = tracemalloc.get_traced_memory()
+        merged = manager._merge_data_by_priority(existing, incoming, source)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        peaks.append(peak - base_current)
+        blocks += sum(stat.count_diff for stat in after.compare_to(before, "lineno") if stat.count_diff > 0)
+        del merged
+    tracemalloc.stop()
+    return per_merge_us, sum(peaks) / len(peaks) / 1024, blocks / len(pairs)
+
+
+def bench_lists(current: MasterProjectManager, legacy: LegacyMergeManager) -> None:
+    """_merge_lists alone: 500 exchange slugs per side with ~70% overlap, and 40 admins per side."""
+    rng = random.Random(SEED)
+    pool = sorted({_slug(rng) + f"-{n}" for n in range(LIST_LEN * 2)})
+    # Fresh string objects per list, as they come out of two different scrapes
+    stored_ex = ["".join(x) for x in rng.sample(pool, LIST_LEN)]
+    incoming_ex = ["".join(x) for x in rng.sample(stored_ex, int(LIST_LEN * 0.7))]
+    incoming_ex += ["".join(x) for x in rng.sample(pool, LIST_LEN - len(incoming_ex))]
+    stored_adm = [{"first_name": f"admin{j}", "status": "admin", "username": f"adm_{j}"} for j in range(40)]
+    incoming_adm = [{"username": f"adm_{j}", "status": "admin", "first_name": f"admin{j}"} for j in range(20, 60)]
+
+    for label, a, b, field in (("exchanges x500", stored_ex, incoming_ex, "exchanges"),
+                               ("telegram_admins x40", stored_adm, incoming_adm, "telegram_admins")):
+        for prefer_b in (False, True):
+            new = current._merge_lists(a, b, prefer_b, field)
+            old = legacy._merge_lists(a, b, prefer_b)
+            timings = []
+            for merge in (lambda: legacy._merge_lists(a, b, prefer_b),
+                          lambda: current._merge_lists(a, b, prefer_b, field)):
+                start = time.perf_counter()
+                for _ in range(LIST_ROUNDS):
+                    merge()
+                timings.append((time.perf_counter() - start) / LIST_ROUNDS * 1e6)
+            print(f"[LISTS {label} prefer_b={prefer_b}] json.dumps={timings[0]:.1f} us  "
+                  f"current={timings[1]:.1f} us  ({timings[0] / timings[1]:.1f}x)  "
+                  f"len {len(old)} -> {len(new)}")
+
+
+def run() -> None:
+    rng = random.Random(SEED)
+    pairs = [make_pair(rng, i) for i in range(N_DOCS)]
+
+    # Merging never touches the store; an in-memory one keeps the benchmark server-free
+    current = MasterProjectManager(store=SQLiteProjectStore(":memory:"))
+    legacy = LegacyMergeManager(store=SQLiteProjectStore(":memory:"))
+
+    mismatches = sum(
+        1 for existing, incoming, source in pairs
+        if current._merge_data_by_priority(existing, incoming, source)
+        != legacy._merge_data_by_priority(existing, incoming, source)
+    )
+    print(f"[PARITY] {len(pairs)} documents, mismatches={mismatches}")
+
+    for label, manager in (("deepcopy (legacy)", legacy), ("copy-free", current)):
+        us, peak_kib, blocks = bench(manager, pairs)
+        print(f"[{label}] {us:.1f} us/merge  peak={peak_kib:.1f} KiB/merge  retained_blocks={blocks:.0f}/merge")
+
+    bench_lists(current, legacy)
+
+
+if __name__ == "__main__":
+    run()
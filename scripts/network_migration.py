@@ -9,13 +9,14 @@ Normalize and migrate:
 """
 
 from __future__ import annotations
-from pymongo import MongoClient, UpdateOne
+from pymongo import UpdateOne
 from pymongo.errors import BulkWriteError
 from bson import ObjectId
 from typing import List, Dict, Any, Optional, Tuple
 import re
 
 from config.private import get_mongodb_uri
+from utils.mongo_client import get_mongo_client
 
 BATCH_DOCS = 2000
 DB_NAME = "chainreachai"
@@ -142,7 +143,7 @@ def build_updates(docs: List[Dict[str, Any]]) -> Tuple[List[UpdateOne], Dict[str
     return ops, stats
 
 def run() -> None:
-    client = MongoClient(get_mongodb_uri())
+    client = get_mongo_client(get_mongodb_uri())
     coll = client[DB_NAME][COLL_NAME]
 
     totals = {"scanned": 0, "updated": 0, "moved_items": 0, "no_category": 0, "no_moves": 0}
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Check the HTTP coin page extractors (extract_details_from_html of scrapers.cmc.data_extractor
+and scrapers.coingecko.cg_data_extractor) against saved coin pages.
+
+  --save URL ...   fetch coin pages into the fixture directory, <site>/<slug>.html each
+  (default)        parse every <slug>.html of --site there and report, per page, the fields
+                   found, those left to the Selenium fallback and the parse time
+
+With --expect, a JSON file of {"<slug>": {field: value}} (e.g. written by hand from a
+browser session) is compared field by field and mismatches are reported. Fixtures are kept
+out of the repo; save fresh ones when CMC changes its page layout.
+
+Run from the repo root:
+    python -m scripts.page_extractor_check --save https://coinmarketcap.com/currencies/bitcoin/
+    python -m scripts.page_extractor_check [--site coingecko] [--dir coin_pages] [--expect expected.json]
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from scrapers.cmc import data_extractor as cmc
+from scrapers.coingecko import cg_data_extractor as cg
+from utils.http_client import fetch_html
+from utils.text_utils import source_identity_keys
+
+DEFAULT_DIR = "coin_pages"
+FIELDS = ("project_name", "project_ticker", "market_cap", "fdv", "about", "important_note",
+          "socials", "category", "network", "contracts")
+
+
+def _parse_cmc(html: str) -> Tuple[Dict[str, Any], List[str]]:
+    fields, has_page_data = cmc.extract_details_from_html(html)
+    missing = [f for f in cmc.SELENIUM_FALLBACK_FIELDS if f not in fields] if not has_page_data else []
+    return fields, missing
+
+
+# site -> parser returning (fields, fields left to the Selenium fallback)
+PARSERS: Dict[str, Callable[[str], Tuple[Dict[str, Any], List[str]]]] = {
+    "coinmarketcap": _parse_cmc,
+    "coingecko": cg.extract_details_from_html,
+}
+
+
+def save(urls: List[str], directory: str) -> None:
+    os.makedirs(directory, exist_ok=True)
+    for url in urls:
+        keys = source_identity_keys({"coinmarketcap": url})
+        if not keys:
+            print(f"[SKIP] {url}: not a coin page URL")
+            continue
+        html = fetch_html(url)
+        if html is None:
+            continue
+        site, slug = keys[0].split(":", 1)
+        os.makedirs(os.path.join(directory, site), exist_ok=True)
+        path = os.path.join(directory, site, f"{slug}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        print(f"[SAVED] {path} ({len(html) / 1024:.0f} KiB)")
+
+
+def check(site: str, directory: str, expect_path: Optional[str]) -> None:
+    expected: Dict[str, Dict[str, Any]] = {}
+    if expect_path:
+        with open(expect_path, encoding="utf-8") as f:
+            expected = json.load(f)
+
+    directory = os.path.join(directory, site)
+    parse = PARSERS[site]
+    pages = sorted(name for name in os.listdir(directory) if name.endswith(".html"))
+    fallbacks = mismatches = 0
+    timings: List[float] = []
+    for name in pages:
+        slug = name[:-len(".html")]
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            html = f.read()
+        start = time.perf_counter()
+        fields, fallback = parse(html)
+        timings.append((time.perf_counter() - start) * 1000)
+        fallbacks += bool(fallback)
+
+        missing = [field for field in FIELDS if field not in fields]
+        print(f"[PAGE] {slug}: {len(fields)} fields, missing={missing}, selenium_fallback={fallback} "
+              f"({timings[-1]:.0f} ms)")
+        for field, value in (expected.get(slug) or {}).items():
+            if fields.get(field) != value:
+                mismatches += 1
+                print(f"[MISMATCH] {slug}.{field}: expected {value!r}, got {fields.get(field)!r}")
+
+    if timings:
+        timings.sort()
+        print(f"[TOTAL] pages={len(pages)} selenium_fallbacks={fallbacks} mismatches={mismatches} "
+              f"parse p50={timings[len(timings) // 2]:.0f} ms max={timings[-1]:.0f} ms")
+    else:
+        print(f"[TOTAL] no .html pages in {directory}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--site", choices=sorted(PARSERS), default="coinmarketcap", help="Pages to check")
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="Fixture directory (one subdirectory per site)")
+    parser.add_argument("--save", nargs="+", metavar="URL", help="Fetch coin pages into --dir")
+    parser.add_argument("--expect", help='JSON file of {"<slug>": {field: expected value}}')
+    args = parser.parse_args()
+    if args.save:
+        save(args.save, args.dir)
+    else:
+        check(args.site, args.dir, args.expect)
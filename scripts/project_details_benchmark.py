@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the split_details layout (storage.mongo_store.DETAIL_FIELDS in project_details).
+
+Loads the same synthetic projects (about up to ~4.5 KB, 80-150 exchange slugs, telegram
+admins) into two scratch databases, one per layout, and reports:
+  - working set: data and index size of projects and project_details (collStats; the BSON
+    size of the stored documents when the server does not answer collStats)
+  - lookup latency (p50/p99) of find_existing_project, the read every upsert starts with,
+    and of get_project_by_uid, which assembles the full view
+  - latency of a refresh upsert (market_cap and socials only) and of one carrying exchanges
+and checks that both layouts return identical full views. The scratch databases are dropped
+afterwards.
+
+Needs a MongoDB server.
+Run from the repo root: python -m scripts.project_details_benchmark [--projects 100000]
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+import bson
+from pymongo.errors import OperationFailure
+
+from MasterProjectManager import MasterProjectManager
+from config.private import get_mongodb_uri
+from scripts.project_record_benchmark import make_payload
+from utils.mongo_client import get_mongo_client
+
+N_PROJECTS = 100_000
+N_LOOKUPS = 5000
+N_UPSERTS = 1000
+LOAD_BATCH = 1000
+SEED = 11
+DB_NAMES = {"single": "chainreachai_details_bench_single", "split": "chainreachai_details_bench_split"}
+
+ABOUT_WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor".split()
+
+
+def make_project(rng: random.Random, i: int) -> Dict[str, Any]:
+    payload = make_payload(rng, i, "coinmarketcap")
+    payload["about"] = " ".join(rng.choice(ABOUT_WORDS) for _ in range(rng.randint(30, 750)))[:4500]
+    return payload
+
+
+def load(manager: MasterProjectManager, projects: List[Dict[str, Any]]) -> None:
+    """Insert first-write documents straight through the store, LOAD_BATCH at a time."""
+    for start in range(0, len(projects), LOAD_BATCH):
+        ops = [{"op": "insert", "doc": manager._build_new_project(p, p["project_ticker"])}
+               for p in projects[start:start + LOAD_BATCH]]
+        outcome = manager.store.bulk_write(ops)
+        if outcome["failed"]:
+            raise RuntimeError(f"load failed: {next(iter(outcome['failed'].values()))}")
+
+
+def collection_size(db, name: str) -> Dict[str, float]:
+    """MiB of data and indexes; falls back to summing document BSON sizes."""
+    try:
+        stats = db.command({"collStats": name})
+        return {"data": stats["size"] / 2 ** 20, "indexes": stats["totalIndexSize"] / 2 ** 20}
+    except (OperationFailure, NotImplementedError):
+        data = sum(len(bson.encode(doc)) for doc in db[name].find())
+        return {"data": data / 2 ** 20, "indexes": float("nan")}
+
+
+def latencies_us(calls: List[Callable[[], Any]]) -> Dict[str, float]:
+    samples = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {"p50": samples[len(samples) // 2], "p99": samples[int(len(samples) * 0.99)]}
+
+
+def run(n_projects: int) -> None:
+    rng = random.Random(SEED)
+    projects = [make_project(rng, i) for i in range(n_projects)]
+    sample = random.Random(SEED + 1).sample(range(n_projects), min(N_LOOKUPS, n_projects))
+    refreshes = sample[:N_UPSERTS]
+
+    client = get_mongo_client(get_mongodb_uri())
+    views: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    try:
+        for layout, db_name in DB_NAMES.items():
+            client.drop_database(db_name)
+            db = client[db_name]
+            manager = MasterProjectManager(db=db, identity_cache_size=0, split_details=layout == "split")
+            manager.store.setup_indexes()
+
+            start = time.perf_counter()
+            load(manager, projects)
+            print(f"[LOAD {layout}] {n_projects} projects in {time.perf_counter() - start:.1f}s")
+
+            hot = collection_size(db, "projects")
+            cold = collection_size(db, "project_details")
+            print(f"[WORKING SET {layout}] projects data={hot['data']:.1f} MiB indexes={hot['indexes']:.1f} MiB  "
+                  f"project_details data={cold['data']:.1f} MiB")
+
+            lookup = latencies_us([
+                lambda p=projects[i]: manager.find_existing_project(p["project_name"], p["project_ticker"])
+                for i in sample
+            ])
+            uids = [manager.find_existing_project(projects[i]["project_name"], projects[i]["project_ticker"])
+                    ["project_uid"] for i in sample]
+            full = latencies_us([lambda uid=uid: manager.get_project_by_uid(uid) for uid in uids])
+            print(f"[LOOKUP {layout}] find_existing_project p50={lookup['p50']:.0f} us p99={lookup['p99']:.0f} us  "
+                  f"get_project_by_uid p50={full['p50']:.0f} us p99={full['p99']:.0f} us")
+
+            refresh = latencies_us([
+                lambda p=projects[i]: manager._upsert_with_retries(
+                    {"project_name": p["project_name"], "project_ticker": p["project_ticker"],
+                     "market_cap": p["market_cap"] * 1.1, "socials": {"website": f"https://{i}.example"}},
+                    "coinmarketcap")
+                for i in refreshes
+            ])
+            listing = latencies_us([
+                lambda p=projects[i]: manager._upsert_with_retries(
+                    {"project_name": p["project_name"], "project_ticker": p["project_ticker"],
+                     "exchanges": p["exchanges"] + ["bench-new-exchange"]}, "coingecko")
+                for i in refreshes
+            ])
+            print(f"[UPSERT {layout}] refresh p50={refresh['p50']:.0f} us p99={refresh['p99']:.0f} us  "
+                  f"with exchanges p50={listing['p50']:.0f} us p99={listing['p99']:.0f} us")
+
+            views[layout] = {
+                doc["name_key"]: {k: v for k, v in doc.items() if k not in ("_id", "project_uid", "created_at")}
+                for doc in (manager.get_project_by_uid(uid) for uid in uids)
+            }
+    finally:
+        for db_name in DB_NAMES.values():
+            client.drop_database(db_name)
+
+    mismatches = sum(1 for key, doc in views["single"].items() if views["split"].get(key) != doc)
+    print(f"[PARITY] {len(views['single'])} full views compared, mismatches={mismatches}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=N_PROJECTS, help="Synthetic projects per layout")
+    run(parser.parse_args().projects)
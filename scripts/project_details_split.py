@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Move the large, rarely read fields (storage.mongo_store.DETAIL_FIELDS: about, exchanges,
+telegram_admins) of existing projects into the project_details collection, keyed by
+project_uid, for MasterProjectManager(split_details=True). --inline moves them back for
+running without split_details again.
+
+Stop the writers first and restart them with the new setting afterwards: a writer still on
+the old layout would keep writing the fields where the other layout no longer reads them.
+Details already in project_details are kept over the copies found in projects.
+
+Run from the repo root: python -m scripts.project_details_split [--inline]
+"""
+
+from __future__ import annotations
+import argparse
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from config.private import get_mongodb_uri
+from storage.mongo_store import DETAIL_FIELDS
+from utils.mongo_client import get_mongo_client
+
+BATCH_DOCS = 1000
+DB_NAME = "chainreachai"
+
+def fetch_batch(coll, query: Dict[str, Any], projection: Dict[str, Any], last_id: Any,
+                limit: int) -> List[Dict[str, Any]]:
+    q: Dict[str, Any] = dict(query)
+    if last_id is not None:
+        q["_id"] = {"$gt": last_id}
+    return list(coll.find(q, projection).sort("_id", 1).limit(limit))
+
+def build_split_updates(docs: List[Dict[str, Any]]) -> Tuple[List[UpdateOne], List[UpdateOne]]:
+    """(project_details upserts, $unset of the moved fields conditioned on the _v they were read at)."""
+    detail_ops: List[UpdateOne] = []
+    project_ops: List[UpdateOne] = []
+    for d in docs:
+        fields = {f: d[f] for f in DETAIL_FIELDS if f in d}
+        detail_ops.append(UpdateOne(
+            {"_id": d["project_uid"]},
+            [{"$set": {f: {"$ifNull": [f"${f}", {"$literal": v}]} for f, v in fields.items()}}],
+            upsert=True,
+        ))
+        project_ops.append(UpdateOne({"_id": d["_id"], "_v": d.get("_v")}, {"$unset": {f: "" for f in fields}}))
+    return detail_ops, project_ops
+
+def bulk(coll, ops: List[UpdateOne]) -> Tuple[int, Set[int]]:
+    """(modified count, indexes of the ops that failed)."""
+    if not ops:
+        return 0, set()
+    try:
+        return coll.bulk_write(ops, ordered=False).modified_count, set()
+    except BulkWriteError as e:
+        print("[ERROR] Bulk write error:", e.details)
+        return e.details.get("nModified", 0), {err["index"] for err in e.details.get("writeErrors", [])}
+
+def split(db) -> None:
+    projects, details = db["projects"], db["project_details"]
+    query = {"$or": [{f: {"$exists": True}} for f in DETAIL_FIELDS]}
+    projection = {"_id": 1, "_v": 1, "project_uid": 1, **{f: 1 for f in DETAIL_FIELDS}}
+
+    total_scanned = total_moved = 0
+    last_id: Optional[ObjectId] = None
+    while True:
+        batch = fetch_batch(projects, query, projection, last_id, BATCH_DOCS)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+        detail_ops, project_ops = build_split_updates(batch)
+        total_scanned += len(batch)
+        _, failed = bulk(details, detail_ops)
+        moved, _ = bulk(projects, [op for i, op in enumerate(project_ops) if i not in failed])
+        total_moved += moved
+
+    print(f"[TOTAL] scanned={total_scanned} moved={total_moved}")
+
+    # Post-migration checks: documents written in between keep their copies until the next run
+    remaining = projects.count_documents(query)
+    print(f"[CHECK] projects still holding detail fields: {remaining}")
+
+def inline(db) -> None:
+    projects, details = db["projects"], db["project_details"]
+
+    total_scanned = total_inlined = 0
+    last_id: Optional[str] = None
+    while True:
+        batch = fetch_batch(details, {}, {}, last_id, BATCH_DOCS)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+        moving = [d for d in batch if any(f in d for f in DETAIL_FIELDS)]
+        ops = [UpdateOne({"project_uid": d["_id"]}, {"$set": {f: d[f] for f in DETAIL_FIELDS if f in d}})
+               for d in moving]
+        total_scanned += len(batch)
+        inlined, failed = bulk(projects, ops)
+        total_inlined += inlined
+        failed_uids = {moving[i]["_id"] for i in failed}
+        details.delete_many({"_id": {"$in": [d["_id"] for d in batch if d["_id"] not in failed_uids]}})
+
+    print(f"[TOTAL] scanned={total_scanned} inlined={total_inlined}")
+    print(f"[CHECK] project_details documents left: {details.count_documents({})}")
+
+def run(to_inline: bool) -> None:
+    client = get_mongo_client(get_mongodb_uri())
+    db = client[DB_NAME]
+    if to_inline:
+        inline(db)
+    else:
+        split(db)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inline", action="store_true", help="Move project_details back into projects")
+    run(parser.parse_args().inline)
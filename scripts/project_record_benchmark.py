@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the slotted ProjectRecord against plain project dicts.
+
+Builds 10k scraper-shaped projects (socials, 80-150 exchange slugs, telegram admins) and
+reports:
+  - memory retained per 10k in-flight projects, as dicts and as records
+  - from_dict / to_dict cost per project
+  - bulk_upsert_projects throughput (insert pass, then a merge pass from a second source)
+    for dict payloads and for records converted at the DB boundary, on an in-memory store
+and checks that both representations end up storing identical documents.
+
+Run from the repo root: python -m scripts.project_record_benchmark
+"""
+
+from __future__ import annotations
+import gc
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from MasterProjectManager import MasterProjectManager
+from ProjectRecord import ProjectRecord
+from storage.sqlite_store import SQLiteProjectStore
+
+N_PROJECTS = 10_000
+BATCH = 100
+SEED = 11
+
+EXCHANGES = ["uniswap", "pancakeswap", "raydium", "mexc", "gate", "bitget", "orca", "dodo", "kucoin", "htx"]
+CATEGORIES = ["Memes", "Defi", "Gaming", "Ai", "Rwa", "Layer 1", "Solana Ecosystem"]
+NETWORKS = ["Ethereum", "Bnb Chain", "Solana", "Base", "Arbitrum"]
+
+
+def make_payload(rng: random.Random, i: int, source: str) -> Dict[str, Any]:
+    """One scraped project; every string is a fresh object, as it is when parsed from a page."""
+    slugs = {"-".join([rng.choice(EXCHANGES), rng.choice(EXCHANGES)]) + f"-v{rng.randint(1, 4)}"
+             for _ in range(rng.randint(80, 150))}
+    return {
+        "project_name": f"Project {i}",
+        "project_ticker": f"TK{i}",
+        "sources": {source: f"https://example.com/{source}/project-{i}"},
+        "socials": {"website": f"https://project{i}.io", "telegram_link": f"https://t.me/project{i}",
+                    "twitter_link": f"https://x.com/project{i}"},
+        "exchanges": sorted(slugs),
+        "market_cap": rng.uniform(1e5, 1e9),
+        "about": f"Project {i} " + "lorem ipsum dolor sit amet " * rng.randint(5, 40),
+        "category": sorted({"".join(rng.choice(CATEGORIES)) for _ in range(3)}),
+        "network": sorted({"".join(rng.choice(NETWORKS)) for _ in range(2)}),
+        "telegram_admins": [{"first_name": f"admin{j}", "status": "".join(rng.choice(["admin", "owner"])),
+                             "username": f"adm_{i}_{j}"} for j in range(rng.randint(2, 10))],
+    }
+
+
+def retained_kib(build: Callable[[], List[Any]]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    items = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return current / 1024
+
+
+def upsert_rate(payloads: List[Any], source: str, manager: MasterProjectManager) -> float:
+    """Projects per second through bulk_upsert_projects in BATCH-sized calls."""
+    start = time.perf_counter()
+    for i in range(0, len(payloads), BATCH):
+        manager.bulk_upsert_projects(payloads[i:i + BATCH], source)
+    return len(payloads) / (time.perf_counter() - start)
+
+
+def stored(manager: MasterProjectManager) -> Dict[str, Dict[str, Any]]:
+    skip = {"_id", "project_uid", "created_at"}
+    return {doc["name_key"]: {k: v for k, v in doc.items() if k not in skip}
+            for doc in manager.store.iter_projects()}
+
+
+def run() -> None:
+    def dicts(source: str) -> List[Dict[str, Any]]:
+        rng = random.Random(SEED)
+        return [make_payload(rng, i, source) for i in range(N_PROJECTS)]
+
+    def records(source: str) -> List[ProjectRecord]:
+        rng = random.Random(SEED)
+        return [ProjectRecord.from_dict(make_payload(rng, i, source)) for i in range(N_PROJECTS)]
+
+    dict_kib = retained_kib(lambda: dicts("coinmarketcap"))
+    record_kib = retained_kib(lambda: records("coinmarketcap"))
+    print(f"[MEMORY] per {N_PROJECTS} projects: dicts={dict_kib / 1024:.1f} MiB  "
+          f"records={record_kib / 1024:.1f} MiB  ({100 * (1 - record_kib / dict_kib):.0f}% less)")
+
+    payloads = dicts("coinmarketcap")
+    start = time.perf_counter()
+    recs = [ProjectRecord.from_dict(p) for p in payloads]
+    from_us = (time.perf_counter() - start) / N_PROJECTS * 1e6
+    start = time.perf_counter()
+    for rec in recs:
+        rec.to_dict()
+    to_us = (time.perf_counter() - start) / N_PROJECTS * 1e6
+    print(f"[CONVERT] from_dict={from_us:.1f} us/project  to_dict={to_us:.1f} us/project")
+
+    managers = {}
+    for label, build in (("dicts", dicts), ("records", records)):
+        manager = MasterProjectManager(store=SQLiteProjectStore(":memory:"))
+        first, second = build("coinmarketcap"), build("coingecko")
+        inserts = upsert_rate(first, "coinmarketcap", manager)
+        merges = upsert_rate(second, "coingecko", manager)
+        print(f"[UPSERT {label}] insert={inserts:.0f} projects/s  merge={merges:.0f} projects/s")
+        managers[label] = manager
+
+    # last_updated dates come from the clock, so both runs must agree on the day
+    dict_docs, record_docs = stored(managers["dicts"]), stored(managers["records"])
+    mismatches = sum(1 for key, doc in dict_docs.items() if record_docs.get(key) != doc)
+    print(f"[PARITY] {len(dict_docs)} stored documents, mismatches={mismatches}")
+
+
+if __name__ == "__main__":
+    run()
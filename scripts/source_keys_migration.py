@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Backfill the indexed copies of `sources` that MasterProjectManager now writes with every merge:
+- source_keys:         source names, in sources order
+- source_last_updated: [{"source", "last_updated"}] pairs
+Then ensure source_keys_idx (source_keys, _id) and source_last_updated_idx
+(source_last_updated.source, source_last_updated.last_updated), so source filters and
+"stale since" queries are index range scans, and drop the old sources_idx, which indexed
+the whole sources subdocument and served neither.
+
+Updates are conditioned on the document's _v: a document written in between already got
+both fields from the writer, so a lost race needs no retry.
+
+Run from the repo root: python -m scripts.source_keys_migration
+"""
+
+from __future__ import annotations
+from pymongo import UpdateOne, ASCENDING
+from pymongo.errors import BulkWriteError, OperationFailure
+from bson import ObjectId
+from typing import List, Dict, Any, Optional, Tuple
+
+from MasterProjectManager import MasterProjectManager
+from config.private import get_mongodb_uri
+from utils.mongo_client import get_mongo_client
+
+BATCH_DOCS = 2000
+DB_NAME = "chainreachai"
+COLL_NAME = "projects"
+
+def fetch_batch(coll, last_id: Optional[ObjectId], limit: int) -> List[Dict[str, Any]]:
+    q: Dict[str, Any] = {}
+    if last_id is not None:
+        q["_id"] = {"$gt": last_id}
+    return list(
+        coll.find(q, {"_id": 1, "_v": 1, "sources": 1, "source_keys": 1, "source_last_updated": 1})
+            .sort("_id", 1)
+            .limit(limit)
+    )
+
+def build_updates(docs: List[Dict[str, Any]]) -> Tuple[List[UpdateOne], int]:
+    ops: List[UpdateOne] = []
+    unchanged = 0
+    for d in docs:
+        derived = MasterProjectManager._with_source_keys({"sources": d.get("sources")})
+        fields = {k: derived[k] for k in ("source_keys", "source_last_updated") if k in derived}
+        if not fields or all(d.get(k) == v for k, v in fields.items()):
+            unchanged += 1
+            continue
+        ops.append(UpdateOne({"_id": d["_id"], "_v": d.get("_v")}, {"$set": fields}))
+    return ops, unchanged
+
+def run() -> None:
+    client = get_mongo_client(get_mongodb_uri())
+    coll = client[DB_NAME][COLL_NAME]
+
+    total_scanned = total_unchanged = total_modified = 0
+    last_id: Optional[ObjectId] = None
+
+    while True:
+        batch = fetch_batch(coll, last_id, BATCH_DOCS)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+        ops, unchanged = build_updates(batch)
+        total_scanned += len(batch)
+        total_unchanged += unchanged
+
+        if ops:
+            try:
+                res = coll.bulk_write(ops, ordered=False)
+                total_modified += res.modified_count
+            except BulkWriteError as e:
+                print("[ERROR] Bulk write error:", e.details)
+
+    coll.create_index([("source_keys", ASCENDING), ("_id", ASCENDING)], name="source_keys_idx")
+    coll.create_index([("source_last_updated.source", ASCENDING),
+                       ("source_last_updated.last_updated", ASCENDING)], name="source_last_updated_idx")
+    try:
+        coll.drop_index("sources_idx")
+    except OperationFailure:
+        pass  # already dropped
+
+    print(f"[TOTAL] scanned={total_scanned} unchanged={total_unchanged} modified={total_modified}")
+
+    # Post-migration checks
+    missing = coll.count_documents({"sources": {"$type": "object"}, "source_keys": {"$exists": False}})
+    print(f"[CHECK] documents with sources still missing source_keys: {missing}")
+
+if __name__ == "__main__":
+    run()
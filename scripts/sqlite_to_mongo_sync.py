@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Push projects collected offline in a SQLite store into MongoDB.
+
+Each stored document is turned back into a scraper payload (sources as {source: url}) and
+written through MasterProjectManager.bulk_upsert_projects, grouped by the document's
+highest-priority source, so it is merged into MongoDB with the normal priority rules
+instead of overwriting what is already there. Projects new to MongoDB get a fresh
+project_uid there. Exchange ids are local to each store, so they travel as the SQLite
+store's exchange slugs and are resolved again in MongoDB.
+
+Run from the repo root: python -m scripts.sqlite_to_mongo_sync projects.sqlite3
+"""
+
+from __future__ import annotations
+import argparse
+from typing import Any, Dict, List, Tuple
+
+from MasterProjectManager import MasterProjectManager
+from config.private import get_mongodb_uri
+from storage.sqlite_store import SQLiteProjectStore
+from utils.exchange_registry import ExchangeRegistry
+
+BATCH_DOCS = 500
+
+# Bookkeeping fields owned by each store
+STORE_FIELDS = {"_id", "_v", "project_uid", "created_at", "name_key", "ticker_key", "identity_keys",
+                "source_keys", "source_last_updated"}
+
+
+def to_payload(doc: Dict[str, Any], exchanges: ExchangeRegistry) -> Dict[str, Any]:
+    payload = {k: v for k, v in doc.items() if k not in STORE_FIELDS}
+    sources = doc.get("sources") or {}
+    payload["sources"] = {
+        src: (info.get("url", "") if isinstance(info, dict) else info) for src, info in sources.items()
+    }
+    if isinstance(payload.get("exchanges"), list):
+        # One lookup for the ids not cached yet; the per-item calls below are cache hits
+        ids = [itm for itm in payload["exchanges"] if type(itm) is int]
+        unknown = len(ids) - len(exchanges.slugs_for(ids))
+        if unknown:
+            print(f"[WARN] {doc.get('project_name')}: {unknown} exchange ids unknown to the SQLite store, skipped")
+        payload["exchanges"] = [slug for itm in payload["exchanges"]
+                                for slug in (exchanges.slugs_for([itm]) if type(itm) is int else [itm])]
+    return payload
+
+
+def flush(manager: MasterProjectManager, batches: Dict[str, List[Dict[str, Any]]]) -> Tuple[int, int]:
+    written = failed = 0
+    for source, payloads in batches.items():
+        result = manager.bulk_upsert_projects(payloads, source)
+        failed += len(result["errors"])
+        written += len(payloads) - len(result["errors"])
+        for err in result["errors"]:
+            print(f"[ERROR] {err['project_name']}: {err['error']}")
+    batches.clear()
+    return written, failed
+
+
+def run(path: str) -> None:
+    local = SQLiteProjectStore(path)
+    local_exchanges = ExchangeRegistry(local)
+    # Replayed documents are not new observations, so no market snapshots are recorded
+    manager = MasterProjectManager(get_mongodb_uri(), record_market_snapshots=False)
+
+    batches: Dict[str, List[Dict[str, Any]]] = {}
+    pending = total_written = total_failed = 0
+    for doc in local.iter_projects(batch_size=BATCH_DOCS):
+        source = manager._get_highest_priority_source(doc.get("sources") or {}) or "unknown"
+        batches.setdefault(source, []).append(to_payload(doc, local_exchanges))
+        pending += 1
+        if pending >= BATCH_DOCS:
+            written, failed = flush(manager, batches)
+            total_written, total_failed, pending = total_written + written, total_failed + failed, 0
+    written, failed = flush(manager, batches)
+    total_written, total_failed = total_written + written, total_failed + failed
+
+    local.close()
+    print(f"[DONE] synced={total_written} failed={total_failed}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="SQLite store written with storage.sqlite_store.SQLiteProjectStore")
+    run(parser.parse_args().path)
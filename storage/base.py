@@ -0,0 +1,240 @@
+# storage/base.py
+"""
+Storage backend interface for MasterProjectManager.
+
+The manager owns merging, source priority, the identity cache and the retry policy;
+a ProjectStore only persists and queries project documents. Documents are plain dicts
+shaped like the MongoDB `projects` collection (sources, category, network, ...), with
+`_v` as the compare-and-swap version, `name_key`/`ticker_key` as the identity,
+`identity_keys` as the cross-source ids (source slugs, contracts) matched before it and
+`source_keys`/`source_last_updated` as the indexed copies of the `sources` map and
+`exchanges` as integer ids into the store's exchange dimension.
+
+Market data observed on each upsert is kept as a time series next to the documents
+(append_market_snapshots), grouped so a project's range reads touch a few contiguous
+buckets or pages rather than one record per scrape.
+
+A backend may keep large fields outside the project documents (MongoProjectStore's
+split_details). Its lookups then return documents without them and load_details attaches
+them on demand; streamed queries return whole documents unless the projection says otherwise.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+Projection = Optional[Union[Dict[str, Any], List[str]]]
+
+# A bulk write op is a dict, either
+#   {"op": "insert", "doc": {...}}  -> insert unless the identity already exists
+#   {"op": "update", "project_uid": str, "version": Optional[int], "doc": merged, "update": diff}
+#                                   -> compare-and-swap on _v; backends apply either `doc`
+#                                      (full document) or `update` (Mongo update operators)
+WriteOp = Dict[str, Any]
+
+
+def normalize_projection(projection: Projection) -> Optional[Dict[str, Any]]:
+    """List of field names -> inclusion dict; empty projections mean whole documents."""
+    if isinstance(projection, list):
+        return {field: 1 for field in projection}
+    return dict(projection) if projection else None
+
+
+def is_inclusion(projection: Dict[str, Any]) -> bool:
+    return any(v for k, v in projection.items() if k != "_id")
+
+
+def apply_projection(doc: Dict[str, Any], projection: Projection) -> Dict[str, Any]:
+    """Apply a top-level Mongo-style inclusion or exclusion projection to a document."""
+    projection = normalize_projection(projection)
+    if not projection:
+        return doc
+    if is_inclusion(projection):
+        out = {}
+        if projection.get("_id", 1) and "_id" in doc:
+            out["_id"] = doc["_id"]
+        for field, keep in projection.items():
+            if keep and field != "_id" and field in doc:
+                out[field] = doc[field]
+        return out
+    return {k: v for k, v in doc.items() if k not in projection}
+
+
+class ProjectStore(ABC):
+    """Persistence operations MasterProjectManager needs from a database."""
+
+    def setup_indexes(self) -> None:
+        """Create the indexes the queries below rely on."""
+
+    def close(self) -> None:
+        """Release backend resources."""
+
+    def load_details(self, docs: List[Dict], fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Attach the fields kept outside the project documents to `docs` (in place).
+
+        Args:
+            docs: Documents returned by the lookups below
+            fields: Only these fields when stored separately (None = all)
+
+        Returns:
+            docs; unchanged by backends that store whole documents
+        """
+        return docs
+
+    # ---- lookups ----
+
+    @abstractmethod
+    def find_by_uid(self, project_uid: str) -> Optional[Dict]:
+        """Project with this project_uid."""
+
+    @abstractmethod
+    def find_by_identity(self, name_key: str, ticker_key: str) -> Optional[Dict]:
+        """First project with this normalized (name_key, ticker_key) identity."""
+
+    @abstractmethod
+    def find_by_name_key(self, name_key: str) -> Optional[Dict]:
+        """First project with this normalized name."""
+
+    @abstractmethod
+    def find_by_identity_keys(self, identity_keys: List[str]) -> List[Dict]:
+        """Projects whose identity_keys contain any of `identity_keys`, oldest first."""
+
+    @abstractmethod
+    def find_candidates(self, project_uids: List[str], identities: List[Tuple[str, str]],
+                        identity_keys: List[str] = ()) -> List[Dict]:
+        """
+        Documents matching any of the project_uids, identities or identity_keys, fetched in
+        as few round trips as the backend allows, oldest first. May return extra documents;
+        callers filter.
+        """
+
+    @abstractmethod
+    def iter_identities(self, batch_size: int = 2000) -> Iterator[Dict]:
+        """project_uid, project_name, project_ticker, name_key, ticker_key, identity_keys and _v of every project."""
+
+    # ---- writes ----
+
+    @abstractmethod
+    def insert_if_absent(self, doc: Dict) -> bool:
+        """Insert `doc` unless its (name_key, ticker_key) identity exists. True if inserted."""
+
+    @abstractmethod
+    def update_if_version(self, project_uid: str, version: Optional[int], doc: Dict,
+                          update: Dict[str, Dict]) -> Optional[int]:
+        """
+        Compare-and-swap: store the merged `doc` (or apply `update`) only while the project
+        is still at `version`, bumping _v.
+
+        Returns:
+            The new _v, or None when the project changed (or vanished) in between
+        """
+
+    @abstractmethod
+    def bulk_write(self, ops: List[WriteOp]) -> Dict[str, Any]:
+        """
+        Apply insert/update ops (see WriteOp) as one batch.
+
+        Returns:
+            Dict with:
+              - "applied": indexes of ops that were written
+              - "conflicts": indexes of ops that lost to a concurrent writer; backends that
+                cannot tell which update lost may report every update op of the batch
+              - "failed": {index: error message}
+        """
+
+    # ---- exchange dimension ----
+
+    @abstractmethod
+    def resolve_exchanges(self, source: str, slugs: List[str], create: bool = True) -> Dict[str, int]:
+        """
+        Exchange ids of a source's slugs. A slug seen from this source before keeps its id;
+        otherwise it joins the exchange with the same utils.text_utils.exchange_key and,
+        with `create`, a new exchange gets the next id.
+
+        Returns:
+            {slug: exchange id} for every slug resolved
+        """
+
+    @abstractmethod
+    def exchange_slugs(self, exchange_ids: List[int]) -> Dict[int, str]:
+        """{exchange id: canonical slug} for the known ids."""
+
+    @abstractmethod
+    def add_exchange_alias(self, exchange_id: int, source: str, slug: str) -> bool:
+        """Make a source's slug resolve to an existing exchange. False when it is already taken."""
+
+    # ---- market snapshots ----
+
+    @abstractmethod
+    def append_market_snapshots(self, snapshots: List[Dict]) -> None:
+        """
+        Append observations to the projects' time series, in one write per backend call.
+        An observation replaces the one with the same (project_uid, t, source).
+
+        Args:
+            snapshots: [{"project_uid", "t" (datetime), "source", "market_cap", "fdv",
+                "liquidity"}]; the three values are floats and may be missing
+        """
+
+    @abstractmethod
+    def iter_market_snapshots(self, project_uid: str, start: Optional[datetime] = None,
+                              end: Optional[datetime] = None) -> Iterator[Dict]:
+        """A project's snapshots with start <= t <= end (None = unbounded), oldest first."""
+
+    # ---- queries ----
+
+    @abstractmethod
+    def iter_projects(self, projection: Projection = None, batch_size: int = 500,
+                      sort_field: str = "_id", resume_after: Any = None) -> Iterator[Dict]:
+        """Stream every project in ascending sort_field order (keyset pagination)."""
+
+    @abstractmethod
+    def iter_by_source(self, source: str, projection: Projection = None, batch_size: int = 500,
+                       sort_field: str = "_id", resume_after: Any = None) -> Iterator[Dict]:
+        """Stream projects that have data from `source`, in ascending sort_field order."""
+
+    @abstractmethod
+    def iter_stale_by_source(self, source: str, before: str, projection: Projection = None,
+                             batch_size: int = 500, limit: int = 0) -> Iterator[Dict]:
+        """
+        Stream projects whose `source` entry was last updated before `before` ('YYYY-MM-DD'),
+        at most `limit` of them (0 or less = all), least recently updated first by that
+        entry's last_updated, ties in insertion order.
+        """
+
+    @abstractmethod
+    def iter_by_exchange(self, exchange_id: int, projection: Projection = None, batch_size: int = 500,
+                         sort_field: str = "_id", resume_after: Any = None) -> Iterator[Dict]:
+        """Stream projects listed on an exchange, in ascending sort_field order."""
+
+    @abstractmethod
+    def iter_by_category(self, category: str, projection: Projection = None, batch_size: int = 500,
+                         sort_field: str = "_id", resume_after: Any = None) -> Iterator[Dict]:
+        """Stream projects in `category`, in ascending sort_field order."""
+
+    @abstractmethod
+    def iter_by_ticker(self, project_ticker: str, projection: Projection = None,
+                       batch_size: int = 100) -> Iterator[Dict]:
+        """Stream the projects sharing a ticker."""
+
+    @abstractmethod
+    def list_duplicate_tickers(self, min_count: int = 2, use_counts: bool = False) -> List[Dict[str, Any]]:
+        """[{"project_ticker", "count"}] for tickers shared by >= min_count projects, most duplicated first."""
+
+    def increment_ticker_counts(self, increments: Dict[str, int]) -> None:
+        """Keep a precomputed ticker -> count table current, for backends that have one."""
+
+    def rebuild_ticker_counts(self) -> int:
+        """Recompute the ticker -> count table; returns the number of distinct tickers."""
+        return len(self.list_duplicate_tickers(min_count=1))
+
+    @abstractmethod
+    def project_stats(self, market_cap_bounds: List[float]) -> Dict[str, Any]:
+        """
+        Raw counts for MasterProjectManager.get_project_stats.
+
+        Returns:
+            Dict with "total" (int); "sources", "categories", "networks" ({value: count},
+            most frequent first); "market_cap" ({bucket lower bound: count}, values at or
+            above the last bound counted in the last bucket)
+        """
@@ -0,0 +1,668 @@
+# storage/mongo_store.py
+"""
+MongoDB backend: the `projects` collection plus the `ticker_counts` side collection and
+the `market_snapshots` buckets, one document per project and month holding that month's
+market data samples.
+
+With split_details, the large and rarely read fields (DETAIL_FIELDS) live in a
+`project_details` collection keyed by project_uid instead, so the `projects` documents the
+lookups, merges and stats touch stay small enough to keep the hot working set in cache.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, PyMongoError
+
+from storage.base import ProjectStore, Projection, WriteOp, is_inclusion, normalize_projection
+from utils.text_utils import exchange_alias, exchange_key
+
+# Fields kept in project_details with split_details: `about` runs to kilobytes, exchanges
+# to hundreds of slugs, and none of them is needed to find, merge or count projects
+DETAIL_FIELDS = ("about", "exchanges", "telegram_admins")
+
+# Server error code of a unique index violation
+DUPLICATE_KEY = 11000
+
+# Values a market snapshot may carry
+SNAPSHOT_FIELDS = ("market_cap", "fdv", "liquidity")
+
+
+class MongoProjectStore(ProjectStore):
+    def __init__(self, db: Database, split_details: bool = False):
+        """
+        Args:
+            db: Database holding the projects and ticker_counts collections
+            split_details: Keep DETAIL_FIELDS in the project_details collection
+                (migrate existing documents with scripts.project_details_split)
+        """
+        self.db = db
+        self.collection = db.projects
+
+        # ticker -> number of projects, so duplicate tickers are an indexed query
+        self.ticker_counts = db.ticker_counts
+
+        # project_uid (as _id) -> DETAIL_FIELDS, read only when a caller needs them
+        self.split_details = split_details
+        self.details = db.project_details
+
+        # Exchange dimension: {_id: int, slug, key, aliases: ["<source>:<slug>", ...]}, ids
+        # handed out by the "exchanges" sequence in counters
+        self.exchanges = db.exchanges
+        self.counters = db.counters
+        self._exchange_indexes_ready = False
+
+        # "<project_uid>:<YYYY-MM>" (as _id) -> {project_uid, month, count, first, last,
+        # samples: [{t, source, market_cap, fdv, liquidity}]}; a project's buckets are one
+        # contiguous _id range, so range reads need no further index
+        self.market_snapshots = db.market_snapshots
+
+    def setup_indexes(self) -> None:
+        """Setup MongoDB indexes for optimal performance"""
+        # Compound index for duplicate detection
+        self.collection.create_index([
+            ("project_name", ASCENDING),
+            ("project_ticker", ASCENDING)
+        ], name="duplicate_detection_idx")
+
+        # Unique compound index on the normalized identity used by find_existing_project. Of two
+        # writers upserting the same new identity, the second gets DuplicateKeyError instead of
+        # inserting a second document (insert_if_absent, bulk_write and the server write mode)
+        try:
+            self.collection.create_index([
+                ("name_key", ASCENDING),
+                ("ticker_key", ASCENDING)
+            ], unique=True, name="identity_key_idx")
+        except OperationFailure as e:
+            # A store from before the unique index: an older non-unique index or duplicate identities
+            print(f"[WARN] identity_key_idx is not unique, run python -m scripts.identity_key_migration: {e}")
+
+        # Multikey index on the cross-source ids (source slugs, contracts) matched before the identity.
+        # Not unique: duplicates from before the backfill may share a key until they are merged
+        self.collection.create_index("identity_keys", name="identity_keys_idx")
+
+        # Unique index on project_uid
+        self.collection.create_index("project_uid", unique=True, name="project_uid_idx")
+
+        # Unique index on project_ticker
+        self.collection.create_index("project_ticker", name="project_ticker_idx")
+
+        # Index on categories for filtering
+        self.collection.create_index("category", name="category_idx")
+
+        # Sparse index on market_cap for projects with market data
+        self.collection.create_index("market_cap", sparse=True, name="market_cap_idx")
+
+        # Multikey index on the source names copied out of `sources`; _id second so
+        # iter_by_source pages are range scans already in keyset order
+        self.collection.create_index([
+            ("source_keys", ASCENDING),
+            ("_id", ASCENDING)
+        ], name="source_keys_idx")
+
+        # Multikey compound index on (source, last_updated) pairs for "stale since" queries
+        self.collection.create_index([
+            ("source_last_updated.source", ASCENDING),
+            ("source_last_updated.last_updated", ASCENDING)
+        ], name="source_last_updated_idx")
+
+        # Multikey index on the exchange ids, for projects listed on an exchange
+        self.collection.create_index([
+            ("exchanges", ASCENDING),
+            ("_id", ASCENDING)
+        ], name="exchanges_idx")
+        if self.split_details:
+            self.details.create_index([("exchanges", ASCENDING), ("_id", ASCENDING)], name="exchanges_idx")
+        self._ensure_exchange_indexes()
+
+        # Duplicate-ticker side collection, most duplicated first
+        self.ticker_counts.create_index([("count", DESCENDING)], name="count_idx")
+
+        print("MongoDB indexes created successfully")
+
+    # ---- detail fields ----
+
+    @staticmethod
+    def _split(doc: Dict) -> Tuple[Dict, Dict]:
+        """(document without DETAIL_FIELDS, the DETAIL_FIELDS it carries)."""
+        core = {k: v for k, v in doc.items() if k not in DETAIL_FIELDS}
+        return core, {k: doc[k] for k in DETAIL_FIELDS if k in doc}
+
+    @staticmethod
+    def _split_update(update: Dict[str, Dict]) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+        """Route the operators of an update by the top-level field of each path."""
+        core: Dict[str, Dict] = {}
+        details: Dict[str, Dict] = {}
+        for operator, fields in update.items():
+            for path, value in fields.items():
+                target = details if path.split(".", 1)[0] in DETAIL_FIELDS else core
+                target.setdefault(operator, {})[path] = value
+        return core, details
+
+    def load_details(self, docs: List[Dict], fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """One project_uid $in query on project_details for the whole list."""
+        if not self.split_details or not docs:
+            return docs
+        wanted = DETAIL_FIELDS if fields is None else [f for f in DETAIL_FIELDS if f in set(fields)]
+        uids = [doc["project_uid"] for doc in docs if "project_uid" in doc]
+        if not wanted or not uids:
+            return docs
+        found = {d.pop("_id"): d for d in self.details.find({"_id": {"$in": uids}}, {f: 1 for f in wanted})}
+        for doc in docs:
+            doc.update(found.get(doc.get("project_uid"), {}))
+        return docs
+
+    def _detail_projection(self, projection: Projection,
+                           sort_field: str = "_id") -> Tuple[Optional[Dict[str, Any]], List[str], bool]:
+        """
+        Plan a streamed query with split_details.
+
+        Returns:
+            (projection for the projects query, detail fields to attach to each page,
+             whether project_uid was only added to join them and has to be removed again)
+        """
+        projection = normalize_projection(projection)
+        if not self.split_details:
+            return projection, [], False
+        if not projection:
+            return projection, list(DETAIL_FIELDS), False
+        if is_inclusion(projection):
+            wanted = [f for f in DETAIL_FIELDS if projection.get(f)]
+            added = bool(wanted) and not projection.get("project_uid")
+            if added:
+                projection["project_uid"] = 1
+        else:
+            wanted = [f for f in DETAIL_FIELDS if f not in projection]
+            added = bool(wanted) and "project_uid" in projection
+            if added:
+                del projection["project_uid"]
+        return projection, wanted, added and sort_field != "project_uid"
+
+    def _attach_details(self, page: List[Dict], wanted: List[str], added: bool) -> List[Dict]:
+        if wanted:
+            self.load_details(page, wanted)
+        if added:
+            for doc in page:
+                doc.pop("project_uid", None)
+        return page
+
+    # ---- lookups ----
+
+    def find_by_uid(self, project_uid: str) -> Optional[Dict]:
+        return self.collection.find_one({"project_uid": project_uid})
+
+    def find_by_identity(self, name_key: str, ticker_key: str) -> Optional[Dict]:
+        return self.collection.find_one({"name_key": name_key, "ticker_key": ticker_key})
+
+    def find_by_name_key(self, name_key: str) -> Optional[Dict]:
+        return self.collection.find_one({"name_key": name_key})
+
+    def find_by_identity_keys(self, identity_keys: List[str]) -> List[Dict]:
+        if not identity_keys:
+            return []
+        return list(self.collection.find({"identity_keys": {"$in": list(identity_keys)}}).sort("_id", ASCENDING))
+
+    def find_candidates(self, project_uids: List[str], identities: List[Tuple[str, str]],
+                        identity_keys: List[str] = ()) -> List[Dict]:
+        """
+        One query: project_uid $in for known uids, name_key/ticker_key $in and identity_keys
+        $in for the rest.
+        """
+        clauses: List[Dict[str, Any]] = []
+        if project_uids:
+            clauses.append({"project_uid": {"$in": sorted(project_uids)}})
+        if identities:
+            clauses.append({
+                "name_key": {"$in": sorted({name for name, _ in identities})},
+                "ticker_key": {"$in": sorted({ticker for _, ticker in identities})},
+            })
+        if identity_keys:
+            clauses.append({"identity_keys": {"$in": sorted(identity_keys)}})
+        if not clauses:
+            return []
+        query = clauses[0] if len(clauses) == 1 else {"$or": clauses}
+        return list(self.collection.find(query).sort("_id", ASCENDING))
+
+    def iter_identities(self, batch_size: int = 2000) -> Iterator[Dict]:
+        projection = {"_id": 0, "project_name": 1, "project_ticker": 1, "project_uid": 1,
+                      "name_key": 1, "ticker_key": 1, "identity_keys": 1, "_v": 1}
+        yield from self.collection.find({}, projection).batch_size(batch_size)
+
+    # ---- writes ----
+
+    @staticmethod
+    def _version_filter(project_uid: str, version: Optional[int]) -> Dict[str, Any]:
+        """Match a document only while it is still at `version` (None = never versioned)."""
+        return {"project_uid": project_uid, "_v": version}
+
+    def insert_if_absent(self, doc: Dict) -> bool:
+        """With split_details, the DETAIL_FIELDS go to project_details once the identity is claimed."""
+        core, details = self._split(doc) if self.split_details else (doc, {})
+        try:
+            result = self.collection.update_one(
+                {"name_key": doc["name_key"], "ticker_key": doc["ticker_key"]},
+                {"$setOnInsert": core},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+        if result.upserted_id is None:
+            return False
+        if details:
+            self.details.update_one({"_id": doc["project_uid"]}, {"$set": details}, upsert=True)
+        return True
+
+    def update_if_version(self, project_uid: str, version: Optional[int], doc: Dict,
+                          update: Dict[str, Dict]) -> Optional[int]:
+        """
+        Applies the field-level `update` diff with find_one_and_update conditioned on _v.
+        With split_details, paths under DETAIL_FIELDS are applied to project_details after the
+        projects update won; _v on projects still orders every write of the project.
+        """
+        core, details = self._split_update(update) if self.split_details else (update, {})
+        stored = self.collection.find_one_and_update(
+            self._version_filter(project_uid, version),
+            core,
+            projection={"_v": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if stored is None:
+            return None
+        if details:
+            self.details.update_one({"_id": project_uid}, details, upsert=True)
+        return stored.get("_v")
+
+    def bulk_write(self, ops: List[WriteOp]) -> Dict[str, Any]:
+        """
+        One unordered bulk_write of insert-if-absent upserts and _v-conditioned UpdateOne diffs.
+        An insert op that matched, or that a concurrent insert of the same identity beat to the
+        unique identity_key_idx (duplicate key error), means the identity appeared first. The
+        bulk result only has a total matched count, so when update ops matched fewer documents
+        than were sent every update op is reported as a conflict.
+        """
+        requests, detail_requests = [], {}
+        for index, op in enumerate(ops):
+            doc = op["doc"]
+            if op["op"] == "insert":
+                core, details = self._split(doc) if self.split_details else (doc, {})
+                requests.append(UpdateOne({"name_key": doc["name_key"], "ticker_key": doc["ticker_key"]},
+                                          {"$setOnInsert": core}, upsert=True))
+                details = {"$set": details} if details else {}
+            else:
+                core, details = self._split_update(op["update"]) if self.split_details else (op["update"], {})
+                requests.append(UpdateOne(self._version_filter(op["project_uid"], op["version"]), core))
+            if details:
+                detail_requests[index] = UpdateOne({"_id": doc["project_uid"]}, details, upsert=True)
+
+        outcome: Dict[str, Any] = {"applied": set(), "conflicts": set(), "failed": {}}
+        if not requests:
+            return outcome
+
+        upserted: Set[int] = set()
+        raced: Set[int] = set()
+        matched = 0
+        try:
+            result = self.collection.bulk_write(requests, ordered=False)
+            upserted, matched = set(result.upserted_ids), result.matched_count
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                if err.get("code") == DUPLICATE_KEY and ops[err["index"]]["op"] == "insert":
+                    raced.add(err["index"])
+                else:
+                    outcome["failed"][err["index"]] = err.get("errmsg", "write error")
+            upserted = {u["index"] for u in e.details.get("upserted", [])}
+            matched = e.details.get("nMatched", 0)
+        except PyMongoError as e:
+            outcome["failed"] = {index: str(e) for index in range(len(ops))}
+            return outcome
+
+        pending = [index for index in range(len(ops)) if index not in outcome["failed"]]
+        insert_conflicts = {i for i in pending if ops[i]["op"] == "insert" and i not in upserted}
+        updates = [i for i in pending if ops[i]["op"] == "update"]
+        outcome["conflicts"] = set(insert_conflicts)
+        # Insert ops that matched count in nMatched; those that lost the race did not match anything
+        if matched - len(insert_conflicts - raced) < len(updates):
+            outcome["conflicts"].update(updates)
+        outcome["applied"] = {i for i in pending if i not in outcome["conflicts"]}
+
+        # project_details of the ops that won; a conflicted op is redone with its details
+        applied = sorted(i for i in outcome["applied"] if i in detail_requests)
+        if applied:
+            try:
+                self.details.bulk_write([detail_requests[i] for i in applied], ordered=False)
+            except BulkWriteError as e:
+                for err in e.details.get("writeErrors", []):
+                    outcome["failed"][applied[err["index"]]] = err.get("errmsg", "project_details write error")
+            except PyMongoError as e:
+                outcome["failed"].update({i: f"project_details: {e}" for i in applied})
+            outcome["applied"].difference_update(outcome["failed"])
+        return outcome
+
+    # ---- exchange dimension ----
+
+    def _ensure_exchange_indexes(self) -> None:
+        """Unique key and alias indexes, which keep concurrent resolvers from duplicating exchanges."""
+        if self._exchange_indexes_ready:
+            return
+        self.exchanges.create_index("key", unique=True, name="exchange_key_idx")
+        self.exchanges.create_index("aliases", unique=True, name="exchange_aliases_idx")
+        self._exchange_indexes_ready = True
+
+    def resolve_exchanges(self, source: str, slugs: List[str], create: bool = True) -> Dict[str, int]:
+        """
+        Alias lookup, then key lookup, then one counters $inc reserving ids for every new
+        exchange and one insert_many. Exchanges a concurrent resolver inserted first are
+        picked up by key.
+        """
+        self._ensure_exchange_indexes()
+        slugs = [slug for slug in dict.fromkeys(slugs) if isinstance(slug, str) and slug.strip()]
+        if not slugs:
+            return {}
+
+        resolved: Dict[str, int] = {}
+        slug_by_alias = {exchange_alias(source, slug): slug for slug in slugs}
+        for doc in self.exchanges.find({"aliases": {"$in": list(slug_by_alias)}}, {"aliases": 1}):
+            for alias in doc["aliases"]:
+                if alias in slug_by_alias:
+                    resolved[slug_by_alias[alias]] = doc["_id"]
+
+        by_key: Dict[str, List[str]] = {}
+        for slug in slugs:
+            if slug not in resolved:
+                by_key.setdefault(exchange_key(slug), []).append(slug)
+        if not by_key:
+            return resolved
+
+        for doc in self.exchanges.find({"key": {"$in": list(by_key)}}, {"key": 1}):
+            known = by_key.pop(doc["key"])
+            try:
+                self.exchanges.update_one({"_id": doc["_id"]}, {"$addToSet": {"aliases": {
+                    "$each": [exchange_alias(source, slug) for slug in known]}}})
+            except DuplicateKeyError:
+                pass  # a concurrent resolver added the same aliases
+            resolved.update({slug: doc["_id"] for slug in known})
+        if not by_key or not create:
+            return resolved
+
+        counter = self.counters.find_one_and_update(
+            {"_id": "exchanges"}, {"$inc": {"seq": len(by_key)}}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        first_id = counter["seq"] - len(by_key) + 1
+        new_docs = [
+            {"_id": first_id + n, "slug": group[0], "key": key, "aliases": [exchange_alias(source, s) for s in group]}
+            for n, (key, group) in enumerate(by_key.items())
+        ]
+        lost: List[str] = []
+        try:
+            self.exchanges.insert_many(new_docs, ordered=False)
+        except BulkWriteError as e:
+            lost = [slug for err in e.details.get("writeErrors", []) for slug in by_key[new_docs[err["index"]]["key"]]]
+        for doc in new_docs:
+            resolved.update({slug: doc["_id"] for slug in by_key[doc["key"]] if slug not in lost})
+        if lost:
+            resolved.update(self.resolve_exchanges(source, lost, create=False))
+        return resolved
+
+    def exchange_slugs(self, exchange_ids: List[int]) -> Dict[int, str]:
+        return {doc["_id"]: doc["slug"] for doc in self.exchanges.find({"_id": {"$in": list(exchange_ids)}}, {"slug": 1})}
+
+    def add_exchange_alias(self, exchange_id: int, source: str, slug: str) -> bool:
+        self._ensure_exchange_indexes()
+        try:
+            result = self.exchanges.update_one({"_id": exchange_id},
+                                               {"$addToSet": {"aliases": exchange_alias(source, slug)}})
+        except DuplicateKeyError:
+            return False
+        return result.matched_count == 1
+
+    # ---- market snapshots ----
+
+    @staticmethod
+    def _bucket_id(project_uid: str, t: datetime) -> str:
+        return f"{project_uid}:{t:%Y-%m}"
+
+    def append_market_snapshots(self, snapshots: List[Dict]) -> None:
+        """
+        One pipeline upsert per touched bucket, sent as one unordered bulk_write. A sample
+        replaces the bucket's sample with the same (t, source), as the SQLite primary key does,
+        so a retried batch doesn't double the series; count, first and last are recomputed.
+        """
+        buckets: Dict[str, Dict[Tuple[datetime, Optional[str]], Dict]] = {}
+        for snap in snapshots:
+            sample = {"t": snap["t"], "source": snap.get("source"),
+                      **{f: snap[f] for f in SNAPSHOT_FIELDS if snap.get(f) is not None}}
+            bucket = buckets.setdefault(self._bucket_id(snap["project_uid"], snap["t"]), {})
+            # Within a batch too, the last sample of a (t, source) wins
+            bucket.pop((sample["t"], sample["source"]), None)
+            bucket[(sample["t"], sample["source"])] = sample
+        ops = []
+        for bucket_id, by_key in buckets.items():
+            samples = list(by_key.values())
+            keys = [{"t": t, "source": source} for t, source in by_key]
+            kept = {"$filter": {"input": {"$ifNull": ["$samples", []]}, "as": "s", "cond": {"$not": {
+                "$in": [{"t": "$$s.t", "source": {"$ifNull": ["$$s.source", None]}}, {"$literal": keys}]}}}}
+            ops.append(UpdateOne(
+                {"_id": bucket_id},
+                [{"$set": {"project_uid": bucket_id.rsplit(":", 1)[0], "month": bucket_id.rsplit(":", 1)[1],
+                           "samples": {"$concatArrays": [kept, {"$literal": samples}]}}},
+                 {"$set": {"count": {"$size": "$samples"},
+                           "first": {"$min": "$samples.t"},
+                           "last": {"$max": "$samples.t"}}}],
+                upsert=True,
+            ))
+        if ops:
+            self.market_snapshots.bulk_write(ops, ordered=False)
+
+    def iter_market_snapshots(self, project_uid: str, start: Optional[datetime] = None,
+                              end: Optional[datetime] = None) -> Iterator[Dict]:
+        """Reads only the buckets of the months in range, via their _id range."""
+        bucket_range = {"$gte": self._bucket_id(project_uid, start) if start else f"{project_uid}:",
+                        "$lte": self._bucket_id(project_uid, end) if end else f"{project_uid}:~"}
+        cursor = self.market_snapshots.find({"_id": bucket_range}, {"_id": 0, "samples": 1}).sort("_id", ASCENDING)
+        for bucket in cursor:
+            for sample in sorted(bucket.get("samples") or [], key=lambda s: s["t"]):
+                if (start is None or sample["t"] >= start) and (end is None or sample["t"] <= end):
+                    yield {"project_uid": project_uid, **sample}
+
+    # ---- queries ----
+
+    def _iter_keyset(
+            self,
+            query: Dict[str, Any],
+            projection: Projection,
+            batch_size: int,
+            sort_field: str,
+            resume_after: Any,
+    ) -> Iterator[Dict]:
+        """
+        Stream documents matching `query` in ascending `sort_field` order.
+
+        Each page is its own range query (sort_field > last value seen) limited to
+        batch_size documents, so memory stays flat no matter how large the result is and
+        no server cursor has to stay open between pages.
+        """
+        if sort_field not in ("_id", "project_uid"):
+            raise ValueError("sort_field must be '_id' or 'project_uid'")
+
+        projection, wanted, added = self._detail_projection(projection, sort_field)
+        if projection:
+            if is_inclusion(projection):
+                projection[sort_field] = 1  # inclusion projection: the resume key must come back
+            else:
+                projection.pop(sort_field, None)
+
+        last = resume_after
+        while True:
+            page_query = dict(query)
+            if last is not None:
+                page_query[sort_field] = {"$gt": last}
+            page = list(
+                self.collection.find(page_query, projection)
+                    .sort(sort_field, ASCENDING)
+                    .limit(batch_size)
+            )
+            if len(page) == batch_size:
+                last = page[-1][sort_field]
+            yield from self._attach_details(page, wanted, added)
+            if len(page) < batch_size:
+                return
+
+    def iter_projects(self, projection: Projection = None, batch_size: int = 500,
+                      sort_field: str = "_id", resume_after: Any = None) -> Iterator[Dict]:
+        yield from self._iter_keyset({}, projection, batch_size, sort_field, resume_after)
+
+    def iter_by_source(self, source: str, projection: Projection = None, batch_size: int = 500,
+                       sort_field: str = "_id", resume_after: Any = None) -> Iterator[Dict]:
+        yield from self._iter_keyset({"source_keys": source}, projection, batch_size, sort_field, resume_after)
+
+    def iter_stale_by_source(self, source: str, before: str, projection: Projection = None,
+                             batch_size: int = 500, limit: int = 0) -> Iterator[Dict]:
+        """
+        A range scan of source_last_updated_idx ($elemMatch bounds source and last_updated on
+        the same array element), sorted on the source's own sources.<source>.last_updated and
+        then _id, the (last_updated, project_id) order of the SQLite store. Sorting on the
+        array path would rank a document by its oldest entry of any source: the server does
+        not apply the query predicate when it picks the array element to sort by. With a
+        limit the sort only keeps the top `limit` documents.
+        """
+        query = {"source_last_updated": {"$elemMatch": {"source": source, "last_updated": {"$lt": before}}}}
+        projection, wanted, added = self._detail_projection(projection)
+        cursor = (self.collection.find(query, projection)
+                  .sort([(f"sources.{source}.last_updated", 1), ("_id", 1)])
+                  .allow_disk_use(True)
+                  .batch_size(batch_size))
+        if limit > 0:
+            cursor = cursor.limit(limit)
+        yield from self._iter_with_details(cursor, batch_size, wanted, added)
+
+    def _iter_with_details(self, cursor, batch_size: int, wanted: List[str], added: bool) -> Iterator[Dict]:
+        """Drain a cursor batch by batch, attaching detail fields with one query per batch."""
+        page: List[Dict] = []
+        for doc in cursor:
+            page.append(doc)
+            if len(page) == batch_size:
+                yield from self._attach_details(page, wanted, added)
+                page = []
+        yield from self._attach_details(page, wanted, added)
+
+    def iter_by_category(self, category: str, projection: Projection = None, batch_size: int = 500,
+                         sort_field: str = "_id", resume_after: Any = None) -> Iterator[Dict]:
+        yield from self._iter_keyset({"category": category}, projection, batch_size, sort_field, resume_after)
+
+    def iter_by_exchange(self, exchange_id: int, projection: Projection = None, batch_size: int = 500,
+                         sort_field: str = "_id", resume_after: Any = None) -> Iterator[Dict]:
+        """
+        Keyset pages over exchanges_idx. With split_details the ids live in project_details,
+        so pages are keyed by project_uid there and the projects are fetched by uid.
+        """
+        if not self.split_details:
+            yield from self._iter_keyset({"exchanges": exchange_id}, projection, batch_size, sort_field, resume_after)
+            return
+        if sort_field != "project_uid":
+            raise ValueError("with split_details, projects by exchange are paged by project_uid")
+
+        projection, wanted, _ = self._detail_projection(projection, sort_field)
+        if projection and is_inclusion(projection):
+            projection["project_uid"] = 1
+        last = resume_after
+        while True:
+            query: Dict[str, Any] = {"exchanges": exchange_id}
+            if last is not None:
+                query["_id"] = {"$gt": last}
+            uids = [d["_id"] for d in self.details.find(query, {"_id": 1}).sort("_id", ASCENDING).limit(batch_size)]
+            by_uid = {doc["project_uid"]: doc for doc in self.collection.find({"project_uid": {"$in": uids}}, projection)}
+            yield from self._attach_details([by_uid[uid] for uid in uids if uid in by_uid], wanted, False)
+            if len(uids) < batch_size:
+                return
+            last = uids[-1]
+
+    def iter_by_ticker(self, project_ticker: str, projection: Projection = None,
+                       batch_size: int = 100) -> Iterator[Dict]:
+        """Stream the projects sharing a ticker through a project_ticker_idx cursor."""
+        projection, wanted, added = self._detail_projection(projection)
+        cursor = self.collection.find({"project_ticker": project_ticker}, projection).batch_size(batch_size)
+        yield from self._iter_with_details(cursor, batch_size, wanted, added)
+
+    def list_duplicate_tickers(self, min_count: int = 2, use_counts: bool = False) -> List[Dict[str, Any]]:
+        """With use_counts, read the ticker_counts side collection (an indexed query) instead of aggregating."""
+        if use_counts:
+            cursor = self.ticker_counts.find({"count": {"$gte": min_count}}).sort([("count", -1), ("_id", 1)])
+            return [{"project_ticker": d["_id"], "count": d["count"]} for d in cursor]
+
+        # Groups carry only the ticker and a count, never the member documents
+        pipeline = [
+            {"$match": {"project_ticker": {"$nin": [None, ""]}}},
+            {"$group": {"_id": "$project_ticker", "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gte": min_count}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$project": {"_id": 0, "project_ticker": "$_id", "count": 1}},
+        ]
+        return list(self.collection.aggregate(pipeline, allowDiskUse=True))
+
+    def increment_ticker_counts(self, increments: Dict[str, int]) -> None:
+        """Add newly inserted projects to the ticker_counts side collection."""
+        if not increments:
+            return
+        ops = [UpdateOne({"_id": t}, {"$inc": {"count": n}}, upsert=True) for t, n in increments.items()]
+        try:
+            self.ticker_counts.bulk_write(ops, ordered=False)
+        except PyMongoError as e:
+            print(f"Failed to update ticker_counts: {e}")
+
+    def rebuild_ticker_counts(self) -> int:
+        """Recompute the ticker_counts side collection from scratch (one aggregation)."""
+        self.ticker_counts.delete_many({})
+        self.collection.aggregate([
+            {"$match": {"project_ticker": {"$nin": [None, ""]}}},
+            {"$group": {"_id": "$project_ticker", "count": {"$sum": 1}}},
+            {"$merge": {"into": self.ticker_counts.name, "whenMatched": "replace", "whenNotMatched": "insert"}},
+        ], allowDiskUse=True)
+        self.ticker_counts.create_index([("count", DESCENDING)], name="count_idx")
+        return self.ticker_counts.count_documents({})
+
+    def project_stats(self, market_cap_bounds: List[float]) -> Dict[str, Any]:
+        """All counts in a single $facet aggregation pass."""
+        def _count_by(field: str) -> List[Dict[str, Any]]:
+            return [
+                {"$unwind": f"${field}"},
+                {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+            ]
+
+        # source_keys, or the keys of `sources` for documents not migrated yet
+        source_keys = {
+            "$ifNull": ["$source_keys", {"$cond": [
+                {"$eq": [{"$type": "$sources"}, "object"]},
+                {"$map": {"input": {"$objectToArray": "$sources"}, "in": "$$this.k"}},
+                [],
+            ]}]
+        }
+        bounds = market_cap_bounds
+        pipeline = [{
+            "$facet": {
+                "total": [{"$count": "count"}],
+                "sources": [{"$project": {"source": source_keys}}] + _count_by("source"),
+                "categories": _count_by("category"),
+                "networks": _count_by("network"),
+                "market_cap": [
+                    {"$match": {"market_cap": {"$gte": 0}}},
+                    {"$bucket": {
+                        "groupBy": "$market_cap",
+                        "boundaries": bounds,
+                        "default": bounds[-1],
+                        "output": {"count": {"$sum": 1}},
+                    }},
+                ],
+            }
+        }]
+        facets = next(self.collection.aggregate(pipeline, allowDiskUse=True), {})
+
+        total = facets.get("total") or [{"count": 0}]
+        return {
+            "total": total[0]["count"],
+            "sources": {row["_id"]: row["count"] for row in facets.get("sources", [])},
+            "categories": {row["_id"]: row["count"] for row in facets.get("categories", [])},
+            "networks": {row["_id"]: row["count"] for row in facets.get("networks", [])},
+            "market_cap": {row["_id"]: row["count"] for row in facets.get("market_cap", [])},
+        }
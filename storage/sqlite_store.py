@@ -0,0 +1,493 @@
+# storage/sqlite_store.py
+"""
+Embedded SQLite backend for offline runs, local benchmarks and dry runs.
+
+Each project is one row: the document as JSON (queried with the JSON1 functions) plus
+indexed columns for the identity, project_uid, project_ticker and the _v version.
+Sources, categories and identity_keys are multi-valued, so they are kept in side tables
+with a composite primary key instead of being scanned out of the JSON; project_sources
+also carries each source's last_updated date for "stale since" queries. The exchange
+dimension is an `exchanges` table (the AUTOINCREMENT id is the exchange id) with its
+source-qualified slugs in `exchange_aliases`; project_exchanges indexes the ids projects store.
+Market snapshots live in a WITHOUT ROWID table clustered on (project_uid, t), which keeps
+a project's series in contiguous pages the way the MongoDB store's monthly buckets do.
+"""
+import json
+import sqlite3
+import threading
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from storage.base import ProjectStore, Projection, WriteOp, apply_projection
+from utils.text_utils import exchange_alias, exchange_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_uid    TEXT    NOT NULL UNIQUE,
+    name_key       TEXT    NOT NULL,
+    ticker_key     TEXT    NOT NULL,
+    project_ticker TEXT,
+    v              INTEGER NOT NULL DEFAULT 0,
+    doc            TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS identity_key_idx ON projects (name_key, ticker_key);
+CREATE INDEX IF NOT EXISTS project_ticker_idx ON projects (project_ticker);
+
+CREATE TABLE IF NOT EXISTS project_sources (
+    source       TEXT    NOT NULL,
+    project_id   INTEGER NOT NULL,
+    last_updated TEXT,
+    PRIMARY KEY (source, project_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS project_sources_project_idx ON project_sources (project_id);
+
+CREATE TABLE IF NOT EXISTS project_categories (
+    category   TEXT    NOT NULL,
+    project_id INTEGER NOT NULL,
+    PRIMARY KEY (category, project_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS project_categories_project_idx ON project_categories (project_id);
+
+CREATE TABLE IF NOT EXISTS project_identity_keys (
+    identity_key TEXT    NOT NULL,
+    project_id   INTEGER NOT NULL,
+    PRIMARY KEY (identity_key, project_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS project_identity_keys_project_idx ON project_identity_keys (project_id);
+
+CREATE TABLE IF NOT EXISTS project_exchanges (
+    exchange_id INTEGER NOT NULL,
+    project_id  INTEGER NOT NULL,
+    PRIMARY KEY (exchange_id, project_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS project_exchanges_project_idx ON project_exchanges (project_id);
+
+CREATE TABLE IF NOT EXISTS exchanges (
+    id   INTEGER PRIMARY KEY AUTOINCREMENT,
+    slug TEXT    NOT NULL,
+    key  TEXT    NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS exchange_aliases (
+    alias       TEXT    PRIMARY KEY,
+    exchange_id INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS market_snapshots (
+    project_uid TEXT NOT NULL,
+    t           TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    market_cap  REAL,
+    fdv         REAL,
+    liquidity   REAL,
+    PRIMARY KEY (project_uid, t, source)
+) WITHOUT ROWID;
+"""
+
+# Created after _upgrade_schema, since stores written before last_updated lack the column
+SOURCE_UPDATED_INDEX = """
+CREATE INDEX IF NOT EXISTS project_sources_updated_idx ON project_sources (source, last_updated);
+"""
+
+# Max identities per "(name_key, ticker_key) IN (VALUES ...)" query (2 bound variables each)
+IDENTITY_CHUNK = 400
+
+
+class SQLiteProjectStore(ProjectStore):
+    def __init__(self, path: str = "projects.sqlite3"):
+        """
+        Args:
+            path: Database file (":memory:" for a throwaway store)
+        """
+        self.path = path
+        # One connection shared by all threads (BufferedProjectWriter flushes from its own),
+        # serialized by self._lock; transactions are explicit
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._upgrade_schema()
+        self._conn.executescript(SOURCE_UPDATED_INDEX)
+
+    def _upgrade_schema(self) -> None:
+        """Add project_sources.last_updated to older stores, filled from the stored documents."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(project_sources)")}
+        if "last_updated" in columns:
+            return
+        with self._transaction() as conn:
+            conn.execute("ALTER TABLE project_sources ADD COLUMN last_updated TEXT")
+            conn.execute(
+                "UPDATE project_sources SET last_updated = (SELECT json_extract(p.doc, "
+                "'$.sources.\"' || project_sources.source || '\".last_updated') "
+                "FROM projects p WHERE p.id = project_sources.project_id)"
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # ---- row <-> document ----
+
+    @staticmethod
+    def _to_doc(row_id: int, body: str) -> Dict:
+        return {"_id": row_id, **json.loads(body)}
+
+    @staticmethod
+    def _dumps(doc: Dict) -> str:
+        return json.dumps({k: v for k, v in doc.items() if k != "_id"}, separators=(",", ":"), default=str)
+
+    @staticmethod
+    def _categories(doc: Dict) -> List[str]:
+        category = doc.get("category")
+        values = category if isinstance(category, list) else [category]
+        return sorted({c for c in values if isinstance(c, str)})
+
+    def _write_side_tables(self, conn: sqlite3.Connection, project_id: int, doc: Dict) -> None:
+        conn.execute("DELETE FROM project_sources WHERE project_id = ?", (project_id,))
+        conn.execute("DELETE FROM project_categories WHERE project_id = ?", (project_id,))
+        conn.execute("DELETE FROM project_identity_keys WHERE project_id = ?", (project_id,))
+        conn.execute("DELETE FROM project_exchanges WHERE project_id = ?", (project_id,))
+        sources = doc.get("sources")
+        if isinstance(sources, dict) and sources:
+            conn.executemany(
+                "INSERT INTO project_sources (source, project_id, last_updated) VALUES (?, ?, ?)",
+                [(source, project_id, info.get("last_updated") if isinstance(info, dict) else None)
+                 for source, info in sources.items()],
+            )
+        categories = self._categories(doc)
+        if categories:
+            conn.executemany("INSERT INTO project_categories (category, project_id) VALUES (?, ?)",
+                             [(category, project_id) for category in categories])
+        identity_keys = doc.get("identity_keys")
+        if isinstance(identity_keys, list) and identity_keys:
+            conn.executemany("INSERT OR IGNORE INTO project_identity_keys (identity_key, project_id) VALUES (?, ?)",
+                             [(key, project_id) for key in identity_keys if isinstance(key, str)])
+        exchanges = doc.get("exchanges")
+        if isinstance(exchanges, list) and exchanges:
+            conn.executemany("INSERT OR IGNORE INTO project_exchanges (exchange_id, project_id) VALUES (?, ?)",
+                             [(exchange_id, project_id) for exchange_id in exchanges if type(exchange_id) is int])
+
+    # ---- lookups ----
+
+    def _find_one(self, where: str, params: Tuple) -> Optional[Dict]:
+        rows = self._query(f"SELECT id, doc FROM projects WHERE {where} ORDER BY id LIMIT 1", params)
+        return self._to_doc(*rows[0]) if rows else None
+
+    def find_by_uid(self, project_uid: str) -> Optional[Dict]:
+        return self._find_one("project_uid = ?", (project_uid,))
+
+    def find_by_identity(self, name_key: str, ticker_key: str) -> Optional[Dict]:
+        return self._find_one("name_key = ? AND ticker_key = ?", (name_key, ticker_key))
+
+    def find_by_name_key(self, name_key: str) -> Optional[Dict]:
+        return self._find_one("name_key = ?", (name_key,))
+
+    def _find_by_identity_keys(self, identity_keys: List[str]) -> List[Tuple]:
+        rows: List[Tuple] = []
+        keys = sorted(set(identity_keys))
+        for start in range(0, len(keys), IDENTITY_CHUNK * 2):
+            chunk = keys[start:start + IDENTITY_CHUNK * 2]
+            rows += self._query(
+                "SELECT DISTINCT p.id, p.doc FROM project_identity_keys k JOIN projects p ON p.id = k.project_id "
+                f"WHERE k.identity_key IN ({','.join('?' * len(chunk))})", tuple(chunk)
+            )
+        return rows
+
+    @staticmethod
+    def _oldest_first(rows: List[Tuple]) -> List[Tuple]:
+        return sorted({row[0]: row for row in rows}.values())
+
+    def find_by_identity_keys(self, identity_keys: List[str]) -> List[Dict]:
+        return [self._to_doc(*row) for row in self._oldest_first(self._find_by_identity_keys(identity_keys))]
+
+    def find_candidates(self, project_uids: List[str], identities: List[Tuple[str, str]],
+                        identity_keys: List[str] = ()) -> List[Dict]:
+        rows: List[Tuple] = []
+        uids = sorted(project_uids)
+        for start in range(0, len(uids), IDENTITY_CHUNK * 2):
+            chunk = uids[start:start + IDENTITY_CHUNK * 2]
+            rows += self._query(
+                f"SELECT id, doc FROM projects WHERE project_uid IN ({','.join('?' * len(chunk))})", tuple(chunk)
+            )
+        keys = sorted(identities)
+        for start in range(0, len(keys), IDENTITY_CHUNK):
+            chunk = keys[start:start + IDENTITY_CHUNK]
+            values = ",".join("(?, ?)" for _ in chunk)
+            rows += self._query(
+                f"SELECT id, doc FROM projects WHERE (name_key, ticker_key) IN (VALUES {values})",
+                tuple(part for key in chunk for part in key),
+            )
+        rows += self._find_by_identity_keys(list(identity_keys))
+        return [self._to_doc(*row) for row in self._oldest_first(rows)]
+
+    def iter_identities(self, batch_size: int = 2000) -> Iterator[Dict]:
+        last = 0
+        while True:
+            rows = self._query(
+                "SELECT id, project_uid, name_key, ticker_key, v, json_extract(doc, '$.project_name'), "
+                "project_ticker, json_extract(doc, '$.identity_keys') FROM projects WHERE id > ? ORDER BY id LIMIT ?",
+                (last, batch_size),
+            )
+            for _, uid, name_key, ticker_key, v, name, ticker, identity_keys in rows:
+                yield {"project_uid": uid, "name_key": name_key, "ticker_key": ticker_key, "_v": v,
+                       "project_name": name, "project_ticker": ticker,
+                       "identity_keys": json.loads(identity_keys) if identity_keys else []}
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][0]
+
+    # ---- writes ----
+
+    def _insert(self, conn: sqlite3.Connection, doc: Dict) -> bool:
+        cur = conn.execute(
+            "INSERT INTO projects (project_uid, name_key, ticker_key, project_ticker, v, doc) "
+            "SELECT ?, ?, ?, ?, ?, ? WHERE NOT EXISTS "
+            "(SELECT 1 FROM projects WHERE name_key = ? AND ticker_key = ?)",
+            (doc["project_uid"], doc["name_key"], doc["ticker_key"], doc.get("project_ticker"),
+             doc.get("_v") or 0, self._dumps(doc), doc["name_key"], doc["ticker_key"]),
+        )
+        if cur.rowcount == 0:
+            return False
+        self._write_side_tables(conn, cur.lastrowid, doc)
+        return True
+
+    def _update(self, conn: sqlite3.Connection, project_uid: str, version: Optional[int],
+                doc: Dict) -> Optional[int]:
+        new_version = (version or 0) + 1
+        body = {**doc, "_v": new_version}
+        cur = conn.execute(
+            "UPDATE projects SET doc = ?, v = ?, name_key = ?, ticker_key = ?, project_ticker = ? "
+            "WHERE project_uid = ? AND v = ?",
+            (self._dumps(body), new_version, doc["name_key"], doc["ticker_key"], doc.get("project_ticker"),
+             project_uid, version or 0),
+        )
+        if cur.rowcount == 0:
+            return None
+        row_id = conn.execute("SELECT id FROM projects WHERE project_uid = ?", (project_uid,)).fetchone()[0]
+        self._write_side_tables(conn, row_id, body)
+        return new_version
+
+    def insert_if_absent(self, doc: Dict) -> bool:
+        with self._transaction() as conn:
+            return self._insert(conn, doc)
+
+    def update_if_version(self, project_uid: str, version: Optional[int], doc: Dict,
+                          update: Dict[str, Dict]) -> Optional[int]:
+        """Stores the whole merged `doc`; the Mongo-specific `update` diff is not needed here."""
+        with self._transaction() as conn:
+            return self._update(conn, project_uid, version, doc)
+
+    def bulk_write(self, ops: List[WriteOp]) -> Dict[str, Any]:
+        """All ops in one transaction, with an exact per-op outcome."""
+        outcome: Dict[str, Any] = {"applied": set(), "conflicts": set(), "failed": {}}
+        with self._transaction() as conn:
+            for index, op in enumerate(ops):
+                try:
+                    if op["op"] == "insert":
+                        ok = self._insert(conn, op["doc"])
+                    else:
+                        ok = self._update(conn, op["project_uid"], op["version"], op["doc"]) is not None
+                except (sqlite3.Error, TypeError, ValueError) as e:
+                    outcome["failed"][index] = str(e)
+                    continue
+                outcome["applied" if ok else "conflicts"].add(index)
+        return outcome
+
+    # ---- exchange dimension ----
+
+    def resolve_exchanges(self, source: str, slugs: List[str], create: bool = True) -> Dict[str, int]:
+        """Alias, then key, then a new exchanges row, all in one transaction."""
+        resolved: Dict[str, int] = {}
+        with self._transaction() as conn:
+            for slug in dict.fromkeys(slugs):
+                if not isinstance(slug, str) or not slug.strip():
+                    continue
+                alias = exchange_alias(source, slug)
+                row = conn.execute("SELECT exchange_id FROM exchange_aliases WHERE alias = ?", (alias,)).fetchone()
+                if row is not None:
+                    resolved[slug] = row[0]
+                    continue
+                key = exchange_key(slug)
+                row = conn.execute("SELECT id FROM exchanges WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    exchange_id = row[0]
+                elif create:
+                    exchange_id = conn.execute("INSERT INTO exchanges (slug, key) VALUES (?, ?)", (slug, key)).lastrowid
+                else:
+                    continue
+                conn.execute("INSERT INTO exchange_aliases (alias, exchange_id) VALUES (?, ?)", (alias, exchange_id))
+                resolved[slug] = exchange_id
+        return resolved
+
+    def exchange_slugs(self, exchange_ids: List[int]) -> Dict[int, str]:
+        ids = sorted(set(exchange_ids))
+        slugs: Dict[int, str] = {}
+        for start in range(0, len(ids), IDENTITY_CHUNK * 2):
+            chunk = ids[start:start + IDENTITY_CHUNK * 2]
+            slugs.update(self._query(f"SELECT id, slug FROM exchanges WHERE id IN ({','.join('?' * len(chunk))})",
+                                     tuple(chunk)))
+        return slugs
+
+    def add_exchange_alias(self, exchange_id: int, source: str, slug: str) -> bool:
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM exchanges WHERE id = ?", (exchange_id,)).fetchone() is None:
+                return False
+            cur = conn.execute("INSERT OR IGNORE INTO exchange_aliases (alias, exchange_id) VALUES (?, ?)",
+                               (exchange_alias(source, slug), exchange_id))
+            return cur.rowcount == 1
+
+    # ---- market snapshots ----
+
+    def append_market_snapshots(self, snapshots: List[Dict]) -> None:
+        rows = [(snap["project_uid"], snap["t"].isoformat(sep=" ", timespec="milliseconds"), snap.get("source") or "",
+                 snap.get("market_cap"), snap.get("fdv"), snap.get("liquidity")) for snap in snapshots]
+        if rows:
+            with self._transaction() as conn:
+                conn.executemany("INSERT OR REPLACE INTO market_snapshots "
+                                 "(project_uid, t, source, market_cap, fdv, liquidity) VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def iter_market_snapshots(self, project_uid: str, start: Optional[datetime] = None,
+                              end: Optional[datetime] = None) -> Iterator[Dict]:
+        where, params = ["project_uid = ?"], [project_uid]
+        if start is not None:
+            where.append("t >= ?")
+            params.append(start.isoformat(sep=" ", timespec="milliseconds"))
+        if end is not None:
+            where.append("t <= ?")
+            params.append(end.isoformat(sep=" ", timespec="milliseconds"))
+        rows = self._query("SELECT t, source, market_cap, fdv, liquidity FROM market_snapshots "
+                           f"WHERE {' AND '.join(where)} ORDER BY t", tuple(params))
+        for t, source, market_cap, fdv, liquidity in rows:
+            snap = {"project_uid": project_uid, "t": datetime.fromisoformat(t), "source": source or None}
+            for field, value in (("market_cap", market_cap), ("fdv", fdv), ("liquidity", liquidity)):
+                if value is not None:
+                    snap[field] = value
+            yield snap
+
+    # ---- queries ----
+
+    def _iter_keyset(self, join: str, where: str, params: Tuple, projection: Projection,
+                     batch_size: int, sort_field: str, resume_after: Any) -> Iterator[Dict]:
+        """Keyset pagination over `projects p` (optionally joined), one short read per page."""
+        columns = {"_id": "p.id", "project_uid": "p.project_uid"}
+        if sort_field not in columns:
+            raise ValueError("sort_field must be '_id' or 'project_uid'")
+        column = columns[sort_field]
+
+        last = resume_after
+        while True:
+            conditions = [where] if where else []
+            page_params = params
+            if last is not None:
+                conditions.append(f"{column} > ?")
+                page_params = params + (last,)
+            sql = (f"SELECT p.id, p.doc FROM projects p {join} "
+                   f"{'WHERE ' + ' AND '.join(conditions) if conditions else ''} "
+                   f"ORDER BY {column} LIMIT ?")
+            page = [self._to_doc(*row) for row in self._query(sql, page_params + (batch_size,))]
+            for doc in page:
+                yield apply_projection(doc, projection)
+            if len(page) < batch_size:
+                return
+            last = page[-1][sort_field]
+
+    def iter_projects(self, projection: Projection = None, batch_size: int = 500,
+                      sort_field: str = "_id", resume_after: Any = None) -> Iterator[Dict]:
+        yield from self._iter_keyset("", "", (), projection, batch_size, sort_field, resume_after)
+
+    def iter_by_source(self, source: str, projection: Projection = None, batch_size: int = 500,
+                       sort_field: str = "_id", resume_after: Any = None) -> Iterator[Dict]:
+        yield from self._iter_keyset("JOIN project_sources s ON s.project_id = p.id", "s.source = ?",
+                                     (source,), projection, batch_size, sort_field, resume_after)
+
+    def iter_stale_by_source(self, source: str, before: str, projection: Projection = None,
+                             batch_size: int = 500, limit: int = 0) -> Iterator[Dict]:
+        """Range scan of project_sources_updated_idx, paged on (last_updated, project_id)."""
+        last: Optional[Tuple[str, int]] = None
+        remaining = limit
+        while True:
+            page_size = min(batch_size, remaining) if limit > 0 else batch_size
+            sql = ("SELECT s.last_updated, p.id, p.doc FROM project_sources s JOIN projects p ON p.id = s.project_id "
+                   "WHERE s.source = ? AND s.last_updated < ?")
+            params: Tuple = (source, before)
+            if last is not None:
+                sql += " AND (s.last_updated, s.project_id) > (?, ?)"
+                params += last
+            rows = self._query(sql + " ORDER BY s.last_updated, s.project_id LIMIT ?", params + (page_size,))
+            for _, row_id, body in rows:
+                yield apply_projection(self._to_doc(row_id, body), projection)
+            remaining -= len(rows)
+            if len(rows) < page_size or (limit > 0 and not remaining):
+                return
+            last = rows[-1][0], rows[-1][1]
+
+    def iter_by_category(self, category: str, projection: Projection = None, batch_size: int = 500,
+                         sort_field: str = "_id", resume_after: Any = None) -> Iterator[Dict]:
+        yield from self._iter_keyset("JOIN project_categories c ON c.project_id = p.id", "c.category = ?",
+                                     (category,), projection, batch_size, sort_field, resume_after)
+
+    def iter_by_exchange(self, exchange_id: int, projection: Projection = None, batch_size: int = 500,
+                         sort_field: str = "_id", resume_after: Any = None) -> Iterator[Dict]:
+        yield from self._iter_keyset("JOIN project_exchanges e ON e.project_id = p.id", "e.exchange_id = ?",
+                                     (exchange_id,), projection, batch_size, sort_field, resume_after)
+
+    def iter_by_ticker(self, project_ticker: str, projection: Projection = None,
+                       batch_size: int = 100) -> Iterator[Dict]:
+        yield from self._iter_keyset("", "p.project_ticker = ?", (project_ticker,), projection,
+                                     batch_size, "_id", None)
+
+    def list_duplicate_tickers(self, min_count: int = 2, use_counts: bool = False) -> List[Dict[str, Any]]:
+        """GROUP BY over project_ticker_idx; there is no separate counts table to read."""
+        rows = self._query(
+            "SELECT project_ticker, COUNT(*) AS n FROM projects "
+            "WHERE project_ticker IS NOT NULL AND project_ticker != '' "
+            "GROUP BY project_ticker HAVING n >= ? ORDER BY n DESC, project_ticker",
+            (min_count,),
+        )
+        return [{"project_ticker": ticker, "count": n} for ticker, n in rows]
+
+    def project_stats(self, market_cap_bounds: List[float]) -> Dict[str, Any]:
+        def _counts(sql: str) -> Dict[Any, int]:
+            return {value: n for value, n in self._query(sql)}
+
+        bounds = market_cap_bounds
+        market_cap: Dict[float, int] = {}
+        for (value,) in self._query(
+                "SELECT json_extract(doc, '$.market_cap') FROM projects "
+                "WHERE json_type(doc, '$.market_cap') IN ('integer', 'real')"):
+            if value < bounds[0]:
+                continue
+            lower = bounds[bisect_right(bounds, value) - 1]
+            market_cap[lower] = market_cap.get(lower, 0) + 1
+
+        return {
+            "total": self._query("SELECT COUNT(*) FROM projects")[0][0],
+            "sources": _counts("SELECT source, COUNT(*) AS n FROM project_sources "
+                               "GROUP BY source ORDER BY n DESC, source"),
+            "categories": _counts("SELECT category, COUNT(*) AS n FROM project_categories "
+                                  "GROUP BY category ORDER BY n DESC, category"),
+            "networks": _counts("SELECT j.value, COUNT(*) AS n FROM projects p, json_each(p.doc, '$.network') j "
+                                "WHERE j.type NOT IN ('object', 'array', 'null') "
+                                "GROUP BY j.value ORDER BY n DESC, j.value"),
+            "market_cap": market_cap,
+        }
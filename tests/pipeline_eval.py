@@ -0,0 +1,137 @@
+# tests/pipeline_eval.py
+"""
+In-process evaluator for the update-pipeline subset MasterProjectManager._build_merge_pipeline
+emits ($set / $unset stages and the expression operators in OPERATORS), so the server-side
+merge can be checked without a MongoDB server. mongomock does not implement several of these
+operators ($type, $reduce over $$value, ...). Field-path and BSON type semantics follow the
+server for the values the merge produces; anything else raises.
+"""
+from typing import Any, Callable, Dict, List
+
+MISSING = object()
+
+
+def _get_path(doc: Any, path: str) -> Any:
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return MISSING
+        doc = doc[part]
+    return doc
+
+
+def _bson_type(value: Any) -> str:
+    if value is MISSING:
+        return "missing"
+    if value is None:
+        return "null"
+    for python_type, name in ((bool, "bool"), (str, "string"), (dict, "object"), (list, "array"),
+                              (int, "int"), (float, "double")):
+        if isinstance(value, python_type):
+            return name
+    raise TypeError(f"No BSON type for {value!r}")
+
+
+def _null(value: Any) -> Any:
+    return None if value is MISSING else value
+
+
+def evaluate(expr: Any, doc: Dict, variables: Dict[str, Any]) -> Any:
+    """Value of an aggregation expression against `doc` with $$variables bound."""
+    if isinstance(expr, str):
+        if expr.startswith("$$"):
+            name, _, rest = expr[2:].partition(".")
+            value = variables[name]
+            return _get_path(value, rest) if rest else value
+        if expr.startswith("$"):
+            return _get_path(doc, expr[1:])
+        return expr
+    if isinstance(expr, list):
+        return [evaluate(item, doc, variables) for item in expr]
+    if not isinstance(expr, dict):
+        return expr
+    if len(expr) == 1:
+        (op, args), = expr.items()
+        if op.startswith("$"):
+            if op not in OPERATORS:
+                raise NotImplementedError(op)
+            return OPERATORS[op](args, doc, variables)
+    evaluated = ((k, evaluate(v, doc, variables)) for k, v in expr.items())
+    return {k: v for k, v in evaluated if v is not MISSING}
+
+
+def _merge_objects(args, doc, variables):
+    merged = {}
+    for item in args:
+        value = _null(evaluate(item, doc, variables))
+        if value is not None:
+            merged.update(value)
+    return merged
+
+
+def _reduce(args, doc, variables):
+    acc = evaluate(args["initialValue"], doc, variables)
+    for item in evaluate(args["input"], doc, variables):
+        acc = evaluate(args["in"], doc, {**variables, "this": item, "value": acc})
+    return acc
+
+
+def _map(args, doc, variables):
+    name = args.get("as", "this")
+    return [evaluate(args["in"], doc, {**variables, name: item}) for item in evaluate(args["input"], doc, variables)]
+
+
+def _let(args, doc, variables):
+    bound = dict(variables)
+    for name, expr in args["vars"].items():
+        bound[name] = evaluate(expr, doc, variables)
+    return evaluate(args["in"], doc, bound)
+
+
+def _if_null(args, doc, variables):
+    value = _null(evaluate(args[0], doc, variables))
+    return value if value is not None else evaluate(args[1], doc, variables)
+
+
+OPERATORS: Dict[str, Callable[[Any, Dict, Dict[str, Any]], Any]] = {
+    "$literal": lambda a, d, v: a,
+    "$type": lambda a, d, v: _bson_type(evaluate(a, d, v)),
+    "$isArray": lambda a, d, v: isinstance(evaluate(a, d, v), list),
+    "$eq": lambda a, d, v: _null(evaluate(a[0], d, v)) == _null(evaluate(a[1], d, v)),
+    "$ne": lambda a, d, v: _null(evaluate(a[0], d, v)) != _null(evaluate(a[1], d, v)),
+    "$in": lambda a, d, v: evaluate(a[0], d, v) in evaluate(a[1], d, v),
+    "$and": lambda a, d, v: all(evaluate(item, d, v) for item in a),
+    "$or": lambda a, d, v: any(evaluate(item, d, v) for item in a),
+    "$cond": lambda a, d, v: evaluate(a[1] if evaluate(a[0], d, v) else a[2], d, v),
+    "$ifNull": _if_null,
+    "$let": _let,
+    "$trim": lambda a, d, v: evaluate(a["input"], d, v).strip(),
+    "$toLower": lambda a, d, v: evaluate(a, d, v).lower(),
+    "$add": lambda a, d, v: sum(evaluate(item, d, v) for item in a),
+    "$size": lambda a, d, v: len(evaluate(a, d, v)),
+    "$mergeObjects": _merge_objects,
+    "$objectToArray": lambda a, d, v: [{"k": k, "v": val} for k, val in evaluate(a, d, v).items()],
+    "$concatArrays": lambda a, d, v: [item for part in a for item in evaluate(part, d, v)],
+    "$setIntersection": lambda a, d, v: list(set(evaluate(a[0], d, v)) & set(evaluate(a[1], d, v))),
+    "$reduce": _reduce,
+    "$map": _map,
+}
+
+
+def apply_pipeline(doc: Dict, pipeline: List[Dict]) -> Dict:
+    """Document that running the update pipeline against `doc` leaves behind."""
+    doc = dict(doc)
+    for stage in pipeline:
+        (op, spec), = stage.items()
+        if op == "$set":
+            updated = dict(doc)
+            for field, expr in spec.items():
+                value = evaluate(expr, doc, {})
+                if value is not MISSING:
+                    updated[field] = value
+            doc = updated
+        elif op == "$unset":
+            for field in [spec] if isinstance(spec, str) else spec:
+                doc.pop(field, None)
+        else:
+            raise NotImplementedError(op)
+    return doc
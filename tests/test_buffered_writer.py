@@ -0,0 +1,75 @@
+# tests/test_buffered_writer.py
+"""BufferedProjectWriter: coalescing per (source, identity), flush triggers and flush on close."""
+import time
+
+import pytest
+
+from BufferedProjectWriter import BufferedProjectWriter
+from ProjectRecord import ProjectRecord
+
+
+class RecordingManager:
+    """Stands in for MasterProjectManager and records the bulk calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def bulk_upsert_projects(self, payloads, source):
+        self.calls.append((source, payloads))
+        errors = [{"index": i, "project_name": p["project_name"], "error": "rejected"}
+                  for i, p in enumerate(payloads) if p.get("reject")]
+        return {"errors": errors}
+
+
+def test_repeated_identities_are_coalesced_into_one_flush():
+    manager = RecordingManager()
+    with BufferedProjectWriter(manager, max_batch=100, flush_interval=60) as writer:
+        writer.upsert_project({"project_name": "Alpha", "project_ticker": "ALP", "about": "a"}, "coingecko")
+        writer.upsert_project({"project_name": " alpha ", "project_ticker": "alp", "about": "b"}, "coingecko")
+        writer.upsert_project(ProjectRecord(project_name="Beta", project_ticker="BET"), "coingecko")
+        writer.upsert_project({"project_name": "Alpha", "project_ticker": "ALP"}, "coinmarketcap")
+        stats = writer.stats()
+        assert manager.calls == []
+
+    assert stats["queue_depth"] == 3 and stats["coalesced"] == 1
+    by_source = dict(manager.calls)
+    assert [p.get("about") for p in by_source["coingecko"]] == ["a", "b", None]
+    assert [p["project_name"] for p in by_source["coinmarketcap"]] == ["Alpha"]
+
+
+def test_max_batch_triggers_a_background_flush():
+    manager = RecordingManager()
+    writer = BufferedProjectWriter(manager, max_batch=2, flush_interval=60)
+    try:
+        writer.upsert_project({"project_name": "A", "project_ticker": "A"}, "coingecko")
+        writer.upsert_project({"project_name": "B", "project_ticker": "B"}, "coingecko")
+        deadline = time.monotonic() + 5
+        while not manager.calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(manager.calls) == 1
+    finally:
+        writer.close()
+
+
+def test_failed_items_are_reported_and_writes_after_close_rejected():
+    manager = RecordingManager()
+    writer = BufferedProjectWriter(manager, max_batch=100, flush_interval=60)
+    writer.upsert_project({"project_name": "A", "project_ticker": "A", "reject": True}, "coingecko")
+    writer.upsert_project({"project_name": "B", "project_ticker": "B"}, "coingecko")
+    writer.close()
+
+    assert [item["project_name"] for item in writer.failed_items] == ["A"]
+    assert writer.stats()["flushed"] == 1
+    with pytest.raises(RuntimeError):
+        writer.upsert_project({"project_name": "C", "project_ticker": "C"}, "coingecko")
+    with BufferedProjectWriter(manager) as other, pytest.raises(ValueError):
+        other.upsert_project({"project_name": "", "project_ticker": "C"}, "coingecko")
+
+
+def test_writes_reach_the_store(manager):
+    with BufferedProjectWriter(manager, max_batch=100, flush_interval=60) as writer:
+        writer.upsert_project({"project_name": "Alpha", "project_ticker": "ALP", "category": ["Defi"]}, "coingecko")
+        writer.upsert_project({"project_name": "Alpha", "project_ticker": "ALP", "category": ["Ai"]}, "coingecko")
+
+    doc = manager.find_existing_project("Alpha", "ALP")
+    assert set(doc["category"]) == {"Defi", "Ai"}
@@ -0,0 +1,43 @@
+# tests/test_bulk_upsert.py
+"""bulk_upsert_projects: one prefetch, one bulk write, in-batch coalescing and per-item errors."""
+
+
+def test_inserts_updates_and_reports_per_item(manager):
+    manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP", "about": "old"}, "coinmarketcap")
+
+    result = manager.bulk_upsert_projects([
+        {"project_name": "alpha", "project_ticker": "alp", "about": "new"},
+        {"project_name": "Beta", "project_ticker": "BET"},
+        {"project_name": "", "project_ticker": "X"},
+    ], "coingecko")
+
+    assert result["inserted"] == 1
+    assert result["updated"] == 1
+    assert [err["index"] for err in result["errors"]] == [2]
+    alpha_uid, beta_uid, failed_uid = result["project_uids"]
+    assert failed_uid is None
+    assert manager.get_project_by_uid(alpha_uid)["about"] == "new"
+    assert manager.get_project_by_uid(beta_uid)["project_ticker"] == "BET"
+
+
+def test_items_for_the_same_project_become_one_write(manager):
+    result = manager.bulk_upsert_projects([
+        {"project_name": "Gamma", "project_ticker": "GAM", "category": ["Defi"]},
+        {"project_name": "GAMMA", "project_ticker": "gam", "category": ["Ai"]},
+    ], "coingecko")
+
+    assert result["inserted"] == 1
+    assert result["project_uids"][0] == result["project_uids"][1]
+    stored = manager.get_project_by_uid(result["project_uids"][0])
+    assert set(stored["category"]) == {"Defi", "Ai"}
+
+
+def test_unchanged_documents_are_not_written(manager):
+    payload = {"project_name": "Delta", "project_ticker": "DEL", "about": "same"}
+    manager.bulk_upsert_projects([payload], "coingecko")
+    before = manager.get_project_by_uid(manager.bulk_upsert_projects([payload], "coingecko")["project_uids"][0])
+
+    result = manager.bulk_upsert_projects([payload], "coingecko")
+
+    assert result["unchanged"] == 1 and result["updated"] == 0
+    assert manager.get_project_by_uid(result["project_uids"][0])["_v"] == before["_v"]
@@ -0,0 +1,84 @@
+# tests/test_cg_page_extractor.py
+"""CoinGecko coin pages parsed over HTTP, Selenium only for the fields the page lacked."""
+from pathlib import Path
+
+from scrapers.coingecko import cg_data_extractor as cg
+
+PAGES = Path(__file__).resolve().parent / "fixtures" / "coin_pages" / "coingecko"
+URL = "https://www.coingecko.com/en/coins/pepe"
+
+
+def page(name: str) -> str:
+    return (PAGES / f"{name}.html").read_text()
+
+
+class FakeDriver:
+    """Records the pages loaded and the elements looked up."""
+
+    def __init__(self):
+        self.loaded = []
+        self.lookups = []
+
+    def get(self, url):
+        self.loaded.append(url)
+
+    def find_element(self, by, selector):
+        self.lookups.append(selector)
+        raise RuntimeError("no such element")
+
+
+def test_coin_page_supplies_every_field():
+    fields, missing = cg.extract_details_from_html(page("pepe"), URL)
+
+    assert missing == []
+    assert (fields["project_name"], fields["project_ticker"]) == ("Pepe Coin", "PEPE")
+    assert (fields["market_cap"], fields["fdv"]) == (1234567.0, 2.5e6)
+    assert (fields["about"], fields["important_note"]) == ("Pepe is a frog.", "Beware of scams")
+    # Ecosystem categories are networks, the rest categories
+    assert (fields["category"], fields["network"]) == (["Meme Token"], ["Base", "Ethereum", "Solana"])
+    assert fields["socials"] == {"website": "https://pepe.vip", "twitter_link": "https://x.com/pepe",
+                                 "telegram_link": "https://t.me/pepe"}
+
+
+def test_empty_page_leaves_everything_to_selenium():
+    assert cg.extract_details_from_html("<html></html>") == ({}, list(cg.SELENIUM_FALLBACK_FIELDS))
+
+
+def test_page_tags_merge_with_the_listing_case_insensitively():
+    project = cg.apply_page_fields({"category": ["meme token", "Frog"]},
+                                   cg.extract_details_from_html(page("pepe"), URL)[0])
+
+    assert project["category"] == ["Frog", "Meme Token"]
+    assert project["project_ticker"] == "PEPE"
+
+
+def stub_fallbacks(monkeypatch):
+    fallbacks = []
+    for name in ("get_coin_symbol", "get_project_info_section", "extract_market_cap", "get_about_text"):
+        monkeypatch.setattr(cg, name, lambda *args, name=name: fallbacks.append(name) or {})
+    monkeypatch.setattr(cg, "extract_exchanges", lambda driver: ["binance", "okx"])
+    return fallbacks
+
+
+def test_enrichment_loads_the_browser_only_for_exchanges(monkeypatch):
+    monkeypatch.setattr(cg, "fetch_html", lambda url: page("pepe"))
+    fallbacks = stub_fallbacks(monkeypatch)
+    driver = FakeDriver()
+
+    project = cg.enrich_project_with_details(driver, {"sources": {"coingecko": URL}})
+
+    assert driver.loaded == [URL]
+    assert (fallbacks, driver.lookups) == ([], [])
+    assert project["exchanges"] == ["binance", "okx"]
+    assert project["market_cap"] == 1234567.0
+
+
+def test_failed_fetch_falls_back_to_the_browser(monkeypatch):
+    monkeypatch.setattr(cg, "fetch_html", lambda url: None)
+    fallbacks = stub_fallbacks(monkeypatch)
+    driver = FakeDriver()
+
+    cg.enrich_project_with_details(driver, {"sources": {"coingecko": URL}})
+
+    assert fallbacks == ["get_coin_symbol", "get_project_info_section", "extract_market_cap", "get_about_text"]
+    assert cg.COIN_NAME_TEXT in driver.lookups and cg.IMPORTANT_TEXT in driver.lookups
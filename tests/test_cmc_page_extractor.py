@@ -0,0 +1,79 @@
+# tests/test_cmc_page_extractor.py
+"""CMC coin pages parsed over HTTP from their __NEXT_DATA__, Selenium only for what is missing."""
+from pathlib import Path
+
+from scrapers.cmc import data_extractor as cmc
+
+PAGES = Path(__file__).resolve().parent / "fixtures" / "coin_pages" / "coinmarketcap"
+URL = "https://coinmarketcap.com/currencies/bitcoin/"
+
+
+def page(name: str) -> str:
+    return (PAGES / f"{name}.html").read_text()
+
+
+class FakeDriver:
+    """Records the pages loaded."""
+
+    def __init__(self):
+        self.loaded = []
+
+    def get(self, url):
+        self.loaded.append(url)
+
+
+def test_next_data_supplies_every_field():
+    fields, has_page_data = cmc.extract_details_from_html(page("bitcoin"))
+
+    assert has_page_data
+    assert (fields["project_name"], fields["project_ticker"]) == ("Bitcoin", "BTC")
+    assert (fields["market_cap"], fields["fdv"]) == (1.2e12, 1.3e12)
+    assert fields["about"] == "Bitcoin is digital gold."
+    # Ecosystem tags are networks, the rest categories
+    assert (fields["category"], fields["network"]) == (["Mineable", "Pow"], ["Bnb Chain"])
+    assert fields["contracts"] == {"Ethereum": "0xABC0000000000000000000000000000000000001"}
+    assert fields["socials"] == {
+        "website": "https://bitcoin.org/", "twitter_link": "https://twitter.com/bitcoin",
+        "telegram_link": "https://t.me/bitcoin", "discord_link": "https://discord.gg/x",
+        "reddit_link": "https://reddit.com/r/bitcoin", "github_link": "https://github.com/bitcoin/bitcoin"}
+
+
+def test_page_without_coin_data_falls_back_to_the_markup():
+    assert cmc.extract_details_from_html(page("bare")) == ({"project_name": "Bare", "project_ticker": "BR"}, False)
+    assert cmc.extract_details_from_html("<html></html>") == ({}, False)
+
+
+def test_listing_name_and_ticker_win_over_the_page():
+    project = cmc.apply_page_fields({"project_name": "BTC Listing", "category": ["Store Of Value"],
+                                     "contracts": {"Ethereum": "0xlisting"}},
+                                    cmc.extract_details_from_html(page("bitcoin"))[0])
+
+    assert (project["project_name"], project["project_ticker"]) == ("BTC Listing", "BTC")
+    assert project["contracts"] == {"Ethereum": "0xlisting"}
+    assert "Store Of Value" in project["category"] and "Mineable" in project["category"]
+
+
+def test_enrichment_loads_the_browser_only_for_exchanges(monkeypatch):
+    monkeypatch.setattr(cmc, "fetch_html", lambda url: page("bitcoin"))
+    monkeypatch.setattr(cmc, "extract_exchanges", lambda driver: ["binance", "okx"])
+    fallbacks = []
+    for name in ("extract_project_name", "extract_project_ticker", "extract_market_cap",
+                 "extract_all_social_links", "extract_categories"):
+        monkeypatch.setattr(cmc, name, lambda driver, name=name: fallbacks.append(name))
+    driver = FakeDriver()
+
+    project = cmc.enrich_project_with_details(driver, {"sources": {"coinmarketcap": URL}})
+
+    assert driver.loaded == [URL]
+    assert fallbacks == []
+    assert project["exchanges"] == ["binance", "okx"]
+    assert project["market_cap"] == 1.2e12
+
+
+def test_http_only_pass_needs_no_driver(monkeypatch):
+    monkeypatch.setattr(cmc, "fetch_html", lambda url: page("bitcoin"))
+
+    project = cmc.enrich_project_with_details(None, {"sources": {"coinmarketcap": URL}})
+
+    assert project["project_ticker"] == "BTC" and "exchanges" not in project
+
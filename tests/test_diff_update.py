@@ -0,0 +1,40 @@
+# tests/test_diff_update.py
+"""_diff_update: field-level $set / $addToSet documents instead of rewriting the whole project."""
+
+
+def test_nested_changes_become_dotted_paths(manager):
+    existing = {"_id": 1, "_v": 3, "about": "a", "sources": {"coingecko": {"url": "g", "last_updated": "2025-01-01"}}}
+    merged = {**existing, "sources": {"coingecko": {"url": "g", "last_updated": "2025-02-01"}}}
+
+    assert manager._diff_update(existing, merged) == {
+        "$set": {"sources.coingecko.last_updated": "2025-02-01"},
+        "$inc": {"_v": 1},
+    }
+
+
+def test_appended_strings_become_add_to_set(manager):
+    existing = {"category": ["Defi"], "market_cap": 1.0}
+    merged = {"category": ["Defi", "Ai"], "market_cap": 2.0}
+
+    update = manager._diff_update(existing, merged)
+
+    assert update["$addToSet"] == {"category": {"$each": ["Ai"]}}
+    assert update["$set"] == {"market_cap": 2.0}
+
+
+def test_reordered_lists_and_type_changes_are_set_whole(manager):
+    update = manager._diff_update({"category": ["a", "b"], "rank": 1}, {"category": ["b", "a"], "rank": 1.0})
+    assert update["$set"] == {"category": ["b", "a"], "rank": 1.0}
+
+
+def test_no_change_means_no_update(manager):
+    doc = {"_id": 1, "_v": 0, "about": "a", "socials": {"website": "w"}}
+    assert manager._diff_update(doc, {**doc, "socials": {"website": "w"}}) == {}
+
+
+def test_update_writes_only_the_changed_fields(manager):
+    uid = manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP", "about": "a"}, "coingecko")
+    manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP", "about": "b"}, "coingecko")
+
+    doc = manager.get_project_by_uid(uid)
+    assert doc["about"] == "b" and doc["_v"] == 1
@@ -0,0 +1,200 @@
+# tests/test_driver_pool.py
+"""DriverPool: reuse, limits, recycling and session recovery, with fake drivers."""
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import InvalidSessionIdException
+
+from utils.driver_pool import DriverPool, dedicated_kind
+
+KIND = "fake"
+
+
+class FakeDriver:
+    """Stands in for a WebDriver: `dead` fails the liveness probe, `session_lost` every call."""
+    started = 0
+
+    def __init__(self):
+        FakeDriver.started += 1
+        self.id = FakeDriver.started
+        self.dead = False
+        self.session_lost = False
+        self.loaded = []
+        self.quits = 0
+        self.current_window_handle = "main"
+
+    @property
+    def current_url(self):
+        if self.dead:
+            raise RuntimeError("browser gone")
+        if self.session_lost:
+            raise InvalidSessionIdException("invalid session id")
+        return self.loaded[-1] if self.loaded else None
+
+    def get(self, url):
+        if self.session_lost:
+            raise InvalidSessionIdException("invalid session id")
+        self.loaded.append(url)
+
+    def title(self):
+        if self.session_lost:
+            raise InvalidSessionIdException("invalid session id")
+        return f"page of driver {self.id}"
+
+    def quit(self):
+        self.quits += 1
+
+
+@pytest.fixture
+def pool():
+    pool = DriverPool(max_navigations=3, checkout_timeout=5)
+    pool.register(KIND, FakeDriver, max_size=2)
+    yield pool
+    pool.close()
+
+
+def test_checked_in_driver_is_reused(pool):
+    with pool.driver(KIND) as first:
+        browser = first._driver
+    with pool.driver(KIND) as second:
+        assert second._driver is browser
+
+    stats = pool.metrics()[KIND]
+    assert (stats["checkouts"], stats["spawns"], stats["live"], stats["idle"], stats["in_use"]) == (2, 1, 1, 1, 0)
+
+
+def test_checkout_waits_for_a_checkin_and_times_out(pool):
+    a, b = pool.checkout(KIND), pool.checkout(KIND)
+    assert pool.capacity(KIND) == 0
+    with pytest.raises(TimeoutError):
+        pool.checkout(KIND, timeout=0.05)
+
+    threading.Timer(0.05, pool.checkin, args=(b,)).start()
+    c = pool.checkout(KIND, timeout=2)
+
+    assert c is b and pool.metrics()[KIND]["max_wait"] >= 0.05
+    pool.checkin(a)
+    pool.checkin(c)
+
+
+def test_driver_is_recycled_after_max_navigations(pool):
+    with pool.driver(KIND) as pooled:
+        for url in ("u1", "u2", "u3"):
+            pooled.get(url)
+        browser = pooled._driver
+
+    assert browser.quits == 1
+    assert pool.metrics()[KIND]["recycles"]["navigations"] == 1
+    with pool.driver(KIND) as pooled:
+        assert pooled._driver is not browser
+
+
+def test_dead_idle_driver_is_replaced_at_checkout(pool):
+    with pool.driver(KIND) as pooled:
+        pooled._driver.dead = True
+        browser = pooled._driver
+
+    with pool.driver(KIND) as pooled:
+        assert pooled._driver is not browser
+    assert pool.metrics()[KIND]["recycles"]["dead"] == 1
+
+
+def test_lost_session_starts_a_new_browser_on_the_last_url(pool):
+    with pool.driver(KIND) as pooled:
+        pooled.get("https://example.com/coin")
+        pooled._driver.session_lost = True
+
+        assert pooled.title().startswith("page of driver")
+        assert pooled._driver.loaded == ["https://example.com/coin"]
+        assert pooled.current_url == "https://example.com/coin"
+    assert pool.metrics()[KIND]["respawns"] == 1
+
+
+def test_quit_or_discarded_drivers_are_not_kept(pool):
+    quit_driver, discarded = pool.checkout(KIND), pool.checkout(KIND)
+    quit_driver.quit()
+    pool.checkin(quit_driver)
+    pool.checkin(discarded, discard=True)
+
+    stats = pool.metrics()[KIND]
+    assert (stats["live"], stats["idle"]) == (0, 0)
+    assert stats["recycles"]["quit"] == 1 and stats["recycles"]["dead"] == 1
+
+
+def test_failed_start_frees_its_slot():
+    pool = DriverPool()
+    starts = []
+
+    def flaky():
+        starts.append(1)
+        if len(starts) == 1:
+            raise RuntimeError("chrome failed to start")
+        return FakeDriver()
+
+    pool.register(KIND, flaky, max_size=1)
+    with pytest.raises(RuntimeError):
+        pool.checkout(KIND)
+    with pool.driver(KIND, timeout=0.05) as pooled:
+        assert isinstance(pooled._driver, FakeDriver)
+    pool.close()
+
+
+def test_close_quits_idle_drivers_and_later_checkins(pool):
+    idle, busy = pool.checkout(KIND), pool.checkout(KIND)
+    pool.checkin(idle)
+
+    pool.close()
+    assert idle._driver.quits == 1 and busy._driver.quits == 0
+    pool.checkin(busy)
+
+    assert busy._driver.quits == 1 and pool.metrics()[KIND]["live"] == 0
+    with pytest.raises(RuntimeError):
+        pool.checkout(KIND)
+
+
+def test_window_setup_runs_once_per_window_and_browser():
+    pool = DriverPool()
+    prepared = []
+    pool.register(KIND, FakeDriver, window_setup=lambda driver: prepared.append((driver.id, driver.current_window_handle)))
+
+    with pool.driver(KIND) as pooled:
+        pooled.get("u1")
+        pooled.get("u2")
+        pooled._driver.current_window_handle = "popup"
+        pooled.get("u3")
+        first = pooled._driver.id
+        pooled._driver.session_lost = True
+        pooled.get("u4")
+
+    assert prepared == [(first, "main"), (first, "popup"), (pooled._driver.id, "main")]
+    pool.close()
+
+
+def test_kinds():
+    pool = DriverPool()
+    assert pool.max_size(dedicated_kind("telegram_1")) == 1
+    with pytest.raises(ValueError):
+        pool.checkout("unknown")
+
+
+def test_concurrent_checkouts_never_exceed_max_size(pool):
+    in_use, peak, lock = [0], [0], threading.Lock()
+
+    def borrow():
+        with pool.driver(KIND):
+            with lock:
+                in_use[0] += 1
+                peak[0] = max(peak[0], in_use[0])
+            time.sleep(0.01)
+            with lock:
+                in_use[0] -= 1
+
+    threads = [threading.Thread(target=borrow) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert peak[0] == 2
+    assert pool.metrics()[KIND]["checkouts"] == 8
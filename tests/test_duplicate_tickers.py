@@ -0,0 +1,43 @@
+# tests/test_duplicate_tickers.py
+"""Duplicate-ticker report: listed first, then streamed one group at a time."""
+import pytest
+
+from MasterProjectManager import MasterProjectManager
+
+
+def seed(manager):
+    for name, ticker in [("Gold A", "GOLD"), ("Gold B", "GOLD"), ("Gold C", "GOLD"),
+                         ("Sun A", "SUN"), ("Sun B", "SUN"), ("Solo", "ONE")]:
+        manager.upsert_project({"project_name": name, "project_ticker": ticker, "about": "long text",
+                                "sources": {"coingecko": name}}, "coingecko")
+
+
+def test_groups_are_listed_most_duplicated_first(any_manager):
+    seed(any_manager)
+    assert any_manager.list_duplicate_tickers() == [{"project_ticker": "GOLD", "count": 3},
+                                                   {"project_ticker": "SUN", "count": 2}]
+    assert any_manager.list_duplicate_tickers(min_count=3) == [{"project_ticker": "GOLD", "count": 3}]
+
+
+def test_groups_stream_their_members_without_large_fields(any_manager):
+    seed(any_manager)
+
+    groups = any_manager.iter_projects_grouped_by_duplicate_ticker()
+    first = next(groups)
+
+    assert first["project_ticker"] == "GOLD" and first["count"] == 3
+    assert sorted(p["project_name"] for p in first["projects"]) == ["Gold A", "Gold B", "Gold C"]
+    assert all("about" not in p for p in first["projects"])
+    assert [g["project_ticker"] for g in groups] == ["SUN"]
+
+
+@pytest.mark.parametrize("rebuild", [False, True])
+def test_counts_table_matches_the_aggregation(sqlite_store, rebuild):
+    manager = MasterProjectManager(store=sqlite_store, maintain_ticker_counts=not rebuild,
+                                   record_market_snapshots=False)
+    seed(manager)
+    if rebuild:
+        manager.rebuild_ticker_counts()
+
+    assert (manager.list_duplicate_tickers(use_counts_collection=True)
+            == manager.list_duplicate_tickers(use_counts_collection=False))
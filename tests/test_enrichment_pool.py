@@ -0,0 +1,133 @@
+# tests/test_enrichment_pool.py
+"""Concurrent enrichment: detail workers, the Telegram stage and the writing consumer."""
+import threading
+import time
+
+import pytest
+
+import utils.enrichment_pool as ep
+from utils.driver_pool import DriverPool
+
+KIND = "fake"
+
+
+class FakeDriver:
+    """Stands in for a WebDriver; `dead` makes the liveness probe fail."""
+
+    def __init__(self):
+        self.dead = False
+        self.url = None
+
+    @property
+    def current_url(self):
+        if self.dead:
+            raise RuntimeError("browser gone")
+        return self.url
+
+    def get(self, url):
+        self.url = url
+
+    def quit(self):
+        pass
+
+
+class RecordingWriter:
+    def __init__(self, fail_on=()):
+        self.fail_on = set(fail_on)
+        self.written = []
+
+    def upsert_project(self, record, source):
+        if record.project_name in self.fail_on:
+            raise RuntimeError("write failed")
+        self.written.append(record.project_name)
+
+
+def enrich(driver, project):
+    time.sleep(project.get("delay", 0.005))
+    if project.get("crash"):
+        driver._driver.dead = True
+        raise RuntimeError("browser crashed")
+    return {"project_name": project["name"], "project_ticker": "TKR", "sources": project["sources"]}
+
+
+@pytest.fixture
+def driver_pool():
+    pool = DriverPool()
+    pool.register(KIND, FakeDriver, max_size=3)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def telegram_threads(monkeypatch):
+    """Names of the threads the Telegram lookups ran on."""
+    threads = []
+
+    def lookup(driver, record, chrome_profile):
+        threads.append(threading.current_thread().name)
+        if record.project_name == "p2":
+            raise RuntimeError("telegram down")
+        return record
+
+    monkeypatch.setattr(ep, "enrich_email_data", lambda record: record)
+    monkeypatch.setattr(ep, "enrich_telegram_data", lookup)
+    return threads
+
+
+def projects(n, **extra):
+    items = [{"name": f"p{i}", "sources": {"coingecko": f"https://example.com/p{i}"}} for i in range(n)]
+    for position, fields in extra.items():
+        items[int(position[1:])].update(fields)
+    return items
+
+
+def run(driver_pool, items, writer, workers=3):
+    return ep.enrich_projects_concurrently(items, "coingecko", enrich, writer, None, "profile",
+                                           workers=workers, driver_pool=driver_pool, driver_kind=KIND)
+
+
+def test_records_are_written_in_page_order_with_telegram_off_the_consumer(driver_pool, telegram_threads, capsys):
+    writer = RecordingWriter()
+
+    records = run(driver_pool, projects(12), writer)
+
+    assert [r.project_name for r in records] == [f"p{i}" for i in range(12)]
+    assert sorted(writer.written) == sorted(r.project_name for r in records)
+    assert set(telegram_threads) == {"telegram-stage"}
+    # A failed Telegram lookup still writes the record, and the report has the stage's row
+    out = capsys.readouterr().out
+    assert "Telegram lookup failed for project 3" in out
+    assert "    tg       12      1" in out
+    assert driver_pool.metrics()[KIND]["in_use"] == 0
+
+
+def test_failed_projects_and_writes_only_fail_themselves(driver_pool, telegram_threads, capsys):
+    writer = RecordingWriter(fail_on={"p5"})
+
+    records = run(driver_pool, projects(10, p4={"crash": True}), writer)
+
+    assert [r.project_name for r in records] == [f"p{i}" for i in range(10) if i not in (4, 5)]
+    assert "enriched=8 failed=2 unprocessed=0" in capsys.readouterr().out
+    assert driver_pool.metrics()[KIND]["respawns"] == 1
+
+
+def test_consumer_error_stops_the_workers_and_releases_their_drivers(driver_pool, telegram_threads):
+    class InterruptingWriter(RecordingWriter):
+        def upsert_project(self, record, source):
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        run(driver_pool, [{**p, "delay": 0.1} for p in projects(50)], InterruptingWriter())
+
+    assert not [t for t in threading.enumerate() if t.name.startswith(("detail-worker", "telegram-stage"))]
+    assert driver_pool.metrics()[KIND]["in_use"] == 0
+
+
+def test_pool_report_includes_the_telegram_stage(capsys):
+    worker = {"worker": 0, "projects": 4, "failed": 0, "busy_seconds": 2.0, "checkout_seconds": 0.5,
+              "driver_restarts": 0, "wall_seconds": 4.0}
+    ep.print_pool_report([worker], 4.0, {"lookups": 4, "failed": 1, "busy_seconds": 3.0, "wall_seconds": 4.0})
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[2].split() == ["tg", "4", "1", "3.0", "0.75", "75%"]
+    assert lines[3] == "1 workers + telegram stage: 4 projects in 4.0s (1.00/s)"
@@ -0,0 +1,69 @@
+# tests/test_exchange_ids.py
+"""Exchange dimension: slugs from the scrapers become ids of the manager's own store."""
+import ast
+from pathlib import Path
+
+from scripts.exchange_ids_migration import converted
+from utils.text_utils import exchange_key
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_exchange_key_normalizes_across_sources():
+    assert exchange_key("Uniswap_V2") == "uniswap-v2"
+    assert exchange_key("  PancakeSwap   V3 ") == "pancakeswap-v3"
+    assert exchange_key("mexc") == "mexc"
+
+
+def test_slugs_resolve_to_ids_of_the_managers_store(manager):
+    uid = manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP",
+                                  "exchanges": ["mexc", "gate", "mexc"]}, "coinmarketcap")
+
+    doc = manager.get_project_by_uid(uid)
+    mexc, gate = manager.exchange_id("coinmarketcap", "mexc"), manager.exchange_id("coinmarketcap", "gate")
+    assert doc["exchanges"] == [mexc, gate]
+    assert manager.exchange_slugs(doc["exchanges"]) == ["mexc", "gate"]
+    assert [p["project_name"] for p in manager.get_projects_by_exchange(gate)] == ["Alpha"]
+
+
+def test_one_exchange_key_shares_an_id_across_sources(manager):
+    cmc = manager._with_exchange_ids([{"exchanges": ["uniswap-v2"]}], "coinmarketcap")[0]
+    cg = manager._with_exchange_ids([{"exchanges": ["uniswap_v2"]}], "coingecko")[0]
+
+    assert cmc["exchanges"] == cg["exchanges"]
+
+
+def test_alias_points_a_source_slug_at_an_existing_exchange(manager):
+    okx = manager.exchange_registry.ids_for("coinmarketcap", ["okx"])[0]
+
+    assert manager.exchange_registry.add_alias(okx, "coingecko", "okex")
+    assert manager._with_exchange_ids([{"exchanges": ["okex"]}], "coingecko")[0]["exchanges"] == [okx]
+
+
+def test_ids_in_payloads_are_dropped(manager, capsys):
+    # An id from another store (or another run's default store) must not be stored as this one's
+    payloads = manager._with_exchange_ids(
+        [{"exchanges": [987654, "mexc"]}, {"exchanges": [123456]}, {"project_name": "No exchanges"}],
+        "coinmarketcap")
+
+    assert payloads[0]["exchanges"] == [manager.exchange_id("coinmarketcap", "mexc")]
+    assert payloads[1]["exchanges"] == []
+    assert payloads[2] == {"project_name": "No exchanges"}
+    assert "Dropped 2 exchange ids" in capsys.readouterr().out
+
+
+def test_migration_keeps_ids_read_from_the_store(manager):
+    gate = manager.exchange_registry.ids_for("coinmarketcap", ["gate"])[0]
+    doc = {"project_name": "Beta", "exchanges": [gate, "mexc"], "sources": {"coinmarketcap": "c"}}
+
+    updated = converted(manager, doc)
+
+    assert updated["exchanges"] == [gate, manager.exchange_id("coinmarketcap", "mexc")]
+    assert converted(manager, updated) is None
+
+
+def test_extractors_no_longer_resolve_exchange_ids():
+    for path in ("scrapers/cmc/data_extractor.py", "scrapers/coingecko/cg_data_extractor.py"):
+        tree = ast.parse((ROOT / path).read_text())
+        modules = {node.module for node in ast.walk(tree) if isinstance(node, ast.ImportFrom)}
+        assert "utils.exchange_registry" not in modules, path
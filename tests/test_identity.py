@@ -0,0 +1,29 @@
+# tests/test_identity.py
+"""Normalized identity keys and the indexed find_existing_project lookup."""
+from utils.text_utils import normalize_project_identity
+
+
+def test_normalize_project_identity():
+    assert normalize_project_identity("  Alpha \t Coin ", " alp ") == ("alpha coin", "ALP")
+    assert normalize_project_identity("STRASSE", "x") == ("strasse", "X")
+    assert normalize_project_identity(None, None) == ("", "")
+
+
+def test_documents_carry_their_identity_keys(manager):
+    uid = manager.upsert_project({"project_name": "Alpha  Coin", "project_ticker": "alp"}, "coingecko")
+    doc = manager.get_project_by_uid(uid)
+    assert (doc["name_key"], doc["ticker_key"]) == ("alpha coin", "ALP")
+    assert doc["project_ticker"] == "ALP"
+
+
+def test_find_existing_project_ignores_case_and_whitespace(manager):
+    uid = manager.upsert_project({"project_name": "Alpha Coin", "project_ticker": "ALP"}, "coingecko")
+
+    assert manager.find_existing_project(" alpha   COIN", "alp")["project_uid"] == uid
+    assert manager.find_existing_project("Alpha Coin", "ALPX") is None
+    assert manager.find_existing_project("", "ALP") is None
+
+
+def test_name_is_matched_literally_not_as_a_pattern(manager):
+    manager.upsert_project({"project_name": "A.B", "project_ticker": "AB"}, "coingecko")
+    assert manager.find_existing_project("AxB", "AB") is None
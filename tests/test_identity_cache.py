@@ -0,0 +1,69 @@
+# tests/test_identity_cache.py
+"""Identity cache: LRU of identity -> project_uid, authoritative misses and store lookups saved."""
+import pytest
+
+from MasterProjectManager import MasterProjectManager
+
+
+@pytest.fixture
+def lookups(manager, monkeypatch):
+    """Names of the store lookups the manager makes."""
+    calls = []
+    for name in ("find_by_uid", "find_by_identity", "find_by_identity_keys", "find_candidates"):
+        original = getattr(manager.store, name)
+
+        def counted(*args, _name=name, _original=original, **kwargs):
+            calls.append(_name)
+            return _original(*args, **kwargs)
+        monkeypatch.setattr(manager.store, name, counted)
+    return calls
+
+
+def test_cache_maps_identities_to_project_uids(manager):
+    uid = manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP",
+                                  "sources": {"coingecko": "https://www.coingecko.com/en/coins/alpha"}},
+                                 "coingecko")
+    assert manager._identity_cache[("alpha", "ALP")] == uid
+    assert manager._identity_cache["coingecko:alpha"] == uid
+
+
+def test_hit_reads_the_document_by_uid(manager, lookups):
+    uid = manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP"}, "coingecko")
+    lookups.clear()
+
+    assert manager.find_existing_project("alpha", "alp")["project_uid"] == uid
+    assert lookups == ["find_by_uid"]
+    assert manager.get_identity_cache_stats()["hits"] == 1
+
+
+def test_authoritative_miss_skips_the_lookup(manager, lookups):
+    manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP"}, "coingecko")
+    manager.warm_identity_cache(authoritative=True)
+    lookups.clear()
+
+    manager.upsert_project({"project_name": "Beta", "project_ticker": "BET"}, "coingecko")
+    manager.bulk_upsert_projects([{"project_name": "Gamma", "project_ticker": "GAM"}], "coingecko")
+
+    assert lookups == []
+    assert manager.get_identity_cache_stats()["negative_hits"] == 2
+
+
+def test_eviction_ends_authoritative_mode(sqlite_store):
+    manager = MasterProjectManager(store=sqlite_store, identity_cache_size=2, record_market_snapshots=False)
+    for name in ("A", "B"):
+        manager.upsert_project({"project_name": name, "project_ticker": name}, "coingecko")
+    manager.warm_identity_cache(authoritative=True)
+    assert manager.get_identity_cache_stats()["authoritative"]
+
+    manager.upsert_project({"project_name": "C", "project_ticker": "C"}, "coingecko")
+
+    stats = manager.get_identity_cache_stats()
+    assert stats["size"] == 2 and stats["evictions"] == 1 and not stats["authoritative"]
+    # "A" was evicted, so it has to be looked up again instead of being taken as new
+    assert manager.find_existing_project("A", "A") is not None
+
+
+def test_stale_entries_are_dropped(manager):
+    manager._identity_cache[("ghost", "GST")] = "missing-uid"
+    assert manager.find_existing_project("Ghost", "GST") is None
+    assert ("ghost", "GST") not in manager._identity_cache
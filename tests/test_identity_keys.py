@@ -0,0 +1,55 @@
+# tests/test_identity_keys.py
+"""Cross-source identity keys: source slugs and contracts resolve a project before name/ticker."""
+from utils.text_utils import contract_identity_key, project_identity_keys, source_identity_keys
+
+CMC_URL = "https://coinmarketcap.com/currencies/digital-gold/"
+CG_URL = "https://www.coingecko.com/zh-tw/coins/Digital-Gold?tab=markets"
+
+
+def test_source_keys_from_payload_and_stored_sources():
+    assert source_identity_keys({"coinmarketcap": CMC_URL, "coingecko": CG_URL}) == [
+        "coinmarketcap:digital-gold", "coingecko:digital-gold"]
+    assert source_identity_keys({"coingecko": {"url": CG_URL, "last_updated": "2025-01-01"}}) == [
+        "coingecko:digital-gold"]
+    assert source_identity_keys({"dextools": "https://www.dextools.io/app/en/ether/pair-explorer/0x1"}) == []
+
+
+def test_contract_keys_normalize_evm_addresses_only():
+    assert contract_identity_key(" Ethereum ", "0xAbC0000000000000000000000000000000000001") == \
+        "contract:ethereum:0xabc0000000000000000000000000000000000001"
+    assert contract_identity_key("Solana", "So11111111111111111111111111111111111111112") == \
+        "contract:solana:So11111111111111111111111111111111111111112"
+    assert contract_identity_key("", "0x1") is None
+
+
+def test_project_keys_list_sources_before_contracts():
+    keys = project_identity_keys({"sources": {"coinmarketcap": CMC_URL},
+                                  "contracts": {"Solana": "So1", "BNB Chain": "0xdef"}})
+    assert keys == ["coinmarketcap:digital-gold", "contract:bnb chain:0xdef", "contract:solana:So1"]
+
+
+def test_renamed_project_is_found_through_its_slug(any_manager):
+    uid = any_manager.upsert_project({"project_name": "Digital Gold", "project_ticker": "GOLD",
+                                      "sources": {"coinmarketcap": CMC_URL}}, "coinmarketcap")
+
+    again = any_manager.upsert_project({"project_name": "Digital Gold Token", "project_ticker": "XAUT",
+                                        "sources": {"coinmarketcap": CMC_URL}, "about": "renamed"},
+                                       "coinmarketcap")
+
+    assert again == uid
+    assert any_manager.get_project_by_uid(uid)["about"] == "renamed"
+
+
+def test_contracts_link_sources_listing_a_project_under_other_names(manager):
+    contracts = {"Ethereum": "0xAbC0000000000000000000000000000000000001"}
+    uid = manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP", "contracts": contracts,
+                                  "sources": {"coingecko": "https://www.coingecko.com/en/coins/alpha"}},
+                                 "coingecko")
+
+    result = manager.bulk_upsert_projects([{"project_name": "Alpha Protocol", "project_ticker": "ALPHA",
+                                            "contracts": {"ethereum": contracts["Ethereum"].lower()}}],
+                                          "dextools")
+
+    assert result["project_uids"] == [uid]
+    assert "contract:ethereum:0xabc0000000000000000000000000000000000001" in \
+        manager.get_project_by_uid(uid)["identity_keys"]
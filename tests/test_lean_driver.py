@@ -0,0 +1,86 @@
+# tests/test_lean_driver.py
+"""Lean headless mode: what is blocked per source, and that the allowlists really hold."""
+import fnmatch
+
+import pytest
+
+from utils.web_driver import (LEAN_SOURCE_ALLOWLIST, apply_lean_blocking, headless_options,
+                              lean_blocked_urls, lean_host_resolver_rules)
+
+# Requests the Cloudflare bot checks make, images included
+CHALLENGE_URLS = {
+    "coinmarketcap": ["https://coinmarketcap.com/cdn-cgi/challenge-platform/h/b/orchestrate/chl_page/v1?ray=8f",
+                      "https://coinmarketcap.com/cdn-cgi/challenge-platform/h/b/cmg/1/logo.png"],
+    "coingecko": ["https://www.coingecko.com/cdn-cgi/challenge-platform/h/g/scripts/jsd/main.js",
+                  "https://challenges.cloudflare.com/turnstile/v0/api.js?render=explicit",
+                  "https://challenges.cloudflare.com/cdn-cgi/challenge-platform/h/g/cmg/1/spinner.svg"],
+}
+ASSET_URLS = {
+    "coinmarketcap": ["https://s2.coinmarketcap.com/static/img/coins/64x64/1.png",
+                      "https://s3.coinmarketcap.com/generated/sparklines/web/7d/2781/1.svg"],
+    "coingecko": ["https://assets.coingecko.com/coins/images/1/small/bitcoin.png?1696501400",
+                  "https://coin-images.coingecko.com/coins/images/1/large/bitcoin.webp"],
+}
+PAGE_URLS = {"coinmarketcap": "https://coinmarketcap.com/currencies/bitcoin/",
+             "coingecko": "https://www.coingecko.com/en/coins/bitcoin"}
+TRACKER_URLS = ["https://www.googletagmanager.com/gtm.js?id=GTM-1",
+                "https://static.cloudflareinsights.com/beacon.min.js",
+                "https://fonts.gstatic.com/s/inter/v12/font.woff2"]
+
+
+def blocked(url, patterns):
+    # setBlockedURLs patterns: * is the only wildcard and matches any run of characters
+    return any(fnmatch.fnmatchcase(url, p) for p in patterns)
+
+
+@pytest.mark.parametrize("source", sorted(LEAN_SOURCE_ALLOWLIST))
+def test_allowlisted_requests_are_never_blocked(source):
+    patterns = lean_blocked_urls(source)
+
+    assert [url for url in CHALLENGE_URLS[source] if blocked(url, patterns)] == []
+    # Without the source's allowlist the same requests would be blocked
+    assert any(blocked(url, lean_blocked_urls()) for url in CHALLENGE_URLS[source])
+
+
+@pytest.mark.parametrize("source", sorted(LEAN_SOURCE_ALLOWLIST))
+def test_assets_and_trackers_stay_blocked(source):
+    patterns = lean_blocked_urls(source)
+
+    assert all(blocked(url, patterns) for url in ASSET_URLS[source] + TRACKER_URLS)
+    assert not blocked(PAGE_URLS[source], patterns)
+
+
+def test_host_rules_cover_trackers_but_no_allowlisted_host():
+    rules = lean_host_resolver_rules().split(", ")
+
+    assert "MAP *.googletagmanager.com ~NOTFOUND" in rules and "MAP googletagmanager.com ~NOTFOUND" in rules
+    hosts = [rule.split()[1] for rule in rules]
+    allowed = [host for entries in LEAN_SOURCE_ALLOWLIST.values() for host, _ in entries]
+    assert not [(a, h) for a in allowed for h in hosts if fnmatch.fnmatchcase(a, h)]
+
+
+def test_lean_options_apply_browser_wide_settings():
+    lean, full = headless_options(lean=True), headless_options()
+
+    assert f"--host-resolver-rules={lean_host_resolver_rules()}" in lean.arguments
+    assert lean.experimental_options["prefs"]["profile.managed_default_content_settings.notifications"] == 2
+    assert not [a for a in full.arguments if a.startswith("--host-resolver-rules")]
+    # No browser-wide image switch: it would block the challenge images the allowlist lets through
+    assert not [a for a in lean.arguments if a.startswith("--blink-settings")]
+    assert "profile.managed_default_content_settings.images" not in lean.experimental_options["prefs"]
+    assert "--headless=new" in full.arguments
+
+
+def test_blocking_is_sent_to_the_current_window():
+    class Recorder:
+        def __init__(self):
+            self.commands = []
+
+        def execute_cdp_cmd(self, cmd, params):
+            self.commands.append((cmd, params))
+
+    driver = Recorder()
+    apply_lean_blocking(driver, "coingecko")
+
+    assert driver.commands == [("Network.enable", {}),
+                               ("Network.setBlockedURLs", {"urls": lean_blocked_urls("coingecko")})]
@@ -0,0 +1,56 @@
+# tests/test_market_snapshots.py
+"""Market snapshot series: both backends keep one sample per (project, t, source)."""
+from datetime import datetime
+
+import pytest
+
+T1 = datetime(2025, 3, 1, 12, 0, 0, 123000)
+T2 = datetime(2025, 3, 2, 12, 0)
+T3 = datetime(2025, 4, 1, 8, 30)
+
+
+def snap(t, source="coinmarketcap", **values):
+    return {"project_uid": "uid-1", "t": t, "source": source, **values}
+
+
+def series(store, **kwargs):
+    return [(s["t"], s["source"], s.get("market_cap")) for s in store.iter_market_snapshots("uid-1", **kwargs)]
+
+
+def test_samples_come_back_in_time_order_across_buckets(any_manager):
+    store = any_manager.store
+    store.append_market_snapshots([snap(T3, market_cap=3.0), snap(T1, market_cap=1.0)])
+    store.append_market_snapshots([snap(T2, "coingecko", market_cap=2.0)])
+
+    assert series(store) == [(T1, "coinmarketcap", 1.0), (T2, "coingecko", 2.0), (T3, "coinmarketcap", 3.0)]
+    assert series(store, start=T2, end=T2) == [(T2, "coingecko", 2.0)]
+
+
+def test_repeated_sample_replaces_the_earlier_one(any_manager):
+    store = any_manager.store
+    store.append_market_snapshots([snap(T1, market_cap=1.0), snap(T1, "coingecko", market_cap=1.5)])
+    # A retried batch, and a duplicate within one batch: the last value wins
+    store.append_market_snapshots([snap(T1, market_cap=9.0), snap(T1, market_cap=1.1), snap(T2, market_cap=2.0)])
+
+    assert sorted(series(store)) == [(T1, "coingecko", 1.5), (T1, "coinmarketcap", 1.1), (T2, "coinmarketcap", 2.0)]
+
+
+def test_mongo_bucket_summary_follows_replacements(mongo_db):
+    from MasterProjectManager import MasterProjectManager
+    store = MasterProjectManager(db=mongo_db, record_market_snapshots=False).store
+    store.append_market_snapshots([snap(T2, market_cap=2.0), snap(T1, market_cap=1.0)])
+    store.append_market_snapshots([snap(T1, market_cap=1.1)])
+
+    bucket = mongo_db.market_snapshots.find_one({"_id": "uid-1:2025-03"})
+    assert (bucket["project_uid"], bucket["month"], bucket["count"]) == ("uid-1", "2025-03", 2)
+    assert (bucket["first"], bucket["last"]) == (T1, T2)
+
+
+@pytest.mark.parametrize("agg, expected", [("last", 1.1), ("mean", 1.1)])
+def test_market_series_sees_one_sample_per_source_and_time(any_manager, agg, expected):
+    any_manager.store.append_market_snapshots([snap(T1, market_cap=1.0)])
+    any_manager.store.append_market_snapshots([snap(T1, market_cap=1.1)])
+
+    points = any_manager.get_market_series("uid-1", interval="day", agg=agg)
+
+    assert [(p["value"], p["samples"]) for p in points] == [(pytest.approx(expected), 1)]
@@ -0,0 +1,64 @@
+# tests/test_merge.py
+"""_merge_data_by_priority: source priority, emptiness rules and no copies or mutation of the inputs."""
+from copy import deepcopy
+
+import pytest
+
+
+@pytest.fixture
+def existing():
+    return {
+        "project_uid": "uid-1", "project_name": "Alpha", "project_ticker": "ALP",
+        "created_at": "2025-01-01 00:00:00",
+        "sources": {"dextools": {"url": "d", "last_updated": "2025-01-01"}},
+        "about": "old", "market_cap": 1.0, "category": ["Defi"],
+        "socials": {"website": "w", "twitter_link": ""},
+        "contracts": {"Ethereum": "0xabc"},
+    }
+
+
+def test_inputs_are_not_mutated_and_unchanged_subtrees_are_shared(manager, existing):
+    incoming = {"project_name": "alpha", "project_ticker": "alp", "about": "new"}
+    existing_before, incoming_before = deepcopy(existing), deepcopy(incoming)
+
+    merged = manager._merge_data_by_priority(existing, incoming, "coingecko")
+
+    assert existing == existing_before and incoming == incoming_before
+    assert merged is not existing
+    assert merged["contracts"] is existing["contracts"]
+
+
+def test_higher_priority_overwrites_and_lower_only_fills_gaps(manager, existing):
+    higher = manager._merge_data_by_priority(existing, {"about": "new", "market_cap": 2.0}, "coingecko")
+    assert (higher["about"], higher["market_cap"]) == ("new", 2.0)
+
+    lower = manager._merge_data_by_priority(
+        existing, {"about": "new", "socials": {"twitter_link": "tw", "website": "x"}}, "birdeye")
+    assert lower["about"] == "old"
+    assert lower["socials"] == {"website": "w", "twitter_link": "tw"}
+
+
+def test_empty_values_and_protected_keys_never_win(manager, existing):
+    merged = manager._merge_data_by_priority(
+        existing, {"about": "  ", "category": [], "market_cap": None, "project_name": "ALPHA",
+                   "created_at": "2030-01-01 00:00:00"}, "coingecko")
+
+    assert merged["about"] == "old"
+    assert merged["category"] == ["Defi"]
+    assert merged["market_cap"] == 1.0
+    assert merged["project_name"] == "Alpha"
+    assert merged["created_at"] == "2025-01-01 00:00:00"
+
+
+def test_lists_union_without_duplicates(manager, existing):
+    merged = manager._merge_data_by_priority(existing, {"category": ["Ai", "Defi"]}, "coingecko")
+    assert merged["category"] == ["Ai", "Defi"]
+    merged = manager._merge_data_by_priority(existing, {"category": ["Ai", "Defi"]}, "birdeye")
+    assert merged["category"] == ["Defi", "Ai"]
+
+
+def test_sources_record_the_incoming_source(manager, existing):
+    merged = manager._merge_data_by_priority(existing, {"sources": {"coingecko": "g"}}, "coingecko")
+    assert merged["sources"]["coingecko"]["url"] == "g"
+    assert merged["sources"]["dextools"] == existing["sources"]["dextools"]
+    assert merged["source_keys"] == ["dextools", "coingecko"]
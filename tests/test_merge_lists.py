@@ -0,0 +1,34 @@
+# tests/test_merge_lists.py
+"""_merge_lists: ordered union, structural de-duplication without json.dumps, identity keys."""
+
+
+def test_string_lists_union_in_priority_order(manager):
+    assert manager._merge_lists(["a", "b"], ["c", "a"], prefer_b=True) == ["c", "a", "b"]
+    assert manager._merge_lists(["a", "b"], ["c", "a"], prefer_b=False) == ["a", "b", "c"]
+
+
+def test_unchanged_union_returns_the_stored_list(manager):
+    stored = ["a", {"k": 1}]
+    assert manager._merge_lists(stored, [{"k": 1}], prefer_b=False) is stored
+
+
+def test_dicts_match_regardless_of_key_order(manager):
+    merged = manager._merge_lists([{"a": 1, "b": [1, 2]}], [{"b": [1, 2], "a": 1}], prefer_b=False)
+    assert merged == [{"a": 1, "b": [1, 2]}]
+
+
+def test_numbers_of_different_types_stay_distinct(manager):
+    assert manager._merge_lists([1, True], [1.0, 1], prefer_b=False) == [1, True, 1.0]
+
+
+def test_unhashable_leaves_fall_back_to_their_signature(manager):
+    merged = manager._merge_lists([{"s": {1, 2}}], [{"s": {1, 2}}, {"s": {3}}], prefer_b=False)
+    assert len(merged) == 2
+
+
+def test_telegram_admins_are_matched_by_username(manager):
+    merged = manager._merge_lists(
+        [{"username": "Adm", "status": "admin"}, {"first_name": "no user"}],
+        [{"username": "adm", "status": "owner"}, {"first_name": "no user"}],
+        prefer_b=True, field="telegram_admins")
+    assert merged == [{"username": "adm", "status": "owner"}, {"first_name": "no user"}]
@@ -0,0 +1,49 @@
+# tests/test_mongo_client.py
+"""Process-wide MongoClient registry: one pooled client per URI and options."""
+import pytest
+
+from utils import mongo_client
+
+
+class FakeClient:
+    def __init__(self, uri, **options):
+        self.uri = uri
+        self.options = options
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_clients(monkeypatch):
+    monkeypatch.setattr(mongo_client, "MongoClient", FakeClient)
+    monkeypatch.setattr(mongo_client, "_clients", {})
+
+
+def test_same_uri_shares_one_client():
+    first = mongo_client.get_mongo_client("mongodb://a")
+    assert mongo_client.get_mongo_client("mongodb://a") is first
+    assert mongo_client.get_mongo_client("mongodb://b") is not first
+
+
+def test_options_override_the_defaults_and_get_their_own_client():
+    default = mongo_client.get_mongo_client("mongodb://a")
+    bigger = mongo_client.get_mongo_client("mongodb://a", maxPoolSize=50)
+
+    assert bigger is not default
+    assert default.options["maxPoolSize"] == mongo_client.DEFAULT_CLIENT_OPTIONS["maxPoolSize"]
+    assert bigger.options["maxPoolSize"] == 50
+    assert bigger.options["retryWrites"] is True
+
+
+def test_zlib_compression_is_always_offered():
+    assert "zlib" in mongo_client.get_mongo_client("mongodb://a").options["compressors"].split(",")
+
+
+def test_close_closes_and_forgets_every_client():
+    first = mongo_client.get_mongo_client("mongodb://a")
+    mongo_client.close_mongo_clients()
+
+    assert first.closed
+    assert mongo_client.get_mongo_client("mongodb://a") is not first
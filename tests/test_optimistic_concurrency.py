@@ -0,0 +1,52 @@
+# tests/test_optimistic_concurrency.py
+"""Compare-and-swap writes on _v: stale versions lose, the loser re-reads and re-merges."""
+import pytest
+
+from MasterProjectManager import WriteConflictError
+
+
+def test_update_if_version_rejects_a_stale_version(any_manager):
+    store = any_manager.store
+    uid = any_manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP"}, "coingecko")
+    doc = store.find_by_uid(uid)
+    merged = {**doc, "about": "a"}
+    update = any_manager._diff_update(doc, merged)
+
+    assert store.update_if_version(uid, doc["_v"], merged, update) == doc["_v"] + 1
+    assert store.update_if_version(uid, doc["_v"], merged, update) is None
+
+
+def test_a_lost_race_is_re_merged(any_manager, monkeypatch):
+    uid = any_manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP", "category": ["Defi"]},
+                                     "coingecko")
+    store = any_manager.store
+    original = store.update_if_version
+    raced = []
+
+    def concurrent_writer_first(project_uid, version, doc, update):
+        if not raced:
+            raced.append(True)
+            other = store.find_by_uid(project_uid)
+            original(project_uid, version, {**other, "category": ["Defi", "Ai"]},
+                     {"$addToSet": {"category": {"$each": ["Ai"]}}, "$inc": {"_v": 1}})
+        return original(project_uid, version, doc, update)
+    monkeypatch.setattr(store, "update_if_version", concurrent_writer_first)
+
+    any_manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP", "category": ["Memes"]},
+                               "coingecko")
+
+    doc = store.find_by_uid(uid)
+    assert set(doc["category"]) == {"Defi", "Ai", "Memes"}
+    assert doc["_v"] == 2
+    stats = any_manager.get_write_stats()
+    assert stats["conflicts"] == 1 and stats["retries"] == 1
+
+
+def test_gives_up_after_max_write_retries(manager, monkeypatch):
+    manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP"}, "coingecko")
+    monkeypatch.setattr(manager.store, "update_if_version", lambda *args: None)
+
+    with pytest.raises(WriteConflictError):
+        manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP", "about": "b"}, "coingecko")
+    assert manager.get_write_stats()["exhausted"] == 1
+    assert manager.get_write_stats()["retries"] == manager.max_write_retries
@@ -0,0 +1,64 @@
+# tests/test_project_record.py
+"""ProjectRecord: dict round trips, interning and the writer/manager boundary."""
+import pytest
+
+from ProjectRecord import ProjectRecord, Socials, TelegramAdmin, as_project_dict
+
+PAYLOAD = {
+    "project_name": "Alpha",
+    "project_ticker": "ALP",
+    "market_cap": 1.5e6,
+    "about": "text",
+    "sources": {"coingecko": "https://www.coingecko.com/en/coins/alpha"},
+    "socials": {"website": "https://alpha.io", "telegram_link": "https://t.me/alpha", "threads_link": "x"},
+    "contracts": {"Ethereum": "0xabc"},
+    "exchanges": ["uniswap-v2", "mexc"],
+    "category": ["Defi"],
+    "network": ["Ethereum"],
+    "telegram_admins": [{"username": "adm", "first_name": "A", "status": "owner"}, "legacy"],
+    "listing_date": "2025-01-01",
+}
+
+
+def test_round_trip_keeps_every_field():
+    assert ProjectRecord.from_dict(PAYLOAD).to_dict() == PAYLOAD
+
+
+def test_unknown_keys_and_links_are_kept_aside():
+    record = ProjectRecord.from_dict(PAYLOAD)
+    assert record.extra == {"listing_date": "2025-01-01"}
+    assert record.socials.get("threads_link") == "x"
+    assert record.socials.website == "https://alpha.io"
+    assert record.telegram_admins[0] == TelegramAdmin("adm", "A", status="owner")
+
+
+def test_unset_fields_are_left_out():
+    record = ProjectRecord(project_name="Beta", project_ticker="BET")
+    assert record.to_dict() == {"project_name": "Beta", "project_ticker": "BET"}
+    assert not Socials()
+
+
+def test_to_dict_never_aliases_record_state():
+    record = ProjectRecord.from_dict(PAYLOAD)
+    out = record.to_dict()
+    out["category"].append("Ai")
+    out["sources"]["coinmarketcap"] = "c"
+    assert record.category == ["Defi"] and "coinmarketcap" not in record.sources
+
+
+def test_repeated_strings_are_interned():
+    a = ProjectRecord.from_dict({**PAYLOAD, "category": ["".join(["De", "fi"])]})
+    b = ProjectRecord.from_dict({**PAYLOAD, "category": ["".join(["Def", "i"])]})
+    assert a.category[0] is b.category[0]
+
+
+def test_records_have_no_instance_dict():
+    with pytest.raises(AttributeError):
+        ProjectRecord().unknown_field = 1
+
+
+def test_manager_accepts_records(manager):
+    uid = manager.upsert_project(ProjectRecord.from_dict(PAYLOAD), "coingecko")
+    stored = manager.get_project_by_uid(uid)
+    assert stored["socials"] == PAYLOAD["socials"]
+    assert as_project_dict(PAYLOAD) is PAYLOAD
@@ -0,0 +1,43 @@
+# tests/test_project_stats.py
+"""get_project_stats: one pass over the store for every count and the market_cap histogram."""
+from MasterProjectManager import MasterProjectManager
+
+PROJECTS = [
+    ({"project_name": "A", "project_ticker": "A", "sources": {"coingecko": "g"}, "category": ["Defi", "Ai"],
+      "network": ["Ethereum"], "market_cap": 5e6}, "coingecko"),
+    ({"project_name": "B", "project_ticker": "B", "sources": {"coinmarketcap": "c"}, "category": ["Defi"],
+      "network": ["Ethereum", "Base"], "market_cap": 2.5e9}, "coinmarketcap"),
+    ({"project_name": "C", "project_ticker": "C", "sources": {"someaggregator": "s"}, "market_cap": "$1M"},
+     "someaggregator"),
+]
+
+
+def check_stats(manager):
+    for payload, source in PROJECTS:
+        manager.upsert_project(payload, source)
+
+    stats = manager.get_project_stats()
+
+    assert stats["total_projects"] == 3
+    assert stats["projects_per_source"] == {"coingecko": 1, "coinmarketcap": 1, "dextools": 0, "dexscreener": 0,
+                                            "birdeye": 0, "someaggregator": 1}
+    assert stats["projects_per_category"] == {"Defi": 2, "Ai": 1}
+    assert stats["projects_per_network"] == {"Ethereum": 2, "Base": 1}
+    counts = {bucket["min"]: bucket["count"] for bucket in stats["market_cap_histogram"]}
+    assert counts[1e6] == 1 and counts[1e9] == 1 and sum(counts.values()) == 2
+    assert stats["market_cap_histogram"][-1]["max"] is None
+
+
+def test_sqlite_stats(manager):
+    check_stats(manager)
+
+
+def test_mongo_stats(mongo_server_db):
+    check_stats(MasterProjectManager(db=mongo_server_db, record_market_snapshots=False))
+
+
+def test_cached_stats_are_reused_within_the_ttl(manager):
+    first = manager.get_project_stats(cache_ttl=60)
+    manager.upsert_project(*PROJECTS[0])
+    assert manager.get_project_stats(cache_ttl=60) is first
+    assert manager.get_project_stats()["total_projects"] == 1
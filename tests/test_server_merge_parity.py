@@ -0,0 +1,202 @@
+# tests/test_server_merge_parity.py
+"""
+Parity between the two MasterProjectManager write modes.
+
+Each case seeds a stored document, applies the incoming payload through the server-side
+merge pipeline (write_mode="server") and compares the result with the Python merge
+(_merge_data_by_priority) of the same inputs. Cases cover every source-priority outcome,
+emptiness rules, protected keys, nested dicts, list unions, telegram admin identities,
+identity_keys matching, type mismatches and first inserts, plus the realistic documents of
+scripts.merge_benchmark.
+
+The pipelines are evaluated in process by pipeline_eval; the same cases run against a real
+server (>= 4.2 for pipeline updates) when MONGODB_TEST_URI is set.
+"""
+import random
+from copy import deepcopy
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from MasterProjectManager import MasterProjectManager
+from pipeline_eval import apply_pipeline
+from scripts.merge_benchmark import make_pair
+from utils.text_utils import normalize_project_identity, project_identity_keys
+
+N_GENERATED = 200
+SEED = 11
+
+# Fields the two modes assign independently
+IGNORED_FIELDS = {"_id", "_v", "project_uid", "created_at"}
+
+Case = Tuple[str, Optional[Dict[str, Any]], Dict[str, Any], str]
+
+
+def fixed_cases() -> List[Case]:
+    """(label, stored document or None, incoming payload, incoming source)."""
+    def stored(**fields) -> Dict[str, Any]:
+        return {"project_name": "Alpha", "project_ticker": "ALP", "project_uid": "uid-alpha",
+                "created_at": "2025-01-01 00:00:00", **fields}
+
+    def incoming(**fields) -> Dict[str, Any]:
+        return {"project_name": "Alpha", "project_ticker": "alp", **fields}
+
+    return [
+        ("higher priority overwrites scalars",
+         stored(sources={"dextools": {"url": "d", "last_updated": "2025-01-01"}}, market_cap=1.0, about="old"),
+         incoming(market_cap=2.0, about="new"), "coingecko"),
+        ("lower priority only fills gaps",
+         stored(sources={"coingecko": {"url": "g", "last_updated": "2025-01-01"}}, market_cap=1.0, about=""),
+         incoming(market_cap=2.0, about="new", network=["Solana"]), "birdeye"),
+        ("priority decided by stored sources",
+         stored(sources={"dexscreener": {"url": "x", "last_updated": "2025-01-01"}}, market_cap=1.0),
+         incoming(market_cap=2.0), "dextools"),
+        ("priority decided by payload sources",
+         stored(sources={"birdeye": {"url": "b", "last_updated": "2025-01-01"}}, market_cap=1.0),
+         incoming(market_cap=2.0, sources={"coingecko": "https://www.coingecko.com/en/coins/alpha"}), "dextools"),
+        ("unknown source ranks last",
+         stored(sources={"someaggregator": {"url": "s", "last_updated": "2025-01-01"}}, market_cap=1.0),
+         incoming(market_cap=2.0), "birdeye"),
+        ("no stored sources",
+         stored(market_cap=1.0), incoming(market_cap=2.0), "dexscreener"),
+        ("empty incoming values never win",
+         stored(sources={"coinmarketcap": {"url": "c", "last_updated": "2025-01-01"}}, about="keep",
+                category=["Defi"], socials={"website": "w"}),
+         incoming(about="   ", category=[], socials={}, market_cap=None), "coingecko"),
+        ("protected keys keep stored values",
+         stored(sources={"birdeye": {"url": "b", "last_updated": "2025-01-01"}}),
+         incoming(project_name="ALPHA ", created_at="2030-01-01 00:00:00"), "coingecko"),
+        ("nested dicts merge per key",
+         stored(sources={"coinmarketcap": {"url": "c", "last_updated": "2025-01-01"}},
+                socials={"website": "old", "twitter_link": "", "telegram_link": "t"}),
+         incoming(socials={"website": "new", "twitter_link": "tw", "discord_link": "dc", "telegram_link": None}),
+         "dextools"),
+        ("lists union in priority order",
+         stored(sources={"coinmarketcap": {"url": "c", "last_updated": "2025-01-01"}},
+                category=["Defi", "Memes"], exchanges=["mexc", "gate"]),
+         incoming(category=["Ai", "Defi"], exchanges=["bitget", "mexc"]), "coingecko"),
+        ("list of dicts union",
+         stored(sources={"coingecko": {"url": "g", "last_updated": "2025-01-01"}},
+                telegram_admins=[{"first_name": "a", "username": "a1"}]),
+         incoming(telegram_admins=[{"first_name": "a", "username": "a1"}, {"first_name": "b", "username": "b1"}]),
+         "coinmarketcap"),
+        ("telegram admins matched by username",
+         stored(sources={"coingecko": {"url": "g", "last_updated": "2025-01-01"}},
+                telegram_admins=[{"first_name": "a", "username": "Adm1", "status": "admin"},
+                                 {"first_name": "nouser", "status": "admin"}, "legacy-entry"]),
+         incoming(telegram_admins=[{"first_name": "a2", "username": "adm1", "status": "owner"},
+                                   {"first_name": "nouser", "status": "admin"}, {"username": ""},
+                                   {"first_name": "b", "username": "b1"}]),
+         "coinmarketcap"),
+        ("type mismatches",
+         stored(sources={"coinmarketcap": {"url": "c", "last_updated": "2025-01-01"}},
+                socials="", network="Ethereum", market_cap={"usd": 1}),
+         incoming(socials={"website": "w"}, network=["Ethereum", "Base"], market_cap=5.0), "dextools"),
+        ("dict with only empty values fills a gap",
+         stored(sources={"coinmarketcap": {"url": "c", "last_updated": "2025-01-01"}}),
+         incoming(socials={"website": None}), "birdeye"),
+        ("values that look like field paths",
+         stored(sources={"coinmarketcap": {"url": "c", "last_updated": "2025-01-01"}}, market_cap="$249.67K"),
+         incoming(market_cap="$1.2M", about="$ALP to the moon"), "coingecko"),
+        ("matched through a source slug under another name",
+         stored(project_name="Digital Gold", project_ticker="GOLD",
+                sources={"coinmarketcap": {"url": "https://coinmarketcap.com/currencies/digital-gold/",
+                                           "last_updated": "2025-01-01"}},
+                identity_keys=["coinmarketcap:digital-gold"]),
+         incoming(project_name="digital gold token", project_ticker="gold", about="new",
+                  sources={"coinmarketcap": "https://coinmarketcap.com/currencies/digital-gold/"}),
+         "coinmarketcap"),
+        ("contracts extend identity_keys",
+         stored(sources={"coingecko": {"url": "https://www.coingecko.com/en/coins/alpha", "last_updated": "2025-01-01"}},
+                identity_keys=["coingecko:alpha"]),
+         incoming(contracts={"Ethereum": "0xAbC0000000000000000000000000000000000001"},
+                  sources={"dextools": "https://www.dextools.io/app/en/ether/pair-explorer/0xdef"}),
+         "dextools"),
+        ("first insert", None,
+         incoming(sources={"coinmarketcap": "https://coinmarketcap.com/currencies/alpha/"},
+                  about="", category=["Defi"], socials={"website": "w", "discord_link": None}), "coinmarketcap"),
+    ]
+
+
+def generated_cases() -> List[Case]:
+    rng = random.Random(SEED)
+    cases: List[Case] = []
+    for i in range(N_GENERATED):
+        existing, incoming, source = make_pair(rng, i)
+        cases.append((f"generated {i}", existing, incoming, source))
+    return cases
+
+
+CASES = fixed_cases() + generated_cases()
+
+
+def expected_document(manager: MasterProjectManager, existing: Optional[Dict], incoming: Dict,
+                      source: str) -> Dict[str, Any]:
+    merged = manager._merge_data_by_priority(existing or {}, incoming, source)
+    if existing is None:
+        # First writes store the ticker uppercased, as upsert_project does
+        merged = {**merged, "project_ticker": merged["project_ticker"].upper()}
+    return merged
+
+
+def comparable(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in doc.items() if k not in IGNORED_FIELDS}
+
+
+def assert_same(actual: Dict[str, Any], expected: Dict[str, Any]) -> None:
+    diff = {key: {"server": actual.get(key), "python": expected.get(key)}
+            for key in sorted(set(actual) | set(expected)) if actual.get(key) != expected.get(key)}
+    assert not diff
+
+
+@pytest.fixture(scope="module")
+def parity_manager(tmp_path_factory):
+    from storage.sqlite_store import SQLiteProjectStore
+    store = SQLiteProjectStore(str(tmp_path_factory.mktemp("parity") / "projects.sqlite3"))
+    yield MasterProjectManager(store=store, record_market_snapshots=False)
+    store.close()
+
+
+@pytest.mark.parametrize("label, existing, incoming, source", CASES, ids=[case[0] for case in CASES])
+def test_pipeline_matches_python_merge(parity_manager, label, existing, incoming, source):
+    manager = parity_manager
+    # upsert_project stores exchange slugs as exchange ids before either merge
+    incoming = manager._with_exchange_ids([deepcopy(incoming)], source)[0]
+    if existing is not None:
+        existing = manager._with_identity_keys(deepcopy(existing))
+
+    # Server mode updates the project its identity_keys match, else upserts on name_key/ticker_key
+    identity = None
+    if existing is not None and set(existing.get("identity_keys") or ()) & set(project_identity_keys(incoming)):
+        identity = manager._doc_identity(existing)
+    if existing is not None and (identity or manager._doc_identity(existing) == normalize_project_identity(
+            incoming.get("project_name"), incoming.get("project_ticker"))):
+        stored = existing
+    else:
+        existing = None
+        name_key, ticker_key = normalize_project_identity(incoming.get("project_name"), incoming.get("project_ticker"))
+        stored = {"name_key": name_key, "ticker_key": ticker_key}
+
+    pipeline = manager._build_merge_pipeline(incoming, source, "new-uid", identity)
+    actual = comparable(apply_pipeline(stored, pipeline))
+
+    assert_same(actual, comparable(expected_document(manager, existing, incoming, source)))
+
+
+def test_server_mode_matches_python_merge(mongo_server_db):
+    manager = MasterProjectManager(db=mongo_server_db, write_mode="server", identity_cache_size=0,
+                                   record_market_snapshots=False)
+    mismatches = []
+    for label, existing, incoming, source in CASES:
+        manager.collection.delete_many({})
+        if existing is not None:
+            manager.collection.insert_one(manager._with_identity_keys(deepcopy(existing)))
+
+        expected = comparable(expected_document(
+            manager, existing, manager._with_exchange_ids([incoming], source)[0], source))
+        project_uid = manager.upsert_project(deepcopy(incoming), source)
+        actual = comparable(manager.get_project_by_uid(project_uid) or {})
+        if actual != expected:
+            mismatches.append(label)
+
+    assert mismatches == []
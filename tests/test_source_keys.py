@@ -0,0 +1,56 @@
+# tests/test_source_keys.py
+"""source_keys / source_last_updated: indexed source queries and the stale-since stream."""
+import pytest
+
+STALE = [
+    ("P1", {"coingecko": "2025-03-01", "coinmarketcap": "2024-01-01"}),
+    ("P2", {"coingecko": "2025-02-01"}),
+    ("P3", {"coingecko": "2025-01-01"}),
+    ("P4", {"coingecko": "2025-02-01"}),
+    ("P5", {"coingecko": "2026-01-01"}),
+    ("P6", {"coinmarketcap": "2020-01-01"}),
+]
+
+
+def seed(manager):
+    for name, updated in STALE:
+        doc = manager._build_new_project({"project_name": name}, name)
+        doc["sources"] = {source: {"url": name, "last_updated": day} for source, day in updated.items()}
+        assert manager.store.insert_if_absent(manager._with_source_keys(manager._with_identity_keys(doc)))
+
+
+def names(docs):
+    return [doc["project_name"] for doc in docs]
+
+
+def test_source_keys_mirror_the_sources_map(manager):
+    uid = manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP",
+                                  "sources": {"coingecko": "g", "dextools": "d"}}, "coingecko")
+    doc = manager.get_project_by_uid(uid)
+    assert doc["source_keys"] == ["coingecko", "dextools"]
+    assert [entry["source"] for entry in doc["source_last_updated"]] == ["coingecko", "dextools"]
+    assert all(entry["last_updated"] == doc["sources"][entry["source"]]["last_updated"]
+               for entry in doc["source_last_updated"])
+
+
+def test_stale_projects_come_least_recently_updated_first(any_manager):
+    seed(any_manager)
+
+    docs = any_manager.iter_projects_stale_since("coingecko", "2025-12-31", batch_size=2)
+
+    # P1's older coinmarketcap entry does not count; P2 and P4 tie and keep insertion order
+    assert names(docs) == ["P3", "P2", "P4", "P1"]
+
+
+@pytest.mark.parametrize("limit, expected", [
+    (0, ["P3", "P2", "P4", "P1"]),
+    (-1, ["P3", "P2", "P4", "P1"]),
+    (2, ["P3", "P2"]),
+    (3, ["P3", "P2", "P4"]),
+    (10, ["P3", "P2", "P4", "P1"]),
+])
+def test_limit_semantics_match_across_backends(any_manager, limit, expected):
+    seed(any_manager)
+    docs = any_manager.iter_projects_stale_since("coingecko", "2025-12-31", projection=["project_name"],
+                                                 batch_size=2, limit=limit)
+    assert names(docs) == expected
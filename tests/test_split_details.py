@@ -0,0 +1,51 @@
+# tests/test_split_details.py
+"""split_details: heavy fields in project_details, lookups without them, full views with them."""
+import pytest
+
+from MasterProjectManager import MasterProjectManager
+from storage.mongo_store import DETAIL_FIELDS
+
+PAYLOAD = {"project_name": "Alpha", "project_ticker": "ALP", "about": "long text " * 50,
+           "exchanges": ["mexc", "gate"], "category": ["Defi"], "sources": {"coinmarketcap": "c"},
+           "telegram_admins": [{"username": "adm", "status": "owner"}]}
+
+
+@pytest.fixture
+def split_manager(mongo_db):
+    manager = MasterProjectManager(db=mongo_db, split_details=True, record_market_snapshots=False)
+    manager.store.setup_indexes()
+    return manager
+
+
+def test_detail_fields_live_in_the_side_collection(split_manager):
+    uid = split_manager.upsert_project(dict(PAYLOAD), "coinmarketcap")
+
+    core = split_manager.collection.find_one({"project_uid": uid})
+    details = split_manager.store.details.find_one({"_id": uid})
+    assert not set(DETAIL_FIELDS) & set(core)
+    assert set(details) - {"_id"} == set(DETAIL_FIELDS)
+    assert split_manager.find_existing_project("Alpha", "ALP").get("about") is None
+
+
+def test_full_view_matches_the_single_collection_layout(split_manager, mongo_db):
+    single = MasterProjectManager(db=mongo_db.client["single_layout"], record_market_snapshots=False)
+    views = []
+    for manager in (single, split_manager):
+        uid = manager.upsert_project(dict(PAYLOAD), "coinmarketcap")
+        manager.upsert_project({"project_name": "Alpha", "project_ticker": "ALP", "exchanges": ["bitget"],
+                                "about": "newer"}, "coingecko")
+        doc = manager.get_project_by_uid(uid)
+        views.append({k: v for k, v in doc.items() if k not in ("_id", "project_uid", "created_at")})
+
+    assert views[0] == views[1]
+    assert views[1]["about"] == "newer"
+
+
+def test_exchange_queries_default_to_the_supported_sort_field(split_manager):
+    uid = split_manager.upsert_project(dict(PAYLOAD), "coinmarketcap")
+    mexc = split_manager.exchange_id("coinmarketcap", "mexc")
+
+    assert [d["project_uid"] for d in split_manager.get_projects_by_exchange(mexc)] == [uid]
+    assert [d["project_uid"] for d in split_manager.iter_projects_by_exchange(mexc, batch_size=1)] == [uid]
+    with pytest.raises(ValueError):
+        list(split_manager.iter_projects_by_exchange(mexc, sort_field="_id"))
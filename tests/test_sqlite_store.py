@@ -0,0 +1,82 @@
+# tests/test_sqlite_store.py
+"""SQLiteProjectStore against the ProjectStore contract, and MasterProjectManager on top of it."""
+import pytest
+
+from MasterProjectManager import MasterProjectManager
+from storage.sqlite_store import SQLiteProjectStore
+
+
+def new_doc(manager, name, ticker, **fields):
+    doc = manager._build_new_project({"project_name": name, **fields}, ticker)
+    return manager._with_source_keys(manager._with_identity_keys(doc))
+
+
+def test_insert_if_absent_keeps_identities_unique(manager, sqlite_store):
+    first = new_doc(manager, "Alpha", "ALP")
+    assert sqlite_store.insert_if_absent(first)
+    assert not sqlite_store.insert_if_absent(new_doc(manager, " alpha", "ALP"))
+
+    assert sqlite_store.find_by_identity("alpha", "ALP")["project_uid"] == first["project_uid"]
+    assert sqlite_store.find_by_name_key("alpha")["project_uid"] == first["project_uid"]
+    assert sqlite_store.find_by_uid("nope") is None
+
+
+def test_bulk_write_reports_each_op(manager, sqlite_store):
+    stored = new_doc(manager, "Alpha", "ALP")
+    sqlite_store.insert_if_absent(stored)
+
+    outcome = sqlite_store.bulk_write([
+        {"op": "insert", "doc": new_doc(manager, "Beta", "BET")},
+        {"op": "insert", "doc": new_doc(manager, "Alpha", "ALP")},
+        {"op": "update", "project_uid": stored["project_uid"], "version": 0, "doc": {**stored, "about": "a"},
+         "update": {}},
+        {"op": "update", "project_uid": stored["project_uid"], "version": 0, "doc": {**stored, "about": "b"},
+         "update": {}},
+    ])
+
+    assert outcome == {"applied": {0, 2}, "conflicts": {1, 3}, "failed": {}}
+    assert sqlite_store.find_by_uid(stored["project_uid"])["about"] == "a"
+
+
+def test_side_tables_follow_document_updates(manager, sqlite_store):
+    doc = new_doc(manager, "Alpha", "ALP", category=["Defi", "Ai"], sources={"coingecko": "g"})
+    sqlite_store.insert_if_absent(doc)
+    assert [d["project_uid"] for d in sqlite_store.iter_by_category("Ai")] == [doc["project_uid"]]
+
+    sqlite_store.update_if_version(doc["project_uid"], 0, {**doc, "category": ["Defi"]}, {})
+
+    assert list(sqlite_store.iter_by_category("Ai")) == []
+    assert [d["_v"] for d in sqlite_store.iter_by_category("Defi")] == [1]
+    assert [d["project_uid"] for d in sqlite_store.iter_by_source("coingecko")] == [doc["project_uid"]]
+
+
+def test_candidates_come_back_oldest_first_without_duplicates(manager, sqlite_store):
+    a = new_doc(manager, "Alpha", "ALP", identity_keys=["coingecko:alpha"])
+    b = new_doc(manager, "Beta", "BET", identity_keys=["coingecko:alpha"])
+    for doc in (a, b):
+        sqlite_store.insert_if_absent(doc)
+
+    found = sqlite_store.find_candidates([b["project_uid"]], [("alpha", "ALP")], ["coingecko:alpha"])
+
+    assert [d["project_uid"] for d in found] == [a["project_uid"], b["project_uid"]]
+
+
+def test_projects_survive_reopening(tmp_path):
+    path = str(tmp_path / "projects.sqlite3")
+    store = SQLiteProjectStore(path)
+    uid = MasterProjectManager(store=store, record_market_snapshots=False).upsert_project(
+        {"project_name": "Alpha", "project_ticker": "ALP", "sources": {"coingecko": "g"}}, "coingecko")
+    store.close()
+
+    reopened = SQLiteProjectStore(path)
+    try:
+        manager = MasterProjectManager(store=reopened, record_market_snapshots=False)
+        assert manager.find_existing_project("Alpha", "ALP")["project_uid"] == uid
+        assert manager.get_project_stats()["projects_per_source"]["coingecko"] == 1
+    finally:
+        reopened.close()
+
+
+def test_server_write_mode_needs_mongodb(sqlite_store):
+    with pytest.raises(ValueError):
+        MasterProjectManager(store=sqlite_store, write_mode="server")
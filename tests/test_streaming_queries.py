@@ -0,0 +1,41 @@
+# tests/test_streaming_queries.py
+"""Keyset-paginated iter_projects_by_source / _by_category with projections and resume."""
+
+
+def seed(manager, n=5):
+    uids = []
+    for i in range(n):
+        uids.append(manager.upsert_project({
+            "project_name": f"Project {i}", "project_ticker": f"P{i}", "about": "x" * 100,
+            "sources": {"coingecko" if i % 2 == 0 else "coinmarketcap": f"url-{i}"},
+            "category": ["Defi"] if i < 3 else ["Memes"],
+        }, "coingecko" if i % 2 == 0 else "coinmarketcap"))
+    return uids
+
+
+def test_iter_by_source_pages_through_every_match(any_manager):
+    uids = seed(any_manager)
+
+    docs = list(any_manager.iter_projects_by_source("coingecko", batch_size=1))
+
+    assert [d["project_uid"] for d in docs] == [uids[0], uids[2], uids[4]]
+
+
+def test_projection_limits_the_fields(any_manager):
+    seed(any_manager)
+
+    docs = list(any_manager.iter_projects_by_category("Defi", projection=["project_name"], batch_size=2))
+
+    assert sorted(d["project_name"] for d in docs) == ["Project 0", "Project 1", "Project 2"]
+    assert all("about" not in d and "category" not in d for d in docs)
+
+
+def test_resume_after_continues_past_the_last_document(any_manager):
+    seed(any_manager)
+    by_uid = sorted(any_manager.iter_projects_by_category("Defi", sort_field="project_uid"),
+                    key=lambda d: d["project_uid"])
+
+    rest = list(any_manager.iter_projects_by_category("Defi", sort_field="project_uid", batch_size=1,
+                                                      resume_after=by_uid[0]["project_uid"]))
+
+    assert [d["project_uid"] for d in rest] == [d["project_uid"] for d in by_uid[1:]]
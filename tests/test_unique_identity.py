@@ -0,0 +1,242 @@
+# tests/test_unique_identity.py
+"""Unique identity_key_idx: two writers inserting one new identity leave a single document."""
+import threading
+from types import SimpleNamespace
+
+import pytest
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from MasterProjectManager import MasterProjectManager
+from pipeline_eval import apply_pipeline
+from scripts import identity_key_migration
+
+ALPHA = {"project_name": "Alpha", "project_ticker": "ALP"}
+
+
+class RacingCollection:
+    """
+    Wraps the projects collection so the next `misses` identity upserts do not see a document
+    that already exists, like two upserts whose queries both ran before either inserted.
+    """
+
+    def __init__(self, collection, misses=1):
+        self._collection = collection
+        self.misses = misses
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    def _missed(self, query):
+        if self.misses and "name_key" in query:
+            self.misses -= 1
+            return {**query, "_race": {"$exists": True}}
+        return query
+
+    def update_one(self, query, update, **kwargs):
+        return self._collection.update_one(self._missed(query), update, **kwargs)
+
+    def find_one_and_update(self, query, update, **kwargs):
+        return self._collection.find_one_and_update(self._missed(query), update, **kwargs)
+
+    def bulk_write(self, requests, **kwargs):
+        requests = [UpdateOne(self._missed(r._filter), r._doc, upsert=r._upsert) for r in requests]
+        return self._collection.bulk_write(requests, **kwargs)
+
+
+class PipelineCollection:
+    """Pipeline updates (write_mode="server") on a mongomock collection, evaluated by pipeline_eval."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    def _apply(self, query, pipeline, upsert):
+        """(_id of the written document or None, whether it was inserted)"""
+        doc = self._collection.find_one(query)
+        if doc is not None:
+            self._collection.replace_one({"_id": doc["_id"]}, apply_pipeline(doc, pipeline))
+            return doc["_id"], False
+        if not upsert:
+            return None, False
+        seed = {k: v for k, v in query.items() if not isinstance(v, dict)}
+        return self._collection.insert_one(apply_pipeline(seed, pipeline)).inserted_id, True
+
+    def find_one_and_update(self, query, pipeline, projection=None, upsert=False, **kwargs):
+        _id, _ = self._apply(query, pipeline, upsert)
+        return None if _id is None else self._collection.find_one({"_id": _id}, projection)
+
+    def bulk_write(self, requests, **kwargs):
+        errors, upserted, matched = [], [], 0
+        for index, request in enumerate(requests):
+            try:
+                _id, inserted = self._apply(request._filter, request._doc, request._upsert)
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": 11000, "errmsg": str(e)})
+                continue
+            if inserted:
+                upserted.append(index)
+            elif _id is not None:
+                matched += 1
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nMatched": matched,
+                                  "upserted": [{"index": index} for index in upserted]})
+        return SimpleNamespace(upserted_ids={index: None for index in upserted}, matched_count=matched)
+
+
+@pytest.fixture
+def mongo_manager(mongo_db):
+    manager = MasterProjectManager(db=mongo_db, record_market_snapshots=False)
+    manager.store.setup_indexes()
+    return manager
+
+
+def first_read_misses(manager, barrier=None):
+    """The manager's identity lookup finds nothing, as if it ran before the other insert."""
+    original = manager.find_existing_project
+    calls = []
+
+    def lookup(*args, **kwargs):
+        if not calls:
+            calls.append(1)
+            if barrier is not None:
+                barrier.wait()
+            return None
+        return original(*args, **kwargs)
+    manager.find_existing_project = lookup
+
+
+def test_identity_index_is_unique(mongo_manager):
+    assert mongo_manager.store.collection.index_information()["identity_key_idx"]["unique"]
+
+
+def test_legacy_non_unique_index_is_reported(mongo_db, capsys):
+    mongo_db.projects.create_index([("name_key", 1), ("ticker_key", 1)], name="identity_key_idx")
+
+    MasterProjectManager(db=mongo_db).store.setup_indexes()
+
+    assert "run python -m scripts.identity_key_migration" in capsys.readouterr().out
+
+
+def test_concurrent_inserts_of_one_identity_keep_one_document(mongo_db):
+    managers = [MasterProjectManager(db=mongo_db, record_market_snapshots=False) for _ in range(2)]
+    managers[0].store.setup_indexes()
+    barrier = threading.Barrier(2)
+    uids = []
+
+    def insert(manager, category):
+        first_read_misses(manager, barrier)
+        uids.append(manager.upsert_project({**ALPHA, "category": [category]}, "coingecko"))
+
+    threads = [threading.Thread(target=insert, args=(m, c)) for m, c in zip(managers, ("Defi", "Ai"))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    docs = list(mongo_db.projects.find({"name_key": "alpha"}))
+    assert len(docs) == 1 and uids == [docs[0]["project_uid"]] * 2
+    assert set(docs[0]["category"]) == {"Defi", "Ai"}
+
+
+def test_insert_that_loses_on_the_unique_index_is_re_merged(mongo_manager):
+    uid = mongo_manager.upsert_project({**ALPHA, "category": ["Defi"]}, "coingecko")
+    other = MasterProjectManager(db=mongo_manager.store.db, record_market_snapshots=False)
+    first_read_misses(other)
+    other.store.collection = RacingCollection(other.store.collection)
+
+    assert other.upsert_project({**ALPHA, "category": ["Ai"]}, "coingecko") == uid
+
+    docs = list(mongo_manager.store.collection.find({"name_key": "alpha"}))
+    assert len(docs) == 1 and set(docs[0]["category"]) == {"Defi", "Ai"}
+
+
+def server_manager(db):
+    """write_mode="server" manager whose first identity upsert misses the stored document."""
+    manager = MasterProjectManager(db=db, write_mode="server", record_market_snapshots=False)
+    manager.collection = RacingCollection(PipelineCollection(manager.collection))
+    return manager
+
+
+def test_server_upsert_that_loses_on_the_unique_index_updates_the_winner(mongo_manager):
+    uid = mongo_manager.upsert_project({**ALPHA, "category": ["Defi"]}, "coingecko")
+
+    assert server_manager(mongo_manager.store.db).upsert_project({**ALPHA, "category": ["Ai"]}, "coingecko") == uid
+
+    docs = list(mongo_manager.store.collection.find({"name_key": "alpha"}))
+    assert len(docs) == 1 and set(docs[0]["category"]) == {"Defi", "Ai"}
+
+
+def test_server_bulk_upsert_that_loses_on_the_unique_index_updates_the_winner(mongo_manager):
+    uid = mongo_manager.upsert_project({**ALPHA, "category": ["Defi"]}, "coingecko")
+
+    result = server_manager(mongo_manager.store.db).bulk_upsert_projects(
+        [{**ALPHA, "category": ["Ai"]}, {"project_name": "Beta", "project_ticker": "BET"}], "coingecko")
+
+    assert (result["errors"], result["inserted"], result["updated"]) == ([], 1, 1)
+    assert result["project_uids"][0] == uid
+    assert set(mongo_manager.store.collection.find_one({"name_key": "alpha"})["category"]) == {"Defi", "Ai"}
+    assert mongo_manager.store.collection.count_documents({}) == 2
+
+
+def test_bulk_insert_that_loses_on_the_unique_index_is_a_conflict(mongo_manager):
+    mongo_manager.upsert_project(ALPHA, "coingecko")
+    store = mongo_manager.store
+    doc = mongo_manager._build_new_project({**ALPHA, "about": "late"}, "ALP")
+    store.collection = RacingCollection(store.collection)
+
+    outcome = store.bulk_write([{"op": "insert", "doc": doc}])
+
+    assert (outcome["conflicts"], outcome["failed"]) == ({0}, {})
+    assert store.collection.count_documents({}) == 1
+
+
+def test_migration_merges_duplicates_then_builds_the_unique_index(mongo_db):
+    manager = MasterProjectManager(db=mongo_db, record_market_snapshots=False)
+    mongo_db.projects.create_index([("name_key", 1), ("ticker_key", 1)], name="identity_key_idx")
+    older = manager._build_new_project({**ALPHA, "category": ["Defi"],
+                                        "sources": {"coingecko": "https://cg/alpha"}}, "ALP")
+    newer = manager._build_new_project({**ALPHA, "about": "A chain", "category": ["Ai"],
+                                        "sources": {"coinmarketcap": "https://cmc/alpha"}}, "ALP")
+    mongo_db.projects.insert_many([older, newer])
+    for doc in ({"project_name": ""}, {"project_name": None}):
+        mongo_db.projects.insert_one({**doc, "project_ticker": "X", "name_key": "", "ticker_key": "X"})
+
+    identity_key_migration.run(manager=manager)
+
+    docs = list(mongo_db.projects.find({"name_key": "alpha"}))
+    assert len(docs) == 1 and docs[0]["project_uid"] == older["project_uid"]
+    assert set(docs[0]["category"]) == {"Defi", "Ai"} and docs[0]["about"] == "A chain"
+    assert set(docs[0]["sources"]) == {"coingecko", "coinmarketcap"}
+    # Nameless documents are only reported, so the index cannot be built yet
+    assert "identity_key_idx" not in mongo_db.projects.index_information()
+
+    mongo_db.projects.delete_many({"name_key": ""})
+    identity_key_migration.run(manager=manager)
+    assert mongo_db.projects.index_information()["identity_key_idx"]["unique"]
+
+
+def test_concurrent_upserts_on_a_server_keep_one_document(mongo_server_db):
+    MasterProjectManager(db=mongo_server_db).store.setup_indexes()
+    barrier = threading.Barrier(8)
+    errors = []
+
+    def insert(i):
+        manager = MasterProjectManager(db=mongo_server_db, record_market_snapshots=False)
+        first_read_misses(manager, barrier)
+        try:
+            manager.upsert_project({**ALPHA, "category": [f"c{i}"]}, "coingecko")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=insert, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    doc, = list(mongo_server_db.projects.find({"name_key": "alpha"}))
+    assert set(doc["category"]) == {f"c{i}" for i in range(8)}
@@ -0,0 +1,407 @@
+# utils/driver_pool.py
+"""
+Process-wide pool of WebDrivers, keyed by driver kind.
+
+Starting Chrome costs 2-5 s, so the scrapers check drivers out of the pool and check them
+back in instead of creating one per page or table. Before a driver is handed out it gets a
+liveness probe; a driver is recycled (quit and replaced on next demand) after
+max_navigations page loads or, when psutil is installed, once its browser processes exceed
+max_rss_mb. The drivers handed out are PooledDriver proxies that start a new browser
+transparently when a call hits InvalidSessionIdException, and that run their kind's window
+setup (the lean CDP blocking) before the first get() in each window.
+
+Kinds: HEADLESS for get_local_headless_web_driver, lean_kind(source) for its lean mode with that
+source's allowlist, dedicated_kind(profile) for get_dedicated_local_web_driver(profile); others
+can be added with DriverPool.register.
+"""
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from selenium.common.exceptions import InvalidSessionIdException
+
+from utils.web_driver import apply_lean_blocking, get_dedicated_local_web_driver, get_local_headless_web_driver
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+HEADLESS = "headless"
+LEAN_PREFIX = "lean:"
+DEDICATED_PREFIX = "dedicated:"
+
+DEFAULT_MAX_DRIVERS = 6
+DEFAULT_MAX_NAVIGATIONS = 200
+DEFAULT_MAX_RSS_MB = 1500
+DEFAULT_CHECKOUT_TIMEOUT = 120.0
+
+
+def lean_kind(source: str) -> str:
+    """Pool kind of lean headless drivers for a source (see utils.web_driver.lean_blocked_urls)."""
+    return f"{LEAN_PREFIX}{source}"
+
+
+def dedicated_kind(chrome_profile: str) -> str:
+    """Pool kind of the dedicated driver for a Chrome profile."""
+    return f"{DEDICATED_PREFIX}{chrome_profile}"
+
+
+def driver_rss_mb(driver) -> Optional[float]:
+    """
+    Resident memory of a local driver's chromedriver and browser processes.
+
+    Returns:
+        float: RSS in MB, or None without psutil or for a Remote driver (the browser runs on the grid node)
+    """
+    if psutil is None:
+        return None
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is None:
+        return None
+    try:
+        root = psutil.Process(process.pid)
+        total = 0
+        for proc in [root] + root.children(recursive=True):
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+    except psutil.Error:
+        return None
+
+
+def _quit_quietly(driver) -> None:
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class PooledDriver:
+    def __init__(self, pool: "DriverPool", kind: str, driver):
+        """
+        WebDriver proxy handed out by DriverPool. Attribute access goes to the wrapped driver;
+        get() counts navigations and sets up a window it has not loaded a page in yet, and a call
+        failing with InvalidSessionIdException starts a new browser, reloads the last URL and is
+        retried once. WebElements found in the dead session
+        cannot be recovered, so a caller holding some still sees the error on them.
+
+        Args:
+            pool: Pool the driver belongs to
+            kind: Pool kind the driver was created for
+            driver: The WebDriver
+        """
+        self._pool = pool
+        self._kind = kind
+        self._driver = driver
+        self._navigations = 0
+        self._last_url: Optional[str] = None
+        self._retired = False
+        # Window handles the kind's window setup ran in
+        self._prepared: Set[str] = set()
+
+    def respawn(self, restore_url: bool = True) -> None:
+        """
+        Replace the browser behind this proxy, e.g. after it crashed; the proxy stays checked out.
+
+        Args:
+            restore_url: Load the last URL passed to get() in the new browser
+        """
+        _quit_quietly(self._driver)
+        self._driver = self._pool._spawn(self._kind, respawn=True)
+        self._navigations = 0
+        self._prepared.clear()
+        if restore_url and self._last_url:
+            self._prepare_window()
+            self._driver.get(self._last_url)
+
+    def _prepare_window(self) -> None:
+        """Run the kind's window setup once per window, e.g. after switching to a new tab."""
+        prepare = self._pool._window_setup.get(self._kind)
+        if prepare is None:
+            return
+        handle = self._driver.current_window_handle
+        if handle not in self._prepared:
+            prepare(self._driver)
+            self._prepared.add(handle)
+
+    def get(self, url: str) -> None:
+        self._navigations += 1
+        self._last_url = url
+        try:
+            self._prepare_window()
+            self._driver.get(url)
+        except InvalidSessionIdException:
+            self.respawn()
+
+    def quit(self) -> None:
+        """Quit the browser for good; the pool drops the driver when it is checked in."""
+        self._retired = True
+        _quit_quietly(self._driver)
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            attr = getattr(self._driver, name)
+        except InvalidSessionIdException:
+            self.respawn()
+            attr = getattr(self._driver, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            try:
+                return attr(*args, **kwargs)
+            except InvalidSessionIdException:
+                self.respawn()
+                return getattr(self._driver, name)(*args, **kwargs)
+        return call
+
+
+class DriverPool:
+    def __init__(self, max_navigations: int = DEFAULT_MAX_NAVIGATIONS, max_rss_mb: float = DEFAULT_MAX_RSS_MB,
+                 checkout_timeout: float = DEFAULT_CHECKOUT_TIMEOUT):
+        """
+        Args:
+            max_navigations: Page loads after which a driver is recycled at checkin
+            max_rss_mb: Browser memory (MB) above which a driver is recycled at checkin; needs psutil
+            checkout_timeout: Default seconds checkout() waits for a free driver
+        """
+        self.max_navigations = max_navigations
+        self.max_rss_mb = max_rss_mb
+        self.checkout_timeout = checkout_timeout
+
+        self._factories: Dict[str, Callable[[], Any]] = {HEADLESS: get_local_headless_web_driver}
+        self._max_size: Dict[str, int] = {HEADLESS: DEFAULT_MAX_DRIVERS}
+        self._window_setup: Dict[str, Callable[[Any], None]] = {}
+        self._idle: Dict[str, List[PooledDriver]] = {}
+        self._live: Dict[str, int] = {}
+        self._in_use: Dict[str, int] = {}
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def register(self, kind: str, factory: Callable[[], Any], max_size: int = DEFAULT_MAX_DRIVERS,
+                 window_setup: Optional[Callable[[Any], None]] = None) -> None:
+        """
+        Add (or replace) a driver kind.
+
+        Args:
+            kind: Pool kind name
+            factory: Creates a WebDriver of this kind
+            max_size: Most drivers of this kind alive at once
+            window_setup: Called with the WebDriver before the first get() in each of its windows
+        """
+        with self._cond:
+            self._factories[kind] = factory
+            self._max_size[kind] = max_size
+            self._window_setup.pop(kind, None)
+            if window_setup is not None:
+                self._window_setup[kind] = window_setup
+
+    def _factory(self, kind: str) -> Callable[[], Any]:
+        """Caller holds self._cond."""
+        factory = self._factories.get(kind)
+        if factory is None and kind.startswith(LEAN_PREFIX):
+            source = kind[len(LEAN_PREFIX):]
+            factory = lambda: get_local_headless_web_driver(lean=True, source=source)
+            self._factories[kind], self._max_size[kind] = factory, DEFAULT_MAX_DRIVERS
+            # CDP blocking holds for one window; tabs opened later get it on their first get()
+            self._window_setup[kind] = lambda driver: apply_lean_blocking(driver, source)
+        if factory is None and kind.startswith(DEDICATED_PREFIX):
+            profile = kind[len(DEDICATED_PREFIX):]
+            factory = lambda: get_dedicated_local_web_driver(profile)
+            # One browser per profile: Chrome locks its user-data-dir
+            self._factories[kind], self._max_size[kind] = factory, 1
+        if factory is None:
+            raise ValueError(f"Unknown driver kind: {kind}")
+        return factory
+
+    def _kind_metrics(self, kind: str) -> Dict[str, Any]:
+        """Caller holds self._cond."""
+        metrics = self._metrics.get(kind)
+        if metrics is None:
+            metrics = self._metrics[kind] = {
+                "checkouts": 0,
+                "total_wait": 0.0,
+                "max_wait": 0.0,
+                "spawns": 0,
+                "spawn_seconds": 0.0,
+                "respawns": 0,
+                "recycles": {"dead": 0, "navigations": 0, "rss": 0, "quit": 0},
+            }
+        return metrics
+
+    def max_size(self, kind: str) -> int:
+        with self._cond:
+            self._factory(kind)
+            return self._max_size[kind]
+
+    def capacity(self, kind: str) -> int:
+        """Drivers of a kind that can be checked out right now without waiting for a checkin."""
+        with self._cond:
+            self._factory(kind)
+            return self._max_size[kind] - self._in_use.get(kind, 0)
+
+    def _spawn(self, kind: str, respawn: bool = False):
+        with self._cond:
+            factory = self._factory(kind)
+        start = time.monotonic()
+        driver = factory()
+        elapsed = time.monotonic() - start
+        with self._cond:
+            metrics = self._kind_metrics(kind)
+            metrics["spawns"] += 1
+            metrics["spawn_seconds"] += elapsed
+            if respawn:
+                metrics["respawns"] += 1
+        return driver
+
+    def _alive(self, pooled: PooledDriver) -> bool:
+        try:
+            pooled._driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _recycle_reason(self, pooled: PooledDriver) -> Optional[str]:
+        if pooled._retired:
+            return "quit"
+        if pooled._navigations >= self.max_navigations:
+            return "navigations"
+        rss = driver_rss_mb(pooled._driver)
+        if rss is not None and rss > self.max_rss_mb:
+            return "rss"
+        return None
+
+    def _retire(self, pooled: PooledDriver, reason: str) -> None:
+        _quit_quietly(pooled._driver)
+        with self._cond:
+            self._live[pooled._kind] -= 1
+            self._kind_metrics(pooled._kind)["recycles"][reason] += 1
+            self._cond.notify_all()
+
+    def checkout(self, kind: str = HEADLESS, timeout: Optional[float] = None) -> PooledDriver:
+        """
+        Hand out an idle driver of `kind` that passes the liveness probe, or start a new one
+        while the kind is below its max_size; otherwise wait for a checkin.
+
+        Args:
+            kind: Pool kind (HEADLESS, dedicated_kind(profile), or a registered one)
+            timeout: Seconds to wait for a free driver (default: checkout_timeout)
+
+        Returns:
+            PooledDriver: Driver to give back with checkin()
+
+        Raises:
+            TimeoutError: If no driver became free within the timeout
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        while True:
+            pooled = None
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("DriverPool is closed")
+                self._factory(kind)
+                while True:
+                    idle = self._idle.get(kind)
+                    if idle:
+                        pooled = idle.pop()
+                        break
+                    if self._live.get(kind, 0) < self._max_size[kind]:
+                        self._live[kind] = self._live.get(kind, 0) + 1
+                        break
+                    remaining = timeout - (time.monotonic() - started)
+                    if remaining <= 0:
+                        raise TimeoutError(f"No {kind} driver became free within {timeout:g}s")
+                    self._cond.wait(remaining)
+
+            if pooled is None:
+                try:
+                    pooled = PooledDriver(self, kind, self._spawn(kind))
+                except Exception:
+                    with self._cond:
+                        self._live[kind] -= 1
+                        self._cond.notify_all()
+                    raise
+            elif not self._alive(pooled):
+                self._retire(pooled, "dead")
+                continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._in_use[kind] = self._in_use.get(kind, 0) + 1
+                metrics = self._kind_metrics(kind)
+                metrics["checkouts"] += 1
+                metrics["total_wait"] += waited
+                metrics["max_wait"] = max(metrics["max_wait"], waited)
+            return pooled
+
+    def checkin(self, pooled: PooledDriver, discard: bool = False) -> None:
+        """
+        Give a driver back. It is recycled instead of kept when `discard` is set, when it was
+        quit, or when it reached max_navigations or max_rss_mb.
+
+        Args:
+            pooled: Driver from checkout()
+            discard: Drop the driver, e.g. after the caller saw it misbehave
+        """
+        with self._cond:
+            self._in_use[pooled._kind] -= 1
+        reason = "dead" if discard else self._recycle_reason(pooled)
+        with self._cond:
+            keep = reason is None and not self._closed
+            if keep:
+                self._idle.setdefault(pooled._kind, []).append(pooled)
+                self._cond.notify_all()
+        if not keep:
+            self._retire(pooled, reason or "quit")
+
+    @contextmanager
+    def driver(self, kind: str = HEADLESS, timeout: Optional[float] = None) -> Iterator[PooledDriver]:
+        """checkout() for the duration of a with block."""
+        pooled = self.checkout(kind, timeout)
+        try:
+            yield pooled
+        finally:
+            self.checkin(pooled)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per kind: checkouts, wait times, spawns, respawns, recycles by reason, live/idle/in-use drivers."""
+        with self._cond:
+            result = {}
+            for kind, metrics in self._metrics.items():
+                stats = dict(metrics, recycles=dict(metrics["recycles"]))
+                stats["avg_wait"] = stats["total_wait"] / stats["checkouts"] if stats["checkouts"] else 0.0
+                stats["live"] = self._live.get(kind, 0)
+                stats["idle"] = len(self._idle.get(kind, []))
+                stats["in_use"] = self._in_use.get(kind, 0)
+                result[kind] = stats
+            return result
+
+    def close(self) -> None:
+        """Quit every idle driver; drivers still checked out are quit when they are checked in."""
+        with self._cond:
+            self._closed = True
+            idle = [pooled for drivers in self._idle.values() for pooled in drivers]
+            self._idle.clear()
+        for pooled in idle:
+            self._retire(pooled, "quit")
+
+
+_pool: Optional[DriverPool] = None
+_lock = threading.Lock()
+
+
+def get_driver_pool() -> DriverPool:
+    """Return the process-wide pool, creating it on first use; its drivers are quit at exit."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = DriverPool()
+            atexit.register(_pool.close)
+        return _pool
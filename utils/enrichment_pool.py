@@ -0,0 +1,325 @@
+# utils/enrichment_pool.py
+"""
+Concurrent detail enrichment for a scraped listing page.
+
+N detail workers, each owning its own headless WebDriver, pull projects from a shared queue
+and run the site's enrich_project_with_details plus the website email lookup. Their records
+go through a Telegram stage, one thread doing the admin lookup on the single dedicated
+profile driver (which cannot be shared) while the workers carry on, and on to the consumer,
+the calling thread, which is the only one writing to the BufferedProjectWriter. A project
+that raises only fails itself; a worker whose driver died gets a fresh one and carries on,
+so one crashed browser doesn't abort the page. Workers check their drivers out of the
+DriverPool, so the next page reuses the same browsers, and check them back in even when the
+consumer stops early.
+"""
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ProjectRecord import ProjectRecord
+from utils.project_enrichment import enrich_email_data, enrich_telegram_data
+from utils.driver_pool import HEADLESS, DriverPool, PooledDriver, get_driver_pool
+
+# Each headless Chrome needs a core and a few hundred MB, so more workers than this rarely help
+MAX_DEFAULT_WORKERS = 4
+# A worker gives up after this many checkouts in a row fail
+MAX_DRIVER_STARTS = 3
+
+_DONE = object()
+
+
+def default_worker_count() -> int:
+    """Detail workers to run when the caller doesn't say: half the cores, at most MAX_DEFAULT_WORKERS."""
+    return max(1, min(MAX_DEFAULT_WORKERS, (os.cpu_count() or 2) // 2))
+
+
+def _driver_alive(driver) -> bool:
+    """Cheap round trip to the browser; False when the session or the process is gone."""
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+class _DetailWorker(threading.Thread):
+    def __init__(self, index: int, tasks: "queue.Queue", results: "queue.Queue",
+                 enrich_details: Callable[[Any, Dict], Dict], driver_pool: DriverPool, driver_kind: str,
+                 stop: threading.Event, driver=None):
+        """
+        Args:
+            index: Worker number, used in logs and the timing report
+            tasks: Queue of (position, project dict); the worker stops when it is empty
+            results: Queue the worker puts (position, ProjectRecord or None, error) on, then _DONE
+            enrich_details: The site's enrich_project_with_details(driver, project)
+            driver_pool: Pool the worker checks its drivers out of
+            driver_kind: Pool kind of those drivers
+            stop: Set when the consumer gives up; the worker stops after its current project
+            driver: Already checked out driver to use first; borrowed, so it is never checked in here
+        """
+        super().__init__(name=f"detail-worker-{index}", daemon=True)
+        self.index = index
+        self.tasks = tasks
+        self.results = results
+        self.enrich_details = enrich_details
+        self.driver_pool = driver_pool
+        self.driver_kind = driver_kind
+        self.stop = stop
+        self.driver = driver
+        self._borrowed = driver
+
+        self.stats: Dict[str, Any] = {
+            "worker": index,
+            "projects": 0,
+            "failed": 0,
+            "busy_seconds": 0.0,
+            "checkout_seconds": 0.0,
+            "driver_restarts": 0,
+            "wall_seconds": 0.0,
+        }
+
+    def _start_driver(self) -> bool:
+        """Check out a driver; False when MAX_DRIVER_STARTS attempts in a row fail."""
+        for attempt in range(1, MAX_DRIVER_STARTS + 1):
+            start = time.monotonic()
+            try:
+                self.driver = self.driver_pool.checkout(self.driver_kind)
+                return True
+            except Exception as e:
+                print(f"[{self.name}] Driver checkout {attempt}/{MAX_DRIVER_STARTS} failed: {e}")
+            finally:
+                self.stats["checkout_seconds"] += time.monotonic() - start
+        self.driver = None
+        return False
+
+    def _replace_driver(self) -> bool:
+        """Start a new browser behind a pooled driver (the borrowed one too); check a new one out otherwise."""
+        self.stats["driver_restarts"] += 1
+        if not isinstance(self.driver, PooledDriver):
+            return self._start_driver()
+        start = time.monotonic()
+        try:
+            self.driver.respawn(restore_url=False)
+            return True
+        except Exception as e:
+            print(f"[{self.name}] Driver respawn failed: {e}")
+            return False
+        finally:
+            self.stats["checkout_seconds"] += time.monotonic() - start
+
+    def run(self) -> None:
+        started = time.monotonic()
+        try:
+            if self.driver is None and not self._start_driver():
+                print(f"[{self.name}] No driver, leaving the queue to the other workers")
+                return
+
+            while not self.stop.is_set():
+                try:
+                    position, project = self.tasks.get_nowait()
+                except queue.Empty:
+                    break
+
+                start = time.monotonic()
+                try:
+                    record = ProjectRecord.from_dict(self.enrich_details(self.driver, project))
+                    enrich_email_data(record)
+                    self.results.put((position, record, None))
+                except Exception as e:
+                    self.stats["failed"] += 1
+                    self.results.put((position, None, e))
+                    if not _driver_alive(self.driver):
+                        print(f"[{self.name}] Driver died on project {position + 1}: {e}")
+                        if not self._replace_driver():
+                            print(f"[{self.name}] Could not replace the driver, stopping")
+                            break
+                finally:
+                    self.stats["projects"] += 1
+                    self.stats["busy_seconds"] += time.monotonic() - start
+        finally:
+            if self.driver is not None and self.driver is not self._borrowed:
+                self.driver_pool.checkin(self.driver)
+            self.stats["wall_seconds"] = time.monotonic() - started
+            self.results.put(_DONE)
+
+
+class _TelegramStage(threading.Thread):
+    def __init__(self, records: "queue.Queue", results: "queue.Queue", workers: int,
+                 telegram_driver, chrome_profile: str, stop: threading.Event):
+        """
+        Args:
+            records: Queue the detail workers put their results and _DONE on
+            results: Queue the stage forwards every result to, then _DONE once all workers are done
+            workers: Number of detail workers feeding `records`
+            telegram_driver: Dedicated profile driver, used by this thread only
+            chrome_profile: Chrome profile name of telegram_driver
+            stop: Set when the consumer gives up; the remaining records are forwarded unchanged
+        """
+        super().__init__(name="telegram-stage", daemon=True)
+        self.records = records
+        self.results = results
+        self.workers = workers
+        self.telegram_driver = telegram_driver
+        self.chrome_profile = chrome_profile
+        self.stop = stop
+
+        self.stats: Dict[str, Any] = {"lookups": 0, "failed": 0, "busy_seconds": 0.0, "wall_seconds": 0.0}
+
+    def run(self) -> None:
+        started = time.monotonic()
+        running = self.workers
+        try:
+            while running:
+                item = self.records.get()
+                if item is _DONE:
+                    running -= 1
+                    continue
+
+                position, record, error = item
+                if error is None and not self.stop.is_set():
+                    start = time.monotonic()
+                    try:
+                        enrich_telegram_data(self.telegram_driver, record, self.chrome_profile)
+                    except Exception as e:
+                        # The record is still written, without admins
+                        self.stats["failed"] += 1
+                        print(f"[{self.name}] Telegram lookup failed for project {position + 1}: {e}")
+                    finally:
+                        self.stats["lookups"] += 1
+                        self.stats["busy_seconds"] += time.monotonic() - start
+                self.results.put(item)
+        finally:
+            self.stats["wall_seconds"] = time.monotonic() - started
+            self.results.put(_DONE)
+
+
+def _drain(tasks: "queue.Queue") -> int:
+    """Empty the task queue; returns the number of projects taken off it."""
+    drained = 0
+    while True:
+        try:
+            tasks.get_nowait()
+        except queue.Empty:
+            return drained
+        drained += 1
+
+
+def enrich_projects_concurrently(projects: List[Dict], source: str,
+                                 enrich_details: Callable[[Any, Dict], Dict],
+                                 writer, telegram_driver, chrome_profile: str,
+                                 workers: Optional[int] = None, driver=None,
+                                 driver_pool: Optional[DriverPool] = None, driver_kind: str = HEADLESS
+                                 ) -> List[ProjectRecord]:
+    """
+    Enrich a page of projects with a pool of detail workers and write them through one writer.
+
+    Args:
+        projects: Project dicts from the listing page (each with sources[source])
+        source: Source name used for the writes (e.g. 'coinmarketcap')
+        enrich_details: The site's enrich_project_with_details(driver, project)
+        writer: BufferedProjectWriter every record goes through, from this thread only
+        telegram_driver: Dedicated profile driver for the Telegram admin lookup
+        chrome_profile: Chrome profile name of telegram_driver
+        workers: Number of detail workers (default: default_worker_count()), capped by the
+            drivers the pool can hand out
+        driver: Open driver to lend to the first worker instead of checking one out
+        driver_pool: Pool the other workers check drivers out of (default: get_driver_pool())
+        driver_kind: Pool kind of those drivers
+
+    Returns:
+        List[ProjectRecord]: Records written, in page order
+    """
+    if workers is None:
+        workers = default_worker_count()
+    if driver_pool is None:
+        driver_pool = get_driver_pool()
+    available = driver_pool.capacity(driver_kind) + (driver is not None)
+    if workers > available:
+        print(f"Driver pool has {available} free {driver_kind} drivers, running {available} workers instead of {workers}")
+        workers = available
+    workers = max(1, min(workers, len(projects)))
+
+    tasks: "queue.Queue" = queue.Queue()
+    for position, project in enumerate(projects):
+        tasks.put((position, project))
+    records: "queue.Queue" = queue.Queue()
+    results: "queue.Queue" = queue.Queue()
+    stop = threading.Event()
+
+    pool = [
+        _DetailWorker(i, tasks, records, enrich_details, driver_pool, driver_kind, stop, driver if i == 0 else None)
+        for i in range(workers)
+    ]
+    telegram = _TelegramStage(records, results, len(pool), telegram_driver, chrome_profile, stop)
+    started = time.monotonic()
+
+    enriched: Dict[int, ProjectRecord] = {}
+    failed = 0
+    try:
+        telegram.start()
+        for worker in pool:
+            worker.start()
+
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+
+            position, record, error = item
+            link = (projects[position].get("sources") or {}).get(source, "Unknown")
+            print(f"Enriched project {position + 1}/{len(projects)}: {link}")
+            if error is not None:
+                failed += 1
+                print(f"[ERROR] Project {link} failed: {error}")
+                continue
+            if not record.project_name or not record.project_ticker:
+                failed += 1
+                print(f"[ERROR] Project {link} not enriched...")
+                continue
+            try:
+                writer.upsert_project(record, source)
+                enriched[position] = record
+            except Exception as e:
+                failed += 1
+                print(f"[ERROR] Project {link} not written: {e}")
+    finally:
+        # Also on an exception or Ctrl-C: the queued projects are dropped, every worker stops
+        # after its current project and checks its driver back in before this returns
+        stop.set()
+        # Projects left queued when every worker lost its driver, or dropped here
+        unprocessed = _drain(tasks)
+        for worker in pool:
+            if worker.ident is None:
+                records.put(_DONE)
+            else:
+                worker.join()
+        if telegram.ident is not None:
+            telegram.join()
+    elapsed = time.monotonic() - started
+
+    print_pool_report([w.stats for w in pool], elapsed, telegram.stats)
+    print(f"Pool results: enriched={len(enriched)} failed={failed} unprocessed={unprocessed}")
+    return [enriched[p] for p in sorted(enriched)]
+
+
+def print_pool_report(worker_stats: List[Dict[str, Any]], elapsed: float, telegram_stats: Dict[str, Any]) -> None:
+    """Per-worker timing table, the Telegram stage's time and overall throughput."""
+    print(f"{'worker':>6} {'projects':>8} {'failed':>6} {'busy s':>8} {'s/project':>9} "
+          f"{'checkout s':>10} {'restarts':>8} {'util':>5}")
+    total = 0
+    for s in worker_stats:
+        total += s["projects"]
+        per_project = s["busy_seconds"] / s["projects"] if s["projects"] else 0.0
+        utilization = s["busy_seconds"] / s["wall_seconds"] if s["wall_seconds"] else 0.0
+        print(f"{s['worker']:>6} {s['projects']:>8} {s['failed']:>6} {s['busy_seconds']:>8.1f} "
+              f"{per_project:>9.2f} {s['checkout_seconds']:>10.1f} {s['driver_restarts']:>8} "
+              f"{utilization:>5.0%}")
+    t = telegram_stats
+    per_lookup = t["busy_seconds"] / t["lookups"] if t["lookups"] else 0.0
+    utilization = t["busy_seconds"] / t["wall_seconds"] if t["wall_seconds"] else 0.0
+    print(f"{'tg':>6} {t['lookups']:>8} {t['failed']:>6} {t['busy_seconds']:>8.1f} "
+          f"{per_lookup:>9.2f} {'':>10} {'':>8} {utilization:>5.0%}")
+    rate = total / elapsed if elapsed else 0.0
+    print(f"{len(worker_stats)} workers + telegram stage: {total} projects in {elapsed:.1f}s ({rate:.2f}/s)")
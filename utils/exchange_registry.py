@@ -0,0 +1,71 @@
+# utils/exchange_registry.py
+"""
+Exchange dimension cache.
+
+Projects store exchanges as integer ids into the store's exchange dimension (see
+ProjectStore.resolve_exchanges) instead of raw CMC/CoinGecko slugs. An ExchangeRegistry
+keeps the slug -> id mapping of a store in process, so a listing page full of known
+exchanges resolves without a query. Ids are local to a store, so a registry is only ever
+used with the store it was built for (MasterProjectManager.exchange_registry); scrapers hand
+over slugs.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from storage.base import ProjectStore
+
+
+class ExchangeRegistry:
+    def __init__(self, store: ProjectStore):
+        """
+        Args:
+            store: Backend holding the exchange dimension
+        """
+        self.store = store
+        # Ids never change once handed out, so the caches only grow and need no invalidation
+        self._ids: Dict[Tuple[str, str], int] = {}
+        self._slugs: Dict[int, str] = {}
+
+    def resolve(self, source: str, slugs: List[str], create: bool = True) -> Dict[str, int]:
+        """
+        Exchange ids of a source's slugs; slugs not cached yet are resolved in one store call.
+
+        Args:
+            source: Source the slugs come from (e.g. 'coinmarketcap')
+            slugs: Exchange slugs as listed by that source
+            create: Give unknown exchanges a new id (otherwise they are left out)
+
+        Returns:
+            {slug: exchange id}
+        """
+        missing = [s for s in dict.fromkeys(slugs) if isinstance(s, str) and (source, s) not in self._ids]
+        if missing:
+            for slug, exchange_id in self.store.resolve_exchanges(source, missing, create).items():
+                self._ids[(source, slug)] = exchange_id
+        return {s: self._ids[(source, s)] for s in slugs if isinstance(s, str) and (source, s) in self._ids}
+
+    def ids_for(self, source: str, slugs: List[str], create: bool = True) -> List[int]:
+        """Exchange ids of `slugs` in order, de-duplicated (two slugs may name one exchange)."""
+        resolved = self.resolve(source, slugs, create)
+        return list(dict.fromkeys(resolved[s] for s in slugs if s in resolved))
+
+    def id_for(self, source: str, slug: str) -> Optional[int]:
+        """Id of a known exchange, without creating one."""
+        return self.resolve(source, [slug], create=False).get(slug)
+
+    def slugs_for(self, exchange_ids: List[int]) -> List[str]:
+        """Canonical slugs of exchange ids, for display; unknown ids are left out."""
+        missing = [i for i in dict.fromkeys(exchange_ids) if i not in self._slugs]
+        if missing:
+            self._slugs.update(self.store.exchange_slugs(missing))
+        return [self._slugs[i] for i in exchange_ids if i in self._slugs]
+
+    def add_alias(self, exchange_id: int, source: str, slug: str) -> bool:
+        """
+        Make a source's slug resolve to an existing exchange, e.g. a CoinGecko slug that
+        differs from the CMC one. Only slugs not resolved before can be aliased.
+        """
+        added = self.store.add_exchange_alias(exchange_id, source, slug)
+        if added:
+            self._ids[(source, slug)] = exchange_id
+        return added
+
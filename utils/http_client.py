@@ -0,0 +1,59 @@
+# utils/http_client.py
+"""
+Shared HTTP session for the page fetches the extractors do before (or instead of) a browser.
+
+One requests.Session per thread keeps connections to a site alive across projects instead of
+opening a TLS connection per page, and sends the browser User-Agent the WebDriver uses, since
+bare requests are served a bot page more often.
+"""
+import threading
+from typing import Dict, Optional
+
+import requests
+
+# BeautifulSoup tree builder: lxml parses large pages several times faster when installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+DEFAULT_HEADERS: Dict[str, str] = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/125.0.6422.141 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+_local = threading.local()
+
+
+def get_http_session() -> requests.Session:
+    """Return this thread's Session, creating it on first use."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        _local.session = session
+    return session
+
+
+def fetch_html(url: str, timeout: float = 10) -> Optional[str]:
+    """
+    GET a page through the thread's session.
+
+    Args:
+        url: Page URL
+        timeout: Seconds for connect and read
+
+    Returns:
+        str: Response body, or None on a network error or a non-2xx status
+    """
+    try:
+        response = get_http_session().get(url, timeout=timeout)
+        if response.ok:
+            return response.text
+        print(f"HTTP {response.status_code} for {url}")
+    except requests.RequestException as e:
+        print(f"Error fetching {url}: {e}")
+    return None
@@ -0,0 +1,86 @@
+# utils/mongo_client.py
+"""
+Process-wide MongoClient registry.
+
+MongoClient is thread-safe and owns its own connection pool and monitor threads, so a
+process should hold one client per URI instead of one per MasterProjectManager/script.
+"""
+import atexit
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import MongoClient
+
+DEFAULT_CLIENT_OPTIONS: Dict[str, Any] = {
+    "maxPoolSize": 20,
+    "minPoolSize": 0,
+    "maxIdleTimeMS": 300000,
+    "connectTimeoutMS": 10000,
+    "serverSelectionTimeoutMS": 15000,
+    "socketTimeoutMS": 60000,
+    "retryWrites": True,
+}
+
+# Wire compression in order of preference; only those whose python module is installed are offered
+PREFERRED_COMPRESSORS = ("zstd", "snappy", "zlib")
+
+_clients: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], MongoClient] = {}
+_lock = threading.Lock()
+
+
+def _available_compressors() -> List[str]:
+    """Compressors from PREFERRED_COMPRESSORS that pymongo can actually use here."""
+    available = []
+    for name, module in (("zstd", "zstandard"), ("snappy", "snappy"), ("zlib", "zlib")):
+        try:
+            __import__(module)
+            available.append(name)
+        except ImportError:
+            continue
+    return [c for c in PREFERRED_COMPRESSORS if c in available]
+
+
+def get_mongo_client(uri: Optional[str] = None, **options) -> MongoClient:
+    """
+    Return the shared pooled MongoClient for `uri`, creating it on first use.
+
+    Args:
+        uri: MongoDB connection string (defaults to config.private.get_mongodb_uri())
+        **options: MongoClient keyword options overriding DEFAULT_CLIENT_OPTIONS
+            (e.g. maxPoolSize=50, compressors="zstd"). Different options get their own client.
+
+    Returns:
+        MongoClient: Shared client; do not close() it, use close_mongo_clients()
+    """
+    if uri is None:
+        from config.private import get_mongodb_uri
+        uri = get_mongodb_uri()
+
+    client_options = {**DEFAULT_CLIENT_OPTIONS, **options}
+    if "compressors" not in client_options:
+        compressors = _available_compressors()
+        if compressors:
+            client_options["compressors"] = ",".join(compressors)
+
+    key = (uri, tuple(sorted((k, repr(v)) for k, v in client_options.items())))
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = MongoClient(uri, **client_options)
+            _clients[key] = client
+        return client
+
+
+def close_mongo_clients() -> None:
+    """Close every shared client (pools and monitor threads). Registered with atexit."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            print(f"Error closing MongoClient: {e}")
+
+
+atexit.register(close_mongo_clients)
@@ -1,28 +1,27 @@
-from typing import Dict
-
 from bs4 import BeautifulSoup
 from telebot import TeleBot
 import requests
 import random
 import re
 
+from ProjectRecord import ProjectRecord, TelegramAdmin
 from messengers.telegram.admin_extractor import get_telegram_channel_admins_chat_type_router
 from utils.text_utils import get_telegram_group_from_link
 
 
-def enrich_telegram_data(driver, project: Dict, chrome_profile) -> Dict:
+def enrich_telegram_data(driver, project: ProjectRecord, chrome_profile) -> ProjectRecord:
     """
-    Enrich project with Telegram admin data.
+    Enrich project with Telegram admin data, in place.
 
     Args:
         driver: Web driver for telegram automation
-        project: Project data dictionary
+        project: Project record
 
     Returns:
-        Dict: Enriched project data
+        ProjectRecord: The same record
     """
     try:
-        telegram_link = project.get('socials', {}).get('telegram_link')
+        telegram_link = project.socials.telegram_link
         if not telegram_link:
             return project
 
@@ -51,7 +50,7 @@ def enrich_telegram_data(driver, project: Dict, chrome_profile) -> Dict:
                 continue
 
         if not bot_info:
-            print(f"✗ All Telegram bots failed for {project.get('project_name', 'Unknown')}")
+            print(f"✗ All Telegram bots failed for {(project.project_name or 'Unknown')}")
             return project
 
         # Get admin list using validated bot
@@ -59,55 +58,55 @@ def enrich_telegram_data(driver, project: Dict, chrome_profile) -> Dict:
 
         if admin_list:
             # Add admin data to project
-            project['telegram_admins'] = admin_list
-            print(f"✓ Added {len(admin_list)} Telegram admins for {project.get('project_name', 'Unknown')}")
+            project.telegram_admins = [TelegramAdmin.from_dict(admin) for admin in admin_list]
+            print(f"✓ Added {len(admin_list)} Telegram admins for {(project.project_name or 'Unknown')}")
         else:
-            print(f"✗ No Telegram admins found for {project.get('project_name', 'Unknown')}")
+            print(f"✗ No Telegram admins found for {(project.project_name or 'Unknown')}")
 
     except Exception as e:
-        print(f"Failed to get Telegram data for {project.get('project_name', 'Unknown')}: {e}")
+        print(f"Failed to get Telegram data for {(project.project_name or 'Unknown')}: {e}")
 
     return project
 
-def enrich_email_data(project: Dict) -> Dict:
+def enrich_email_data(project: ProjectRecord) -> ProjectRecord:
     """
-    Enrich project with email data by scraping website for email addresses.
+    Enrich project with email data by scraping website for email addresses, in place.
 
     Args:
-        project: Project data dictionary
+        project: Project record
 
     Returns:
-        Dict: Enriched project data
+        ProjectRecord: The same record
     """
     try:
         # Check if we already have email data
-        existing_email = project.get('socials', {}).get('email_link')
+        existing_email = project.socials.email_link
         if existing_email:
-            print(f"✓ Email already exists for {project.get('project_name', 'Unknown')}: {existing_email}")
+            print(f"✓ Email already exists for {(project.project_name or 'Unknown')}: {existing_email}")
             return project
 
         # Get website URL to scrape for emails
-        website = project.get('socials', {}).get('website')
+        website = project.socials.website
         if not website:
-            print(f"✗ No website found for {project.get('project_name', 'Unknown')} - cannot scrape emails")
+            print(f"✗ No website found for {(project.project_name or 'Unknown')} - cannot scrape emails")
             return project
 
-        print(f"🔍 Scraping emails from website for {project.get('project_name', 'Unknown')}")
+        print(f"🔍 Scraping emails from website for {(project.project_name or 'Unknown')}")
 
         # Extract emails using the provided logic
         emails = get_email_from_website(website)
 
         if emails:
             if ', ' in emails:
-                project['email_links'] = emails
+                project.email_links = emails
             else:
-                project['email_link'] = emails
-            print(f"✓ Found email(s) for {project.get('project_name', 'Unknown')}: {emails}")
+                project.email_link = emails
+            print(f"✓ Found email(s) for {(project.project_name or 'Unknown')}: {emails}")
         else:
-            print(f"✗ No emails found for {project.get('project_name', 'Unknown')}")
+            print(f"✗ No emails found for {(project.project_name or 'Unknown')}")
 
     except Exception as e:
-        print(f"Failed to enrich email data for {project.get('project_name', 'Unknown')}: {e}")
+        print(f"Failed to enrich email data for {(project.project_name or 'Unknown')}: {e}")
 
     return project
 
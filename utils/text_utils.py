@@ -4,7 +4,7 @@ Text processing utility functions.
 """
 
 import re
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 
 # category and network util
@@ -53,6 +53,88 @@ def _slug_from_categories_url(url: str) -> Optional[str]:
 # end of category and network util
 
 
+# project identity util
+
+def normalize_project_identity(project_name: str, project_ticker: str) -> Tuple[str, str]:
+    """
+    Normalized (name_key, ticker_key) used for duplicate detection.
+    Name is whitespace-collapsed and casefolded, ticker is stripped and uppercased.
+    """
+    return _collapse_ws(project_name or "").casefold(), (project_ticker or "").strip().upper()
+
+# Source URLs whose path carries an id that is stable for the project on that site,
+# tried in this order (optional locale prefix like /en/ or /zh-tw/)
+SOURCE_ID_PATTERNS = [
+    ("coinmarketcap", re.compile(r"coinmarketcap\.com/(?:[a-z]{2}(?:-[a-z]{2,4})?/)?currencies/([^/?#\s]+)", re.IGNORECASE)),
+    ("coingecko", re.compile(r"coingecko\.com/(?:[a-z]{2}(?:-[a-z]{2,4})?/)?coins/([^/?#\s]+)", re.IGNORECASE)),
+]
+EVM_ADDRESS_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+def source_identity_keys(sources: Optional[dict]) -> List[str]:
+    """
+    'coinmarketcap:<slug>' / 'coingecko:<id>' keys parsed from source URLs.
+    Accepts payload sources ({source: url}) and stored ones ({source: {"url": ...}}).
+    """
+    urls = []
+    for value in (sources or {}).values():
+        url = value.get("url") if isinstance(value, dict) else value
+        if isinstance(url, str) and url:
+            urls.append(url)
+    keys: List[str] = []
+    for site, pattern in SOURCE_ID_PATTERNS:
+        for url in urls:
+            match = pattern.search(url)
+            if match:
+                key = f"{site}:{match.group(1).lower()}"
+                if key not in keys:
+                    keys.append(key)
+    return keys
+
+def contract_identity_key(chain: str, address: str) -> Optional[str]:
+    """
+    'contract:<chain>:<address>' for a token contract. Chains are casefolded, EVM addresses
+    lowercased; other addresses (e.g. Solana base58) are case-sensitive and kept as is.
+    """
+    chain = _collapse_ws(chain or "").casefold()
+    address = (address or "").strip()
+    if not chain or not address:
+        return None
+    if EVM_ADDRESS_RE.match(address):
+        address = address.lower()
+    return f"contract:{chain}:{address}"
+
+def project_identity_keys(project: dict) -> List[str]:
+    """
+    Cross-source identity keys of a project in matching order: source ids first, then
+    contracts ({chain: address}) sorted by chain. Name and ticker are not included.
+    """
+    keys = source_identity_keys(project.get("sources"))
+    contracts = project.get("contracts")
+    if isinstance(contracts, dict):
+        for chain in sorted(contracts, key=str):
+            address = contracts[chain]
+            key = contract_identity_key(chain, address) if isinstance(address, str) else None
+            if key and key not in keys:
+                keys.append(key)
+    return keys
+# end of project identity util
+
+
+# exchange util
+
+def exchange_key(slug: str) -> str:
+    """
+    Source-independent form of an exchange slug, so a venue listed under the same slug on
+    CMC ("uniswap-v2") and CoinGecko ("uniswap_v2") resolves to one exchange id.
+    """
+    return _collapse_ws(slug).lower().replace("_", "-").replace(" ", "-")
+
+def exchange_alias(source: str, slug: str) -> str:
+    """Source-qualified exchange slug, e.g. "coinmarketcap:pancakeswap-v3"."""
+    return f"{source}:{slug.strip()}"
+# end of exchange util
+
+
 def parse_dollar_amount(value: str) -> float | None:
     """
     Convert market cap string into float.
@@ -2,7 +2,9 @@
 """
 WebDriver utility functions.
 """
+import fnmatch
 import time
+from typing import Dict, List, Optional, Tuple
 
 from selenium.webdriver import Remote
 import os
@@ -42,31 +44,147 @@ def get_local_web_driver():
         print(f"Error creating WebDriver: {e}")
         raise
 
-def get_local_headless_web_driver():
+# Lean mode: the scrapers only read text and hrefs, so images, fonts, media and trackers are not loaded.
+# Resource patterns are path globs for Network.setBlockedURLs, whose only wildcard is *.
+LEAN_BLOCKED_RESOURCE_PATTERNS: Dict[str, List[str]] = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"],
+    "font": ["*.woff2*", "*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*.ogg*"],
+}
+# Blocked with their subdomains, in every window and frame (see headless_options)
+LEAN_BLOCKED_HOSTS: List[str] = [
+    "googletagmanager.com", "google-analytics.com", "doubleclick.net", "googlesyndication.com",
+    "googleadservices.com", "adservice.google.com", "connect.facebook.net", "hotjar.com",
+    "segment.com", "segment.io", "amplitude.com", "mixpanel.com", "clarity.ms", "bat.bing.com",
+    "static.ads-twitter.com", "ads.linkedin.com", "intercom.io", "intercomcdn.com",
+    "cloudflareinsights.com", "sentry.io", "coinzilla.io", "bitmedia.io", "a-ads.com",
+    "fonts.googleapis.com", "fonts.gstatic.com",
+]
+# Hosts a source serves its own images, fonts and media from; its resource patterns only apply there
+LEAN_SOURCE_ASSET_HOSTS: Dict[str, List[str]] = {
+    "coinmarketcap": ["s2.coinmarketcap.com", "s3.coinmarketcap.com"],
+    "coingecko": ["assets.coingecko.com", "coin-images.coingecko.com"],
+}
+# (host, path prefix) of the requests a source's pages depend on. setBlockedURLs has no
+# exceptions, so a pattern that could match one of these is not blocked for that source.
+LEAN_SOURCE_ALLOWLIST: Dict[str, List[Tuple[str, str]]] = {
+    # Cloudflare bot checks gate both sites; their scripts, images and widgets must load
+    "coinmarketcap": [("coinmarketcap.com", "/cdn-cgi/challenge-platform/")],
+    "coingecko": [("www.coingecko.com", "/cdn-cgi/challenge-platform/"), ("challenges.cloudflare.com", "/")],
+}
+# Browser-wide content settings for what the scrapers never use. Images are left to the
+# per-source patterns: a browser-wide switch would also block the allowlisted challenge images.
+LEAN_CONTENT_SETTINGS = {
+    "profile.managed_default_content_settings.media_stream": 2,
+    "profile.managed_default_content_settings.notifications": 2,
+    "profile.managed_default_content_settings.geolocation": 2,
+}
+
+
+def _may_block(host_glob: str, path_glob: str, host: str, path_prefix: str) -> bool:
+    """Whether the pattern *://host_glob/path_glob can match a URL on `host` under `path_prefix`."""
+    if not fnmatch.fnmatchcase(host, host_glob):
+        return False
+    # Some URL under the prefix matches iff a leading part of the glob matches the prefix itself
+    path = path_prefix.lstrip("/")
+    return any(fnmatch.fnmatchcase(path, path_glob[:end]) for end in range(len(path_glob) + 1))
+
+
+def lean_blocked_urls(source: Optional[str] = None) -> List[str]:
+    """
+    URL patterns a lean driver blocks for a source: its resource patterns on the source's
+    asset hosts (on every host without a source) and the tracker hosts, minus the patterns
+    that could block a URL of the source's allowlist.
+
+    Args:
+        source: 'coinmarketcap' or 'coingecko' to apply its asset hosts and allowlist; None
+            blocks the resource patterns everywhere
+
+    Returns:
+        List[str]: Patterns for Network.setBlockedURLs
+    """
+    resource_paths = [p for group in LEAN_BLOCKED_RESOURCE_PATTERNS.values() for p in group]
+    globs = [(host, path) for host in LEAN_SOURCE_ASSET_HOSTS.get(source, ["*"]) for path in resource_paths]
+    globs += [(h, "*") for host in LEAN_BLOCKED_HOSTS for h in (host, f"*.{host}")]
+    allowed = LEAN_SOURCE_ALLOWLIST.get(source, [])
+    return [f"*://{host_glob}/{path_glob}" for host_glob, path_glob in globs
+            if not any(_may_block(host_glob, path_glob, host, prefix) for host, prefix in allowed)]
+
+
+def lean_host_resolver_rules() -> str:
+    """
+    --host-resolver-rules value that fails DNS for the tracker hosts. Unlike setBlockedURLs,
+    which holds for one tab, it covers every window, popup and cross-site frame of the browser.
+    """
+    allowed = {host for hosts in LEAN_SOURCE_ALLOWLIST.values() for host, _ in hosts}
+    rules = [f"MAP {h} ~NOTFOUND" for host in LEAN_BLOCKED_HOSTS for h in (host, f"*.{host}")
+             if not any(fnmatch.fnmatchcase(a, h) for a in allowed)]
+    return ", ".join(rules)
+
+
+def headless_options(lean: bool = False) -> Options:
+    """
+    Chrome options of the headless driver.
+
+    Args:
+        lean: Also turn off media, notifications and geolocation through content settings,
+            and resolve no tracker host (lean_host_resolver_rules). Images stay on: they are
+            blocked per window by lean_blocked_urls, which spares the source's allowlist
+
+    Returns:
+        Options: Chrome options
+    """
+    options = Options()
+    options.add_argument("--disable-background-timer-throttling")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    options.add_argument("--disable-renderer-backgrounding")
+    options.add_argument("--disable-features=CalculateNativeWinOcclusion")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1200,1080")
+    options.add_argument("--headless=new")
+    # options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+    options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                         "(KHTML, like Gecko) Chrome/125.0.6422.141 Safari/537.36") #required for X (Twitter)
+    if lean:
+        options.add_argument("--autoplay-policy=user-gesture-required")
+        options.add_argument(f"--host-resolver-rules={lean_host_resolver_rules()}")
+        options.add_experimental_option("prefs", LEAN_CONTENT_SETTINGS)
+    return options
+
+
+def apply_lean_blocking(driver, source: Optional[str] = None) -> None:
+    """
+    Block lean_blocked_urls(source) in the driver's current window through CDP. The block
+    list belongs to that window's target, so a window opened later needs its own call
+    (DriverPool does this before the first get() in each window).
+
+    Args:
+        driver: Local Chrome WebDriver
+        source: Source whose asset hosts and allowlist apply
+    """
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": lean_blocked_urls(source)})
+
+
+def get_local_headless_web_driver(lean: bool = False, source: Optional[str] = None):
     """
-    Creates and returns a headless Chrome WebDriver instance using a specific Chrome profile.
+    Creates and returns a headless Chrome WebDriver instance.
+
+    Args:
+        lean: Block images, fonts, media and tracker hosts (see lean_blocked_urls)
+        source: Source the lean driver is used for, selecting its allowlist
 
     Returns:
         webdriver.Chrome: Configured Chrome WebDriver
     """
     try:
-        options = Options()
-        options.add_argument("--disable-background-timer-throttling")
-        options.add_argument("--disable-backgrounding-occluded-windows")
-        options.add_argument("--disable-renderer-backgrounding")
-        options.add_argument("--disable-features=CalculateNativeWinOcclusion")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1200,1080")
-        options.add_argument("--headless=new")
-        # options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
-        options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                             "(KHTML, like Gecko) Chrome/125.0.6422.141 Safari/537.36") #required for X (Twitter)
-
-        driver = webdriver.Chrome(options=options)
+        driver = webdriver.Chrome(options=headless_options(lean))
         driver.set_page_load_timeout(20)
         driver.implicitly_wait(int(10))
+        if lean:
+            apply_lean_blocking(driver, source)
 
         return driver
 